@@ -0,0 +1,261 @@
+"""
+Disease Code Tree - 질병 코드 접두사 트리 + 코호트 규모 추정
+reference_data/unique_disease_codes.csv의 코드별 환자 수/발생 건수를 접두사 단위로 집계해
+LIKE 'AI1%' 같은 패턴이 얼마나 큰 코호트를 만드는지 미리 알 수 있게 함
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from core.reference_store import load_reference_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CODES_PATH = "reference_data/unique_disease_codes.csv"
+DEFAULT_DISEASES_PATH = "reference_data/unique_diseases.csv"
+
+# 이 이상이면 대형 코호트로 보고 경고 (추정 환자 수 상한 기준)
+LARGE_COHORT_PATIENTS = 100_000
+
+
+@dataclass
+class CodeNode:
+    """
+    접두사 트리 노드
+
+    patient_count는 하위 코드 환자 수의 합 (한 환자가 여러 코드를 가질 수 있어 상한),
+    max_code_patients는 하위 코드 중 최대 환자 수 (하한)
+    """
+    prefix: str
+    patient_count: int = 0
+    occurrence_count: int = 0
+    code_count: int = 0
+    max_code_patients: int = 0
+    is_code: bool = False
+    children: Dict[str, "CodeNode"] = field(default_factory=dict)
+
+    @property
+    def pattern(self) -> str:
+        return self.prefix + '%'
+
+    @property
+    def own_patient_count(self) -> int:
+        """이 코드 자체의 환자 수 (하위 코드 제외)"""
+        return self.patient_count - sum(child.patient_count for child in self.children.values())
+
+    def iter_codes(self) -> Iterable["CodeNode"]:
+        """하위 실제 코드 노드 (깊이 우선)"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_code:
+                yield node
+            stack.extend(node.children.values())
+
+
+@dataclass
+class CohortEstimate:
+    """LIKE 패턴 하나의 코호트 규모 추정"""
+    pattern: str
+    patient_count: int          # 상한 (코드별 환자 수 합)
+    patient_count_min: int      # 하한 (최대 단일 코드 환자 수)
+    occurrence_count: int       # 진료 행 수 (코드별 발생 건수 합 - 정확)
+    code_count: int
+
+    @property
+    def is_large(self) -> bool:
+        return self.patient_count >= LARGE_COHORT_PATIENTS
+
+    def describe(self) -> str:
+        """프롬프트용 한 줄 요약"""
+        if self.patient_count_min == self.patient_count:
+            patients = f"{self.patient_count:,}명"
+        else:
+            patients = f"{self.patient_count_min:,}~{self.patient_count:,}명"
+        return f"코드 {self.code_count}개, 환자 {patients}, 진료 {self.occurrence_count:,}건"
+
+
+class DiseaseCodeTree:
+    """
+    질병 코드 접두사 트리
+
+    로드 시 코드마다 루트→코드 경로의 모든 노드에 환자 수/발생 건수를 누적하므로,
+    이후 접두사 추정은 트리 탐색 한 번 (코드 길이만큼)으로 끝남.
+    """
+
+    def __init__(self, codes_df: pd.DataFrame) -> None:
+        """
+        Args:
+            codes_df: code, patient_count, occurrence_count 컬럼 ('$' 코드는 제외)
+        """
+        self.root = CodeNode(prefix='')
+
+        df = codes_df.dropna(subset=['code'])
+        df = df[df['code'] != '$']
+        for code, patients, occurrences in zip(df['code'], df['patient_count'], df['occurrence_count']):
+            patients, occurrences = int(patients), int(occurrences)
+            node = self.root
+            self._accumulate(node, patients, occurrences)
+            for char in code:
+                child = node.children.get(char)
+                if child is None:
+                    child = CodeNode(prefix=node.prefix + char)
+                    node.children[char] = child
+                node = child
+                self._accumulate(node, patients, occurrences)
+            node.is_code = True
+
+        logger.info(f"Disease code tree ready: {self.root.code_count} codes")
+
+    @staticmethod
+    def _accumulate(node: CodeNode, patients: int, occurrences: int) -> None:
+        node.patient_count += patients
+        node.occurrence_count += occurrences
+        node.code_count += 1
+        node.max_code_patients = max(node.max_code_patients, patients)
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_CODES_PATH) -> "DiseaseCodeTree":
+        """
+        unique_disease_codes.csv에서 생성 (없으면 unique_diseases.csv를 코드별로 집계)
+        """
+        if Path(path).exists():
+            return cls(load_reference_frame(path))
+
+        diseases = load_reference_frame(DEFAULT_DISEASES_PATH)
+        codes = diseases.groupby('code', as_index=False)[['patient_count', 'occurrence_count']].sum()
+        return cls(codes)
+
+    def node(self, prefix: str) -> Optional[CodeNode]:
+        """접두사 노드 ('AI1%'처럼 % 붙은 패턴도 허용), 없으면 None"""
+        node = self.root
+        for char in prefix.rstrip('%'):
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def estimate(self, pattern: str) -> CohortEstimate:
+        """LIKE 패턴 (또는 접두사)의 코호트 규모 추정 - 매칭 코드가 없으면 0"""
+        node = self.node(pattern)
+        prefix = pattern.rstrip('%')
+        if node is None:
+            return CohortEstimate(prefix + '%', 0, 0, 0, 0)
+        return CohortEstimate(
+            pattern=prefix + '%',
+            patient_count=node.patient_count,
+            patient_count_min=node.max_code_patients,
+            occurrence_count=node.occurrence_count,
+            code_count=node.code_count
+        )
+
+    def tightest_prefix(self, codes: Iterable[str]) -> Optional[CodeNode]:
+        """
+        주어진 코드를 모두 포함하는 가장 깊은 (가장 작은) 접두사 노드
+
+        Returns:
+            CodeNode, 코드가 없거나 트리에 없는 코드가 섞이면 None
+        """
+        codes = [code for code in codes if code]
+        if not codes:
+            return None
+
+        prefix = codes[0]
+        for code in codes[1:]:
+            length = 0
+            for a, b in zip(prefix, code):
+                if a != b:
+                    break
+                length += 1
+            prefix = prefix[:length]
+
+        if any(self.node(code) is None for code in codes):
+            return None
+        return self.node(prefix)
+
+    def cover(self, codes: Iterable[str], max_patterns: int = 3) -> List[CodeNode]:
+        """
+        코드들을 max_patterns개 이하의 접두사로 덮기
+
+        코드 자체에서 시작해, 패턴 수가 max_patterns 이하가 될 때까지
+        합쳤을 때 추가로 끌려오는 환자 수가 가장 적은 두 접두사를 병합 (탐욕적).
+        추가 환자가 없는 병합은 패턴 수와 관계없이 계속 (AJ450 + AJ459 → AJ45).
+
+        Returns:
+            접두사 노드 목록 (환자 수 내림차순)
+        """
+        nodes: List[CodeNode] = []
+        for code in dict.fromkeys(code for code in codes if code):
+            node = self.node(code)
+            if node is not None:
+                nodes.append(node)
+
+        # 이미 다른 접두사에 포함된 노드 제거
+        nodes = [n for n in nodes if not any(o is not n and n.prefix.startswith(o.prefix) for o in nodes)]
+
+        while len(nodes) > 1:
+            best: Optional[Tuple[int, int, int, CodeNode]] = None
+            for i in range(len(nodes)):
+                for j in range(i + 1, len(nodes)):
+                    merged = self.tightest_prefix([nodes[i].prefix, nodes[j].prefix])
+                    covered = sum(n.patient_count for n in nodes if n.prefix.startswith(merged.prefix))
+                    extra = merged.patient_count - covered
+                    if best is None or extra < best[0]:
+                        best = (extra, i, j, merged)
+            extra, i, j, merged = best
+            if extra > 0 and len(nodes) <= max(1, max_patterns):
+                break
+            nodes = [n for k, n in enumerate(nodes) if k not in (i, j) and not n.prefix.startswith(merged.prefix)]
+            nodes.append(merged)
+
+        return sorted(nodes, key=lambda n: n.patient_count, reverse=True)
+
+    @staticmethod
+    def precision(nodes: Iterable[CodeNode], codes: Iterable[str]) -> float:
+        """
+        접두사들이 끌어오는 환자 중 주어진 코드의 환자 비율 (cover()가 형제 코드를 얼마나 섞었는지)
+
+        Returns:
+            0~1, 접두사 환자 수가 0이면 1.0
+        """
+        wanted = set(codes)
+        total = inside = 0
+        for node in nodes:
+            for code in node.iter_codes():
+                own = code.own_patient_count
+                total += own
+                if code.prefix in wanted:
+                    inside += own
+        return inside / total if total else 1.0
+
+
+_trees: Dict[str, Tuple[int, DiseaseCodeTree]] = {}
+_trees_lock = threading.Lock()
+
+
+def get_disease_code_tree(path: str = DEFAULT_CODES_PATH) -> Optional[DiseaseCodeTree]:
+    """
+    프로세스 공용 DiseaseCodeTree (CSV가 바뀌면 다시 생성)
+
+    Returns:
+        DiseaseCodeTree, 참조 파일이 모두 없으면 None
+    """
+    csv_path = Path(path)
+    if not csv_path.exists():
+        csv_path = Path(DEFAULT_DISEASES_PATH)
+        if not csv_path.exists():
+            return None
+
+    mtime_ns = csv_path.stat().st_mtime_ns
+    key = str(Path(path).resolve())
+    with _trees_lock:
+        entry = _trees.get(key)
+        if entry is None or entry[0] != mtime_ns:
+            entry = (mtime_ns, DiseaseCodeTree.from_csv(path))
+            _trees[key] = entry
+        return entry[1]
@@ -0,0 +1,366 @@
+"""
+Disease Matcher - 질의 속 질병 언급을 한 번에 찾는 Aho–Corasick 사전
+unique_diseases.csv 전체 질병명에서 뽑은 용어 + 흔한 별칭으로 자동자를 만들고,
+질의를 한 번 훑어 모든 질병 언급과 해당 질병 코드(환자 수 순)를 반환
+"""
+
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from core.disease_code_tree import DiseaseCodeTree
+from core.reference_store import load_reference_frame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISEASES_PATH = "reference_data/unique_diseases.csv"
+
+# 별칭 → 질병명에서 찾을 용어 (질병명에 그대로 나오지 않는 일상 표현 포함)
+COMMON_ALIASES: Dict[str, List[str]] = {
+    '고혈압': ['고혈압'],
+    '당뇨': ['당뇨'],
+    '암': ['암', '악성 신생물'],
+    '위염': ['위염'],
+    '감기': ['감기', '비인두염'],
+    '독감': ['인플루엔자'],
+    '조현병': ['조현병'],
+    '비만': ['비만'],
+    '폐렴': ['폐렴'],
+    '천식': ['천식'],
+    '우울': ['우울'],
+    '우울증': ['우울'],
+    '치매': ['치매'],
+    '알츠하이머': ['알츠하이머'],
+    '파킨슨': ['파킨슨'],
+    '간염': ['간염'],
+    '간경화': ['간경변', '간섬유증'],
+    '신부전': ['신부전'],
+    '심부전': ['심부전'],
+    '고지혈증': ['고지혈증', '이상지질혈증', '고콜레스테롤혈증'],
+    '중풍': ['뇌경색', '뇌졸중'],
+    '디스크': ['추간판'],
+    '코로나': ['코로나바이러스'],
+}
+
+# 장기별 암 별칭 → 원발성 악성 신생물 질병명에서 찾을 부위 표현 (정규식, 괄호 제거한 질병명 기준)
+# '뇌간의', '부갑상선의'처럼 다른 단어 안에 들어간 부위는 앞 글자가 한글이 아니어야 함
+CANCER_SITES: Dict[str, str] = {
+    '위암': r'(?<![가-힣])(위|유문동|유문|분문)의',
+    '폐암': r'(?<![가-힣])(폐|주기관지)의',
+    '간암': r'(?<![가-힣])간(의| 및 간내)|간세포암|간내담관암|간모세포',
+    '대장암': r'결장|직장|맹장',
+    '유방암': r'유방|유두 및 유륜',
+    '갑상선암': r'(?<![가-힣])갑상선의',
+    '후두암': r'후두',
+    '설암': r'(?<![가-힣])혀',
+    '피부암': r'피부',
+    '뇌암': r'(?<![가-힣])뇌의',
+    '췌장암': r'췌장|췌관',
+    '전립선암': r'전립선',
+    '자궁경부암': r'자궁경부',
+    '방광암': r'방광',
+    '신장암': r'(?<![가-힣])신장의',
+    '난소암': r'난소',
+    '자궁내막암': r'자궁내막|자궁체',
+    '고환암': r'고환',
+    '식도암': r'식도',
+    '담낭암': r'담낭',
+}
+_MALIGNANT = '악성 신생물'
+_NON_PRIMARY = ('이차성', '가족력', '개인력', '추적검사')
+
+# 질병명에서 용어로 쓰지 않을 단어 (수식어/일반어, 분석 질의에 흔한 단어)
+TERM_STOPWORDS = {
+    '기타', '상세불명', '상세불명의', '명시된', '명시되지', '분류되지', '분류된', '달리', '않은', '않는', '없는',
+    '있는', '동반한', '동반하지', '관련된', '의한', '대한', '또는', '여러', '부분', '부위', '이상', '손상',
+    '장애', '질환', '급성', '만성', '양성', '이차성', '원발성', '특발성', '신생물', '합병증', '증후군',
+    '환자', '남성', '여성', '소아', '성인', '노인', '검사', '관리', '치료', '병원', '지역', '연령', '진단',
+    '가진', '약물', '처방', '방문', '수술', '사용', '투여', '상태', '경우', '결과', '분포', '비율', '기간',
+}
+
+# 조사/어미로 끝나는 단어는 수식어로 보고 제외 (예: 부위의, 손상을)
+_PARTICLE_ENDINGS = ('의', '을', '를', '은', '는', '한', '된', '인', '로', '에', '과', '와', '서', '던')
+
+_NAME_PREFIX_RE = re.compile(r'^\((양방|한방)\)')
+_BRACKETS_RE = re.compile(r'\[[^\]]*\]|\([^)]*\)')
+_WORD_SPLIT_RE = re.compile(r'[\s,·/]+')
+_HANGUL_RE = re.compile(r'[가-힣]')
+
+
+def clean_disease_name(name: str) -> str:
+    """'(양방)' 접두사와 괄호 내용 제거"""
+    return _BRACKETS_RE.sub(' ', _NAME_PREFIX_RE.sub('', name)).strip()
+
+
+def extract_terms(name: str) -> List[str]:
+    """질병명 → 언급 용어 (2자 이상, 수식어/조사로 끝나는 단어 제외)"""
+    terms = []
+    for word in _WORD_SPLIT_RE.split(clean_disease_name(name)):
+        word = word.strip('.-')
+        if len(word) < 2 or word in TERM_STOPWORDS or word.endswith(_PARTICLE_ENDINGS):
+            continue
+        if word.isdigit():
+            continue
+        terms.append(word)
+    return terms
+
+
+def code_pattern(code: str) -> str:
+    """질병 코드 → LIKE 패턴 (앞 3자리 + %, 예: AI109 → AI1%) - 코드 트리가 없을 때의 기본값"""
+    return code[:3] + '%' if len(code) >= 3 else code + '%'
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick 다중 문자열 검색 자동자 (순수 Python)
+
+    텍스트 길이 + 일치 수에 비례하는 한 번의 선형 탐색으로 등록된 모든 단어의 출현을 찾음.
+    """
+
+    def __init__(self, words) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+
+        for word in words:
+            state = 0
+            for char in word:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            if word not in self._output[state]:
+                self._output[state] = self._output[state] + (word,)
+
+        # BFS로 실패 링크 계산, 출력은 실패 링크 쪽 출력과 병합
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(시작, 끝, 단어) - 겹치는 일치도 모두 반환"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word in output[state]:
+                yield position - len(word) + 1, position + 1, word
+
+
+@dataclass
+class DiseaseMention:
+    """질의 속 질병 언급 1건"""
+    keyword: str
+    start: int
+    end: int
+    diseases: List[Dict] = field(default_factory=list)  # 환자 수 내림차순
+
+
+class DiseaseMatcher:
+    """
+    질병 언급 사전
+
+    로드 시:
+      - 모든 질병명에서 용어를 뽑고 별칭과 합쳐 Aho–Corasick 자동자 생성
+      - 자동자로 질병명을 한 번씩 훑어 용어 → 그 용어를 포함하는 질병 (환자 수 순, 상위 max_candidates)
+      - 장기별 암 별칭 (위암, 폐암 ...)은 부위 표현이 있는 원발성 악성 신생물로
+      - 질병 코드별 LIKE 패턴 미리 계산
+    질의 시:
+      - 자동자로 질의를 한 번 훑어 가장 긴 비중첩 언급만 남기고 미리 계산된 후보 반환
+      - 한 글자 용어 ('암')는 단어 첫 글자일 때만 (후두암 → 전체 암으로 넓히지 않음)
+    """
+
+    def __init__(
+        self,
+        diseases_df: pd.DataFrame,
+        aliases: Optional[Dict[str, List[str]]] = None,
+        max_candidates: int = 20,
+        cancer_sites: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Args:
+            diseases_df: unique_diseases.csv (name, code, patient_count)
+            aliases: 별칭 → 질병명 검색 용어 (기본 COMMON_ALIASES)
+            max_candidates: 용어별로 보관할 질병 수
+            cancer_sites: 장기별 암 별칭 → 부위 정규식 (기본 CANCER_SITES)
+        """
+        aliases = COMMON_ALIASES if aliases is None else aliases
+        cancer_sites = CANCER_SITES if cancer_sites is None else cancer_sites
+        self.max_candidates = max_candidates
+
+        df = diseases_df.dropna(subset=['name', 'code'])
+        df = df[df['code'] != '$'].sort_values('patient_count', ascending=False, kind='stable')
+        self.diseases: List[Dict] = [
+            {
+                'disease_name': name,
+                'disease_code': code,
+                'pattern': code_pattern(code),
+                'patient_count': int(count)
+            }
+            for name, code, count in zip(df['name'], df['code'], df['patient_count'])
+        ]
+
+        name_terms = {term for name in df['name'] for term in extract_terms(name)}
+        alias_targets = {target for targets in aliases.values() for target in targets}
+        name_matcher = AhoCorasick(name_terms | alias_targets)
+
+        # 용어 → 포함하는 질병 인덱스 (self.diseases가 환자 수 순이므로 추가 순서가 곧 순위)
+        postings: Dict[str, List[int]] = {}
+        for index, disease in enumerate(self.diseases):
+            seen = set()
+            for _, _, term in name_matcher.iter_matches(disease['disease_name']):
+                if term in seen:
+                    continue
+                seen.add(term)
+                bucket = postings.setdefault(term, [])
+                if len(bucket) < max_candidates:
+                    bucket.append(index)
+
+        self.candidates: Dict[str, Tuple[int, ...]] = {
+            term: tuple(indices) for term, indices in postings.items() if term in name_terms
+        }
+        for alias, targets in aliases.items():
+            merged = sorted({i for target in targets for i in postings.get(target, ())})
+            if merged:
+                self.candidates[alias] = tuple(merged[:max_candidates])
+
+        primary_cancers = [
+            (index, clean_disease_name(disease['disease_name']))
+            for index, disease in enumerate(self.diseases)
+            if _MALIGNANT in disease['disease_name']
+            and not any(word in disease['disease_name'] for word in _NON_PRIMARY)
+        ]
+        for alias, site in cancer_sites.items():
+            site_re = re.compile(site)
+            indices = [index for index, name in primary_cancers if site_re.search(name)]
+            if indices:
+                self.candidates[alias] = tuple(indices[:max_candidates])
+
+        self.matcher = AhoCorasick(self.candidates)
+        logger.info(f"Disease matcher ready: {len(self.diseases)} diseases, {len(self.candidates)} terms")
+
+    @classmethod
+    def from_csv(cls, path: str = DEFAULT_DISEASES_PATH, **kwargs) -> "DiseaseMatcher":
+        """unique_diseases.csv (컬럼형 사본이 있으면 메모리 매핑)에서 생성"""
+        return cls(load_reference_frame(path), **kwargs)
+
+    def find_mentions(self, query: str, per_mention: int = 3) -> List[DiseaseMention]:
+        """
+        질의 속 질병 언급 (질의 순서, 겹치면 가장 긴 언급 우선)
+
+        Args:
+            query: 사용자 질의
+            per_mention: 언급별 반환할 질병 수 (환자 수 순)
+        """
+        matches = sorted(self.matcher.iter_matches(query), key=lambda m: (m[0], -(m[1] - m[0])))
+
+        mentions: List[DiseaseMention] = []
+        covered_until = 0
+        for start, end, term in matches:
+            if start < covered_until:
+                continue
+            if end - start == 1 and start > 0 and _HANGUL_RE.match(query[start - 1]):
+                continue
+            covered_until = end
+            mentions.append(DiseaseMention(
+                keyword=term,
+                start=start,
+                end=end,
+                diseases=[self.diseases[i] for i in self.candidates[term][:per_mention]]
+            ))
+        return mentions
+
+    def find_disease_codes(
+        self,
+        query: str,
+        per_mention: int = 3,
+        code_tree: Optional[DiseaseCodeTree] = None,
+        max_patterns: int = 3
+    ) -> List[Dict]:
+        """
+        NL2SQL 질병 코드 힌트용 평탄화 결과
+
+        Args:
+            query: 사용자 질의
+            per_mention: 언급별 반환할 질병 수 (환자 수 순)
+            code_tree: 있으면 언급의 후보 코드 전체를 cover()로 덮은 접두사를 pattern으로 사용
+                       (천식: AJ4% 대신 AJ45%), 없으면 앞 3자리
+            max_patterns: 3자리 그룹별 접두사 최대 개수
+
+        Returns:
+            [{'disease_name', 'disease_code', 'pattern', 'patient_count', 'keyword'}, ...]
+        """
+        if code_tree is None:
+            return [
+                dict(disease, keyword=mention.keyword)
+                for mention in self.find_mentions(query, per_mention=per_mention)
+                for disease in mention.diseases
+            ]
+
+        codes = []
+        for mention in self.find_mentions(query, per_mention=self.max_candidates):
+            patterns = self._cover_patterns(mention.diseases, code_tree, max_patterns)
+            for disease in mention.diseases[:per_mention]:
+                pattern = patterns.get(disease['disease_code'], disease['pattern'])
+                codes.append(dict(disease, pattern=pattern, keyword=mention.keyword))
+        return codes
+
+    @staticmethod
+    def _cover_patterns(diseases: List[Dict], code_tree: DiseaseCodeTree, max_patterns: int) -> Dict[str, str]:
+        """후보 질병 → 코드별 덮는 접두사 패턴 (3자리 그룹마다 cover, 트리에 없는 코드는 제외)"""
+        groups: Dict[str, List[str]] = {}
+        for disease in diseases:
+            groups.setdefault(disease['pattern'], []).append(disease['disease_code'])
+
+        patterns: Dict[str, str] = {}
+        for codes in groups.values():
+            for node in code_tree.cover(codes, max_patterns=max_patterns):
+                for code in codes:
+                    if code.startswith(node.prefix):
+                        patterns[code] = node.pattern
+        return patterns
+
+
+_matchers: Dict[str, Tuple[int, DiseaseMatcher]] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_disease_matcher(path: str = DEFAULT_DISEASES_PATH) -> Optional[DiseaseMatcher]:
+    """
+    프로세스 공용 DiseaseMatcher (CSV가 바뀌면 다시 생성)
+
+    Returns:
+        DiseaseMatcher, 파일이 없으면 None
+    """
+    csv_path = Path(path)
+    if not csv_path.exists():
+        return None
+
+    mtime_ns = csv_path.stat().st_mtime_ns
+    key = str(csv_path.resolve())
+    with _matchers_lock:
+        entry = _matchers.get(key)
+        if entry is None or entry[0] != mtime_ns:
+            entry = (mtime_ns, DiseaseMatcher.from_csv(path))
+            _matchers[key] = entry
+        return entry[1]
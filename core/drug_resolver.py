@@ -0,0 +1,339 @@
+"""
+Drug Resolver - 질의 속 약품명/성분명 → 표준 성분 + res_drug_name / res_ingredients 필터
+unique_drugs.csv + medication_ingredients.csv로 로드 시 사전을 만들고
+
+- 정확 매칭: 상품명 / 한글 성분명 / 영문 성분명 Aho–Corasick 자동자 (질의 한 번 훑기)
+- 부분 매칭: 정확 매칭되지 않은 한글 단어는 상품명 음절 bigram 색인으로 유사도 검색 ("소론도" → 소론도정)
+
+결과는 patient_count / usage_count 순
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.disease_matcher import AhoCorasick
+from core.reference_store import REFERENCE_DIR, load_reference_frame
+
+logger = logging.getLogger(__name__)
+
+DRUGS_FILENAME = "unique_drugs.csv"
+MEDICATION_INGREDIENTS_FILENAME = "medication_ingredients.csv"
+
+# 부분 매칭 최소 Dice 유사도 (음절 bigram)
+FUZZY_MIN_SIMILARITY = 0.75
+
+# 부분 매칭 대상에서 제외할 질의 단어
+QUERY_STOPWORDS = {
+    '환자', '처방', '처방된', '처방받은', '약물', '약품', '성분', '복용', '투여', '병원', '지역', '분포',
+    '비율', '상위', '남성', '여성', '연령', '성별', '기간', '동시', '함께', '사용', '이상', '이하',
+}
+
+# 영문 성분명 첫 단어로 쓰지 않을 염/제형 단어
+_GENERIC_INGREDIENT_WORDS = {'sodium', 'potassium', 'calcium', 'magnesium', 'hydrochloride', 'acid', 'dried'}
+
+# 한글 성분명 끝의 염/수화물 표기 (제거해 기본 성분명도 사전에 추가: 메트포르민염산염 → 메트포르민)
+_KOREAN_SALT_SUFFIXES = (
+    '브롬화수소산염', '타르타르산염', '푸마르산염', '시트르산염', '아세트산염', '베실산염', '말레산염', '숙신산염',
+    '메실산염', '캄실산염', '토실산염', '염산염', '황산염', '인산염', '질산염', '이수화물', '수화물', '무수물',
+    '나트륨', '칼륨', '칼슘', '마그네슘',
+)
+
+# 상품명 끝의 제형 표기 (제거해 기본 상품명도 사전에 추가: 소론도정 → 소론도)
+_DOSAGE_FORM_SUFFIXES = (
+    '필름코팅정', '연질캡슐', '서방정', '장용정', '주사액', '현탁액', '점안액', '캡슐', '시럽', '과립', '연고',
+    '크림', '패취', '정', '주', '액', '산', '겔',
+)
+
+_BRAND_END_RE = re.compile(r'[(\[_]')
+_LEADING_HANGUL_RE = re.compile(r'^[가-힣]+')
+_FIRST_PAREN_RE = re.compile(r'^[^(]*\(([^()]*)\)')
+_HANGUL_WORD_RE = re.compile(r'[가-힣]{3,}')
+_HANGUL_RE = re.compile(r'[가-힣]')
+
+
+def brand_key(drug_name: str) -> str:
+    """약품명 → 상품명 (괄호/규격 앞부분, 예: '소론도정(프레드니솔론)_(5mg/1정)' → '소론도정')"""
+    return _BRAND_END_RE.split(drug_name, 1)[0].strip()
+
+
+def korean_ingredient(drug_name: str) -> Optional[str]:
+    """약품명 첫 괄호 속 한글 성분명 (예: '소론도정(프레드니솔론)_(5mg/1정)' → '프레드니솔론')"""
+    match = _FIRST_PAREN_RE.match(drug_name)
+    if not match:
+        return None
+    text = match.group(1).strip()
+    if len(text) < 2 or not _HANGUL_RE.search(text) or ':' in text:
+        return None
+    return text
+
+
+def strip_suffixes(word: str, suffixes: Tuple[str, ...], min_length: int = 3) -> str:
+    """끝에 붙은 접미사를 반복 제거, 긴 접미사 우선 (남는 길이가 min_length 미만이면 중단)"""
+    suffix_set = frozenset(suffixes)
+    lengths = sorted({len(suffix) for suffix in suffixes}, reverse=True)
+    stripped = True
+    while stripped:
+        stripped = False
+        for length in lengths:
+            if len(word) - length >= min_length and word[-length:] in suffix_set:
+                word = word[:-length]
+                stripped = True
+                break
+    return word
+
+
+def brand_stems(drug_name: str) -> List[str]:
+    """
+    약품명 → 사전에 넣을 상품명 변형 (앞쪽 한글 부분 + 제형 표기를 뗀 기본형)
+
+    '타이레놀8시간이알서방정(아세트아미노펜)_(0.65g/1정)' → ['타이레놀']
+    '소론도정(프레드니솔론)_(5mg/1정)' → ['소론도정', '소론도']
+    """
+    leading = _LEADING_HANGUL_RE.match(brand_key(drug_name))
+    if not leading:
+        return []
+    base = leading.group()
+    stems = [base, strip_suffixes(base, _DOSAGE_FORM_SUFFIXES)]
+    return [s for s in dict.fromkeys(stems) if len(s) >= 2]
+
+
+def brand_base(keyword: str) -> str:
+    """상품명 → 제형 표기를 뗀 기본형 (소론도정 → 소론도)"""
+    return strip_suffixes(keyword, _DOSAGE_FORM_SUFFIXES, min_length=2)
+
+
+def canonical_ingredient(ingredient: str) -> str:
+    """
+    영문 성분명 → res_ingredients 검색어 (괄호 제거, 염/수화물 앞 첫 단어)
+
+    'metformin hydrochloride' → 'metformin', 'acetaminophen(encapsulated)' → 'acetaminophen'
+    """
+    text = re.sub(r'\([^)]*\)', ' ', ingredient.lower()).strip()
+    first_word = text.split(' ', 1)[0] if text else ingredient.lower()
+    if len(first_word) >= 4 and first_word not in _GENERIC_INGREDIENT_WORDS:
+        return first_word
+    return text or ingredient.lower()
+
+
+def _bigrams(word: str) -> List[str]:
+    return [word[i:i + 2] for i in range(len(word) - 1)] or [word]
+
+
+def _sql_like_value(text: str) -> str:
+    """LIKE 패턴 리터럴용 이스케이프 (작은따옴표)"""
+    return text.replace("'", "''")
+
+
+@dataclass
+class DrugEntry:
+    """상품명 또는 성분명 하나 (사전 항목)"""
+    keyword: str
+    kind: str                       # 'brand' | 'ingredient'
+    ingredient: str                 # 대표 영문 성분명 (res_ingredients 값)
+    patient_count: int
+    drug_names: List[str] = field(default_factory=list)   # 대표 res_drug_name (사용량 순)
+
+    @property
+    def ingredient_filter(self) -> str:
+        """성분 기준 prescribed_drug 필터 (같은 성분의 다른 상품 포함)"""
+        return f"LOWER(pd.res_ingredients) LIKE '%{_sql_like_value(self.ingredient.lower())}%'"
+
+    @property
+    def drug_name_filter(self) -> Optional[str]:
+        """상품명 기준 prescribed_drug 필터 (상품명 항목만)"""
+        if self.kind != 'brand':
+            return None
+        return f"pd.res_drug_name LIKE '{_sql_like_value(self.keyword)}%'"
+
+
+@dataclass
+class DrugMatch:
+    """질의 속 약품/성분 언급 1건"""
+    mention: str
+    start: int
+    end: int
+    entry: DrugEntry
+    similarity: float = 1.0        # 부분 매칭이면 Dice 유사도
+
+
+class DrugResolver:
+    """
+    약품/성분 사전
+
+    로드 시:
+      - 약품별 상품명 / 한글 성분명 / 영문 성분명을 뽑아 사전 항목으로 집계 (환자 수 합, 대표 성분)
+      - 모든 항목 키워드로 Aho–Corasick 자동자, 상품명은 음절 bigram 역색인
+    질의 시:
+      - 자동자로 정확 매칭 (겹치면 가장 긴 것), 남은 한글 단어만 bigram 색인으로 부분 매칭
+    """
+
+    def __init__(self, drugs_df: pd.DataFrame, medication_df: Optional[pd.DataFrame] = None) -> None:
+        """
+        Args:
+            drugs_df: unique_drugs.csv (name, ingredients, patient_count)
+            medication_df: medication_ingredients.csv (drug_name, ingredients, usage_count) - 성분 누락 보충
+        """
+        frames = [pd.DataFrame({
+            'name': drugs_df['name'].astype(object),
+            'ingredients': drugs_df['ingredients'].astype(object),
+            'count': drugs_df['patient_count'].astype('int64'),
+        })]
+        if medication_df is not None:
+            known = set(drugs_df['name'].dropna())
+            extra = medication_df[~medication_df['drug_name'].isin(known)]
+            frames.append(pd.DataFrame({
+                'name': extra['drug_name'].astype(object),
+                'ingredients': extra['ingredients'].astype(object),
+                'count': extra['usage_count'].astype('int64'),
+            }))
+        drugs = pd.concat(frames, ignore_index=True).dropna(subset=['name', 'ingredients'])
+        drugs = drugs.sort_values('count', ascending=False, kind='stable')
+
+        entries: Dict[Tuple[str, str], DrugEntry] = {}
+        ingredient_votes: Dict[Tuple[str, str], Dict[str, int]] = {}
+
+        def add(keyword: str, kind: str, name: str, ingredient: str, count: int) -> None:
+            key = (keyword, kind)
+            entry = entries.get(key)
+            if entry is None:
+                entry = entries[key] = DrugEntry(keyword, kind, ingredient, 0)
+                ingredient_votes[key] = {}
+            entry.patient_count += count
+            votes = ingredient_votes[key]
+            votes[ingredient] = votes.get(ingredient, 0) + count
+            if len(entry.drug_names) < 3 and name not in entry.drug_names:
+                entry.drug_names.append(name)
+
+        for name, ingredient, count in zip(drugs['name'], drugs['ingredients'], drugs['count']):
+            count = int(count)
+            canonical = canonical_ingredient(ingredient)
+            for stem in brand_stems(name):
+                add(stem, 'brand', name, canonical, count)
+
+            korean = korean_ingredient(name)
+            if korean:
+                add(korean, 'ingredient', name, canonical, count)
+                base = strip_suffixes(korean, _KOREAN_SALT_SUFFIXES)
+                if base != korean:
+                    add(base, 'ingredient', name, canonical, count)
+
+            add(ingredient.lower(), 'ingredient', name, canonical, count)
+            if canonical != ingredient.lower():
+                add(canonical, 'ingredient', name, canonical, count)
+
+        for key, entry in entries.items():
+            votes = ingredient_votes[key]
+            entry.ingredient = max(votes, key=votes.get)
+
+        # 키워드 → 항목 (같은 키워드가 상품명/성분명 모두면 환자 수 큰 쪽)
+        self.entries: Dict[str, DrugEntry] = {}
+        for entry in sorted(entries.values(), key=lambda e: e.patient_count, reverse=True):
+            self.entries.setdefault(entry.keyword, entry)
+
+        self.matcher = AhoCorasick(self.entries)
+
+        # 상품명 bigram 역색인
+        self._brands: List[DrugEntry] = [e for e in self.entries.values() if e.kind == 'brand']
+        self._brand_sizes: List[int] = []
+        self._bigram_index: Dict[str, List[int]] = {}
+        for index, entry in enumerate(self._brands):
+            grams = set(_bigrams(entry.keyword))
+            self._brand_sizes.append(len(grams))
+            for gram in grams:
+                self._bigram_index.setdefault(gram, []).append(index)
+
+        logger.info(f"Drug resolver ready: {len(self.entries)} keywords, {len(self._brands)} brands")
+
+    @classmethod
+    def from_reference_dir(cls, reference_dir: Path = REFERENCE_DIR) -> "DrugResolver":
+        """reference_data/ (컬럼형 사본이 있으면 메모리 매핑)에서 생성"""
+        reference_dir = Path(reference_dir)
+        medication_path = reference_dir / MEDICATION_INGREDIENTS_FILENAME
+        medication_df = load_reference_frame(medication_path) if medication_path.exists() else None
+        return cls(load_reference_frame(reference_dir / DRUGS_FILENAME), medication_df)
+
+    def _fuzzy_brand(self, word: str) -> Optional[Tuple[DrugEntry, float]]:
+        """음절 bigram Dice 유사도가 가장 높은 상품명 (동률이면 환자 수 순)"""
+        grams = set(_bigrams(word))
+        overlaps: Counter = Counter()
+        for gram in grams:
+            for index in self._bigram_index.get(gram, ()):
+                overlaps[index] += 1
+
+        best: Optional[Tuple[DrugEntry, float]] = None
+        for index, overlap in overlaps.items():
+            similarity = 2 * overlap / (len(grams) + self._brand_sizes[index])
+            if similarity < FUZZY_MIN_SIMILARITY:
+                continue
+            entry = self._brands[index]
+            if best is None or (similarity, entry.patient_count) > (best[1], best[0].patient_count):
+                best = (entry, similarity)
+        return best
+
+    def resolve(self, query: str, limit: int = 5) -> List[DrugMatch]:
+        """
+        질의 속 약품/성분 언급 (질의 순서)
+
+        Args:
+            query: 사용자 질의
+            limit: 최대 반환 수
+        """
+        text = query.lower()
+        exact = sorted(self.matcher.iter_matches(text), key=lambda m: (m[0], -(m[1] - m[0])))
+
+        matches: List[DrugMatch] = []
+        covered_until = 0
+        for start, end, keyword in exact:
+            if start < covered_until:
+                continue
+            # 영문은 단어 경계에서만 (예: 'ice'가 'price' 안에서 매칭되지 않도록)
+            if keyword.isascii() and ((start > 0 and text[start - 1].isalnum()) or (end < len(text) and text[end].isalnum())):
+                continue
+            covered_until = end
+            matches.append(DrugMatch(query[start:end], start, end, self.entries[keyword]))
+
+        covered = [(m.start, m.end) for m in matches]
+        for word_match in _HANGUL_WORD_RE.finditer(query):
+            start, end = word_match.span()
+            word = word_match.group()
+            if word in QUERY_STOPWORDS or any(s < end and start < e for s, e in covered):
+                continue
+            fuzzy = self._fuzzy_brand(word)
+            if fuzzy is not None:
+                matches.append(DrugMatch(word, start, end, fuzzy[0], similarity=fuzzy[1]))
+
+        matches.sort(key=lambda m: m.start)
+        return matches[:limit]
+
+
+_resolvers: Dict[str, Tuple[Tuple, DrugResolver]] = {}
+_resolvers_lock = threading.Lock()
+
+
+def get_drug_resolver(reference_dir: str = str(REFERENCE_DIR)) -> Optional[DrugResolver]:
+    """
+    프로세스 공용 DrugResolver (CSV가 바뀌면 다시 생성)
+
+    Returns:
+        DrugResolver, unique_drugs.csv가 없으면 None
+    """
+    directory = Path(reference_dir)
+    paths = (directory / DRUGS_FILENAME, directory / MEDICATION_INGREDIENTS_FILENAME)
+    if not paths[0].exists():
+        return None
+
+    signature = tuple(p.stat().st_mtime_ns if p.exists() else None for p in paths)
+    key = str(directory.resolve())
+    with _resolvers_lock:
+        entry = _resolvers.get(key)
+        if entry is None or entry[0] != signature:
+            entry = (signature, DrugResolver.from_reference_dir(directory))
+            _resolvers[key] = entry
+        return entry[1]
@@ -32,3 +32,8 @@ class ParameterExtractionError(ClinicalReportError):
 class LLMAPIError(ClinicalReportError):
     """Raised when LLM API calls fail"""
     pass
+
+
+class QueryExecutionError(ClinicalReportError):
+    """Raised when SQL execution fails outside the result-dict API (e.g. streaming)"""
+    pass
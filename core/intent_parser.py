@@ -0,0 +1,398 @@
+"""
+Intent Parser - 자주 나오는 NL2SQL 질의 형태를 규칙으로 해석
+질병 / 약품 / 연령대 / 성별 / 지역 / TOP-N / 기간 슬롯을 뽑고,
+질의의 모든 단어가 슬롯 또는 허용된 표현으로 설명될 때만 신뢰도를 부여
+
+지원 형태:
+  - patient_count: 조건별 환자 수 (성별 / 연령대별 분포 포함)
+  - top_drugs: 조건별 가장 많이 처방된 약물 TOP N
+"""
+
+import calendar
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from core.disease_code_tree import DiseaseCodeTree
+from core.disease_matcher import DiseaseMatcher
+from core.drug_resolver import DrugMatch, DrugResolver
+
+logger = logging.getLogger(__name__)
+
+INTENT_PATIENT_COUNT = 'patient_count'
+INTENT_TOP_DRUGS = 'top_drugs'
+
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 1000
+
+# 시도 표기 → 병원명 검색어
+REGIONS: Dict[str, str] = {
+    '서울특별시': '서울', '서울시': '서울', '서울': '서울',
+    '부산광역시': '부산', '부산시': '부산', '부산': '부산',
+    '대구광역시': '대구', '대구시': '대구', '대구': '대구',
+    '인천광역시': '인천', '인천시': '인천', '인천': '인천',
+    '광주광역시': '광주', '광주시': '광주', '광주': '광주',
+    '대전광역시': '대전', '대전시': '대전', '대전': '대전',
+    '울산광역시': '울산', '울산시': '울산', '울산': '울산',
+    '세종특별자치시': '세종', '세종시': '세종', '세종': '세종',
+    '경기도': '경기', '경기': '경기',
+    '강원특별자치도': '강원', '강원도': '강원', '강원': '강원',
+    '충청북도': '충북', '충북': '충북',
+    '충청남도': '충남', '충남': '충남',
+    '전북특별자치도': '전북', '전라북도': '전북', '전북': '전북',
+    '전라남도': '전남', '전남': '전남',
+    '경상북도': '경북', '경북': '경북',
+    '경상남도': '경남', '경남': '경남',
+    '제주특별자치도': '제주', '제주도': '제주', '제주': '제주',
+}
+
+GENDERS: Dict[str, str] = {'남성': 'MAN', '남자': 'MAN', '여성': 'WOMAN', '여자': 'WOMAN'}
+
+# 대표 패턴 비율 계산에 쓰는 언급별 후보 질병 수 (DiseaseMatcher max_candidates 이상)
+_MAX_DISEASE_CANDIDATES = 100
+# 질병 하나를 덮는 LIKE 패턴 최대 개수 (OR로 연결)
+_MAX_DISEASE_PATTERNS = 3
+
+_PARTICLES = (
+    '에서는', '으로는', '에게서', '에서', '으로', '에게', '까지', '부터', '보다', '하고', '이랑',
+    '의', '은', '는', '이', '가', '을', '를', '에', '로', '과', '와', '도', '만', '랑',
+)
+
+# 결과에 영향 없는 표현 (조사 제거 후 비교)
+_REQUEST_WORDS = {
+    stem + ending
+    for stem in ('알려', '보여', '구해', '계산해', '집계해', '조회해', '분석해', '뽑아', '찾아', '정리해')
+    for ending in ('줘', '주세요', '줄래', '줄래요', '주실래요', '봐', '봐줘', '봐주세요')
+}
+_FILLER_WORDS = _REQUEST_WORDS | set(_PARTICLES) | {
+    '환자', '환자들', '사람', '사람들', '대상', '전체', '총', '모든', '해당', '각', '각각', '별',
+    '치료받은', '진료받은', '진단받은', '진단된', '치료', '진료', '진단', '받은', '앓는', '앓고', '있는', '가진', '걸린',
+    '분포', '구분', '집계', '교차', '따른', '따라', '기준', '현황', '통계',
+    '기간', '동안', '간', '사이', '중', '및', '그리고',
+    '주세요', '해주세요', '해줘', '조회', '계산', '확인', '좀', '부탁해', '부탁합니다', '부탁드립니다',
+    '몇', '명', '수', '얼마', '얼마나', '되나요', '됩니까', '인가요', '입니까', '인지', '일까요', '나요', '요',
+}
+_PRESCRIPTION_WORDS = {'처방', '처방된', '처방받은', '처방한', '처방되는', '복용', '복용한', '복용하는', '투약', '투약한'}
+_REGION_WORDS = {'지역', '소재', '병원', '병원들', '의료기관', '시', '도'}
+
+_WORD_RE = re.compile(r'[가-힣]+|[a-zA-Z]+|\d+')
+
+# --- 기간 ---
+_DATE_RANGE_YMD_RE = re.compile(
+    r'(\d{4})[-./]\s*(\d{1,2})[-./]\s*(\d{1,2})\s*(?:부터|~|에서)\s*(\d{4})[-./]\s*(\d{1,2})[-./]\s*(\d{1,2})(?:\s*까지)?'
+)
+_DATE_RANGE_YM_RE = re.compile(r'(\d{4})년\s*(\d{1,2})월\s*(?:부터|~|에서)\s*(?:(\d{4})년\s*)?(\d{1,2})월(?:\s*까지)?')
+_DATE_RANGE_Y_RE = re.compile(r'(\d{4})년?\s*(?:부터|~|에서)\s*(\d{4})년(?:\s*까지)?')
+_DATE_YM_RE = re.compile(r'(\d{4})년\s*(\d{1,2})월')
+_DATE_Y_RE = re.compile(r'(\d{4})년도?')
+_RECENT_RE = re.compile(r'최근\s*(\d+)\s*(년|개월|달|주|일)')
+
+# --- TOP N / 연령 ---
+_TOP_N_RE = re.compile(r'top\s*(\d+)|상위\s*(\d+)\s*(?:개|위|종|가지)?|(\d+)\s*(?:개|종|가지|위)(?![가-힣])', re.IGNORECASE)
+_AGE_DECADE_RANGE_RE = re.compile(r'(\d)0대\s*(?:~|-|부터|에서)\s*(\d)0대(?:\s*까지)?')
+_AGE_RANGE_RE = re.compile(r'(\d{1,3})\s*(?:~|-)\s*(\d{1,3})\s*세')
+_AGE_BOUND_RE = re.compile(r'(\d{1,3})\s*세\s*(이상|초과|이하|미만)')
+_AGE_DECADE_RE = re.compile(r'(\d)0대(?:\s*(이상|이하))?')
+
+# --- 의도 표현 ---
+_GROUP_GENDER_RE = re.compile(r'남녀|성별')
+_GROUP_AGE_RE = re.compile(r'연령대|연령|나이대')
+_COUNT_RE = re.compile(r'환자\s*수|몇\s*명|인원\s*수?|명\s*수')
+_MOST_PRESCRIBED_RE = re.compile(r'(?:가장\s*)?많이\s*(?:처방|사용)(?:된|받은|한|되는)?|순위')
+_DRUG_NOUN_RE = re.compile(r'(?:처방\s*)?(?:약물|의약품|약품|처방약)|약(?=\s|$|을|를|은|는|이|가|의)')
+_REGION_RE = re.compile('|'.join(sorted(REGIONS, key=len, reverse=True)))
+_GENDER_RE = re.compile('|'.join(GENDERS))
+
+
+@dataclass
+class QueryIntent:
+    """질의 해석 결과 (슬롯 + 신뢰도)"""
+    query: str
+    intent: Optional[str] = None                 # INTENT_PATIENT_COUNT | INTENT_TOP_DRUGS
+    group_by: List[str] = field(default_factory=list)   # 'gender', 'age_group'
+    disease_keyword: Optional[str] = None
+    disease_patterns: List[str] = field(default_factory=list)  # res_disease_code LIKE 패턴 (OR)
+    disease_share: float = 1.0                   # 언급 후보 중 대표 패턴의 환자 비율
+    disease_precision: float = 1.0               # 패턴 환자 중 후보 코드 환자 비율
+    drug: Optional[DrugMatch] = None
+    gender: Optional[str] = None                 # 'MAN' | 'WOMAN'
+    age_min: Optional[int] = None
+    age_max: Optional[int] = None
+    region: Optional[str] = None
+    top_n: Optional[int] = None
+    top_n_defaulted: bool = False
+    date_from: Optional[str] = None              # yyyyMMdd
+    date_to: Optional[str] = None
+    recent: Optional[Tuple[int, str]] = None     # (수량, '년'|'개월'|'주'|'일')
+    unparsed: List[str] = field(default_factory=list)   # 설명되지 않은 단어 / 지원하지 않는 조합
+    confidence: float = 0.0
+
+    def describe(self) -> List[str]:
+        """조건 요약 (analysis.key_conditions 용)"""
+        conditions = []
+        if self.disease_patterns:
+            conditions.append(f"질병: {self.disease_keyword} ({', '.join(self.disease_patterns)})")
+        if self.drug:
+            conditions.append(f"약품: {self.drug.mention} ({self.drug.entry.ingredient})")
+        if self.gender:
+            conditions.append(f"성별: {self.gender}")
+        if self.age_min is not None or self.age_max is not None:
+            low = '' if self.age_min is None else f"{self.age_min}세"
+            high = '' if self.age_max is None else f"{self.age_max}세"
+            conditions.append(f"연령: {low}~{high}")
+        if self.region:
+            conditions.append(f"지역: {self.region}")
+        if self.date_from:
+            conditions.append(f"기간: {self.date_from}~{self.date_to}")
+        if self.recent:
+            conditions.append(f"기간: 최근 {self.recent[0]}{self.recent[1]}")
+        if self.group_by:
+            conditions.append(f"그룹: {', '.join(self.group_by)}")
+        if self.top_n:
+            conditions.append(f"상위 {self.top_n}개")
+        return conditions
+
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if word.endswith(particle) and len(word) > len(particle):
+            return word[:-len(particle)]
+    return word
+
+
+def _month_end(year: int, month: int) -> int:
+    return calendar.monthrange(year, month)[1]
+
+
+class IntentParser:
+    """
+    규칙 기반 질의 해석기
+
+    슬롯을 찾을 때마다 해당 구간을 공백으로 지우고, 마지막에 남은 단어가 모두
+    허용된 표현(요청/대상/조사 등)이어야 신뢰도를 부여 → 템플릿이 질의 의미를 빠뜨리지 않음
+    """
+
+    def __init__(
+        self,
+        disease_matcher: Optional[DiseaseMatcher] = None,
+        drug_resolver: Optional[DrugResolver] = None,
+        code_tree: Optional[DiseaseCodeTree] = None
+    ) -> None:
+        """
+        Args:
+            disease_matcher: 질병 언급 사전 (없으면 질병이 언급된 질의는 해석하지 않음)
+            drug_resolver: 약품/성분 사전
+            code_tree: 질병 코드 접두사 트리 (있으면 후보 코드를 덮는 접두사 몇 개의 OR 사용)
+        """
+        self.disease_matcher = disease_matcher
+        self.drug_resolver = drug_resolver
+        self.code_tree = code_tree
+
+    def parse(self, query: str) -> QueryIntent:
+        """질의 → QueryIntent (confidence 0이면 템플릿으로 처리하지 않음)"""
+        text = unicodedata.normalize('NFKC', query)
+        intent = QueryIntent(query=query)
+        chars = list(text)
+
+        def consume(start: int, end: int) -> None:
+            chars[start:end] = ' ' * (end - start)
+
+        def scan(pattern: re.Pattern):
+            matches = list(pattern.finditer(''.join(chars)))
+            for match in matches:
+                consume(match.start(), match.end())
+            return matches
+
+        self._parse_entities(text, intent, consume)
+        self._parse_dates(scan, intent)
+        self._parse_top_n(scan, intent)
+        self._parse_age(scan, intent)
+
+        regions = {REGIONS[m.group()] for m in scan(_REGION_RE)}
+        if len(regions) > 1:
+            intent.unparsed.append('지역 여러 개')
+        intent.region = next(iter(regions)) if len(regions) == 1 else None
+
+        if scan(_GROUP_GENDER_RE):
+            intent.group_by.append('gender')
+        if scan(_GROUP_AGE_RE):
+            intent.group_by.append('age_group')
+        genders = {GENDERS[m.group()] for m in scan(_GENDER_RE)}
+        if len(genders) > 1 and 'gender' not in intent.group_by:
+            intent.group_by.append('gender')
+        elif len(genders) == 1:
+            intent.gender = genders.pop()
+
+        counted = bool(scan(_COUNT_RE))
+        most = bool(scan(_MOST_PRESCRIBED_RE))
+        drug_noun = bool(scan(_DRUG_NOUN_RE))
+        if drug_noun and (most or intent.top_n):
+            intent.intent = INTENT_TOP_DRUGS
+        elif counted or intent.group_by:
+            intent.intent = INTENT_PATIENT_COUNT
+
+        allowed = set(_FILLER_WORDS)
+        if intent.drug or intent.intent == INTENT_TOP_DRUGS:
+            allowed |= _PRESCRIPTION_WORDS
+        if intent.region:
+            allowed |= _REGION_WORDS
+        for word in _WORD_RE.findall(''.join(chars)):
+            if word in allowed or _strip_particle(word) in allowed or _strip_particle(_strip_particle(word)) in allowed:
+                continue
+            intent.unparsed.append(word)
+
+        intent.confidence = self._confidence(intent)
+        return intent
+
+    def _parse_entities(self, text: str, intent: QueryIntent, consume) -> None:
+        """질병 / 약품 언급 (각각 하나까지만 지원)"""
+        spans: List[Tuple[int, int]] = []
+        if self.disease_matcher is not None:
+            mentions = self.disease_matcher.find_mentions(text, per_mention=_MAX_DISEASE_CANDIDATES)
+            if len({m.keyword for m in mentions}) > 1:
+                intent.unparsed.append('질병 여러 개')
+            elif mentions:
+                mention = mentions[0]
+                intent.disease_keyword = mention.keyword
+                intent.disease_patterns, intent.disease_share, intent.disease_precision = \
+                    self._disease_patterns(mention.diseases)
+                for m in mentions:
+                    spans.append((m.start, m.end))
+                    consume(m.start, m.end)
+
+        if self.drug_resolver is not None:
+            matches = [
+                match for match in self.drug_resolver.resolve(text)
+                if not any(match.start < end and start < match.end for start, end in spans)
+            ]
+            if len({m.entry.keyword for m in matches}) > 1:
+                intent.unparsed.append('약품 여러 개')
+            elif matches:
+                intent.drug = matches[0]
+                for m in matches:
+                    consume(m.start, m.end)
+
+    def _disease_patterns(self, diseases: List[Dict]) -> Tuple[List[str], float, float]:
+        """
+        언급 후보 질병 → (LIKE 패턴 목록, 후보 환자 중 대표 패턴 비율, 패턴 환자 중 후보 코드 비율)
+
+        대표 3자리 패턴의 후보 코드를 코드 트리로 최대 _MAX_DISEASE_PATTERNS개 접두사로 덮음
+        (천식: AJ4% 대신 AJ45% OR AJ46%)
+        """
+        patients = Counter()
+        for disease in diseases:
+            patients[disease['pattern']] += disease['patient_count']
+        pattern = diseases[0]['pattern']
+        total = sum(patients.values())
+        share = patients[pattern] / total if total else 0.0
+
+        if self.code_tree is not None:
+            codes = [d['disease_code'] for d in diseases if d['pattern'] == pattern]
+            nodes = self.code_tree.cover(codes, max_patterns=_MAX_DISEASE_PATTERNS)
+            if nodes and all(len(node.prefix) >= 3 for node in nodes):
+                return [node.pattern for node in nodes], share, self.code_tree.precision(nodes, codes)
+        return [pattern], share, 1.0
+
+    @staticmethod
+    def _parse_dates(scan, intent: QueryIntent) -> None:
+        """진료 기간 (연/월/일 범위 또는 최근 N기간)"""
+        ranges: List[Tuple[str, str]] = []
+        try:
+            for m in scan(_DATE_RANGE_YMD_RE):
+                y1, m1, d1, y2, m2, d2 = map(int, m.groups())
+                ranges.append((f"{y1:04d}{m1:02d}{d1:02d}", f"{y2:04d}{m2:02d}{d2:02d}"))
+            for m in scan(_DATE_RANGE_YM_RE):
+                y1, m1, m2 = int(m.group(1)), int(m.group(2)), int(m.group(4))
+                y2 = int(m.group(3)) if m.group(3) else y1
+                ranges.append((f"{y1:04d}{m1:02d}01", f"{y2:04d}{m2:02d}{_month_end(y2, m2):02d}"))
+            for m in scan(_DATE_RANGE_Y_RE):
+                ranges.append((f"{m.group(1)}0101", f"{m.group(2)}1231"))
+            for m in scan(_DATE_YM_RE):
+                year, month = int(m.group(1)), int(m.group(2))
+                ranges.append((f"{year:04d}{month:02d}01", f"{year:04d}{month:02d}{_month_end(year, month):02d}"))
+            for m in scan(_DATE_Y_RE):
+                ranges.append((f"{m.group(1)}0101", f"{m.group(1)}1231"))
+        except ValueError:
+            intent.unparsed.append('잘못된 날짜')
+            return
+
+        recent = [(int(m.group(1)), '개월' if m.group(2) == '달' else m.group(2)) for m in scan(_RECENT_RE)]
+        if len(ranges) + len(recent) > 1:
+            intent.unparsed.append('기간 여러 개')
+        elif ranges:
+            intent.date_from, intent.date_to = ranges[0]
+            if not all(1 <= int(value[4:6]) <= 12 and 1 <= int(value[6:]) <= 31 for value in ranges[0]) \
+                    or intent.date_from > intent.date_to:
+                intent.unparsed.append('잘못된 날짜')
+        elif recent:
+            intent.recent = recent[0]
+
+    @staticmethod
+    def _parse_top_n(scan, intent: QueryIntent) -> None:
+        values = [int(next(g for g in m.groups() if g)) for m in scan(_TOP_N_RE)]
+        if len(set(values)) > 1 or any(not 1 <= v <= MAX_TOP_N for v in values):
+            intent.unparsed.append('TOP N')
+        elif values:
+            intent.top_n = values[0]
+
+    @staticmethod
+    def _parse_age(scan, intent: QueryIntent) -> None:
+        """연령 조건 → 포함 범위 [age_min, age_max]"""
+        bounds: List[Tuple[Optional[int], Optional[int]]] = []
+        for m in scan(_AGE_DECADE_RANGE_RE):
+            bounds.append((int(m.group(1)) * 10, int(m.group(2)) * 10 + 9))
+        for m in scan(_AGE_RANGE_RE):
+            bounds.append((int(m.group(1)), int(m.group(2))))
+        for m in scan(_AGE_BOUND_RE):
+            age, op = int(m.group(1)), m.group(2)
+            bounds.append({
+                '이상': (age, None), '초과': (age + 1, None), '이하': (None, age), '미만': (None, age - 1)
+            }[op])
+        for m in scan(_AGE_DECADE_RE):
+            decade, op = int(m.group(1)) * 10, m.group(2)
+            bounds.append((decade, None) if op == '이상' else (None, decade + 9) if op == '이하' else (decade, decade + 9))
+
+        if len(bounds) > 1:
+            intent.unparsed.append('연령 조건 여러 개')
+        elif bounds:
+            intent.age_min, intent.age_max = bounds[0]
+            if intent.age_min is not None and intent.age_max is not None and intent.age_min > intent.age_max:
+                intent.unparsed.append('잘못된 연령 범위')
+
+    @staticmethod
+    def _confidence(intent: QueryIntent) -> float:
+        """해석 신뢰도 (0~1)"""
+        if intent.intent is None or intent.unparsed:
+            return 0.0
+        if intent.intent == INTENT_TOP_DRUGS and (intent.drug or intent.group_by):
+            return 0.0
+
+        confidence = intent.disease_share * intent.disease_precision if intent.disease_patterns else 1.0
+        if intent.drug:
+            confidence *= intent.drug.similarity
+        if intent.intent == INTENT_TOP_DRUGS and intent.top_n is None:
+            intent.top_n, intent.top_n_defaulted = DEFAULT_TOP_N, True
+            confidence *= 0.9
+        return round(confidence, 3)
+
+
+_parser: Optional[Tuple[tuple, IntentParser]] = None
+_parser_lock = threading.Lock()
+
+
+def get_intent_parser() -> IntentParser:
+    """프로세스 공용 IntentParser (참조 데이터 사전이 다시 만들어지면 함께 갱신)"""
+    from core.disease_code_tree import get_disease_code_tree
+    from core.disease_matcher import get_disease_matcher
+    from core.drug_resolver import get_drug_resolver
+
+    global _parser
+    indexes = (get_disease_matcher(), get_drug_resolver(), get_disease_code_tree())
+    with _parser_lock:
+        if _parser is None or any(a is not b for a, b in zip(_parser[0], indexes)):
+            _parser = (indexes, IntentParser(*indexes))
+        return _parser[1]
@@ -3,13 +3,122 @@ Recipe Loader - Load and manage SQL recipe metadata
 레시피 메타데이터 관리 모듈
 """
 
+import hashlib
+import json
+import os
+import threading
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# libyaml(C) 로더가 있으면 사용 (순수 Python SafeLoader 대비 수 배 빠름)
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+RECIPE_CATEGORIES = ("pool", "profile")
+MANIFEST_FILENAME = ".manifest.json"
+MANIFEST_VERSION = 1
+
+# 프로세스 공용 레지스트리: recipes_dir → (YAML stat 시그니처, recipe_metadata, all_recipes)
+_registry: Dict[str, Tuple[Tuple, Dict[str, Dict[str, Any]], List[Dict[str, Any]]]] = {}
+_registry_lock = threading.Lock()
+
+
+def _yaml_files(recipes_dir: Path) -> List[Tuple[str, Path]]:
+    """(카테고리, YAML 경로) 목록 (카테고리 순서 → 파일명 순서)"""
+    files = []
+    for category in RECIPE_CATEGORIES:
+        category_path = recipes_dir / category
+        if category_path.exists():
+            files.extend((category, path) for path in sorted(category_path.glob("*.yaml")))
+    return files
+
+
+def _stat_signature(files: List[Tuple[str, Path]]) -> Tuple:
+    signature = []
+    for _, path in files:
+        stat = path.stat()
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class RecipeManifest:
+    """
+    레시피 YAML 파싱 결과를 모아 둔 JSON 매니페스트 (recipes/.manifest.json)
+
+    파일별 mtime/크기가 같으면 저장된 파싱 결과를 그대로 사용하고,
+    달라졌으면 내용 해시를 비교해 실제로 바뀐 YAML만 다시 파싱한 뒤 매니페스트를 갱신.
+    """
+
+    def __init__(self, recipes_dir: Path) -> None:
+        self.recipes_dir = recipes_dir
+        self.path = recipes_dir / MANIFEST_FILENAME
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('files', {})
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            # 읽기 전용 디렉토리 등 - 매니페스트 없이도 동작
+            logger.debug(f"Could not write recipe manifest {self.path}: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def load(self, files: List[Tuple[str, Path]]) -> Dict[str, Dict[str, Any]]:
+        """
+        YAML별 파싱 결과
+
+        Returns:
+            {YAML 경로: {'metadata': dict 또는 None, 'error': 파싱 오류 메시지 (실패 시)}}
+        """
+        cached = self._read()
+        entries: Dict[str, Dict[str, Any]] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        changed = len(cached) != len(files)
+        parsed = 0
+
+        for _, yaml_file in files:
+            key = yaml_file.relative_to(self.recipes_dir).as_posix()
+            stat = yaml_file.stat()
+            entry = cached.get(key)
+
+            if entry is None or entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                raw = yaml_file.read_bytes()
+                digest = hashlib.sha1(raw).hexdigest()
+                if entry is None or entry['sha1'] != digest:
+                    entry = {'sha1': digest, 'metadata': None}
+                    try:
+                        entry['metadata'] = yaml.load(raw.decode('utf-8'), Loader=_YAML_LOADER)
+                    except Exception as e:
+                        entry['error'] = str(e)
+                    parsed += 1
+                entry = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                changed = True
+
+            entries[key] = entry
+            results[str(yaml_file)] = entry
+
+        if changed:
+            self._write(entries)
+        logger.debug(f"Recipe manifest: {len(files)} files, {parsed} parsed")
+        return results
+
 
 class RecipeLoader:
     """레시피 메타데이터 로더"""
@@ -21,40 +130,58 @@ class RecipeLoader:
         self._load_recipe_metadata()
 
     def _load_recipe_metadata(self) -> None:
-        """모든 레시피의 메타데이터 로드"""
-        logger.info("Loading recipe metadata...")
-
-        for category_dir in ["pool", "profile"]:
-            category_path = self.recipes_dir / category_dir
-            if not category_path.exists():
-                continue
-
-            yaml_files = list(category_path.glob("*.yaml"))
-            for yaml_file in yaml_files:
-                try:
-                    with open(yaml_file, 'r', encoding='utf-8') as f:
-                        metadata = yaml.safe_load(f)
-                        recipe_name = metadata.get('name', yaml_file.stem)
-
-                        recipe_info = {
-                            'name': recipe_name,
-                            'description': metadata.get('description', 'N/A'),
-                            'category': category_dir,
-                            'tags': metadata.get('tags', []),
-                            'parameters': metadata.get('parameters', []),
-                            'visualization': metadata.get('visualization'),
-                            'path': str(yaml_file),
-                            'sql_file_path': str(yaml_file.with_suffix('.sql')),
-                            'sql_path': str(yaml_file.with_suffix('.sql'))
-                        }
-
-                        self.recipe_metadata[recipe_name] = recipe_info
-                        self.all_recipes.append(recipe_info)
-
-                except Exception as e:
-                    logger.warning(f"Error loading {yaml_file}: {e}")
-
-        logger.info(f"Loaded {len(self.recipe_metadata)} recipe metadata files")
+        """
+        모든 레시피의 메타데이터 로드
+
+        같은 프로세스에서는 YAML이 바뀌지 않았으면 이미 만든 메타데이터를 공유하고 (stat만 확인),
+        처음 로드할 때도 매니페스트 덕분에 바뀐 YAML만 파싱.
+        """
+        files = _yaml_files(self.recipes_dir)
+        signature = _stat_signature(files)
+        registry_key = str(self.recipes_dir.resolve())
+
+        with _registry_lock:
+            shared = _registry.get(registry_key)
+            if shared is None or shared[0] != signature:
+                logger.info("Loading recipe metadata...")
+                shared = (signature, *self._build_metadata(files))
+                _registry[registry_key] = shared
+                logger.info(f"Loaded {len(shared[1])} recipe metadata files")
+
+        _, self.recipe_metadata, self.all_recipes = shared
+
+    def _build_metadata(self, files: List[Tuple[str, Path]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        recipe_metadata: Dict[str, Dict[str, Any]] = {}
+        all_recipes: List[Dict[str, Any]] = []
+        parsed = RecipeManifest(self.recipes_dir).load(files)
+
+        for category_dir, yaml_file in files:
+            try:
+                entry = parsed[str(yaml_file)]
+                if 'error' in entry:
+                    raise ValueError(entry['error'])
+                metadata = entry['metadata']
+                recipe_name = metadata.get('name', yaml_file.stem)
+
+                recipe_info = {
+                    'name': recipe_name,
+                    'description': metadata.get('description', 'N/A'),
+                    'category': category_dir,
+                    'tags': metadata.get('tags', []),
+                    'parameters': metadata.get('parameters', []),
+                    'visualization': metadata.get('visualization'),
+                    'path': str(yaml_file),
+                    'sql_file_path': str(yaml_file.with_suffix('.sql')),
+                    'sql_path': str(yaml_file.with_suffix('.sql'))
+                }
+
+                recipe_metadata[recipe_name] = recipe_info
+                all_recipes.append(recipe_info)
+
+            except Exception as e:
+                logger.warning(f"Error loading {yaml_file}: {e}")
+
+        return recipe_metadata, all_recipes
 
     def get_recipe_by_name(self, recipe_name: str) -> Optional[Dict[str, Any]]:
         """레시피 이름으로 메타데이터 조회"""
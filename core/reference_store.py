@@ -0,0 +1,175 @@
+"""
+Reference Store - reference_data/ CSV의 컬럼형 (Arrow IPC) 사본
+tools/build_reference_store.py로 한 번 변환해 두면, 런타임에는 메모리 매핑으로 읽어
+세션/워커 프로세스가 같은 물리 페이지를 공유하고 CSV 파싱 없이 수 ms 안에 로드
+
+- 저장 위치: reference_data/.arrow/<CSV 이름>.arrow (압축 없음 - 메모리 매핑 zero-copy 조건)
+- JSON 문자열 목록 컬럼 (예: example_drugs)은 변환 시 한 번 파싱해 list<string> (offset 배열)로 저장
+- 원본 CSV의 크기/mtime을 스키마 메타데이터에 기록 → CSV가 바뀌면 CSV에서 직접 읽음
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DIR = Path("reference_data")
+STORE_DIRNAME = ".arrow"
+STORE_FORMAT_VERSION = "1"
+
+# CSV 이름 → JSON 문자열 목록 컬럼
+LIST_COLUMNS: Dict[str, List[str]] = {
+    'unique_ingredients.csv': ['example_drugs'],
+    'unique_disease_codes.csv': ['disease_names'],
+}
+
+# 숫자처럼 보여도 문자열로 읽어야 하는 컬럼
+STRING_COLUMNS = ('code', 'name', 'drug_name', 'ingredients')
+
+_META_SOURCE_SIZE = b'source_size'
+_META_SOURCE_MTIME = b'source_mtime_ns'
+_META_VERSION = b'store_version'
+
+_tables: Dict[str, Tuple[Tuple, pa.Table]] = {}
+_tables_lock = threading.Lock()
+
+
+def store_path_for(csv_path: Union[str, Path]) -> Path:
+    """CSV 경로 → 컬럼형 사본 경로"""
+    csv_path = Path(csv_path)
+    return csv_path.parent / STORE_DIRNAME / (csv_path.stem + '.arrow')
+
+
+def _parse_list_column(column: pa.ChunkedArray) -> pa.Array:
+    """JSON 문자열 목록 → list<string> (빈 문자열 항목 제외)"""
+    values = []
+    for text in column.to_pylist():
+        if text is None:
+            values.append(None)
+            continue
+        try:
+            items = json.loads(text)
+        except ValueError:
+            items = [text]
+        values.append([str(item) for item in items if item not in ('', None)])
+    return pa.array(values, type=pa.list_(pa.string()))
+
+
+def read_reference_csv(csv_path: Union[str, Path]) -> pa.Table:
+    """
+    CSV → Arrow Table (목록 컬럼 파싱 포함)
+
+    빈 문자열은 null로 읽어 pd.read_csv와 같은 결측 처리를 유지.
+    """
+    csv_path = Path(csv_path)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in STRING_COLUMNS},
+        strings_can_be_null=True
+    )
+    table = pa_csv.read_csv(csv_path, convert_options=convert_options)
+
+    for name in LIST_COLUMNS.get(csv_path.name, []):
+        if name in table.column_names:
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, _parse_list_column(table.column(name)))
+    return table
+
+
+def _source_signature(csv_path: Path) -> Dict[bytes, bytes]:
+    stat = csv_path.stat()
+    return {
+        _META_SOURCE_SIZE: str(stat.st_size).encode(),
+        _META_SOURCE_MTIME: str(stat.st_mtime_ns).encode(),
+        _META_VERSION: STORE_FORMAT_VERSION.encode(),
+    }
+
+
+def convert_reference_csv(csv_path: Union[str, Path]) -> Path:
+    """
+    CSV 하나를 컬럼형 사본으로 변환 (임시 파일에 쓴 뒤 교체 - 읽는 중인 프로세스에 안전)
+
+    Returns:
+        생성된 .arrow 경로
+    """
+    csv_path = Path(csv_path)
+    table = read_reference_csv(csv_path)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **_source_signature(csv_path)})
+
+    target = store_path_for(csv_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(f'.tmp{os.getpid()}')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, target)
+    return target
+
+
+def build_reference_store(reference_dir: Union[str, Path] = REFERENCE_DIR) -> Dict[str, Path]:
+    """reference_dir의 모든 CSV 변환 - {CSV 이름: .arrow 경로}"""
+    return {
+        csv_path.name: convert_reference_csv(csv_path)
+        for csv_path in sorted(Path(reference_dir).glob('*.csv'))
+    }
+
+
+def _open_store(csv_path: Path) -> Optional[pa.Table]:
+    """최신 사본이 있으면 메모리 매핑으로 열기, 없거나 오래됐으면 None"""
+    path = store_path_for(csv_path)
+    if not path.exists():
+        return None
+
+    table = feather.read_table(str(path), memory_map=True)
+    metadata = table.schema.metadata or {}
+    if csv_path.exists() and any(metadata.get(k) != v for k, v in _source_signature(csv_path).items()):
+        logger.info(f"Reference store out of date, reading CSV: {csv_path.name}")
+        return None
+    return table
+
+
+def load_reference_table(csv_path: Union[str, Path]) -> pa.Table:
+    """
+    참조 데이터 Arrow Table (프로세스 공용)
+
+    컬럼형 사본이 최신이면 메모리 매핑으로, 아니면 CSV를 직접 읽음.
+    CSV/사본이 바뀌면 다음 호출에서 다시 로드.
+
+    Raises:
+        FileNotFoundError: CSV와 사본이 모두 없을 때
+    """
+    csv_path = Path(csv_path)
+    store_path = store_path_for(csv_path)
+    signature = tuple(
+        (p.stat().st_size, p.stat().st_mtime_ns) if p.exists() else None
+        for p in (csv_path, store_path)
+    )
+    if signature == (None, None):
+        raise FileNotFoundError(f"Reference data not found: {csv_path}")
+
+    key = str(csv_path.resolve())
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        table = _open_store(csv_path)
+        if table is None:
+            table = read_reference_csv(csv_path)
+        _tables[key] = (signature, table)
+        return table
+
+
+def load_reference_frame(csv_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    참조 데이터 DataFrame (Arrow 버퍼를 그대로 쓰는 pd.ArrowDtype 컬럼)
+
+    메모리 매핑된 버퍼를 복사하지 않으므로 여러 세션이 같은 페이지를 공유.
+    """
+    return load_reference_table(csv_path).to_pandas(types_mapper=pd.ArrowDtype)
@@ -0,0 +1,120 @@
+"""
+Schema Search Index - 스키마 RAG용 역색인 (BM25)
+로드 시 한 번 색인을 만들고, 질의는 NumPy 벡터 연산으로 점수 계산
+"""
+
+import re
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r'\w+')
+_HANGUL_RUN_RE = re.compile(r'[가-힣]+|[^가-힣]+')
+
+
+def _is_hangul(run: str) -> bool:
+    return '가' <= run[0] <= '힣'
+
+
+def tokenize_word(word: str) -> List[str]:
+    """
+    단어 하나를 색인 토큰으로 분해
+
+    - 한글: 음절 bigram ("당뇨병" → 당뇨, 뇨병) - 조사/어미가 붙어도 매칭 ("환자의" ↔ "환자")
+    - 그 외: 단어 그대로 + '_' 분리 조각 ("user_id" → user_id, user, id)
+    """
+    tokens: List[str] = []
+    for run in _HANGUL_RUN_RE.findall(word):
+        if _is_hangul(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+            if '_' in run:
+                tokens.extend(part for part in run.split('_') if part)
+    return tokens
+
+
+def tokenize(text: str, min_word_length: int = 1) -> List[str]:
+    """텍스트 → 토큰 목록 (소문자화, min_word_length 미만 단어 제외)"""
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(str(text).lower()):
+        if len(word) >= min_word_length:
+            tokens.extend(tokenize_word(word))
+    return tokens
+
+
+class SchemaSearchIndex:
+    """
+    문서(스키마 컬럼)별 토큰에 대한 BM25 역색인
+
+    토큰별 게시 목록을 CSR 형태 (indptr / doc_ids / weights) 배열로 보관하고,
+    질의 시 해당 토큰의 게시 목록만 모아 np.bincount로 문서 점수를 합산.
+    비용은 전체 컬럼 수가 아니라 질의 토큰의 게시 목록 길이에 비례.
+    """
+
+    def __init__(self, documents: Sequence[Iterable[str]], k1: float = 1.2, b: float = 0.75) -> None:
+        """
+        Args:
+            documents: 문서별 토큰 목록
+            k1, b: BM25 파라미터
+        """
+        self.num_docs = len(documents)
+        term_ids: Dict[str, int] = {}
+        doc_terms: List[Dict[int, int]] = []
+        doc_lengths = np.zeros(self.num_docs, dtype=np.float32)
+
+        for doc_id, tokens in enumerate(documents):
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                term_id = term_ids.setdefault(token, len(term_ids))
+                counts[term_id] = counts.get(term_id, 0) + 1
+                doc_lengths[doc_id] += 1
+            doc_terms.append(counts)
+
+        # 토큰별 게시 목록 (CSR)
+        doc_freq = np.zeros(len(term_ids), dtype=np.int64)
+        for counts in doc_terms:
+            for term_id in counts:
+                doc_freq[term_id] += 1
+        indptr = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        doc_ids = np.empty(indptr[-1], dtype=np.int32)
+        tf = np.empty(indptr[-1], dtype=np.float32)
+        fill = indptr[:-1].copy()
+        for doc_id, counts in enumerate(doc_terms):
+            for term_id, count in counts.items():
+                position = fill[term_id]
+                doc_ids[position] = doc_id
+                tf[position] = count
+                fill[term_id] += 1
+
+        # BM25 가중치 미리 계산: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        avg_length = float(doc_lengths.mean()) if self.num_docs else 0.0
+        idf = np.log1p((self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        length_norm = k1 * (1 - b + b * doc_lengths[doc_ids] / max(avg_length, 1e-9))
+        term_of_posting = np.repeat(np.arange(len(term_ids)), doc_freq)
+
+        self.term_ids = term_ids
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = (idf[term_of_posting] * tf * (k1 + 1) / (tf + length_norm)).astype(np.float32)
+
+    def score(self, query_tokens: Iterable[str]) -> np.ndarray:
+        """질의 토큰(중복 제거)의 BM25 점수 합 - 길이 num_docs 배열"""
+        slices = []
+        for token in set(query_tokens):
+            term_id = self.term_ids.get(token)
+            if term_id is not None:
+                slices.append(slice(self.indptr[term_id], self.indptr[term_id + 1]))
+
+        if not slices:
+            return np.zeros(self.num_docs, dtype=np.float64)
+
+        doc_ids = np.concatenate([self.doc_ids[s] for s in slices])
+        weights = np.concatenate([self.weights[s] for s in slices])
+        return np.bincount(doc_ids, weights=weights, minlength=self.num_docs)
@@ -3,11 +3,41 @@ Database Schema Loader for RAG-enhanced SQL generation
 Databricks 스키마 정보를 로드하고 RAG 검색을 지원
 """
 
+import functools
+import itertools
+import logging
+import threading
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+from core.schema_index import SchemaSearchIndex, tokenize
+
+logger = logging.getLogger(__name__)
+
+# 관련도와 무관하게 항상 포함하는 핵심 테이블
+CORE_TABLES = ['basic_treatment', 'prescribed_drug', 'insured_person']
+
+# 질의와 스키마 양쪽에 있으면 가산점 (+0.3)
+IMPORTANT_KEYWORDS = ['환자', '질환', '질병', '약물', '처방', '병원', '나이', '연령', '성별', '지역', 'user', 'hospital']
+
+# 역색인 대상 컬럼
+INDEXED_COLUMNS = ['search_text', '키워드', '한글명']
+
+# 스키마 CSV 변경 확인 주기 (초) - 이 간격 안에서는 stat 없이 현재 스냅샷 사용
+RELOAD_CHECK_INTERVAL = 1.0
+
+# 스냅샷에서 파생된 DataFrame에 붙는 버전 표시 (DataFrame.attrs)
+SCHEMA_VERSION_ATTR = 'schema_version'
+
+# 행 집합별 LLM 스키마 텍스트 메모 크기
+FORMAT_CACHE_SIZE = 128
+
+_snapshot_versions = itertools.count(1)
+
 
 @dataclass
 class ColumnInfo:
@@ -24,8 +54,195 @@ class ColumnInfo:
     importance: str
 
 
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def format_column_line(col: Any) -> str:
+    """컬럼 한 줄 (+ 설명/키워드) - LLM 프롬프트용"""
+    col_info = (
+        f"  - {col['컬럼명']} ({col['한글명']}): "
+        f"{col['데이터타입']} "
+        f"{'[NULL 허용]' if col['NULL허용'] == '예' else '[NOT NULL]'}"
+    )
+
+    if pd.notna(col['설명']) and col['설명']:
+        col_info += f"\n    설명: {col['설명']}"
+
+    if pd.notna(col['키워드']) and col['키워드']:
+        col_info += f"\n    키워드: {col['키워드']}"
+
+    return col_info
+
+
+def format_table_blocks(blocks: List[Tuple[Any, List[str]]]) -> str:
+    """(테이블명, 컬럼 줄 목록) → LLM용 스키마 텍스트"""
+    formatted_lines = ["=== Database Schema Information ===\n"]
+    for table_name, column_lines in blocks:
+        formatted_lines.append(f"**Table: {table_name}**")
+        formatted_lines.extend(column_lines)
+        formatted_lines.append("")  # 테이블 간 빈 줄
+    return "\n".join(formatted_lines)
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    """
+    스키마 CSV 한 버전의 읽기 전용 스냅샷 (DataFrame + 검색 색인)
+
+    프로세스 전체에서 공유되므로 schema_df를 직접 수정하지 말 것 (필요하면 .copy()).
+    CSV가 바뀌면 새 스냅샷을 만들어 통째로 교체하며, 기존 스냅샷은 그대로 유지됨.
+    """
+    path: Path
+    mtime_ns: int
+    size: int
+    schema_df: pd.DataFrame
+    search_index: SchemaSearchIndex
+    core_mask: np.ndarray
+    core_rows: np.ndarray
+    keyword_masks: Dict[str, np.ndarray]
+    searchable_mask: np.ndarray
+    column_lines: Tuple[str, ...]
+    table_names: Tuple[Any, ...]
+    version: int
+    loaded_at: float
+
+    @classmethod
+    def load(cls, path: Path) -> "SchemaSnapshot":
+        """CSV 로드 + BM25 역색인 / 핵심 테이블 / 가산 키워드 마스크 생성"""
+        if not path.exists():
+            raise FileNotFoundError(
+                f"Schema file not found: {path}\n"
+                "Please run the schema preparation script first."
+            )
+
+        stat = path.stat()
+        version = next(_snapshot_versions)
+        df = pd.read_csv(path, encoding='utf-8-sig')
+        df.attrs[SCHEMA_VERSION_ATTR] = version
+        logger.info(f"Loaded schema: {len(df)} columns from {df['테이블명'].nunique()} tables")
+
+        texts = df[INDEXED_COLUMNS].fillna('').astype(str).agg(' '.join, axis=1)
+        search_index = SchemaSearchIndex([tokenize(text) for text in texts])
+        for array in (search_index.indptr, search_index.doc_ids, search_index.weights):
+            _read_only(array)
+
+        core_mask = df['테이블명'].str.lower().isin(CORE_TABLES).to_numpy()
+        search_lower = df['search_text'].fillna('').astype(str).str.lower()
+        keyword_masks = {
+            kw: _read_only(search_lower.str.contains(kw, regex=False).to_numpy())
+            for kw in IMPORTANT_KEYWORDS
+        }
+
+        return cls(
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            schema_df=df,
+            search_index=search_index,
+            core_mask=_read_only(core_mask),
+            core_rows=_read_only(np.flatnonzero(core_mask)),
+            keyword_masks=keyword_masks,
+            # search_text가 없는 컬럼은 점수 계산 대상이 아님 (기존 동작 유지)
+            searchable_mask=_read_only(df['search_text'].notna().to_numpy() & ~core_mask),
+            # 컬럼별 LLM 프롬프트 줄은 바뀌지 않으므로 로드 시 한 번만 포맷
+            column_lines=tuple(format_column_line(col) for _, col in df.iterrows()),
+            table_names=tuple(df['테이블명']),
+            version=version,
+            loaded_at=time.time()
+        )
+
+    def format_rows(self, row_ids: Tuple[int, ...]) -> str:
+        """
+        선택된 행(schema_df 위치)의 LLM용 스키마 텍스트 - 미리 만든 줄을 이어 붙이기만 함
+
+        테이블명 순, 테이블 안에서는 주어진 행 순서 (groupby 기반 기존 출력과 동일).
+        자주 쓰는 행 집합(핵심 테이블 등)은 결과 전체를 메모.
+        """
+        return self._format_cache(row_ids)
+
+    @functools.cached_property
+    def _format_cache(self):
+        @functools.lru_cache(maxsize=FORMAT_CACHE_SIZE)
+        def build(row_ids: Tuple[int, ...]) -> str:
+            blocks: Dict[Any, List[str]] = {}
+            for row_id in row_ids:
+                blocks.setdefault(self.table_names[row_id], []).append(self.column_lines[row_id])
+            return format_table_blocks(sorted(blocks.items(), key=lambda item: item[0]))
+        return build
+
+    def score_relevance(self, query: str) -> np.ndarray:
+        """
+        질의에 대한 컬럼별 관련도 점수 (schema_df 행 순서, 새 배열)
+
+        점수 = 0.1 * BM25 + 0.3 * (질의와 search_text에 모두 있는 중요 키워드 수).
+        핵심 테이블과 search_text가 없는 컬럼은 0.
+        """
+        query_lower = query.lower()
+        query_tokens = tokenize(query_lower, min_word_length=2)
+
+        scores = 0.1 * self.search_index.score(query_tokens)
+        for kw, mask in self.keyword_masks.items():
+            if kw in query_lower:
+                scores = scores + 0.3 * mask
+
+        scores[~self.searchable_mask] = 0.0
+        return scores
+
+
+# 프로세스 공용 스냅샷: 경로 → (스냅샷, 마지막 변경 확인 시각)
+_snapshots: Dict[str, Tuple[SchemaSnapshot, float]] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_schema_snapshot(schema_path: str = "databricks_schema_for_rag.csv") -> SchemaSnapshot:
+    """
+    스키마 CSV의 현재 스냅샷 (프로세스 전체 공유)
+
+    RELOAD_CHECK_INTERVAL마다 파일 mtime/크기를 확인해, 바뀌었으면 새 스냅샷을 만든 뒤 한 번에 교체.
+    새로 만드는 동안에도 다른 스레드는 기존 스냅샷을 계속 사용.
+    """
+    key = str(Path(schema_path).resolve())
+    now = time.monotonic()
+
+    entry = _snapshots.get(key)
+    if entry is not None and now - entry[1] < RELOAD_CHECK_INTERVAL:
+        return entry[0]
+
+    with _snapshots_lock:
+        entry = _snapshots.get(key)
+        if entry is not None and now - entry[1] < RELOAD_CHECK_INTERVAL:
+            return entry[0]
+
+        if entry is None:
+            snapshot = SchemaSnapshot.load(Path(schema_path))
+        else:
+            snapshot = entry[0]
+            try:
+                stat = Path(schema_path).stat()
+                if (stat.st_mtime_ns, stat.st_size) != (snapshot.mtime_ns, snapshot.size):
+                    snapshot = SchemaSnapshot.load(Path(schema_path))
+                    logger.info(f"Schema reloaded: {schema_path}")
+            except Exception as e:
+                # 파일 삭제/쓰기 중 등 - 기존 스냅샷 유지
+                logger.warning(f"Schema reload failed, keeping previous snapshot: {e}")
+
+        _snapshots[key] = (snapshot, time.monotonic())
+        return snapshot
+
+
 class SchemaLoader:
-    """Databricks 스키마 로더 (RAG용)"""
+    """
+    Databricks 스키마 로더 (RAG용)
+
+    CSV/색인은 get_schema_snapshot()의 공유 스냅샷을 사용하므로 여러 인스턴스를 만들어도
+    파일은 한 번만 읽고, 검색은 공유 상태를 수정하지 않음 (세션 간 안전).
+    """
+
+    CORE_TABLES = CORE_TABLES
+    IMPORTANT_KEYWORDS = IMPORTANT_KEYWORDS
+    INDEXED_COLUMNS = INDEXED_COLUMNS
 
     def __init__(self, schema_path: str = "databricks_schema_for_rag.csv") -> None:
         """
@@ -35,22 +252,21 @@ class SchemaLoader:
             schema_path: RAG용 스키마 CSV 파일 경로
         """
         self.schema_path = Path(schema_path)
-        self.schema_df: pd.DataFrame = self._load_schema()
+        get_schema_snapshot(str(self.schema_path))  # 파일이 없으면 여기서 FileNotFoundError
 
-    def _load_schema(self) -> pd.DataFrame:
-        """스키마 CSV 로드"""
-        import logging
-        logger = logging.getLogger(__name__)
+    @property
+    def snapshot(self) -> SchemaSnapshot:
+        """현재 스키마 스냅샷 (CSV가 바뀌었으면 새 버전)"""
+        return get_schema_snapshot(str(self.schema_path))
 
-        if not self.schema_path.exists():
-            raise FileNotFoundError(
-                f"Schema file not found: {self.schema_path}\n"
-                "Please run the schema preparation script first."
-            )
+    @property
+    def schema_df(self) -> pd.DataFrame:
+        """현재 스냅샷의 스키마 DataFrame (읽기 전용으로 취급)"""
+        return self.snapshot.schema_df
 
-        df = pd.read_csv(self.schema_path, encoding='utf-8-sig')
-        logger.info(f"Loaded schema: {len(df)} columns from {df['테이블명'].nunique()} tables")
-        return df
+    def score_relevance(self, query: str) -> np.ndarray:
+        """질의에 대한 컬럼별 관련도 점수 (SchemaSnapshot.score_relevance 참고)"""
+        return self.snapshot.score_relevance(query)
 
     def get_relevant_schema(
         self,
@@ -69,60 +285,31 @@ class SchemaLoader:
         Returns:
             관련 스키마 DataFrame (점수 순 정렬)
         """
-        # 1. 핵심 테이블 먼저 포함 (항상)
-        core_tables = ['basic_treatment', 'prescribed_drug', 'insured_person']
-
-        if include_core_tables:
-            core_schema = self.schema_df[
-                self.schema_df['테이블명'].str.lower().isin(core_tables)
-            ].copy()
-            core_schema['relevance_score'] = 0.8  # 높은 기본 점수
-        else:
-            core_schema = pd.DataFrame()
-
-        # 2. 쿼리 기반 추가 검색
-        query_lower = query.lower()
-        import re
-        query_words = [w for w in re.findall(r'[\w]+', query_lower) if len(w) > 1]
+        snapshot = self.snapshot  # 호출 도중 교체되어도 한 스냅샷으로 일관되게 계산
 
-        def calculate_score(row) -> float:
-            search_text = row['search_text']
-            if pd.isna(search_text):
-                return 0.0
+        # 1. 핵심 테이블 먼저 포함 (항상, 높은 기본 점수 0.8)
+        core_rows = snapshot.core_rows if include_core_tables else np.empty(0, dtype=np.int64)
 
-            search_lower = str(search_text).lower()
-            table_name = row['테이블명'].lower()
+        # 2. 쿼리 기반 추가 검색 (역색인 점수, 핵심 테이블 제외)
+        scores = snapshot.score_relevance(query)
+        candidates = np.flatnonzero(scores > 0)
 
-            # 핵심 테이블은 이미 포함되었으므로 스킵
-            if table_name in core_tables:
-                return 0.0
-
-            # 부분 매칭 점수
-            matches = sum(1 for word in query_words if word in search_lower)
-
-            # 키워드 가중치
-            important_keywords = ['환자', '질환', '질병', '약물', '처방', '병원', '나이', '연령', '성별', '지역', 'user', 'hospital']
-            bonus = sum(0.3 for kw in important_keywords if kw in query_lower and kw in search_lower)
-
-            return matches * 0.1 + bonus
-
-        self.schema_df['relevance_score'] = self.schema_df.apply(calculate_score, axis=1)
-
-        # 점수 있는 것만 필터링
-        additional_schema = self.schema_df[self.schema_df['relevance_score'] > 0].copy()
-        additional_schema = additional_schema.sort_values('relevance_score', ascending=False)
-
-        # 3. 핵심 테이블 + 추가 스키마 병합
-        if len(core_schema) > 0 and len(additional_schema) > 0:
-            # 핵심 테이블 + top_k 추가
-            remaining = max(0, top_k - len(core_schema))
-            combined = pd.concat([core_schema, additional_schema.head(remaining)], ignore_index=True)
-        elif len(core_schema) > 0:
-            combined = core_schema
+        # 3. 핵심 테이블 + 추가 스키마 병합 (핵심 테이블이 있으면 top_k에서 그만큼 제외)
+        limit = max(0, top_k - len(core_rows)) if len(core_rows) > 0 else top_k
+        if len(candidates) > limit:
+            # 점수 상위 limit개 (동점이면 스키마 순서)
+            order = np.lexsort((candidates, -scores[candidates]))
+            candidates = candidates[order[:limit]]
         else:
-            combined = additional_schema.head(top_k)
+            candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
 
-        return combined.sort_values('relevance_score', ascending=False)
+        rows = np.concatenate([core_rows, candidates])
+        row_scores = np.concatenate([np.full(len(core_rows), 0.8), scores[candidates]])
+        order = np.argsort(-row_scores, kind='stable')
+
+        combined = snapshot.schema_df.iloc[rows[order]]
+        combined['relevance_score'] = row_scores[order]
+        return combined
 
     def get_table_schema(self, table_name: str) -> pd.DataFrame:
         """특정 테이블의 전체 스키마 반환"""
@@ -150,33 +337,17 @@ class SchemaLoader:
         if len(schema_df) == 0:
             return "No relevant schema found."
 
-        # 테이블별로 그룹핑
-        tables = schema_df.groupby('테이블명')
-
-        formatted_lines = []
-        formatted_lines.append("=== Database Schema Information ===\n")
-
-        for table_name, cols in tables:
-            formatted_lines.append(f"**Table: {table_name}**")
-
-            for _, col in cols.iterrows():
-                col_info = (
-                    f"  - {col['컬럼명']} ({col['한글명']}): "
-                    f"{col['데이터타입']} "
-                    f"{'[NULL 허용]' if col['NULL허용'] == '예' else '[NOT NULL]'}"
-                )
-
-                if pd.notna(col['설명']) and col['설명']:
-                    col_info += f"\n    설명: {col['설명']}"
-
-                if pd.notna(col['키워드']) and col['키워드']:
-                    col_info += f"\n    키워드: {col['키워드']}"
-
-                formatted_lines.append(col_info)
-
-            formatted_lines.append("")  # 테이블 간 빈 줄
-
-        return "\n".join(formatted_lines)
+        # 현재 스냅샷에서 뽑은 행이면 미리 포맷한 줄 사용 (행 번호 = index)
+        snapshot = self.snapshot
+        if schema_df.attrs.get(SCHEMA_VERSION_ATTR) == snapshot.version:
+            return snapshot.format_rows(tuple(schema_df.index.tolist()))
+
+        # 그 외 DataFrame: 행마다 포맷 (테이블별로 그룹핑)
+        blocks = [
+            (table_name, [format_column_line(col) for _, col in cols.iterrows()])
+            for table_name, cols in schema_df.groupby('테이블명')
+        ]
+        return format_table_blocks(blocks)
 
     def get_table_list(self) -> List[str]:
         """전체 테이블 목록 반환"""
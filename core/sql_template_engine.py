@@ -3,20 +3,113 @@ SQL Template Engine - Render SQL templates with parameters
 Jinja2 기반 SQL 템플릿 렌더링 엔진
 """
 
+import functools
 import re
+import threading
 from datetime import date, timedelta
-from jinja2 import Template, TemplateError
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateError, TemplateNotFound
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from core.exceptions import TemplateRenderError, RecipeNotFoundError
 
 
+# 레시피 SQL 검색 순서 (같은 이름이면 앞쪽 우선)
+RECIPE_CATEGORIES = ("pool", "profile")
+
+
+class _TemplateStore:
+    """
+    recipes_dir별로 공유하는 Jinja 환경 + 레시피 → 파일 경로 인덱스
+
+    - 컴파일된 템플릿은 Environment 캐시에 보관, 파일 mtime이 바뀌면 자동 재컴파일 (auto_reload)
+    - bytecode_cache_dir 지정 시 컴파일 결과를 디스크에 저장해 프로세스 재시작 시 컴파일 생략
+    - 문자열 템플릿(render)도 소스별로 컴파일 결과를 LRU 캐시
+    """
+
+    def __init__(self, recipes_dir: Path, bytecode_cache_dir: Optional[str] = None, cache_size: int = 400):
+        self.recipes_dir = recipes_dir
+
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+
+        self.env = Environment(
+            loader=FileSystemLoader([str(recipes_dir / category) for category in RECIPE_CATEGORIES], encoding='utf-8'),
+            auto_reload=True,
+            cache_size=cache_size,
+            bytecode_cache=bytecode_cache
+        )
+        self.from_string = functools.lru_cache(maxsize=256)(self.env.from_string)
+
+        self._index_lock = threading.Lock()
+        self.index: Dict[str, Path] = self._build_index()
+
+    def _build_index(self) -> Dict[str, Path]:
+        index: Dict[str, Path] = {}
+        for category in RECIPE_CATEGORIES:
+            category_dir = self.recipes_dir / category
+            if category_dir.is_dir():
+                for sql_path in sorted(category_dir.glob("*.sql")):
+                    index.setdefault(sql_path.stem, sql_path)
+        return index
+
+    def find(self, recipe_name: str) -> Optional[Path]:
+        """레시피 SQL 경로 (인덱스에 없으면 새로 추가된 파일일 수 있어 한 번 다시 스캔)"""
+        path = self.index.get(recipe_name)
+        if path is None:
+            with self._index_lock:
+                self.index = self._build_index()
+            path = self.index.get(recipe_name)
+        return path
+
+
+_template_stores: Dict[Tuple[str, Optional[str]], _TemplateStore] = {}
+_template_stores_lock = threading.Lock()
+
+
+def get_template_store(recipes_dir: str = "recipes", bytecode_cache_dir: Optional[str] = None) -> _TemplateStore:
+    """
+    recipes_dir별 공유 템플릿 저장소 (SQLTemplateEngine 인스턴스 간 컴파일 캐시 공유)
+
+    config.yaml 예시:
+        sql_templates:
+          bytecode_cache_dir: data/template_cache   # 생략 시 디스크 캐시 사용 안 함
+          cache_size: 400                           # 메모리에 유지할 컴파일된 템플릿 수
+    """
+    from config.config_loader import get_config, ConfigurationError
+    try:
+        settings = get_config().get('sql_templates', {}) or {}
+    except ConfigurationError:
+        settings = {}
+
+    bytecode_cache_dir = bytecode_cache_dir or settings.get('bytecode_cache_dir')
+    key = (str(Path(recipes_dir).resolve()), bytecode_cache_dir)
+    with _template_stores_lock:
+        store = _template_stores.get(key)
+        if store is None:
+            store = _TemplateStore(
+                Path(recipes_dir),
+                bytecode_cache_dir=bytecode_cache_dir,
+                cache_size=int(settings.get('cache_size', 400))
+            )
+            _template_stores[key] = store
+        return store
+
+
 class SQLTemplateEngine:
     """SQL 템플릿 렌더링 엔진 (통합 버전)"""
 
-    def __init__(self, recipes_dir: str = "recipes") -> None:
+    def __init__(self, recipes_dir: str = "recipes", bytecode_cache_dir: Optional[str] = None) -> None:
+        """
+        Args:
+            recipes_dir: 레시피 디렉토리 (pool/, profile/ 하위에 .sql)
+            bytecode_cache_dir: 컴파일된 템플릿 디스크 캐시 경로 (None이면 config.yaml -> sql_templates.bytecode_cache_dir)
+        """
         self.recipes_dir: Path = Path(recipes_dir)
+        self._store = get_template_store(recipes_dir, bytecode_cache_dir)
+        self.env: Environment = self._store.env
 
     def _process_special_placeholders(self, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -55,66 +148,101 @@ class SQLTemplateEngine:
 
         return processed_params
 
-    def render(self, sql_template: str, parameters: Optional[Dict[str, Any]] = None) -> str:
+    @staticmethod
+    def _cohort_visits_function(cohort: Optional[Any]):
+        """
+        템플릿 함수 cohort_visits(keyword, start_date, end_date) 생성
+
+        미리 만들어 둔 코호트 테이블이 요청 구간을 포함하면 그 테이블명을, 아니면 basic_treatment를 반환.
+        레시피는 기존 WHERE 조건을 그대로 두므로 어느 쪽이든 결과는 같음.
+        """
+        def cohort_visits(keyword: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
+            if cohort is not None and cohort.covers(keyword, start_date, end_date):
+                return cohort.table_name
+            return 'basic_treatment'
+        return cohort_visits
+
+    def render(
+        self,
+        sql_template: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        cohort: Optional[Any] = None
+    ) -> str:
         """
         SQL 템플릿 문자열을 파라미터로 렌더링 (특수 플레이스홀더 지원)
 
         Args:
             sql_template: SQL 템플릿 문자열
             parameters: 템플릿 변수 딕셔너리
+            cohort: 물리화된 코호트 (pipelines.cohort.MaterializedCohort). None이면 원본 테이블 스캔
 
         Returns:
             렌더링된 SQL 쿼리 문자열
         """
+        try:
+            template = self._store.from_string(sql_template)
+        except TemplateError as e:
+            raise TemplateRenderError(f"Failed to render SQL template: {e}") from e
+        except Exception as e:
+            raise TemplateRenderError(f"Unexpected error during template rendering: {e}") from e
+
+        return self._render_compiled(template, parameters, cohort)
+
+    def _render_compiled(
+        self,
+        template: Template,
+        parameters: Optional[Dict[str, Any]],
+        cohort: Optional[Any]
+    ) -> str:
+        """컴파일된 템플릿 렌더링 (render / render_template 공통)"""
         # 1. 특수 플레이스홀더 처리
         processed_params = self._process_special_placeholders(parameters)
+        processed_params.setdefault('cohort_visits', self._cohort_visits_function(cohort))
 
         # 2. Jinja2 템플릿 렌더링
         try:
-            template = Template(sql_template)
             return template.render(**processed_params)
         except TemplateError as e:
             raise TemplateRenderError(f"Failed to render SQL template: {e}") from e
         except Exception as e:
             raise TemplateRenderError(f"Unexpected error during template rendering: {e}") from e
 
-    def render_template(self, recipe_name: str, parameters: Dict[str, Any]) -> str:
+    def render_template(
+        self,
+        recipe_name: str,
+        parameters: Dict[str, Any],
+        cohort: Optional[Any] = None
+    ) -> str:
         """
         SQL 템플릿 파일을 읽어 파라미터로 렌더링
 
         Args:
             recipe_name: 레시피 이름
             parameters: 템플릿 변수 딕셔너리
+            cohort: 물리화된 코호트 (render() 참고)
 
         Returns:
             렌더링된 SQL 쿼리 문자열
         """
-        # SQL 파일 찾기 (pool 또는 profile 디렉토리)
-        sql_path = None
-        for category in ["pool", "profile"]:
-            candidate_path = self.recipes_dir / category / f"{recipe_name}.sql"
-            if candidate_path.exists():
-                sql_path = candidate_path
-                break
-
-        if not sql_path:
+        # 인덱스로 존재 확인 (pool → profile 순서, 파일시스템 탐색 없음)
+        if self._store.find(recipe_name) is None:
             raise RecipeNotFoundError(f"SQL template file not found for recipe: {recipe_name}")
 
-        # SQL 템플릿 읽기
+        # 컴파일 캐시에서 템플릿 로드 (파일이 수정된 경우에만 다시 읽고 컴파일)
         try:
-            with open(sql_path, 'r', encoding='utf-8') as f:
-                template_content = f.read()
+            template = self.env.get_template(f"{recipe_name}.sql")
+        except TemplateNotFound as e:
+            raise RecipeNotFoundError(f"SQL template file not found for recipe: {recipe_name}") from e
+        except TemplateError as e:
+            raise TemplateRenderError(f"Failed to render SQL template: {e}") from e
         except IOError as e:
             raise TemplateRenderError(f"Failed to read SQL template file: {e}") from e
 
-        # render() 메서드를 통해 통합 렌더링 수행
-        return self.render(template_content, parameters)
+        return self._render_compiled(template, parameters, cohort)
 
     def get_sql_template_path(self, recipe_name: str) -> Path:
         """레시피의 SQL 템플릿 파일 경로 반환"""
-        for category in ["pool", "profile"]:
-            candidate_path = self.recipes_dir / category / f"{recipe_name}.sql"
-            if candidate_path.exists():
-                return candidate_path
-
-        raise RecipeNotFoundError(f"SQL template file not found for recipe: {recipe_name}")
+        sql_path = self._store.find(recipe_name)
+        if sql_path is None:
+            raise RecipeNotFoundError(f"SQL template file not found for recipe: {recipe_name}")
+        return sql_path
@@ -1,5 +1,6 @@
 """Disease Pipeline Tab - Disease-centric analysis with core + recommended recipes"""
 
+import time
 import streamlit as st
 from typing import Optional
 from pipelines.disease_pipeline import DiseaseAnalysisPipeline
@@ -76,14 +77,10 @@ class DiseasePipelineTab:
                 with st.spinner("🔄 핵심 분석 실행 및 추천 레시피 생성 중..."):
                     pipeline = st.session_state.disease_pipeline
 
-                    # Execute core recipes
-                    core_results = pipeline.execute_core_recipes(disease_name)
-
-                    # Get LLM recommendations
-                    recommended = pipeline.recommend_additional_recipes(
-                        disease_name,
-                        target_count=7
-                    )
+                    # Render core recipes while the LLM recommends additional ones
+                    prepared = pipeline.prepare_analysis(disease_name, target_count=7)
+                    core_results = prepared['core_results']
+                    recommended = prepared['recommended']
 
                     # Store in session state
                     st.session_state.pipeline_core_results = core_results
@@ -217,30 +214,78 @@ class DiseasePipelineTab:
                 if checked
             ]
 
-            with st.spinner(f"⏳ {total_count}개 레시피 실행 중..."):
-                # Execute approved recipes
+            disease_name = st.session_state.pipeline_disease_name
+
+            with st.spinner("⏳ 질환 코호트 생성 중..."):
+                # Scan basic_treatment once; recipes read the shared cohort table instead
+                cohort = pipeline.materialize_cohort(disease_name)
+
+            with st.spinner(f"⏳ {total_count}개 레시피 SQL 생성 중..."):
+                # Core recipes were rendered without a cohort during analysis; re-render against it
+                if cohort is not None:
+                    core_results = pipeline.execute_core_recipes(disease_name, cohort=cohort)
+                else:
+                    core_results = st.session_state.pipeline_core_results
+
+                # Render approved recipes
                 approved_results = pipeline.execute_approved_recipes(
-                    st.session_state.pipeline_disease_name,
-                    approved_recipes
+                    disease_name,
+                    approved_recipes,
+                    cohort=cohort
                 )
 
                 # Combine with core results
-                all_results = st.session_state.pipeline_core_results + approved_results
+                rendered_results = core_results + approved_results
+
+            # Run all queries concurrently; cards appear as each recipe finishes
+            all_results, wall_time = self._execute_progressively(pipeline, rendered_results)
 
-                # Calculate success rate
-                success_count = sum(1 for r in all_results if r.get('success', False))
-                success_rate = success_count / len(all_results) if all_results else 0
+            # Calculate success rate
+            success_count = sum(1 for r in all_results if r.get('success', False))
+            success_rate = success_count / len(all_results) if all_results else 0
 
-                # Store results
-                st.session_state.pipeline_final_results = all_results
-                st.session_state.pipeline_success_rate = success_rate
+            # Store results
+            st.session_state.pipeline_final_results = all_results
+            st.session_state.pipeline_success_rate = success_rate
+            st.session_state.pipeline_wall_time = wall_time
 
             st.success(
                 f"✅ 분석 완료! 성공률: {success_rate*100:.1f}% "
-                f"({success_count}/{len(all_results)})"
+                f"({success_count}/{len(all_results)}, {wall_time:.1f}초)"
             )
             st.balloons()
 
+    def _execute_progressively(self, pipeline: DiseaseAnalysisPipeline, rendered_results: list):
+        """
+        Run rendered recipe SQL concurrently and render each card as soon as it completes
+
+        Returns:
+            (results in original order, wall time in seconds)
+        """
+        total = len(rendered_results)
+        progress = st.progress(0.0, text=f"⏳ 0/{total} 레시피 완료")
+        placeholders = [st.empty() for _ in rendered_results]
+        results = list(rendered_results)
+
+        started = time.time()
+        for done, result in enumerate(pipeline.execute_recipe_queries(rendered_results), 1):
+            results[result['index']] = result
+            with placeholders[result['index']].container():
+                self._render_result_card(result['index'] + 1, result)
+            progress.progress(
+                done / total,
+                text=f"⏳ {done}/{total} 레시피 완료 - {result.get('recipe_name', '')} "
+                     f"({result.get('execution_time', 0):.1f}초)"
+            )
+        wall_time = time.time() - started
+
+        # Progressive cards are replaced by the full results section below
+        progress.empty()
+        for placeholder in placeholders:
+            placeholder.empty()
+
+        return results, wall_time
+
     def _render_final_results(self):
         """Render final analysis results"""
         st.divider()
@@ -250,7 +295,7 @@ class DiseasePipelineTab:
         success_rate = st.session_state.pipeline_success_rate
 
         # Summary metrics
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
             st.metric("총 실행 레시피", len(results))
         with col2:
@@ -258,25 +303,60 @@ class DiseasePipelineTab:
             st.metric("성공", success_count)
         with col3:
             st.metric("성공률", f"{success_rate*100:.1f}%")
+        with col4:
+            wall_time = st.session_state.get('pipeline_wall_time')
+            query_time_sum = sum(r.get('execution_time', 0.0) for r in results)
+            if wall_time is not None:
+                st.metric(
+                    "전체 소요 시간",
+                    f"{wall_time:.1f}초",
+                    delta=f"순차 실행 시 {query_time_sum:.1f}초",
+                    delta_color="off"
+                )
 
         # Display each result
         st.subheader("상세 결과")
         for idx, result in enumerate(results, 1):
-            recipe_name = result.get('recipe_name', 'Unknown')
-            success = result.get('success', False)
-
-            if success:
-                with st.expander(f"✅ {idx}. {recipe_name}", expanded=False):
-                    metadata = result.get('metadata', {})
-                    st.markdown(f"**설명:** {metadata.get('description', 'N/A')}")
-
-                    params = result.get('parameters', {})
-                    if params:
-                        st.markdown("**파라미터:**")
-                        st.json(params)
-
-                    st.markdown("**생성된 SQL:**")
-                    st.code(result.get('sql_query', 'No SQL'), language='sql')
-            else:
-                with st.expander(f"❌ {idx}. {recipe_name} - 실패", expanded=False):
-                    st.error(f"오류: {result.get('error', 'Unknown error')}")
+            self._render_result_card(idx, result)
+
+    def _render_result_card(self, idx: int, result: dict):
+        """Render a single recipe result card (query result, timing, SQL)"""
+        recipe_name = result.get('recipe_name', 'Unknown')
+        success = result.get('success', False)
+
+        if success:
+            timing = f"{result.get('execution_time', 0):.1f}초" if 'execution_time' in result else ""
+            with st.expander(f"✅ {idx}. {recipe_name} {timing}".rstrip(), expanded=False):
+                metadata = result.get('metadata', {})
+                st.markdown(f"**설명:** {metadata.get('description', 'N/A')}")
+
+                if 'execution_time' in result:
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("결과 행 수", f"{result.get('row_count', 0):,}")
+                    with col2:
+                        st.metric(
+                            "실행 시간",
+                            f"{result.get('execution_time', 0):.2f}초",
+                            delta="캐시" if result.get('cached') else None,
+                            delta_color="off"
+                        )
+                    with col3:
+                        st.metric("대기 시간", f"{result.get('queue_time', 0):.2f}초")
+
+                data = result.get('data')
+                if data is not None:
+                    st.dataframe(data, use_container_width=True)
+
+                params = result.get('parameters', {})
+                if params:
+                    st.markdown("**파라미터:**")
+                    st.json(params)
+
+                st.markdown("**생성된 SQL:**")
+                st.code(result.get('sql_query', 'No SQL'), language='sql')
+        else:
+            with st.expander(f"❌ {idx}. {recipe_name} - 실패", expanded=False):
+                st.error(f"오류: {result.get('error', 'Unknown error')}")
+                if result.get('sql_query'):
+                    st.code(result['sql_query'], language='sql')
@@ -10,6 +10,11 @@ import pandas as pd
 from datetime import datetime, timedelta
 
 from utils.log_analyzer import LogAnalyzer
+from services.query_cache import get_query_cache
+from services.nl2sql_cache import get_nl2sql_cache
+from pipelines.fast_path_sql import get_fast_path_sql
+from services.llm_gateway import get_llm_gateway
+from services.databricks_client import get_execution_metrics
 
 
 class MonitoringTab:
@@ -47,6 +52,15 @@ class MonitoringTab:
 
         st.markdown("---")
 
+        # 쿼리 결과 캐시
+        self._render_query_cache_stats()
+        self._render_nl2sql_cache_stats()
+        self._render_fast_path_stats()
+        self._render_llm_gateway_stats()
+        self._render_execution_stats()
+
+        st.markdown("---")
+
         # RAG 사용 통계
         self._render_rag_stats()
 
@@ -200,6 +214,219 @@ class MonitoringTab:
         else:
             st.info("데이터가 없습니다. 쿼리를 실행해보세요.")
 
+    def _render_query_cache_stats(self):
+        """SQL 결과 캐시 적중률 및 절감량"""
+        st.subheader("⚡ 쿼리 결과 캐시")
+
+        cache = get_query_cache()
+        metrics = cache.get_metrics()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(
+                label="캐시 적중률",
+                value=f"{metrics['hit_rate']:.1f}%",
+                delta=f"{metrics['hits']}/{metrics['hits'] + metrics['misses']}"
+            )
+        with col2:
+            st.metric(
+                label="절약된 데이터",
+                value=self._format_bytes(metrics['bytes_saved']),
+                delta=f"메모리 {metrics['memory_hits']} / 디스크 {metrics['disk_hits']}",
+                delta_color="off"
+            )
+        with col3:
+            st.metric(
+                label="절약된 실행 시간",
+                value=f"{metrics['time_saved']:.1f}s"
+            )
+        with col4:
+            st.metric(
+                label="캐시 크기",
+                value=self._format_bytes(metrics['memory_bytes'] + metrics['disk_bytes']),
+                delta=f"{metrics['memory_entries']} 메모리 / {metrics['disk_entries']} 디스크",
+                delta_color="off"
+            )
+
+        st.caption("캐시 적중/미스 지표는 현재 서버 프로세스 시작 이후 누적값입니다.")
+
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            category = st.selectbox(
+                "무효화 대상",
+                ["전체", "pool", "profile", "nl2sql"],
+                key="monitoring_cache_category"
+            )
+        with col2:
+            st.write("")
+            if st.button("🧹 캐시 비우기", key="monitoring_cache_clear"):
+                removed = cache.invalidate(category=None if category == "전체" else category)
+                st.success(f"✅ {removed}개 캐시 항목을 제거했습니다.")
+
+    def _render_nl2sql_cache_stats(self):
+        """NL2SQL 생성 캐시 적중률 (완전 일치 / 유사 질문)"""
+        cache = get_nl2sql_cache()
+        if cache is None:
+            return
+
+        st.subheader("🧠 NL2SQL 생성 캐시")
+        metrics = cache.get_metrics()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(
+                label="캐시 적중률",
+                value=f"{metrics['hit_rate']:.1f}%",
+                delta=f"{metrics['hits']}/{metrics['hits'] + metrics['misses']}"
+            )
+        with col2:
+            st.metric(
+                label="완전 일치 / 유사 질문",
+                value=f"{metrics['exact_hits']} / {metrics['semantic_hits']}"
+            )
+        with col3:
+            st.metric(
+                label="절약된 LLM 시간",
+                value=f"{metrics['time_saved']:.1f}s"
+            )
+        with col4:
+            st.metric(
+                label="저장된 항목",
+                value=f"{metrics['disk_entries']}",
+                delta=f"{metrics['memory_entries']} 메모리",
+                delta_color="off"
+            )
+
+        if st.button("🧹 NL2SQL 캐시 비우기", key="monitoring_nl2sql_cache_clear"):
+            removed = cache.clear()
+            st.success(f"✅ {removed}개 캐시 항목을 제거했습니다.")
+
+    def _render_fast_path_stats(self):
+        """템플릿 SQL(fast-path) 적중률 - LLM 없이 처리된 NL2SQL 요청 비율"""
+        fast_path = get_fast_path_sql()
+        if fast_path is None:
+            return
+
+        st.subheader("⚡ 템플릿 SQL (Fast-path)")
+        metrics = fast_path.get_metrics()
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                label="Fast-path 적중률",
+                value=f"{metrics['hit_rate']:.1f}%",
+                delta=f"{metrics['hits']}/{metrics['total']}"
+            )
+        with col2:
+            st.metric(
+                label="신뢰도 부족 / 미지원 형태",
+                value=f"{metrics['fallbacks']} / {metrics['unmatched']}"
+            )
+        with col3:
+            st.metric(
+                label="평균 해석 시간",
+                value=f"{metrics['avg_time_ms']:.2f}ms"
+            )
+
+    def _render_llm_gateway_stats(self):
+        """LLM 게이트웨이 - 호출 지연 시간 / 토큰 / 429 재시도 / 대기열"""
+        st.subheader("🤖 LLM 호출 (Gateway)")
+        metrics = get_llm_gateway().get_metrics()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(
+                label="LLM 호출",
+                value=f"{metrics['calls']:,}",
+                delta=f"실패 {metrics['failures']}",
+                delta_color="inverse" if metrics['failures'] else "off"
+            )
+        with col2:
+            st.metric(
+                label="지연 시간 p50 / p95",
+                value=f"{metrics['latency_p50']:.1f}s / {metrics['latency_p95']:.1f}s",
+                delta=f"대기 평균 {metrics['avg_queue_wait']:.2f}s",
+                delta_color="off"
+            )
+        with col3:
+            st.metric(
+                label="토큰 (입력 / 출력)",
+                value=f"{metrics['prompt_tokens']:,} / {metrics['output_tokens']:,}"
+            )
+        with col4:
+            st.metric(
+                label="429 / 재시도",
+                value=f"{metrics['rate_limited']} / {metrics['retries']}",
+                delta=f"진행 {metrics['in_flight']}/{metrics['max_concurrency']} · 대기 {metrics['queued']}",
+                delta_color="off"
+            )
+
+        if metrics['by_caller']:
+            rows = [
+                {
+                    '호출자': caller,
+                    '호출': m['calls'],
+                    '실패': m['failures'],
+                    '평균 지연(s)': round(m['latency'] / m['calls'], 2) if m['calls'] else 0.0,
+                    '입력 토큰': m['prompt_tokens'],
+                    '출력 토큰': m['output_tokens'],
+                    '429': m['rate_limited'],
+                }
+                for caller, m in sorted(metrics['by_caller'].items())
+            ]
+            with st.expander("호출자별 LLM 사용량"):
+                st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    def _render_execution_stats(self):
+        """웨어하우스 실행 계층 지표 (커넥션 풀, 동일 쿼리 합치기)"""
+        metrics = get_execution_metrics()
+        if not metrics:
+            st.caption("Databricks 클라이언트가 아직 초기화되지 않았습니다.")
+            return
+
+        pool = metrics['pool']
+        coalescing = metrics['coalescing']
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric(
+                label="동일 쿼리 합치기 비율",
+                value=f"{coalescing['coalescing_ratio'] * 100:.1f}%",
+                delta=f"{coalescing['coalesced']}/{coalescing['calls']}",
+                delta_color="off"
+            )
+        with col2:
+            st.metric(
+                label="실제 웨어하우스 실행",
+                value=f"{coalescing['executions']}회",
+                delta=f"진행 중 {coalescing['in_flight']}",
+                delta_color="off"
+            )
+        with col3:
+            st.metric(
+                label="커넥션 사용 중",
+                value=f"{pool['in_use']}/{pool['max_size']}",
+                delta=f"유휴 {pool['idle']}",
+                delta_color="off"
+            )
+        with col4:
+            st.metric(
+                label="커넥션 대기",
+                value=f"{pool['waits']}회",
+                delta=f"{pool['wait_time']:.1f}s",
+                delta_color="off"
+            )
+
+    @staticmethod
+    def _format_bytes(num_bytes: int) -> str:
+        """바이트 수를 사람이 읽기 쉬운 단위로 변환"""
+        size = float(num_bytes)
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024 or unit == 'GB':
+                return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+            size /= 1024
+        return f"{size:.1f} GB"
+
     def _render_rag_stats(self):
         """RAG 질병 코드 사용 통계"""
         st.subheader("💡 RAG 질병 코드 사용 현황")
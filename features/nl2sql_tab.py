@@ -1,6 +1,8 @@
 """NL2SQL Tab - Natural language to SQL query generation with RAG"""
 
+import os
 import streamlit as st
+import tempfile
 from typing import List, Optional
 from pipelines.nl2sql_generator import NL2SQLGenerator
 from services.databricks_client import DatabricksClient
@@ -12,6 +14,10 @@ from utils.query_history import QueryHistory
 class NL2SQLTab:
     """Handles Tab 3: NL2SQL - AI-powered SQL code generation"""
 
+    # 화면 표시용 실행 결과 최대 행 수 (전체 결과는 스트리밍 CSV 내보내기 사용)
+    EXECUTION_MAX_ROWS = 10000
+    EXPORT_BATCH_SIZE = 50000
+
     def __init__(self):
         """Initialize NL2SQL Tab"""
         self._initialize_generator()
@@ -157,9 +163,14 @@ class NL2SQLTab:
         Args:
             user_query: Natural language query from user
         """
+        stream_placeholder = st.empty()
         with st.spinner("SQL 생성 중..."):
             generator = st.session_state.nl2sql_generator
-            result = generator.generate_sql(user_query)
+            result = generator.generate_sql(
+                user_query,
+                on_sql_progress=self._sql_progress_renderer(stream_placeholder)
+            )
+        stream_placeholder.empty()
 
         # Store result in session state to persist across reruns
         st.session_state.nl2sql_result = result
@@ -183,6 +194,13 @@ class NL2SQLTab:
             )
             self._render_error_result(result)
 
+    @staticmethod
+    def _sql_progress_renderer(placeholder):
+        """Gemini 스트리밍 중 부분 SQL을 placeholder에 갱신하는 콜백"""
+        def render(partial_sql: str, complete: bool):
+            placeholder.code(partial_sql if complete else partial_sql + " ▌", language="sql")
+        return render
+
     def _render_success_result(self, result, user_query: str):
         """Render successful SQL generation result"""
 
@@ -248,6 +266,20 @@ class NL2SQLTab:
                 complexity = "복잡"
             st.metric("복잡도", complexity)
 
+        if getattr(result, 'fast_path', None):
+            st.caption(f"⚡ 템플릿 SQL ({result.fast_path}) - LLM 호출 없이 생성")
+        elif getattr(result, 'cache_hit', None):
+            st.caption(f"⚡ NL2SQL 캐시 적중 ({result.cache_hit})")
+        elif getattr(result, 'stream_metrics', None):
+            metrics = result.stream_metrics
+            parts = []
+            if metrics.time_to_first_token is not None:
+                parts.append(f"첫 응답 {metrics.time_to_first_token:.1f}s")
+            if metrics.time_to_sql is not None:
+                parts.append(f"SQL 완성 {metrics.time_to_sql:.1f}s")
+            parts.append(f"전체 {metrics.total_time:.1f}s")
+            st.caption("⏱️ " + " · ".join(parts))
+
     def _render_action_buttons(self, sql_query: str):
         """Render SQL download and execution buttons"""
         col1, col2 = st.columns([1, 1])
@@ -276,10 +308,15 @@ class NL2SQLTab:
                     # Clear previous execution result
                     if 'nl2sql_execution_result' in st.session_state:
                         del st.session_state.nl2sql_execution_result
+                    self._discard_full_export()
 
                     client = st.session_state.databricks_client
                     with st.spinner("쿼리 실행 중..."):
-                        result = client.execute_query(sql_query, max_rows=10000)
+                        result = client.execute_query(
+                            sql_query,
+                            max_rows=self.EXECUTION_MAX_ROWS,
+                            cache_category='nl2sql'
+                        )
 
                     # Store result and display immediately
                     st.session_state.nl2sql_execution_result = result
@@ -430,13 +467,16 @@ class NL2SQLTab:
 
     def _process_refinement(self, original_query: str, current_sql: str, refinement_request: str):
         """Process SQL refinement request"""
+        stream_placeholder = st.empty()
         with st.spinner("🔄 SQL 개선 중..."):
             generator = st.session_state.nl2sql_generator
             result = generator.refine_sql(
                 original_query=original_query,
                 current_sql=current_sql,
-                refinement_request=refinement_request
+                refinement_request=refinement_request,
+                on_sql_progress=self._sql_progress_renderer(stream_placeholder)
             )
+        stream_placeholder.empty()
 
         if result.success:
             # Update session state with refined SQL
@@ -446,6 +486,7 @@ class NL2SQLTab:
             # Clear previous execution result
             if 'nl2sql_execution_result' in st.session_state:
                 del st.session_state.nl2sql_execution_result
+            self._discard_full_export()
 
             # Set flag to show improvement banner
             st.session_state.nl2sql_just_improved = True
@@ -493,7 +534,12 @@ class NL2SQLTab:
             with col1:
                 st.metric("반환된 행 수", f"{result['row_count']:,}")
             with col2:
-                st.metric("실행 시간", f"{result['execution_time']}초")
+                st.metric(
+                    "실행 시간",
+                    f"{result['execution_time']}초",
+                    delta="캐시" if result.get('cached') else None,
+                    delta_color="off"
+                )
 
             # Display data
             if result['row_count'] > 0:
@@ -513,6 +559,10 @@ class NL2SQLTab:
                     key="nl2sql_csv_download"
                 )
 
+                # 결과가 화면 표시 한도에서 잘린 경우 전체 결과 스트리밍 내보내기 제공
+                if result['row_count'] >= self.EXECUTION_MAX_ROWS and 'nl2sql_result' in st.session_state:
+                    self._render_full_export(st.session_state.nl2sql_result.sql_query)
+
                 # Interactive chart builder
                 st.divider()
                 chart_builder = ChartBuilder(result['data'], key_prefix="nl2sql_chart")
@@ -524,6 +574,7 @@ class NL2SQLTab:
             if st.button("🗑️ 결과 지우기", key="nl2sql_clear_results"):
                 if 'nl2sql_execution_result' in st.session_state:
                     del st.session_state.nl2sql_execution_result
+                self._discard_full_export()
 
         else:
             # Error display
@@ -554,6 +605,74 @@ class NL2SQLTab:
             if st.button("🗑️ 결과 지우기", key="nl2sql_clear_error"):
                 if 'nl2sql_execution_result' in st.session_state:
                     del st.session_state.nl2sql_execution_result
+                self._discard_full_export()
+
+    def _render_full_export(self, sql_query: str):
+        """
+        전체 결과 CSV 내보내기 (배치 스트리밍)
+
+        DataFrame 전체를 메모리에 올리지 않고 배치 단위로 임시 파일에 기록
+        (세션당 임시 파일 하나 - 새 내보내기/실행/결과 지우기 시 이전 파일 삭제)
+        """
+        st.warning(
+            f"⚠️ 화면에는 최대 {self.EXECUTION_MAX_ROWS:,}행만 표시됩니다. "
+            "전체 결과가 필요하면 아래 버튼으로 내보내세요."
+        )
+
+        if st.button("📦 전체 결과 CSV 내보내기", key="nl2sql_full_export"):
+            client = st.session_state.databricks_client
+            progress = st.empty()
+
+            def on_batch(batch):
+                progress.info(
+                    f"⏳ {batch.total_rows:,}행 기록 중... "
+                    f"(첫 배치 {batch.time_to_first_batch:.1f}초, 경과 {batch.elapsed:.1f}초)"
+                )
+
+            self._discard_full_export()
+            export_file = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+            try:
+                with export_file:
+                    stats = client.export_query_to_csv(
+                        sql_query,
+                        export_file,
+                        batch_size=self.EXPORT_BATCH_SIZE,
+                        progress_callback=on_batch
+                    )
+            except Exception as e:
+                self._remove_file(export_file.name)
+                progress.error(f"❌ 내보내기 실패: {e}")
+                return
+
+            progress.success(
+                f"✅ {stats['row_count']:,}행 내보내기 완료 ({stats['execution_time']}초)"
+            )
+            st.session_state.nl2sql_full_export_path = export_file.name
+
+        export_path = st.session_state.get('nl2sql_full_export_path')
+        if export_path and os.path.exists(export_path):
+            with open(export_path, 'rb') as f:
+                st.download_button(
+                    label="📥 전체 결과 CSV 다운로드",
+                    data=f,
+                    file_name="query_result_full.csv",
+                    mime="text/csv",
+                    key="nl2sql_full_csv_download"
+                )
+
+    @classmethod
+    def _discard_full_export(cls):
+        """이전 전체 결과 CSV 임시 파일 삭제"""
+        export_path = st.session_state.pop('nl2sql_full_export_path', None)
+        if export_path:
+            cls._remove_file(export_path)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
     def _render_error_result(self, result):
         """Render error result with recovery guidance"""
@@ -19,7 +19,7 @@ from reportlab.platypus import Paragraph
 # Core imports
 from core.recipe_loader import RecipeLoader
 from core.sql_template_engine import SQLTemplateEngine
-from services.gemini_service import GeminiService
+from services.llm_gateway import PRIORITY_BATCH, get_llm_gateway
 from services.databricks_client import DatabricksClient
 
 # Font Configuration
@@ -76,8 +76,7 @@ def get_report_structure_with_llm(query, all_recipes):
     full_prompt = f"{system_prompt}\n\n{prompt}"
     
     print("🤖 Calling Gemini to generate report structure...")
-    gemini = GeminiService()
-    response = gemini.generate_content(full_prompt)
+    response = get_llm_gateway().generate(full_prompt, priority=PRIORITY_BATCH, caller="pdf_report_structure")
     
     try:
         text = response.text
@@ -121,9 +120,8 @@ def generate_chart_insight(df, report_title, chart_title, recipe_name):
     prompt = prompt.replace("{{DATA_SUMMARY}}", summary_str)
     
     print(f"🤖 Generating insight for chart: {chart_title}...")
-    gemini = GeminiService()
     try:
-        response = gemini.generate_content(prompt)
+        response = get_llm_gateway().generate(prompt, priority=PRIORITY_BATCH, caller="pdf_chart_insight")
         return response.text.strip()
     except Exception as e:
         print(f"❌ Failed to generate insight: {e}")
@@ -287,7 +285,7 @@ def generate_pdf(report_structure, query, output_filename):
                     print(f"   Executing SQL...")
                     
                     # Execute SQL
-                    result = client.execute_query(final_sql)
+                    result = client.execute_query(final_sql, cache_category=recipe.get('category'))
                     
                     if result['success']:
                         df = result['data']
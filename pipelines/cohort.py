@@ -0,0 +1,234 @@
+"""
+Cohort Materialization - 질환 코호트 1회 생성 후 레시피 간 공유
+질환 키워드 + 기간으로 basic_treatment를 한 번만 스캔해 테이블로 만들어 두고,
+레시피 템플릿은 cohort_visits() 함수로 그 테이블을 참조
+
+웨어하우스에서는 전용 scratch 스키마(pipeline.cohort.schema)가 있어야만 테이블을 만들고,
+만료된 코호트 테이블은 DROP TABLE로 정리 (생성기가 회수되거나 프로세스가 종료될 때 나머지도)
+
+테이블명에는 생성기별 owner 토큰이 붙어, 같은 scratch 스키마를 쓰는 다른 세션/프로세스의
+테이블을 CREATE OR REPLACE / DROP 하지 않음
+"""
+
+import hashlib
+import itertools
+import secrets
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
+
+from core.exceptions import QueryExecutionError
+
+
+@dataclass(frozen=True)
+class CohortSpec:
+    """코호트 정의 (질환 키워드 + 분석 기간, 날짜는 YYYY-MM-DD)"""
+    disease_keyword: str
+    start_date: str
+    end_date: str
+
+    def __post_init__(self):
+        if "'" in self.disease_keyword or "\\" in self.disease_keyword:
+            raise ValueError(f"Invalid disease keyword for cohort: {self.disease_keyword!r}")
+
+    @property
+    def start_year(self) -> str:
+        return self.start_date[:4]
+
+    @property
+    def end_year(self) -> str:
+        return self.end_date[:4]
+
+    def table_name(self, schema: Optional[str] = None, owner: Optional[str] = None) -> str:
+        """(키워드, 기간)별 테이블명 (owner가 있으면 cohort_<hash>_<owner>)"""
+        digest = hashlib.sha1(
+            f"{self.disease_keyword}|{self.start_date}|{self.end_date}".encode('utf-8')
+        ).hexdigest()[:12]
+        name = f"cohort_{digest}_{owner}" if owner else f"cohort_{digest}"
+        return f"{schema}.{name}" if schema else name
+
+    def build_sql(self, table_name: str) -> str:
+        """
+        코호트 생성 SQL
+
+        레시피마다 날짜 비교 방식이 다르므로 (문자열 비교 / DATE 캐스팅) 연도 단위로 넓게 잘라
+        어떤 해석에도 빠지는 행이 없게 함. 정확한 기간 조건은 각 레시피의 WHERE가 다시 적용.
+        """
+        return (
+            f"CREATE OR REPLACE TABLE {table_name} AS\n"
+            f"SELECT *\n"
+            f"FROM basic_treatment\n"
+            f"WHERE deleted = FALSE\n"
+            f"  AND res_disease_name LIKE '%{self.disease_keyword}%'\n"
+            f"  AND SUBSTRING(res_treat_start_date, 1, 4) BETWEEN '{self.start_year}' AND '{self.end_year}'"
+        )
+
+    def covers(self, keyword: str, start_date: Optional[str], end_date: Optional[str]) -> bool:
+        """레시피의 (키워드, 기간) 조건이 이 코호트 안에 완전히 포함되는지"""
+        if keyword != self.disease_keyword or not start_date or not end_date:
+            return False
+        return str(start_date)[:4] >= self.start_year and str(end_date)[:4] <= self.end_year
+
+
+@dataclass
+class MaterializedCohort:
+    """생성된 코호트 테이블 정보"""
+    spec: CohortSpec
+    table_name: str
+    visit_count: int
+    patient_count: int
+    build_time: float
+    created_at: float = field(default_factory=time.time)
+    # 코호트를 쓰는 동안 생성기가 회수되어 테이블이 DROP되지 않도록 참조 유지
+    materializer: Optional["CohortMaterializer"] = field(default=None, repr=False, compare=False)
+
+    def covers(self, keyword: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> bool:
+        return self.spec.covers(keyword, start_date, end_date)
+
+
+def _drop_table(client, table_name: str) -> bool:
+    dropped = client.execute_query(f"DROP TABLE IF EXISTS {table_name}", max_rows=1, use_cache=False)
+    if not dropped['success']:
+        # 남은 테이블은 README의 cohort 정리 안내대로 수동 삭제
+        print(f"⚠️ Failed to drop cohort table {table_name}: {dropped['error_message']}")
+    return dropped['success']
+
+
+def _drop_all(client, tables: Set[str], lock: threading.Lock) -> int:
+    """생성기가 만든 코호트 테이블 전부 DROP (생성기를 참조하지 않아 weakref.finalize에서 사용 가능)"""
+    with lock:
+        table_names = sorted(tables)
+        tables.clear()
+    return sum(_drop_table(client, table_name) for table_name in table_names)
+
+
+class CohortMaterializer:
+    """
+    코호트 테이블 생성/재사용 관리
+
+    같은 (질환, 기간) 코호트는 ttl_seconds 동안 다시 만들지 않음.
+    동시에 같은 코호트를 요청하면 DatabricksClient의 single-flight로 CTAS가 1회만 실행됨.
+    테이블명에는 생성기 owner 토큰 + 생성 번호가 붙음 → 다른 생성기의 테이블이나, TTL 후 다시 만든
+    코호트가 유예 기간 중인 이전 테이블을 CREATE OR REPLACE로 덮어쓰지 않음.
+    생성기가 회수되거나 프로세스가 종료되면 남은 테이블을 DROP (weakref.finalize - 생성기를 붙잡지 않음).
+    """
+
+    def __init__(
+        self,
+        client,
+        schema: Optional[str] = None,
+        ttl_seconds: float = 3600,
+        drop_grace_seconds: float = 600
+    ):
+        """
+        Args:
+            client: DatabricksClient (execute_query 사용)
+            schema: 코호트 테이블을 만들 scratch 스키마 (로컬 실행기에서만 생략 가능)
+            ttl_seconds: 코호트 재사용 기간 (초)
+            drop_grace_seconds: 만료 후 DROP까지 유예 (초) - 만료 직전에 받은 코호트로 실행 중인 레시피 보호
+
+        Raises:
+            ValueError: 웨어하우스 실행기인데 schema가 없을 때 (운영 스키마에 테이블이 쌓이지 않도록)
+        """
+        if not schema and getattr(client, 'executor', 'databricks') != 'local':
+            raise ValueError(
+                "Cohort tables need a dedicated scratch schema on the warehouse "
+                "(config.yaml -> pipeline.cohort.schema)"
+            )
+        self.client = client
+        self.schema = schema
+        self.ttl_seconds = ttl_seconds
+        self.drop_grace_seconds = drop_grace_seconds
+        self.owner = secrets.token_hex(4)
+        self._builds = itertools.count(1)
+        self._latest: Dict[CohortSpec, MaterializedCohort] = {}
+        self._cohorts: Dict[str, MaterializedCohort] = {}   # 테이블명 → 코호트 (유예 중인 이전 코호트 포함)
+        self._tables: Set[str] = set()   # 정리 대상 (코호트 → 생성기 참조가 없어 finalize가 붙잡지 않음)
+        self._lock = threading.Lock()
+        weakref.finalize(self, _drop_all, client, self._tables, self._lock)
+
+    def get(self, spec: CohortSpec) -> Optional[MaterializedCohort]:
+        """유효한 (TTL 이내) 코호트가 있으면 반환"""
+        with self._lock:
+            cohort = self._latest.get(spec)
+        if cohort is not None and time.time() - cohort.created_at < self.ttl_seconds:
+            return cohort
+        return None
+
+    def materialize(self, spec: CohortSpec) -> MaterializedCohort:
+        """
+        코호트 테이블 생성 (유효한 코호트가 있으면 재사용)
+
+        Raises:
+            QueryExecutionError: 테이블 생성 또는 집계 쿼리 실패 시
+        """
+        cohort = self.get(spec)
+        if cohort is not None:
+            return cohort
+        self.drop_expired()
+
+        table_name = spec.table_name(self.schema, owner=f"{self.owner}_{next(self._builds)}")
+        started = time.time()
+
+        created = self.client.execute_query(spec.build_sql(table_name), max_rows=1, use_cache=False)
+        if not created['success']:
+            raise QueryExecutionError(f"Failed to materialize cohort {table_name}: {created['error_message']}")
+        with self._lock:
+            self._tables.add(table_name)
+
+        counted = self.client.execute_query(
+            f"SELECT COUNT(*) AS visit_count, COUNT(DISTINCT user_id) AS patient_count FROM {table_name}",
+            max_rows=1,
+            result_format='arrow',
+            use_cache=False
+        )
+        if not counted['success']:
+            self._drop(table_name)
+            raise QueryExecutionError(f"Failed to count cohort {table_name}: {counted['error_message']}")
+        counts = counted['data'].to_pylist()[0]
+
+        cohort = MaterializedCohort(
+            spec=spec,
+            table_name=table_name,
+            visit_count=int(counts['visit_count']),
+            patient_count=int(counts['patient_count']),
+            build_time=round(time.time() - started, 2),
+            materializer=self
+        )
+        with self._lock:
+            self._latest[spec] = cohort
+            self._cohorts[table_name] = cohort
+        return cohort
+
+    def drop_expired(self) -> int:
+        """
+        만료 + 유예 시간이 지난 코호트 테이블 DROP
+
+        Returns:
+            DROP한 테이블 수
+        """
+        now = time.time()
+        with self._lock:
+            expired = [
+                cohort for cohort in self._cohorts.values()
+                if now - cohort.created_at >= self.ttl_seconds + self.drop_grace_seconds
+            ]
+            for cohort in expired:
+                del self._cohorts[cohort.table_name]
+                if self._latest.get(cohort.spec) is cohort:
+                    del self._latest[cohort.spec]
+        return sum(self._drop(cohort.table_name) for cohort in expired)
+
+    def drop_all(self) -> int:
+        """이 생성기가 만든 코호트 테이블 전부 DROP"""
+        with self._lock:
+            self._latest.clear()
+            self._cohorts.clear()
+        return _drop_all(self.client, self._tables, self._lock)
+
+    def _drop(self, table_name: str) -> bool:
+        with self._lock:
+            self._tables.discard(table_name)
+        return _drop_table(self.client, table_name)
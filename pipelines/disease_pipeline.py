@@ -3,15 +3,25 @@ Disease-Centric Pipeline Analysis System - Phase 6
 질환 중심 파이프라인 분석 시스템
 """
 
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
-import google.generativeai as genai
+from typing import Dict, List, Optional, Any, Iterator
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
 
 from core.recipe_loader import RecipeLoader
 from core.sql_template_engine import SQLTemplateEngine
 from core.schema_loader import SchemaLoader
 from config.config_loader import get_config
 from prompts.loader import PromptLoader
+from services.llm_gateway import PRIORITY_INTERACTIVE, get_llm_gateway
+from pipelines.stage_graph import StageGraph, StageTiming
+from pipelines.cohort import CohortMaterializer, CohortSpec, MaterializedCohort
+
+
+# 레시피 쿼리 실패 처리 정책
+#   isolate:   실패한 레시피만 실패로 기록하고 나머지는 계속 실행 (기본)
+#   fail_fast: 첫 실패 시 아직 시작하지 않은 레시피는 취소 (실행 중인 쿼리는 끝까지 대기)
+FAILURE_POLICIES = ('isolate', 'fail_fast')
 
 
 @dataclass
@@ -23,6 +33,9 @@ class PipelineResult:
     approved_recipes: List[str]  # 사용자 승인된 레시피 이름들
     executed_results: List[Dict[str, Any]]  # 실행된 모든 레시피 결과
     success_rate: float
+    execution_wall_time: Optional[float] = None  # 쿼리 동시 실행 전체 소요 시간 (execute_queries=True일 때)
+    stage_timeline: List[StageTiming] = field(default_factory=list)  # 단계별 시작/종료 시각
+    cohort: Optional[MaterializedCohort] = None  # 레시피들이 공유한 코호트 테이블 (execute_queries=True일 때)
 
 
 class DiseaseAnalysisPipeline:
@@ -46,12 +59,19 @@ class DiseaseAnalysisPipeline:
         self.schema_loader = SchemaLoader()  # RAG 추가
         self.prompt_loader = PromptLoader()  # Prompt Optimization
 
-        # Gemini API 초기화 (centralized config)
+        # LLM 호출은 공용 게이트웨이로 (모델/동시성/요청률 제한 공유)
         config = get_config()
-        api_key = config.get_gemini_api_key()
+        self.llm = get_llm_gateway()
+
+        # 레시피 쿼리 동시 실행 (config.yaml -> pipeline.max_workers, 기본: DatabricksClient.max_concurrency)
+        self.max_workers: Optional[int] = config.get('pipeline.max_workers')
+        self._query_client = None
 
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        # 질환 코호트 공유 (config.yaml -> pipeline.cohort.*, 웨어하우스에서는 scratch schema 필수)
+        self.cohort_enabled: bool = config.get('pipeline.cohort.enabled', False)
+        self.cohort_schema: Optional[str] = config.get('pipeline.cohort.schema')
+        self.cohort_ttl: float = config.get('pipeline.cohort.ttl_seconds', 3600)
+        self._cohort_materializer = None
 
         print("✅ DiseaseAnalysisPipeline initialized (Prompt Optimized)")
         print(f"   - Loaded {len(self.recipe_loader.all_recipes)} recipes")
@@ -59,12 +79,24 @@ class DiseaseAnalysisPipeline:
         print(f"   - Core recipes: {len(self.CORE_RECIPES)}")
         print(f"   - Prompt: External templates (optimized)")
 
-    def execute_core_recipes(self, disease_name: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def analysis_window() -> tuple:
+        """레시피 기본 분석 기간 (최근 3년) - (start_date, end_date) YYYY-MM-DD"""
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        return (now - timedelta(days=1095)).strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d')
+
+    def execute_core_recipes(
+        self,
+        disease_name: str,
+        cohort: Optional[MaterializedCohort] = None
+    ) -> List[Dict[str, Any]]:
         """
         4개 고정 코어 레시피 실행
 
         Args:
             disease_name: 질환명 (예: "당뇨병", "고혈압")
+            cohort: 공유 코호트 (materialize_cohort). 있으면 레시피가 basic_treatment 대신 참조
 
         Returns:
             실행 결과 리스트 (각 레시피별 결과)
@@ -84,7 +116,7 @@ class DiseaseAnalysisPipeline:
                     continue
 
                 # 파라미터 자동 설정 - 모든 파라미터에 값 할당
-                from datetime import datetime, timedelta
+                start_date, end_date = self.analysis_window()
                 parameters = {}
 
                 for param in recipe.get('parameters', []):
@@ -98,11 +130,9 @@ class DiseaseAnalysisPipeline:
                     # 날짜 파라미터 - 최근 3년
                     elif param_type == 'date':
                         if 'start' in param_name.lower():
-                            parameters[param_name] = (datetime.now() - timedelta(days=1095)).strftime('%Y-%m-%d')
-                        elif 'end' in param_name.lower():
-                            parameters[param_name] = datetime.now().strftime('%Y-%m-%d')
+                            parameters[param_name] = start_date
                         else:
-                            parameters[param_name] = datetime.now().strftime('%Y-%m-%d')
+                            parameters[param_name] = end_date
 
                     # 정수 파라미터 - 반드시 기본값 설정
                     elif param_type == 'integer':
@@ -121,7 +151,7 @@ class DiseaseAnalysisPipeline:
                         parameters[param_name] = ''
 
                 # SQL 생성
-                sql_query = self.sql_engine.render_template(recipe_name, parameters)
+                sql_query = self.sql_engine.render_template(recipe_name, parameters, cohort=cohort)
 
                 results.append({
                     'recipe_name': recipe_name,
@@ -181,7 +211,7 @@ class DiseaseAnalysisPipeline:
         )
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self.llm.generate(prompt, priority=PRIORITY_INTERACTIVE, caller="recipe_recommendation")
             response_text = response.text.strip()
 
             # JSON 파싱
@@ -281,7 +311,7 @@ class DiseaseAnalysisPipeline:
 """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = self.llm.generate(prompt, priority=PRIORITY_INTERACTIVE, caller="recipe_refinement")
             response_text = response.text.strip()
 
             # JSON 파싱
@@ -314,7 +344,8 @@ class DiseaseAnalysisPipeline:
     def execute_approved_recipes(
         self,
         disease_name: str,
-        approved_recipe_names: List[str]
+        approved_recipe_names: List[str],
+        cohort: Optional[MaterializedCohort] = None
     ) -> List[Dict[str, Any]]:
         """
         승인된 레시피들 실행
@@ -322,6 +353,7 @@ class DiseaseAnalysisPipeline:
         Args:
             disease_name: 질환명
             approved_recipe_names: 승인된 레시피 이름 리스트
+            cohort: 공유 코호트 (execute_core_recipes 참고)
 
         Returns:
             실행 결과 리스트
@@ -340,7 +372,7 @@ class DiseaseAnalysisPipeline:
                     continue
 
                 # 파라미터 자동 설정
-                from datetime import datetime, timedelta
+                start_date, end_date = self.analysis_window()
                 parameters = {}
 
                 for param in recipe.get('parameters', []):
@@ -355,13 +387,10 @@ class DiseaseAnalysisPipeline:
                     elif param_type == 'date':
                         if 'start' in param_name.lower():
                             # 3년 전부터
-                            parameters[param_name] = (datetime.now() - timedelta(days=1095)).strftime('%Y-%m-%d')
-                        elif 'end' in param_name.lower():
-                            # 오늘까지
-                            parameters[param_name] = datetime.now().strftime('%Y-%m-%d')
+                            parameters[param_name] = start_date
                         else:
-                            # 기본값 (오늘)
-                            parameters[param_name] = datetime.now().strftime('%Y-%m-%d')
+                            # 오늘까지 (기본값도 오늘)
+                            parameters[param_name] = end_date
 
                     # 정수 파라미터 - 기본값 사용
                     elif param_type == 'integer':
@@ -372,7 +401,7 @@ class DiseaseAnalysisPipeline:
                         parameters[param_name] = ''
 
                 # SQL 생성
-                sql_query = self.sql_engine.render_template(recipe_name, parameters)
+                sql_query = self.sql_engine.render_template(recipe_name, parameters, cohort=cohort)
 
                 results.append({
                     'recipe_name': recipe_name,
@@ -391,11 +420,201 @@ class DiseaseAnalysisPipeline:
 
         return results
 
+    @property
+    def query_client(self):
+        """레시피 쿼리 실행용 DatabricksClient (첫 실행 시 생성)"""
+        if self._query_client is None:
+            from services.databricks_client import DatabricksClient
+            self._query_client = DatabricksClient()
+        return self._query_client
+
+    @property
+    def cohort_materializer(self) -> CohortMaterializer:
+        """공유 코호트 생성기 (query_client 사용, 첫 사용 시 생성)"""
+        if self._cohort_materializer is None:
+            self._cohort_materializer = CohortMaterializer(
+                self.query_client,
+                schema=self.cohort_schema,
+                ttl_seconds=self.cohort_ttl
+            )
+        return self._cohort_materializer
+
+    def materialize_cohort(self, disease_name: str) -> Optional[MaterializedCohort]:
+        """
+        질환 코호트를 (질환, 분석 기간)당 한 번만 만들어 레시피들이 공유하도록 함
+
+        레시피마다 반복되던 basic_treatment LIKE 전체 스캔을 1회로 줄임.
+        비활성화되어 있거나 생성에 실패하면 None (레시피는 원본 테이블을 그대로 스캔).
+        """
+        if not self.cohort_enabled:
+            return None
+        try:
+            spec = CohortSpec(disease_name, *self.analysis_window())
+            cohort = self.cohort_materializer.materialize(spec)
+        except Exception as e:
+            print(f"⚠️ Cohort materialization failed, recipes will scan basic_treatment: {e}")
+            return None
+        print(
+            f"✅ Cohort {cohort.table_name}: {cohort.patient_count:,} patients / "
+            f"{cohort.visit_count:,} visits ({cohort.build_time:.2f}s)"
+        )
+        return cohort
+
+    def execute_recipe_queries(
+        self,
+        rendered_results: List[Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        failure_policy: str = 'isolate',
+        max_rows: int = 10000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        렌더링된 레시피 SQL을 제한된 워커 풀에서 동시에 실행하고, 끝나는 순서대로 결과를 yield
+
+        전체 소요 시간은 레시피별 지연 시간의 합이 아니라 가장 느린 레시피 수준이 됨.
+        SQL 렌더링 단계에서 실패한 레시피는 실행하지 않고 바로 반환.
+
+        Args:
+            rendered_results: execute_core_recipes() / execute_approved_recipes() 결과
+            max_workers: 동시 실행 수 (None이면 pipeline.max_workers → 클라이언트 max_concurrency)
+            failure_policy: 'isolate' | 'fail_fast' (FAILURE_POLICIES 참고)
+            max_rows: 레시피당 최대 반환 행 수
+
+        Yields:
+            입력 결과 dict + {
+                'index': int,  # rendered_results 내 위치
+                'status': 'succeeded' | 'failed' | 'render_failed' | 'cancelled',
+                'data': DataFrame or None,
+                'row_count': int,
+                'execution_time': float,  # 쿼리 실행 시간
+                'queue_time': float,  # 워커를 기다린 시간
+                'completed_at': float,  # 배치 시작 후 완료까지 경과 시간
+                'cached': bool
+            }
+        """
+        if failure_policy not in FAILURE_POLICIES:
+            raise ValueError(f"failure_policy must be one of {FAILURE_POLICIES}, got {failure_policy!r}")
+
+        client = self.query_client
+        workers = max_workers or self.max_workers or getattr(client, 'max_concurrency', 4)
+        batch_started = time.time()
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recipe_query")
+        futures = {}
+        try:
+            # 1) 렌더링 실패분은 즉시 반환, 나머지는 모두 제출
+            for index, rendered in enumerate(rendered_results):
+                if not rendered.get('success') or not rendered.get('sql_query'):
+                    yield {
+                        **rendered,
+                        'index': index,
+                        'success': False,
+                        'status': 'render_failed',
+                        'data': None,
+                        'row_count': 0,
+                        'execution_time': 0.0,
+                        'queue_time': 0.0,
+                        'completed_at': round(time.time() - batch_started, 3),
+                        'cached': False
+                    }
+                    continue
+                future = executor.submit(
+                    self._run_recipe_query, client, rendered, max_rows, batch_started
+                )
+                futures[future] = (index, rendered)
+
+            # 2) 끝나는 순서대로 반환
+            aborted = False
+            for future in as_completed(futures):
+                index, rendered = futures[future]
+
+                if future.cancelled():
+                    yield {
+                        **rendered,
+                        'index': index,
+                        'success': False,
+                        'status': 'cancelled',
+                        'error': '앞선 레시피 실패로 실행이 취소되었습니다 (fail_fast)',
+                        'data': None,
+                        'row_count': 0,
+                        'execution_time': 0.0,
+                        'queue_time': 0.0,
+                        'completed_at': round(time.time() - batch_started, 3),
+                        'cached': False
+                    }
+                    continue
+
+                result = {**future.result(), 'index': index}
+                if not result['success'] and failure_policy == 'fail_fast' and not aborted:
+                    aborted = True
+                    for other in futures:
+                        other.cancel()
+                yield result
+        finally:
+            # 소비자가 중간에 멈춰도 시작 전인 쿼리는 실행하지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _run_recipe_query(
+        client: Any,
+        rendered: Dict[str, Any],
+        max_rows: int,
+        batch_started: float
+    ) -> Dict[str, Any]:
+        """워커 스레드에서 레시피 쿼리 1건 실행 (예외도 실패 결과로 변환)"""
+        started = time.time()
+        try:
+            query_result = client.execute_query(
+                rendered['sql_query'],
+                max_rows=max_rows,
+                cache_category=rendered.get('metadata', {}).get('category')
+            )
+        except Exception as e:
+            query_result = {
+                'success': False,
+                'data': None,
+                'row_count': 0,
+                'execution_time': round(time.time() - started, 2),
+                'error_message': str(e),
+                'cached': False
+            }
+
+        return {
+            **rendered,
+            'success': query_result['success'],
+            'status': 'succeeded' if query_result['success'] else 'failed',
+            'error': query_result.get('error_message'),
+            'data': query_result.get('data'),
+            'row_count': query_result.get('row_count', 0),
+            'execution_time': query_result.get('execution_time', 0.0),
+            'queue_time': round(started - batch_started, 3),
+            'completed_at': round(time.time() - batch_started, 3),
+            'cached': query_result.get('cached', False)
+        }
+
+    def prepare_analysis(self, disease_name: str, target_count: int = 7) -> Dict[str, Any]:
+        """
+        탭의 "분석 시작" 단계: 코어 레시피 렌더링과 LLM 추천을 동시에 실행
+
+        Returns:
+            {'core_results': [...], 'recommended': [...], 'stage_timeline': [StageTiming, ...]}
+        """
+        graph = StageGraph(max_workers=2)
+        graph.add('core_render', lambda _: self.execute_core_recipes(disease_name))
+        graph.add('recommend', lambda _: self.recommend_additional_recipes(disease_name, target_count=target_count))
+        results = graph.run()
+        return {
+            'core_results': results['core_render'],
+            'recommended': results['recommend'],
+            'stage_timeline': graph.timeline
+        }
+
     def run_complete_pipeline(
         self,
         disease_name: str,
         user_approved_recipes: Optional[List[str]] = None,
-        natural_language_feedback: Optional[str] = None
+        natural_language_feedback: Optional[str] = None,
+        execute_queries: bool = False,
+        failure_policy: str = 'isolate'
     ) -> PipelineResult:
         """
         전체 파이프라인 실행
@@ -404,6 +623,8 @@ class DiseaseAnalysisPipeline:
             disease_name: 질환명
             user_approved_recipes: 사용자가 체크박스로 승인한 레시피 (None이면 자동 추천만 사용)
             natural_language_feedback: 사용자의 자연어 피드백 (추가 조정용)
+            execute_queries: True면 렌더링된 전체 레시피 SQL을 동시에 실행 (execute_recipe_queries)
+            failure_policy: 쿼리 실패 처리 정책 ('isolate' | 'fail_fast')
 
         Returns:
             PipelineResult 객체
@@ -413,42 +634,93 @@ class DiseaseAnalysisPipeline:
         print(f"   Disease: {disease_name}")
         print(f"{'='*60}\n")
 
-        # Step 1: 코어 레시피 실행
-        print("Step 1: Executing 4 core recipes...")
-        core_results = self.execute_core_recipes(disease_name)
-        core_success = sum(1 for r in core_results if r.get('success', False))
-        print(f"✅ Core recipes executed: {core_success}/{len(core_results)} succeeded\n")
-
-        # Step 2: LLM 추천
-        print("Step 2: LLM recommending additional recipes...")
-        recommended = self.recommend_additional_recipes(disease_name, target_count=7)
-        print(f"✅ Recommended {len(recommended)} recipes\n")
-
-        # Step 3: 자연어 피드백 반영 (옵션)
-        if natural_language_feedback:
-            print(f"Step 3: Refining with user feedback...")
-            print(f"   Feedback: '{natural_language_feedback}'")
-            recommended = self.refine_recommendations_with_nl(
+        # 단계 의존성 그래프
+        #   cohort ─→ core_render ─→ core_execute
+        #   recommend ─→ refine ─→ approved_render ─→ approved_execute   (approved_render도 cohort 이후)
+        # 코어 레시피 렌더링/실행과 LLM 추천(Gemini + 스키마 RAG)은 서로 독립이므로 동시에 실행
+        # cohort 단계는 쿼리를 실행할 때만 추가 (실패해도 None을 넘겨 레시피가 원본 테이블을 스캔)
+        graph = StageGraph(max_workers=4)
+        use_cohort = execute_queries and self.cohort_enabled
+        cohort_deps = ['cohort'] if use_cohort else []
+
+        def cohort_stage(_):
+            return self.materialize_cohort(disease_name)
+
+        def core_render(inputs):
+            core_results = self.execute_core_recipes(disease_name, cohort=inputs.get('cohort'))
+            core_success = sum(1 for r in core_results if r.get('success', False))
+            print(f"✅ Core recipes rendered: {core_success}/{len(core_results)} succeeded")
+            return core_results
+
+        def recommend(_):
+            recommended = self.recommend_additional_recipes(disease_name, target_count=7)
+            print(f"✅ Recommended {len(recommended)} recipes")
+            return recommended
+
+        def refine(inputs):
+            recommended = inputs['recommend']
+            if not natural_language_feedback:
+                return recommended
+            print(f"   Refining with feedback: '{natural_language_feedback}'")
+            refined = self.refine_recommendations_with_nl(
                 disease_name,
                 recommended,
                 natural_language_feedback
             )
-            print(f"✅ Refined to {len(recommended)} recipes\n")
-
-        # Step 4: 사용자 승인 처리
-        if user_approved_recipes is not None:
-            approved = user_approved_recipes
-            print(f"Step 4: User approved {len(approved)} recipes")
+            print(f"✅ Refined to {len(refined)} recipes")
+            return refined
+
+        def approved_render(inputs):
+            if user_approved_recipes is not None:
+                approved = user_approved_recipes
+                print(f"   User approved {len(approved)} recipes")
+            else:
+                # 자동 승인 (UI 없이 테스트할 때)
+                approved = inputs['refine']
+                print(f"   Auto-approving all {len(approved)} recommended recipes")
+            approved_results = self.execute_approved_recipes(disease_name, approved, cohort=inputs.get('cohort'))
+            approved_success = sum(1 for r in approved_results if r.get('success', False))
+            print(f"✅ Approved recipes rendered: {approved_success}/{len(approved_results)} succeeded")
+            return {'approved': approved, 'results': approved_results}
+
+        def run_queries(rendered):
+            executed = self.execute_recipe_queries(rendered, failure_policy=failure_policy)
+            return sorted(executed, key=lambda r: r['index'])
+
+        def core_execute(inputs):
+            return run_queries(inputs['core_render'])
+
+        def approved_execute(inputs):
+            return run_queries(inputs['approved_render']['results'])
+
+        if use_cohort:
+            graph.add('cohort', cohort_stage)
+        graph.add('core_render', core_render, depends_on=cohort_deps)
+        graph.add('recommend', recommend)
+        graph.add('refine', refine, depends_on=['recommend'])
+        graph.add('approved_render', approved_render, depends_on=['refine'] + cohort_deps)
+        if execute_queries:
+            graph.add('core_execute', core_execute, depends_on=['core_render'])
+            graph.add('approved_execute', approved_execute, depends_on=['approved_render'])
+
+        print("Running stages: core recipes ∥ LLM recommendation...")
+        stage_results = graph.run()
+        print(f"\nStage timeline:\n{graph.format_timeline()}\n")
+
+        recommended = stage_results['refine']
+        approved = stage_results['approved_render']['approved']
+
+        execution_wall_time = None
+        if execute_queries:
+            core_results = stage_results['core_execute']
+            approved_results = stage_results['approved_execute']
+            execute_timings = [t for t in graph.timeline if t.name.endswith('_execute')]
+            execution_wall_time = round(
+                max(t.finished_at for t in execute_timings) - min(t.started_at for t in execute_timings), 2
+            )
         else:
-            # 자동 승인 (UI 없이 테스트할 때)
-            approved = recommended
-            print(f"Step 4: Auto-approving all {len(approved)} recommended recipes")
-
-        # Step 5: 승인된 레시피 실행
-        print(f"\nStep 5: Executing {len(approved)} approved recipes...")
-        approved_results = self.execute_approved_recipes(disease_name, approved)
-        approved_success = sum(1 for r in approved_results if r.get('success', False))
-        print(f"✅ Approved recipes executed: {approved_success}/{len(approved_results)} succeeded\n")
+            core_results = stage_results['core_render']
+            approved_results = stage_results['approved_render']['results']
 
         # 전체 결과 집계
         all_results = core_results + approved_results
@@ -467,5 +739,8 @@ class DiseaseAnalysisPipeline:
             recommended_recipes=recommended,
             approved_recipes=approved,
             executed_results=all_results,
-            success_rate=success_rate
+            success_rate=success_rate,
+            execution_wall_time=execution_wall_time,
+            stage_timeline=graph.timeline,
+            cohort=stage_results.get('cohort')
         )
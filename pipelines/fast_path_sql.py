@@ -0,0 +1,245 @@
+"""
+Fast-path SQL - 자주 나오는 질의 형태는 LLM 없이 템플릿으로 SQL 생성
+IntentParser 슬롯(질병/약품/연령/성별/지역/TOP-N/기간)을 _load_example_queries()와 같은 모양의 SQL로 조립
+신뢰도가 min_confidence 이상일 때만 사용하고, 나머지는 Gemini로 넘김
+"""
+
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from core.intent_parser import INTENT_PATIENT_COUNT, INTENT_TOP_DRUGS, IntentParser, QueryIntent, get_intent_parser
+
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+_AGE_EXPR = "YEAR(CURRENT_DATE) - YEAR(TRY_TO_DATE(ip.birthday, 'yyyyMMdd'))"
+_AGE_GROUP_EXPR = f"""CASE
+        WHEN {_AGE_EXPR} < 30 THEN '20대 이하'
+        WHEN {_AGE_EXPR} < 40 THEN '30대'
+        WHEN {_AGE_EXPR} < 50 THEN '40대'
+        WHEN {_AGE_EXPR} < 60 THEN '50대'
+        ELSE '60대 이상'
+    END"""
+_TREAT_DATE_EXPR = "TRY_TO_DATE(bt.res_treat_start_date, 'yyyyMMdd')"
+_RECENT_START_EXPR = {
+    '년': lambda n: f"DATE_SUB(CURRENT_DATE, {365 * n})",
+    '개월': lambda n: f"ADD_MONTHS(CURRENT_DATE, -{n})",
+    '주': lambda n: f"DATE_SUB(CURRENT_DATE, {7 * n})",
+    '일': lambda n: f"DATE_SUB(CURRENT_DATE, {n})",
+}
+
+
+@dataclass
+class FastPathResult:
+    """템플릿으로 만든 SQL"""
+    sql_query: str
+    template: str                   # 'patient_count' | 'patient_count_by_gender' | 'top_drugs' ...
+    intent: QueryIntent
+    referenced_tables: List[str]
+    elapsed_ms: float
+
+    @property
+    def analysis(self) -> Dict[str, Any]:
+        """LLM 응답과 같은 형식의 analysis"""
+        return {
+            'required_tables': self.referenced_tables,
+            'key_conditions': self.intent.describe(),
+            'explanation': f"템플릿 '{self.template}'으로 생성 (신뢰도 {self.intent.confidence:.2f}, LLM 호출 없음)"
+        }
+
+
+@dataclass
+class FastPathMetrics:
+    """Fast-path 사용 통계"""
+    hits: int = 0
+    fallbacks: int = 0               # 해석은 됐지만 신뢰도 부족
+    unmatched: int = 0               # 지원하지 않는 형태
+    total_time_ms: float = 0.0
+
+
+def referenced_tables(intent: QueryIntent) -> List[str]:
+    """슬롯에 필요한 테이블 (basic_treatment 기준 JOIN)"""
+    tables = ['basic_treatment']
+    if intent.gender or intent.age_min is not None or intent.age_max is not None or intent.group_by:
+        tables.append('insured_person')
+    if intent.intent == INTENT_TOP_DRUGS or intent.drug is not None:
+        tables.append('prescribed_drug')
+    return tables
+
+
+def render_sql(intent: QueryIntent) -> Optional[str]:
+    """슬롯 → SQL (지원하지 않는 intent면 None)"""
+    tables = referenced_tables(intent)
+    uses_person = 'insured_person' in tables
+    uses_drug = 'prescribed_drug' in tables
+
+    joins = []
+    if uses_person:
+        joins.append("JOIN insured_person ip ON bt.user_id = ip.user_id")
+    if uses_drug:
+        joins.append(
+            "JOIN prescribed_drug pd\n"
+            "    ON bt.user_id = pd.user_id\n"
+            "    AND bt.res_treat_start_date = pd.res_treat_start_date"
+        )
+
+    conditions = ["bt.deleted = FALSE"]
+    if uses_drug:
+        conditions.append("pd.deleted = FALSE")
+    if intent.disease_patterns:
+        likes = [f"bt.res_disease_code LIKE '{pattern}'" for pattern in intent.disease_patterns]
+        conditions.append(likes[0] if len(likes) == 1 else f"({' OR '.join(likes)})")
+    if intent.drug:
+        entry = intent.drug.entry
+        conditions.append(entry.drug_name_filter or entry.ingredient_filter)
+    if intent.gender:
+        conditions.append(f"ip.gender = '{intent.gender}'")
+    if intent.age_min is not None and intent.age_max is not None:
+        conditions.append(f"{_AGE_EXPR} BETWEEN {intent.age_min} AND {intent.age_max}")
+    elif intent.age_min is not None:
+        conditions.append(f"{_AGE_EXPR} >= {intent.age_min}")
+    elif intent.age_max is not None:
+        conditions.append(f"{_AGE_EXPR} <= {intent.age_max}")
+    if 'age_group' in intent.group_by:
+        conditions.append("TRY_TO_DATE(ip.birthday, 'yyyyMMdd') IS NOT NULL")
+    if intent.region:
+        conditions.append(f"bt.res_hospital_name LIKE '%{intent.region}%'")
+    if intent.date_from:
+        conditions.append(
+            f"{_TREAT_DATE_EXPR}\n"
+            f"        BETWEEN TRY_TO_DATE('{intent.date_from}', 'yyyyMMdd')\n"
+            f"        AND TRY_TO_DATE('{intent.date_to}', 'yyyyMMdd')"
+        )
+    if intent.recent:
+        amount, unit = intent.recent
+        conditions.append(f"{_TREAT_DATE_EXPR} >= {_RECENT_START_EXPR[unit](amount)}")
+
+    if intent.intent == INTENT_TOP_DRUGS:
+        select = ["pd.res_drug_name AS `약물명`", "COUNT(*) AS `처방횟수`"]
+        group_by = ["pd.res_drug_name"]
+        order_by = "`처방횟수` DESC"
+        limit = f"\nLIMIT {intent.top_n}"
+    elif intent.intent == INTENT_PATIENT_COUNT:
+        select, group_by = [], []
+        if 'gender' in intent.group_by:
+            select.append("ip.gender AS `성별`")
+            group_by.append("ip.gender")
+        if 'age_group' in intent.group_by:
+            select.append(f"{_AGE_GROUP_EXPR} AS `연령대`")
+            group_by.append("`연령대`")
+        select.append("COUNT(DISTINCT bt.user_id) AS `환자수`")
+        order_by = ", ".join(group_by) if len(group_by) > 1 or 'age_group' in intent.group_by else "`환자수` DESC"
+        limit = ""
+    else:
+        return None
+
+    sql = "SELECT\n    " + ",\n    ".join(select)
+    sql += "\nFROM basic_treatment bt"
+    for join in joins:
+        sql += "\n" + join
+    sql += "\nWHERE " + "\n    AND ".join(conditions)
+    if group_by:
+        sql += "\nGROUP BY " + ", ".join(group_by)
+        sql += "\nORDER BY " + order_by
+    return sql + limit
+
+
+def template_name(intent: QueryIntent) -> str:
+    """모니터링/로그용 템플릿 이름"""
+    if intent.intent == INTENT_PATIENT_COUNT and intent.group_by:
+        return f"{intent.intent}_by_{'_'.join(intent.group_by)}"
+    return intent.intent or 'none'
+
+
+class FastPathSQL:
+    """
+    질의 → 템플릿 SQL (신뢰도가 낮으면 None → 호출 측에서 LLM 사용)
+    """
+
+    def __init__(self, parser: Optional[IntentParser] = None, min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> None:
+        """
+        Args:
+            parser: 질의 해석기 (기본: 프로세스 공용 get_intent_parser())
+            min_confidence: 템플릿을 사용할 최소 신뢰도
+        """
+        self._parser = parser
+        self.min_confidence = min_confidence
+        self.metrics = FastPathMetrics()
+        self._lock = threading.Lock()
+
+    @property
+    def parser(self) -> IntentParser:
+        return self._parser or get_intent_parser()
+
+    def synthesize(self, query: str) -> Optional[FastPathResult]:
+        """템플릿 SQL 생성 (신뢰도 부족/지원하지 않는 형태면 None)"""
+        parser = self.parser
+        started_at = time.perf_counter()
+        intent = parser.parse(query)
+        sql = render_sql(intent) if intent.confidence >= self.min_confidence else None
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        with self._lock:
+            self.metrics.total_time_ms += elapsed_ms
+            if sql is None:
+                if intent.intent is None or intent.confidence == 0.0:
+                    self.metrics.unmatched += 1
+                else:
+                    self.metrics.fallbacks += 1
+                return None
+            self.metrics.hits += 1
+
+        return FastPathResult(
+            sql_query=sql,
+            template=template_name(intent),
+            intent=intent,
+            referenced_tables=referenced_tables(intent),
+            elapsed_ms=elapsed_ms
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """통계 + 적중률(%)"""
+        with self._lock:
+            metrics = asdict(self.metrics)
+        total = metrics['hits'] + metrics['fallbacks'] + metrics['unmatched']
+        metrics['total'] = total
+        metrics['hit_rate'] = metrics['hits'] / total * 100 if total else 0.0
+        metrics['avg_time_ms'] = metrics['total_time_ms'] / total if total else 0.0
+        return metrics
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self.metrics = FastPathMetrics()
+
+
+_shared_fast_path: Optional[FastPathSQL] = None
+_shared_fast_path_lock = threading.Lock()
+
+
+def get_fast_path_sql() -> Optional[FastPathSQL]:
+    """
+    프로세스 공용 FastPathSQL (config.yaml -> nl2sql_fast_path.* 설정 사용)
+
+    설정 예:
+        nl2sql_fast_path:
+          enabled: true
+          min_confidence: 0.85
+
+    Returns:
+        FastPathSQL, enabled: false면 None
+    """
+    global _shared_fast_path
+    with _shared_fast_path_lock:
+        if _shared_fast_path is None:
+            from config.config_loader import get_config, ConfigurationError
+            try:
+                settings = get_config().get('nl2sql_fast_path', {}) or {}
+            except ConfigurationError:
+                settings = {}
+            if not settings.get('enabled', True):
+                return None
+            _shared_fast_path = FastPathSQL(
+                min_confidence=float(settings.get('min_confidence', DEFAULT_MIN_CONFIDENCE))
+            )
+        return _shared_fast_path
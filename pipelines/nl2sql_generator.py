@@ -5,16 +5,37 @@ RAG-based Natural Language to SQL Generator (Pattern II)
 
 import os
 import pandas as pd
-import google.generativeai as genai
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import json
 import re
+import time
+from pathlib import Path
 
-from config.config_loader import get_config
+from core.disease_code_tree import CohortEstimate, get_disease_code_tree
+from core.disease_matcher import get_disease_matcher
+from core.drug_resolver import DrugMatch, get_drug_resolver
+from core.reference_store import load_reference_frame
 from core.schema_loader import SchemaLoader
+from services.llm_gateway import PRIORITY_INTERACTIVE, get_llm_gateway
+from services.nl2sql_cache import generation_context_hash, get_nl2sql_cache
+from pipelines.fast_path_sql import get_fast_path_sql
 from prompts.loader import PromptLoader
 from utils.logger import setup_logger, log_nl2sql_generation
+from utils.parsers import StreamingJSONField
+
+
+# 스트리밍 중 SQL 진행 콜백: (지금까지의 SQL, SQL 필드 완성 여부)
+SQLProgressCallback = Callable[[str, bool], None]
+
+
+@dataclass
+class StreamMetrics:
+    """스트리밍 생성 시간 지표 (초, Gemini 호출 시작 기준)"""
+    time_to_first_token: Optional[float] = None
+    time_to_sql: Optional[float] = None       # JSON의 sql 필드가 완성된 시점
+    total_time: float = 0.0
+    chunks: int = 0
 
 
 @dataclass
@@ -26,6 +47,10 @@ class SQLGenerationResult:
     error_message: Optional[str] = None
     referenced_tables: List[str] = None
     relevant_examples: List[str] = None
+    cohort_estimates: List[CohortEstimate] = None  # 질병 코드 패턴별 코호트 규모 추정
+    cache_hit: Optional[str] = None  # NL2SQL 캐시 적중 단계 ('exact' | 'semantic'), 미적중이면 None
+    fast_path: Optional[str] = None  # LLM 없이 사용한 템플릿 이름, LLM 생성이면 None
+    stream_metrics: Optional[StreamMetrics] = None  # 스트리밍 생성 시에만
 
 
 class NL2SQLGenerator:
@@ -33,7 +58,7 @@ class NL2SQLGenerator:
 
     def __init__(self, enable_logging: bool = True):
         """초기화"""
-        self.gemini_model = self._initialize_gemini()
+        self.llm = get_llm_gateway()
 
         # === RAG Enhancement: Unified SchemaLoader ===
         self.schema_loader = SchemaLoader()
@@ -53,16 +78,9 @@ class NL2SQLGenerator:
         print(f"  - 참조 데이터: {len(self.reference_data)} categories")
         print(f"  - 예시 쿼리: {len(self.example_queries)}개")
         print(f"  - Prompt: External templates (optimized)")
+        print(f"  - LLM: {self.llm.model_name} (LLM gateway)")
         print(f"  - Logging: {'Enabled' if enable_logging else 'Disabled'}")
 
-    def _initialize_gemini(self):
-        """Gemini API 초기화 (centralized config)"""
-        config = get_config()
-        api_key = config.get_gemini_api_key()
-
-        genai.configure(api_key=api_key)
-        return genai.GenerativeModel('gemini-2.0-flash-exp')
-
     # Removed: _load_notion_columns() - now using SchemaLoader
 
     def _load_reference_data(self) -> Dict[str, pd.DataFrame]:
@@ -79,9 +97,8 @@ class NL2SQLGenerator:
         for key, filename in files.items():
             filepath = os.path.join(reference_dir, filename)
             if os.path.exists(filepath):
-                # RAG 개선: 전체 데이터 로드 (질병 코드 매핑용)
-                df = pd.read_csv(filepath)
-                ref_data[key] = df
+                # 컬럼형 사본(reference_data/.arrow)이 있으면 메모리 매핑 - 세션 간 페이지 공유
+                ref_data[key] = load_reference_frame(filepath)
 
         return ref_data
 
@@ -288,56 +305,75 @@ WHERE deleted = FALSE
         RAG: 쿼리에서 질병명을 찾아 해당하는 질병 코드 반환
 
         Returns:
-            List[Dict]: [{'disease_name': '고혈압', 'disease_code': 'AI109', 'pattern': 'AI1%'}, ...]
+            List[Dict]: [{'disease_name': '고혈압', 'disease_code': 'AI109', 'pattern': 'AI1%', 'keyword': '고혈압'}, ...]
+            (질의에 나온 순서, 언급별 환자 수 상위 3개, pattern은 언급 후보 코드를 덮는 가장 좁은 접두사)
         """
-        disease_matches = []
-        diseases_df = self.reference_data.get('diseases', pd.DataFrame())
-
-        if diseases_df.empty:
-            return disease_matches
-
-        # 주요 질병 키워드 매핑 (부분 매칭용)
-        disease_keywords = {
-            '고혈압': ['고혈압'],
-            '당뇨': ['당뇨', '당뇨병'],
-            '암': ['암'],
-            '위염': ['위염'],
-            '감기': ['감기', '독감'],
-            '조현병': ['조현병'],
-            '비만': ['비만'],
-            '폐렴': ['폐렴'],
-            '천식': ['천식'],
-            '우울': ['우울증', '우울'],
-            '치매': ['치매', '알츠하이머'],
-            '파킨슨': ['파킨슨'],
-            '간염': ['간염', '간경화'],
-            '신부전': ['신부전'],
-            '심부전': ['심부전'],
-        }
-
-        # 쿼리에서 질병 키워드 감지
-        for disease_key, keywords in disease_keywords.items():
-            for keyword in keywords:
-                if keyword in query:
-                    # 해당 질병명이 포함된 질병 코드 찾기
-                    matching_diseases = diseases_df[
-                        diseases_df['name'].str.contains(keyword, na=False, case=False)
-                    ].head(3)  # 상위 3개만
-
-                    for _, row in matching_diseases.iterrows():
-                        code = row['code']
-                        if code and code != '$':
-                            # 코드 패턴 생성 (예: AI109 → AI1%)
-                            pattern = code[:3] + '%' if len(code) >= 3 else code + '%'
-                            disease_matches.append({
-                                'disease_name': row['name'],
-                                'disease_code': code,
-                                'pattern': pattern,
-                                'keyword': keyword
-                            })
-                    break  # 첫 번째 매칭 키워드만 사용
-
-        return disease_matches
+        # 전체 질병명 사전(Aho–Corasick)으로 질의를 한 번 훑어 모든 질병 언급 검색 (프로세스 공용)
+        matcher = get_disease_matcher(os.path.join("reference_data", "unique_diseases.csv"))
+        if matcher is None:
+            return []
+
+        tree = get_disease_code_tree(os.path.join("reference_data", "unique_disease_codes.csv"))
+        return matcher.find_disease_codes(query, per_mention=3, code_tree=tree)
+
+    def _estimate_cohorts(self, disease_codes: List[Dict]) -> List[CohortEstimate]:
+        """질병 코드 힌트의 LIKE 패턴별 코호트 규모 (질병 코드 접두사 트리, 패턴 중복 제거)"""
+        tree = get_disease_code_tree(os.path.join("reference_data", "unique_disease_codes.csv"))
+        if tree is None:
+            return []
+
+        patterns = dict.fromkeys(dc['pattern'] for dc in disease_codes)
+        return [tree.estimate(pattern) for pattern in patterns]
+
+    def _format_disease_hints(self, disease_codes: List[Dict], limit: int = 3) -> str:
+        """질병 코드 힌트 → 프롬프트 텍스트 (패턴 limit개, 패턴별 예상 코호트 규모 포함)"""
+        # 같은 언급의 후보가 한 패턴으로 덮이면 한 줄로 (예시 질병만 나열)
+        groups: Dict[Tuple[str, str], List[Dict]] = {}
+        for dc in disease_codes:
+            groups.setdefault((dc['keyword'], dc['pattern']), []).append(dc)
+        groups = dict(list(groups.items())[:limit])
+        estimates = {e.pattern: e for e in self._estimate_cohorts([{'pattern': p} for _, p in groups])}
+
+        hints = []
+        for (keyword, pattern), group in groups.items():
+            examples = ", ".join(f"{dc['disease_name']} 코드: {dc['disease_code']}" for dc in group)
+            hint = f"- '{keyword}' → `res_disease_code LIKE '{pattern}'` (예: {examples})"
+            estimate = estimates.get(pattern)
+            if estimate is not None and estimate.code_count:
+                hint += f"\n  - 예상 규모: {estimate.describe()}"
+                if estimate.is_large:
+                    hint += " ⚠️ 대형 코호트 - 더 구체적인 코드나 기간/지역 조건으로 범위를 좁히는 것을 고려하세요"
+            hints.append(hint)
+
+        disease_hints = "\n".join(hints)
+        disease_hints += "\n\n**중요**: 위 질병 코드를 반드시 사용하세요!"
+        return disease_hints
+
+    def _find_drug_mentions(self, query: str) -> List[DrugMatch]:
+        """RAG: 쿼리에서 약품명/성분명을 찾아 표준 성분과 필터 후보 반환 (프로세스 공용 사전)"""
+        resolver = get_drug_resolver("reference_data")
+        if resolver is None:
+            return []
+
+        return resolver.resolve(query)
+
+    def _format_drug_hints(self, drug_matches: List[DrugMatch]) -> str:
+        """약품/성분 힌트 → 프롬프트 텍스트"""
+        hints = []
+        for match in drug_matches:
+            entry = match.entry
+            hint = f"- '{match.mention}' → 성분 `{entry.ingredient}`: `{entry.ingredient_filter}`"
+            if entry.drug_name_filter:
+                hint += f" / 상품명: `{entry.drug_name_filter}`"
+            if entry.drug_names:
+                hint += f" (예: {entry.drug_names[0]})"
+            if match.similarity < 1.0:
+                hint += f" - 유사 상품명 '{entry.keyword}'로 추정"
+            hints.append(hint)
+
+        drug_hints = "\n".join(hints)
+        drug_hints += "\n\n**참고**: 성분 필터(res_ingredients)는 같은 성분의 다른 상품도 포함합니다. 특정 상품만 원하면 상품명 필터를 사용하세요."
+        return drug_hints
 
     # Removed: _search_relevant_schema() - now delegating to SchemaLoader
 
@@ -393,8 +429,29 @@ WHERE deleted = FALSE
         scored_examples.sort(key=lambda x: x[0], reverse=True)
         return [ex for score, ex in scored_examples[:3]]
 
-    def _create_llm_prompt(self, query: str, schema_context: str, examples: List[Dict], disease_hints: str = "") -> str:
-        """LLM 프롬프트 생성 (PromptLoader 사용 + 질병 코드 힌트)"""
+    def _generation_context(self) -> str:
+        """NL2SQL 캐시 키 접두사 - 프롬프트 템플릿 / 스키마 CSV / 질병·약품 참조 데이터 / 모델이 바뀌면 달라짐"""
+        return generation_context_hash(
+            input_paths=[
+                Path("prompts") / "nl2sql",
+                Path("prompts") / "shared",
+                self.schema_loader.schema_path,
+                Path("reference_data") / "unique_diseases.csv",
+                Path("reference_data") / "unique_disease_codes.csv",
+                Path("reference_data") / "unique_drugs.csv",
+            ],
+            model=self.llm.model_name
+        )
+
+    def _create_llm_prompt(
+        self,
+        query: str,
+        schema_context: str,
+        examples: List[Dict],
+        disease_hints: str = "",
+        drug_hints: str = ""
+    ) -> str:
+        """LLM 프롬프트 생성 (PromptLoader 사용 + 질병 코드 / 약품 힌트)"""
         base_prompt = self.prompt_loader.load_nl2sql_prompt(
             user_query=query,
             schema_context=schema_context,
@@ -405,19 +462,110 @@ WHERE deleted = FALSE
         if disease_hints:
             base_prompt += f"\n\n## 🎯 질병 코드 힌트 (RAG 자동 검색 결과)\n\n{disease_hints}"
 
+        if drug_hints:
+            base_prompt += f"\n\n## 💊 약품/성분 힌트 (RAG 자동 검색 결과)\n\n{drug_hints}"
+
         return base_prompt
 
-    def generate_sql(self, user_query: str) -> SQLGenerationResult:
+    def _call_llm(
+        self,
+        prompt: str,
+        on_sql_progress: Optional[SQLProgressCallback] = None
+    ) -> Tuple[str, Optional[StreamMetrics]]:
+        """
+        Gemini 호출 - 콜백이 있으면 스트리밍하며 sql 필드를 완성되는 대로 전달
+
+        Returns:
+            (전체 응답 텍스트, 스트리밍 시간 지표 또는 None)
+        """
+        if on_sql_progress is None:
+            response = self.llm.generate(prompt, priority=PRIORITY_INTERACTIVE, caller="nl2sql")
+            return response.text.strip(), None
+
+        metrics = StreamMetrics()
+        sql_field = StreamingJSONField('sql')
+        chunks: List[str] = []
+        last_sql = None
+        started_at = time.perf_counter()
+        for text in self.llm.stream(prompt, priority=PRIORITY_INTERACTIVE, caller="nl2sql"):
+            if metrics.time_to_first_token is None:
+                metrics.time_to_first_token = time.perf_counter() - started_at
+            chunks.append(text)
+            was_complete = sql_field.complete
+            partial_sql = sql_field.feed(text)
+            if sql_field.complete and not was_complete:
+                metrics.time_to_sql = time.perf_counter() - started_at
+                on_sql_progress(partial_sql, True)
+            elif not sql_field.complete and partial_sql is not None and partial_sql != last_sql:
+                on_sql_progress(partial_sql, False)
+            last_sql = partial_sql
+        metrics.total_time = time.perf_counter() - started_at
+        metrics.chunks = len(chunks)
+
+        if self.logger:
+            ttft = f"{metrics.time_to_first_token:.2f}s" if metrics.time_to_first_token is not None else "N/A"
+            tts = f"{metrics.time_to_sql:.2f}s" if metrics.time_to_sql is not None else "N/A"
+            self.logger.info(
+                f"NL2SQL Stream | TTFT: {ttft} | Time-to-SQL: {tts} | "
+                f"Total: {metrics.total_time:.2f}s | Chunks: {metrics.chunks}"
+            )
+        return ''.join(chunks).strip(), metrics
+
+    def generate_sql(self, user_query: str, on_sql_progress: Optional[SQLProgressCallback] = None) -> SQLGenerationResult:
         """
         자연어 → SQL 변환 (RAG Pattern)
 
         Args:
             user_query: 사용자 자연어 요청
+            on_sql_progress: 지정 시 Gemini 응답을 스트리밍하며 (부분 SQL, 완성 여부)로 호출
 
         Returns:
             SQLGenerationResult
         """
         try:
+            # 0. === Fast-path: 자주 나오는 형태(성별 분포, TOP-N 약물, 연령대, 기간별 환자 수)는 템플릿으로 즉시 생성 ===
+            fast_path = get_fast_path_sql()
+            templated = fast_path.synthesize(user_query) if fast_path else None
+            if templated:
+                print(f"⚡ 템플릿 SQL ({templated.template}, 신뢰도 {templated.intent.confidence:.2f}, {templated.elapsed_ms:.1f}ms)")
+                disease_patterns = templated.intent.disease_patterns
+                if self.logger:
+                    log_nl2sql_generation(
+                        self.logger,
+                        user_query=user_query,
+                        success=True,
+                        rag_detected=bool(disease_patterns),
+                        disease_codes=disease_patterns
+                    )
+                return SQLGenerationResult(
+                    success=True,
+                    sql_query=templated.sql_query,
+                    analysis=templated.analysis,
+                    referenced_tables=templated.referenced_tables,
+                    relevant_examples=[],
+                    cohort_estimates=self._estimate_cohorts([{'pattern': pattern} for pattern in disease_patterns]),
+                    fast_path=templated.template
+                )
+
+            # 0-1. === NL2SQL 캐시: 같은/거의 같은 질문이면 LLM 호출 생략 ===
+            started_at = time.time()
+            cache = get_nl2sql_cache()
+            cache_context = self._generation_context() if cache else ""
+            if cache:
+                hit = cache.get(user_query, cache_context)
+                if hit:
+                    payload, meta = hit
+                    print(f"⚡ NL2SQL 캐시 적중 ({meta['tier']}/{meta['storage']}, {meta['age']:.0f}s 전): {meta['query']}")
+                    return SQLGenerationResult(
+                        success=True,
+                        sql_query=payload['sql_query'],
+                        analysis=payload['analysis'],
+                        referenced_tables=payload['referenced_tables'],
+                        relevant_examples=payload['relevant_examples'],
+                        cohort_estimates=self._estimate_cohorts(self._find_disease_codes(user_query)),
+                        cache_hit=meta['tier']
+                    )
+
             # 1. 키워드 추출
             keywords = self._extract_keywords(user_query)
             print(f"📌 추출된 키워드: {keywords}")
@@ -425,18 +573,18 @@ WHERE deleted = FALSE
             # 2. === RAG Enhancement: 질병 코드 자동 검색 ===
             disease_codes = self._find_disease_codes(user_query)
             disease_hints = ""
+            cohort_estimates = self._estimate_cohorts(disease_codes)
             if disease_codes:
                 print(f"🔍 RAG 질병 코드 발견: {len(disease_codes)}개")
-                hints = []
-                for dc in disease_codes[:3]:  # 최대 3개만
-                    hints.append(
-                        f"- '{dc['keyword']}' → `res_disease_code LIKE '{dc['pattern']}'` "
-                        f"(예: {dc['disease_name']} 코드: {dc['disease_code']})"
-                    )
-                disease_hints = "\n".join(hints)
-                disease_hints += "\n\n**중요**: 위 질병 코드를 반드시 사용하세요!"
+                disease_hints = self._format_disease_hints(disease_codes)
                 print(f"💡 질병 코드 힌트:\n{disease_hints}")
 
+            drug_matches = self._find_drug_mentions(user_query)
+            drug_hints = ""
+            if drug_matches:
+                drug_hints = self._format_drug_hints(drug_matches)
+                print(f"💊 약품/성분 힌트:\n{drug_hints}")
+
             # 3. === RAG Enhancement: Use unified SchemaLoader ===
             relevant_schema = self.schema_loader.get_relevant_schema(
                 query=user_query,
@@ -454,11 +602,10 @@ WHERE deleted = FALSE
             print(f"📚 선택된 예시: {len(examples)}개")
 
             # 6. LLM 프롬프트 생성 (질병 코드 힌트 포함)
-            prompt = self._create_llm_prompt(user_query, schema_context, examples, disease_hints)
+            prompt = self._create_llm_prompt(user_query, schema_context, examples, disease_hints, drug_hints)
 
-            # 7. Gemini API 호출
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text.strip()
+            # 7. Gemini API 호출 (콜백이 있으면 스트리밍)
+            response_text, stream_metrics = self._call_llm(prompt, on_sql_progress)
 
             # 8. JSON 파싱
             if '```json' in response_text:
@@ -478,13 +625,23 @@ WHERE deleted = FALSE
                     disease_codes=[dc['pattern'] for dc in disease_codes] if disease_codes else []
                 )
 
-            return SQLGenerationResult(
+            generated = SQLGenerationResult(
                 success=True,
                 sql_query=result.get('sql', ''),
                 analysis=result.get('analysis', {}),
                 referenced_tables=result.get('analysis', {}).get('required_tables', []),
-                relevant_examples=[ex['question'] for ex in examples]
+                relevant_examples=[ex['question'] for ex in examples],
+                cohort_estimates=cohort_estimates,
+                stream_metrics=stream_metrics
             )
+            if cache and generated.sql_query:
+                cache.put(user_query, cache_context, {
+                    'sql_query': generated.sql_query,
+                    'analysis': generated.analysis,
+                    'referenced_tables': generated.referenced_tables,
+                    'relevant_examples': generated.relevant_examples,
+                }, generation_time=time.time() - started_at)
+            return generated
 
         except json.JSONDecodeError as e:
             error_msg = f"JSON 파싱 실패: LLM 응답 형식이 올바르지 않습니다. {str(e)}"
@@ -523,7 +680,8 @@ WHERE deleted = FALSE
         self,
         original_query: str,
         current_sql: str,
-        refinement_request: str
+        refinement_request: str,
+        on_sql_progress: Optional[SQLProgressCallback] = None
     ) -> SQLGenerationResult:
         """
         기존 SQL을 사용자 피드백에 따라 개선
@@ -532,6 +690,7 @@ WHERE deleted = FALSE
             original_query: 원래 자연어 요청
             current_sql: 현재 생성된 SQL
             refinement_request: 사용자의 개선 요청 (예: "서울 지역만 필터링해주세요")
+            on_sql_progress: 지정 시 Gemini 응답을 스트리밍하며 (부분 SQL, 완성 여부)로 호출
 
         Returns:
             SQLGenerationResult: 개선된 SQL 결과
@@ -552,6 +711,12 @@ WHERE deleted = FALSE
                 print(f"  - 🎯 RAG 질병 코드 발견: {len(disease_codes)}개")
                 disease_hints = self._format_disease_hints(disease_codes)
 
+            drug_matches = self._find_drug_mentions(refinement_request)
+            drug_hints = ""
+            if drug_matches:
+                print(f"  - 💊 약품/성분 발견: {len(drug_matches)}개")
+                drug_hints = self._format_drug_hints(drug_matches)
+
             # 3. 관련 스키마 추출 (원래 요청 + 개선 요청 결합)
             combined_query = original_query + " " + refinement_request
             schema_context = self.schema_loader.get_relevant_schema(combined_query, top_k=15)
@@ -563,12 +728,12 @@ WHERE deleted = FALSE
                 current_sql=current_sql,
                 refinement_request=refinement_request,
                 schema_context=schema_context,
-                disease_hints=disease_hints
+                disease_hints=disease_hints,
+                drug_hints=drug_hints
             )
 
-            # 5. Gemini API 호출
-            response = self.gemini_model.generate_content(prompt)
-            response_text = response.text.strip()
+            # 5. Gemini API 호출 (콜백이 있으면 스트리밍)
+            response_text, stream_metrics = self._call_llm(prompt, on_sql_progress)
 
             # 6. JSON 파싱
             if '```json' in response_text:
@@ -594,7 +759,8 @@ WHERE deleted = FALSE
                 success=True,
                 sql_query=result.get('sql', ''),
                 analysis=result.get('analysis', {}),
-                referenced_tables=result.get('analysis', {}).get('required_tables', [])
+                referenced_tables=result.get('analysis', {}).get('required_tables', []),
+                stream_metrics=stream_metrics
             )
 
         except Exception as e:
@@ -615,11 +781,11 @@ WHERE deleted = FALSE
         current_sql: str,
         refinement_request: str,
         schema_context: pd.DataFrame,
-        disease_hints: str
+        disease_hints: str,
+        drug_hints: str = ""
     ) -> str:
         """SQL 개선용 프롬프트 생성"""
         # System prompt
-        from pathlib import Path
         system_prompt_path = Path("prompts") / "nl2sql" / "system.txt"
         with open(system_prompt_path, 'r', encoding='utf-8') as f:
             system_prompt = f.read()
@@ -662,13 +828,15 @@ WHERE deleted = FALSE
 
 {disease_hints}
 
+{drug_hints}
+
 ---
 
 ## 🎯 개선 지침
 
 1. **현재 SQL을 기반**으로 사용자의 개선 요청을 반영하세요
 2. **기존 로직은 유지**하되, 요청된 변경 사항만 적용하세요
-3. **질병 코드 힌트**가 제공된 경우 반드시 활용하세요
+3. **질병 코드 / 약품 힌트**가 제공된 경우 반드시 활용하세요
 4. **전체 SQL을 다시 생성**하세요 (부분 수정이 아님)
 
 응답 형식 (JSON):
@@ -0,0 +1,147 @@
+"""
+Stage Graph - 파이프라인 단계 의존성 그래프 실행기
+서로 독립적인 단계(LLM 호출, SQL 렌더링/실행 등)를 동시에 실행하고 단계별 타임라인을 기록
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class StageTiming:
+    """단계별 실행 기록 (시간은 그래프 시작 기준 초)"""
+    name: str
+    depends_on: List[str]
+    status: str = 'pending'  # pending | succeeded | failed | skipped
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    duration: Optional[float] = None
+    thread: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+
+class StageGraph:
+    """
+    의존성 그래프 기반 단계 실행기
+
+    각 단계는 선행 단계가 모두 끝나는 즉시 시작되며, 선행 단계 결과 dict를 인자로 받음.
+    선행 단계가 실패하면 후속 단계는 건너뛰고(skipped), 실행이 끝난 뒤 첫 예외를 다시 발생시킴.
+
+    사용 예:
+        graph = StageGraph()
+        graph.add("core", lambda r: render_core())
+        graph.add("recommend", lambda r: call_llm())
+        graph.add("approved", lambda r: render(r["recommend"]), depends_on=["recommend"])
+        results = graph.run()
+        graph.timeline  # [StageTiming, ...]
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages: Dict[str, _Stage] = {}
+        self.timeline: List[StageTiming] = []
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None
+    ) -> "StageGraph":
+        """단계 추가 (선행 단계는 먼저 add되어 있어야 함)"""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        deps = tuple(depends_on or ())
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self._stages[name] = _Stage(name=name, fn=fn, depends_on=deps)
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """
+        모든 단계를 의존성 순서대로 (가능한 한 동시에) 실행
+
+        Returns:
+            {단계명: 반환값}
+        """
+        started = time.time()
+        results: Dict[str, Any] = {}
+        timings = {
+            name: StageTiming(name=name, depends_on=list(stage.depends_on))
+            for name, stage in self._stages.items()
+        }
+        self.timeline = list(timings.values())
+        lock = threading.Lock()
+        first_error: Optional[BaseException] = None
+
+        def execute(stage: _Stage) -> Any:
+            timing = timings[stage.name]
+            timing.started_at = round(time.time() - started, 3)
+            timing.thread = threading.current_thread().name
+            with lock:
+                inputs = {dep: results[dep] for dep in stage.depends_on}
+            try:
+                return stage.fn(inputs)
+            finally:
+                timing.finished_at = round(time.time() - started, 3)
+                timing.duration = round(timing.finished_at - timing.started_at, 3)
+
+        remaining = dict(self._stages)
+        running: Dict[Future, _Stage] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while remaining or running:
+                # 선행 단계가 모두 끝난 단계 시작 / 선행 단계가 실패한 단계는 건너뜀
+                for name, stage in list(remaining.items()):
+                    dep_status = [timings[d].status for d in stage.depends_on]
+                    if any(s in ('failed', 'skipped') for s in dep_status):
+                        timings[name].status = 'skipped'
+                        del remaining[name]
+                    elif all(s == 'succeeded' for s in dep_status):
+                        running[executor.submit(execute, stage)] = stage
+                        del remaining[name]
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        timings[stage.name].status = 'failed'
+                        timings[stage.name].error = str(e)
+                        if first_error is None:
+                            first_error = e
+                    else:
+                        with lock:
+                            results[stage.name] = value
+                        timings[stage.name].status = 'succeeded'
+
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def format_timeline(self) -> str:
+        """타임라인을 사람이 읽기 쉬운 문자열로 (로그/콘솔 출력용)"""
+        lines = []
+        for timing in sorted(self.timeline, key=lambda t: (t.started_at is None, t.started_at or 0)):
+            if timing.started_at is None:
+                lines.append(f"   - {timing.name}: {timing.status}")
+            else:
+                lines.append(
+                    f"   - {timing.name}: {timing.started_at:.2f}s → {timing.finished_at:.2f}s "
+                    f"({timing.duration:.2f}s, {timing.status})"
+                )
+        return "\n".join(lines)
@@ -8,7 +8,7 @@ WITH filtered_treatments AS (
         bt.res_hospital_code,
         CAST(REGEXP_REPLACE(bt.res_total_amount, '[^0-9]', '') AS DECIMAL) as treatment_cost,
         bt.created_at
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%' -- 파라미터 1
         AND bt.res_treat_start_date >= DATE '{{ start_date }}'   -- 파라미터 2 (통일: res_treat_start_date)
         AND bt.res_treat_start_date < DATE '{{ end_date }}'      -- 파라미터 3 (통일: res_treat_start_date)
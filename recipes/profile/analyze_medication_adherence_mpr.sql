@@ -6,7 +6,7 @@ WITH target_patients AS (
     SELECT DISTINCT
         bt.user_id,
         MIN(TO_DATE(bt.created_at)) as first_diagnosis_date
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%'
         AND bt.res_treat_start_date >= '{{ start_date }}'
         AND bt.res_treat_start_date <= '{{ end_date }}'
@@ -12,7 +12,7 @@ SELECT
         THEN CAST(REGEXP_REPLACE(bt.res_total_amount, '[^0-9]', '') AS DECIMAL)
         ELSE NULL
     END), 0) as avg_cost_per_treatment
-FROM basic_treatment bt
+FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
 WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%'
     AND bt.res_treat_start_date >= '{{ start_date }}'
     AND bt.res_treat_start_date <= '{{ end_date }}'
@@ -16,7 +16,7 @@ WITH recruitment_feasibility AS (
                 ELSE NULL
             END) BETWEEN {{ min_age }} AND {{ max_age }} AND visit_counts.total_visits >= {{ min_visits }} THEN bt.user_id END) as qualified_pool,
         {{ target_enrollment }} as target_enrollment
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     JOIN user u ON bt.user_id = u.id
     JOIN (
         SELECT user_id, COUNT(*) as total_visits
@@ -6,7 +6,7 @@ WITH screened_patients AS (
     SELECT DISTINCT
         bt.user_id,
         ip.gender
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     LEFT JOIN insured_person ip ON bt.user_id = ip.user_id
     WHERE bt.deleted = FALSE
       AND bt.res_treat_start_date >= '{{ start_date }}'
@@ -9,7 +9,7 @@ WITH screened_patients AS (
         bt.res_hospital_name,
         h.sido_name,
         h.sigungu_name
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     LEFT JOIN insured_person ip ON bt.user_id = ip.user_id
     LEFT JOIN hospital h ON bt.res_hospital_code = h.hospital_code
     WHERE bt.deleted = FALSE
@@ -20,7 +20,7 @@ WITH patient_base AS (
                 END
             ELSE NULL
         END as age
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     JOIN user u ON bt.user_id = u.id
     WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%'
         AND bt.res_treat_start_date >= '{{ start_date }}'
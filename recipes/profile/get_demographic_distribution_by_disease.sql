@@ -14,7 +14,7 @@ WITH patient_demographics AS (
             ELSE 'UNKNOWN'
         END as standardized_gender,
         u.birthday
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     JOIN user u ON bt.user_id = u.id
     LEFT JOIN insured_person ip ON bt.user_id = ip.user_id
     WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%'
@@ -1,6 +1,6 @@
 WITH target_patients AS (
     SELECT DISTINCT bt.user_id
-    FROM basic_treatment bt
+    FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
     JOIN user u ON bt.user_id = u.id
     WHERE bt.res_disease_name LIKE '%{{ disease_name_keyword }}%' -- 파라미터 1
         AND bt.res_treat_start_date >= '{{ start_date }}'     -- 파라미터 2 (통일: res_treat_start_date)
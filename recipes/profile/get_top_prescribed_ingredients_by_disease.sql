@@ -4,7 +4,7 @@
 SELECT
     pd.res_ingredients,
     COUNT(*) AS prescription_count
-FROM basic_treatment bt
+FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt
 JOIN prescribed_drug pd
     ON bt.user_id = pd.user_id
     AND bt.res_treat_start_date = pd.res_treat_start_date
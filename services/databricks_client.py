@@ -5,23 +5,412 @@ Production-ready singleton client with context manager pattern
 
 from databricks import sql
 import pandas as pd
-from typing import Optional, Dict, Any
+import pyarrow as pa
+from typing import Optional, Dict, Any, Callable, Deque, List, Iterator, Union, BinaryIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+import asyncio
+import functools
 import logging
+import threading
 import time
 import os
+from pathlib import Path
 
 from utils.logger import setup_logger, log_sql_execution
 from config.config_loader import get_config, ConfigurationError
+from core.exceptions import QueryExecutionError
+from services.query_cache import QueryResultCache, get_query_cache, make_cache_key
 
 logger = setup_logger("databricks_client")
 
 
+# Arrow → pandas dtype 매핑 방식
+#   numpy:    pandas 기본 dtype (int64/float64/object) - 기존 동작과 동일
+#   nullable: pandas nullable dtype (Int64/boolean/string) - 정수 컬럼에 NULL이 있어도 float로 바뀌지 않음
+#   pyarrow:  pd.ArrowDtype - Arrow 버퍼를 그대로 사용 (복사/변환 최소화)
+DTYPE_BACKENDS = ('numpy', 'nullable', 'pyarrow')
+
+_NULLABLE_DTYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.uint8(): pd.UInt8Dtype(),
+    pa.uint16(): pd.UInt16Dtype(),
+    pa.uint32(): pd.UInt32Dtype(),
+    pa.uint64(): pd.UInt64Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.float32(): pd.Float32Dtype(),
+    pa.float64(): pd.Float64Dtype(),
+    pa.string(): pd.StringDtype(),
+    pa.large_string(): pd.StringDtype(),
+}
+
+
+def arrow_to_pandas(table: pa.Table, dtype_backend: str = 'numpy') -> pd.DataFrame:
+    """
+    Arrow Table을 한 번에 pandas DataFrame으로 변환
+
+    Args:
+        table: pyarrow.Table
+        dtype_backend: 'numpy' | 'nullable' | 'pyarrow' (DTYPE_BACKENDS 참고)
+
+    Returns:
+        pd.DataFrame
+    """
+    if dtype_backend == 'numpy':
+        return table.to_pandas()
+    if dtype_backend == 'nullable':
+        return table.to_pandas(types_mapper=_NULLABLE_DTYPES.get)
+    if dtype_backend == 'pyarrow':
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    raise ValueError(f"Unknown dtype_backend: {dtype_backend} (expected one of {DTYPE_BACKENDS})")
+
+
+@dataclass
+class QueryBatch:
+    """execute_query_stream()이 반환하는 결과 배치"""
+    data: Union[pd.DataFrame, pa.Table]  # 이번 배치 데이터
+    batch_index: int  # 0부터 시작
+    row_count: int  # 이번 배치 행 수
+    total_rows: int  # 지금까지 누적 행 수
+    time_to_first_batch: float  # 쿼리 시작 ~ 첫 배치 수신 (초)
+    elapsed: float  # 쿼리 시작 ~ 이번 배치 수신 (초)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available within checkout_timeout"""
+    pass
+
+
+@dataclass
+class PoolMetrics:
+    """커넥션 풀 누적 지표"""
+    checkouts: int = 0  # 총 체크아웃 횟수
+    waits: int = 0  # 풀이 가득 차 대기한 체크아웃 수
+    wait_time: float = 0.0  # 누적 대기 시간 (초)
+    creations: int = 0  # 새로 연 연결 수
+    evictions: int = 0  # 유휴 시간 초과로 닫은 연결 수
+    health_checks: int = 0  # SELECT 1 헬스체크 횟수
+    health_check_failures: int = 0  # 헬스체크 실패 (연결 교체) 횟수
+    discards: int = 0  # 오류로 폐기한 연결 수
+
+
+@dataclass
+class _PooledConnection:
+    """풀에서 관리되는 연결 + 마지막 사용 시각"""
+    connection: Any
+    last_used: float
+    needs_check: bool = False
+
+
+class ConnectionPool:
+    """
+    스레드 안전한 유한 크기 커넥션 풀
+
+    - max_size: 동시에 열 수 있는 최대 연결 수 (초과 시 대기)
+    - min_size: 유휴 정리 시에도 유지하는 최소 연결 수
+    - idle_timeout: 이 시간 이상 유휴 상태인 연결은 닫음 (min_size 초과분만)
+    - health_check_interval: 이 시간 이상 유휴였던 연결은 체크아웃 시 SELECT 1 검사
+
+    사용 예:
+        pool = ConnectionPool(connect=lambda: sql.connect(...), max_size=8)
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 8,
+        idle_timeout: float = 600.0,
+        health_check_interval: float = 60.0,
+        checkout_timeout: float = 120.0
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: Deque[_PooledConnection] = deque()
+        self._size = 0  # 열린 연결 수 (유휴 + 사용 중)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.metrics = PoolMetrics()
+
+    def acquire(self) -> _PooledConnection:
+        """연결 체크아웃 (유휴 연결 우선, 없으면 생성, 가득 차면 대기)"""
+        deadline = time.monotonic() + self.checkout_timeout
+        wait_started = None
+
+        with self._cond:
+            stale = self._evict_idle_locked()
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                if self._idle:
+                    entry = self._idle.pop()  # LIFO: 가장 최근에 쓴 (warm) 연결
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    entry = None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No connection available within {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self.metrics.waits += 1
+                self._cond.wait(remaining)
+
+            self.metrics.checkouts += 1
+            if wait_started is not None:
+                self.metrics.wait_time += time.monotonic() - wait_started
+
+        self._close_all(stale)
+
+        # 네트워크 작업(연결 생성/헬스체크)은 락 밖에서 수행
+        if entry is None:
+            try:
+                return _PooledConnection(self._create(), time.monotonic())
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        idle_for = time.monotonic() - entry.last_used
+        if entry.needs_check or idle_for >= self.health_check_interval:
+            if not self._is_healthy(entry.connection):
+                self._close_all([entry])
+                try:
+                    entry.connection = self._create()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            entry.needs_check = False
+
+        return entry
+
+    def release(self, entry: _PooledConnection, broken: bool = False) -> None:
+        """
+        연결 반납
+
+        Args:
+            entry: acquire()로 받은 연결
+            broken: True면 연결을 닫고 풀에서 제거
+        """
+        with self._cond:
+            if broken or self._closed:
+                self._size -= 1
+                self.metrics.discards += int(broken)
+                self._cond.notify()
+                to_close = [entry]
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+                self._cond.notify()
+                to_close = self._evict_idle_locked()
+
+        self._close_all(to_close)
+
+    @contextmanager
+    def connection(self):
+        """
+        연결 컨텍스트 매니저
+
+        블록 안에서 예외가 발생하면 연결을 닫지 않고 다음 체크아웃 시
+        헬스체크하도록 표시 (SQL 오류로 매번 재연결하지 않기 위함)
+        """
+        entry = self.acquire()
+        try:
+            yield entry.connection
+        except Exception:
+            entry.needs_check = True
+            raise
+        finally:
+            # 스트리밍 제너레이터가 중간에 닫혀도(GeneratorExit) 반드시 반납
+            self.release(entry)
+
+    def warm_up(self) -> None:
+        """min_size만큼 연결을 미리 열어둠"""
+        entries = []
+        try:
+            # 유휴 연결을 먼저 꺼내고 부족한 만큼만 새로 생성됨
+            for _ in range(self.min_size):
+                entries.append(self.acquire())
+        finally:
+            for entry in entries:
+                self.release(entry)
+
+    def close(self) -> None:
+        """풀을 닫고 모든 유휴 연결 종료 (사용 중인 연결은 반납 시 종료)"""
+        with self._cond:
+            self._closed = True
+            to_close = list(self._idle)
+            self._size -= len(to_close)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(to_close)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """풀 지표 스냅샷"""
+        with self._cond:
+            metrics = asdict(self.metrics)
+            metrics.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        metrics['wait_time'] = round(metrics['wait_time'], 3)
+        return metrics
+
+    def _create(self) -> Any:
+        connection = self._connect()
+        with self._cond:
+            self.metrics.creations += 1
+        return connection
+
+    def _is_healthy(self, connection: Any) -> bool:
+        with self._cond:
+            self.metrics.health_checks += 1
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check, reconnecting: {e}")
+            with self._cond:
+                self.metrics.health_check_failures += 1
+            return False
+
+    def _evict_idle_locked(self) -> List[_PooledConnection]:
+        """idle_timeout을 넘긴 유휴 연결 제거 (락 보유 상태에서 호출)"""
+        now = time.monotonic()
+        evicted = []
+        # deque 왼쪽이 가장 오래 유휴 상태인 연결
+        while (
+            self._idle
+            and self._size > self.min_size
+            and now - self._idle[0].last_used >= self.idle_timeout
+        ):
+            evicted.append(self._idle.popleft())
+            self._size -= 1
+            self.metrics.evictions += 1
+        return evicted
+
+    @staticmethod
+    def _close_all(entries: List[_PooledConnection]) -> None:
+        for entry in entries:
+            try:
+                entry.connection.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection: {e}")
+
+
+class _Flight:
+    """진행 중인 실행 1건 (대기자들이 결과를 공유)"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    동일 키 요청 합치기 (single-flight)
+
+    같은 키로 동시에 들어온 호출 중 첫 호출(leader)만 fn을 실행하고,
+    나머지는 완료를 기다렸다가 같은 결과 객체(또는 같은 예외)를 받음.
+
+    사용 예:
+        flight = SingleFlight()
+        table, coalesced = flight.do(key, lambda: run_query(sql))
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self.calls = 0  # 총 요청 수
+        self.executions = 0  # 실제 실행 수
+        self.coalesced = 0  # 다른 실행에 합쳐진 요청 수
+
+    def do(self, key: str, fn: Callable[[], Any]) -> "tuple[Any, bool]":
+        """
+        Returns:
+            (결과, coalesced 여부)
+        """
+        with self._lock:
+            self.calls += 1
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                is_leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.executions += 1
+                is_leader = True
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+        return flight.result, False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """합치기 지표 (coalescing_ratio = 합쳐진 요청 / 전체 요청)"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._inflight),
+                'coalescing_ratio': round(self.coalesced / self.calls, 3) if self.calls else 0.0,
+            }
+
+
 class DatabricksClient:
     """
     Databricks SQL Warehouse 연결 및 쿼리 실행 클라이언트
 
-    싱글톤 패턴으로 구현하여 연결 재사용
+    싱글톤 패턴 + 커넥션 풀로 구현하여 세션(TLS/인증) 재사용
     """
 
     _instance = None
@@ -40,157 +429,316 @@ class DatabricksClient:
         # Use centralized config loader
         try:
             config = get_config()
-            databricks_config = config.get_databricks_config()
 
-            self.server_hostname = databricks_config['server_hostname']
-            self.http_path = databricks_config['http_path']
-            self.access_token = databricks_config['access_token']
+            # 실행기 선택 (config.yaml -> databricks.executor: databricks | local)
+            executor = config.get('databricks.executor', 'databricks')
+            if executor == 'local':
+                connect = self._create_local_connection_factory(config)
+                data_dir = config.get('databricks.local.data_dir', 'data/local_warehouse')
+                cache_namespace = f"local:{Path(data_dir).resolve()}"
+            elif executor == 'databricks':
+                databricks_config = config.get_databricks_config()
+
+                self.server_hostname = databricks_config['server_hostname']
+                self.http_path = databricks_config['http_path']
+                self.access_token = databricks_config['access_token']
+                connect = self._create_connection
+                cache_namespace = f"databricks:{self.server_hostname}{self.http_path}"
+            else:
+                raise ConfigurationError(
+                    f"Unknown databricks.executor: {executor!r} (expected 'databricks' or 'local')"
+                )
 
-            self._initialized = True
+            # 커넥션 풀 (config.yaml -> databricks.pool.*)
+            pool = ConnectionPool(
+                connect=connect,
+                min_size=config.get('databricks.pool.min_size', 1),
+                max_size=config.get('databricks.pool.max_size', 8),
+                idle_timeout=config.get('databricks.pool.idle_timeout', 600),
+                health_check_interval=config.get('databricks.pool.health_check_interval', 60),
+                checkout_timeout=config.get('databricks.pool.checkout_timeout', 120)
+            )
+            self._setup(
+                pool=pool,
+                executor=executor,
+                dtype_backend=config.get('databricks.dtype_backend', 'numpy'),
+                # 결과 캐시 (config.yaml -> query_cache.*)
+                cache=get_query_cache() if config.get('query_cache.enabled', True) else None,
+                max_concurrency=config.get('databricks.max_concurrency', pool.max_size),
+                cache_namespace=cache_namespace
+            )
             logger.info("DatabricksClient initialized successfully")
         except ConfigurationError as e:
             logger.error(f"Failed to initialize DatabricksClient: {e}")
             raise
 
+    @classmethod
+    def from_pool(
+        cls,
+        pool: ConnectionPool,
+        executor: str = 'databricks',
+        dtype_backend: str = 'numpy',
+        cache: Optional[QueryResultCache] = None,
+        max_concurrency: Optional[int] = None,
+        cache_namespace: Optional[str] = None
+    ) -> "DatabricksClient":
+        """
+        주어진 커넥션 풀로 독립 인스턴스 생성 (싱글톤 / config.yaml 미사용 - 테스트, 도구용)
+
+        Args:
+            pool: 커넥션 풀 (connect 팩토리는 DB-API 커넥션 반환)
+            executor: 'databricks' | 'local'
+            dtype_backend: pandas 변환 dtype 매핑
+            cache: 결과 캐시 (None이면 캐시 미사용)
+            max_concurrency: 비동기 실행 스레드 수 (기본 pool.max_size)
+            cache_namespace: 결과 캐시 키 구분자 (기본 executor)
+        """
+        client = object.__new__(cls)
+        client._setup(
+            pool=pool,
+            executor=executor,
+            dtype_backend=dtype_backend,
+            cache=cache,
+            max_concurrency=max_concurrency or pool.max_size,
+            cache_namespace=cache_namespace or executor
+        )
+        return client
+
+    def _setup(
+        self,
+        pool: ConnectionPool,
+        executor: str,
+        dtype_backend: str,
+        cache: Optional[QueryResultCache],
+        max_concurrency: int,
+        cache_namespace: str
+    ) -> None:
+        """인스턴스 상태 초기화 (__init__ / from_pool 공용 - 필드는 여기에만 추가)"""
+        self.executor = executor
+        self.pool = pool
+        self.dtype_backend = dtype_backend
+        self.cache = cache
+        # 실행 대상(웨어하우스 / 로컬 data_dir)별로 캐시 키를 나눔 - 합성 데이터 결과가 실제 결과로 반환되지 않도록
+        self.cache_namespace = cache_namespace
+
+        # 동시 실행 중인 동일 쿼리 합치기 (Streamlit 세션 간 공유)
+        self.singleflight = SingleFlight()
+
+        # 비동기 실행용 스레드 풀 (커넥터는 블로킹 API이므로 executor에서 실행)
+        self.max_concurrency = max_concurrency
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._initialized = True
+
+    def _create_connection(self):
+        """새 Databricks SQL 연결 생성 (풀에서만 호출)"""
+        logger.debug("Opening new Databricks connection...")
+        return sql.connect(
+            server_hostname=self.server_hostname,
+            http_path=self.http_path,
+            access_token=self.access_token,
+            _retry_stop_after_attempts_count=3,  # 재시도 3회로 제한 (기본값: 24)
+            _socket_timeout=30,  # 30초 소켓 타임아웃
+            _tls_no_verify=os.environ.get('DATABRICKS_TLS_NO_VERIFY', 'false').lower() == 'true',
+            user_agent_entry="clinical_report_generator"
+        )
+
+    @staticmethod
+    def _create_local_connection_factory(config) -> Callable[[], Any]:
+        """
+        로컬 DuckDB 실행기의 커넥션 팩토리 생성
+
+        Spark SQL을 DuckDB로 변환해 로컬 Parquet 데이터에 실행 (services/local_executor.py).
+        """
+        try:
+            from services.local_executor import LocalWarehouse
+            warehouse = LocalWarehouse.get(
+                config.get('databricks.local.data_dir', 'data/local_warehouse'),
+                threads=config.get('databricks.local.threads')
+            )
+        except ImportError as e:
+            raise ConfigurationError(
+                f"Local executor requires duckdb and sqlglot: {e}\n"
+                "Install with: pip install duckdb sqlglot"
+            )
+        logger.info("Using local DuckDB executor")
+        return warehouse.connect
+
     @contextmanager
     def get_connection(self):
         """
-        연결 컨텍스트 매니저
+        연결 컨텍스트 매니저 (커넥션 풀에서 체크아웃 후 반납)
 
         사용 예:
             with client.get_connection() as conn:
-                df = client.execute_query(conn, "SELECT * FROM table")
+                cursor = conn.cursor()
         """
-        connection = None
         try:
-            connection = sql.connect(
-                server_hostname=self.server_hostname,
-                http_path=self.http_path,
-                access_token=self.access_token,
-                _retry_stop_after_attempts_count=3,  # 재시도 3회로 제한 (기본값: 24)
-                _socket_timeout=30,  # 30초 소켓 타임아웃
-                _tls_no_verify=os.environ.get('DATABRICKS_TLS_NO_VERIFY', 'false').lower() == 'true',
-                user_agent_entry="clinical_report_generator"
-            )
-            yield connection
+            with self.pool.connection() as connection:
+                yield connection
         except Exception as e:
             logger.error(f"Databricks connection failed: {e}")
             raise
-        finally:
-            if connection:
-                connection.close()
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """커넥션 풀 지표 (checkouts, waits, creations 등)"""
+        return self.pool.get_metrics()
+
+    def get_coalescing_metrics(self) -> Dict[str, Any]:
+        """동일 쿼리 합치기 지표 (calls, executions, coalesced, coalescing_ratio)"""
+        return self.singleflight.get_metrics()
+
+    def close(self) -> None:
+        """실행 스레드 풀 및 커넥션 풀 종료"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.pool.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """비동기 실행용 스레드 풀 (최초 사용 시 생성)"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="databricks-query"
+                )
+            return self._executor
+
+    def _run_query(self, sql_query: str, max_rows: int) -> pa.Table:
+        """웨어하우스에서 쿼리를 실행하고 최대 max_rows 행을 Arrow Table로 반환 (캐시 미사용)"""
+        logger.debug("Connecting to Databricks...")
+        with self.get_connection() as connection:
+            logger.debug("Connection established")
+            cursor = connection.cursor()
+
+            try:
+                # 쿼리 실행
+                logger.debug("Executing query...")
+                cursor.execute(sql_query)
+                logger.debug("Query executed, fetching results...")
+
+                # 결과 가져오기 (최대 max_rows, Arrow 포맷)
+                table = self._fetch_arrow(cursor, max_rows)
+                logger.debug(f"Fetched {table.num_rows} rows")
+                return table
+
+            finally:
+                cursor.close()
 
     def execute_query(
         self,
         sql_query: str,
-        max_rows: int = 10000
+        max_rows: int = 10000,
+        result_format: str = 'pandas',
+        dtype_backend: Optional[str] = None,
+        use_cache: bool = True,
+        cache_category: Optional[str] = None,
+        coalesce: bool = True
     ) -> Dict[str, Any]:
         """
         SQL 쿼리 실행 및 결과 반환
 
+        결과는 Arrow 배치로 가져온 뒤 한 번에 변환 (행 단위 Python 객체 생성 없음).
+        결과 캐시가 켜져 있으면 정규화된 SQL + max_rows가 같은 이전 결과를 재사용.
+        동일한 쿼리가 동시에 들어오면 웨어하우스 실행 1회를 공유 (single-flight).
+
         Args:
             sql_query: 실행할 SQL 쿼리
             max_rows: 최대 반환 행 수 (기본 10,000)
+            result_format: 'pandas' (DataFrame) 또는 'arrow' (pyarrow.Table)
+            dtype_backend: pandas 변환 시 dtype 매핑 ('numpy' | 'nullable' | 'pyarrow').
+                None이면 config.yaml -> databricks.dtype_backend (기본 'numpy')
+            use_cache: False면 캐시를 조회/저장하지 않고 항상 웨어하우스에서 실행
+            cache_category: TTL 선택용 카테고리 (예: 'pool', 'profile', 'nl2sql')
+            coalesce: False면 동시 실행 중인 동일 쿼리가 있어도 별도로 실행
 
         Returns:
             {
                 'success': bool,
-                'data': pd.DataFrame or None,
+                'data': pd.DataFrame / pyarrow.Table or None,
                 'row_count': int,
                 'execution_time': float (seconds),
-                'error_message': str or None
+                'error_message': str or None,
+                'cached': bool,  # 결과 캐시에서 반환됨
+                'coalesced': bool  # 동시 실행 중이던 동일 쿼리의 결과를 공유함
             }
         """
+        if result_format not in ('pandas', 'arrow'):
+            raise ValueError(f"result_format must be 'pandas' or 'arrow', got: {result_format}")
+
         start_time = time.time()
+        dtype_backend = dtype_backend or self.dtype_backend
+        cache = self.cache if use_cache else None
+        cache_variant = f"{self.cache_namespace}:max_rows={max_rows}"
 
         try:
-            logger.debug("Connecting to Databricks...")
-            with self.get_connection() as connection:
-                logger.debug("Connection established")
-                cursor = connection.cursor()
-
-                try:
-                    # 쿼리 실행
-                    logger.debug("Executing query...")
-                    cursor.execute(sql_query)
-                    logger.debug("Query executed, fetching results...")
-
-                    # 결과 가져오기 (최대 max_rows)
-                    result = cursor.fetchmany(max_rows)
-                    logger.debug(f"Fetched {len(result) if result else 0} rows")
-
-                    # DataFrame 변환
-                    if result:
-                        columns = [desc[0] for desc in cursor.description]
-                        df = pd.DataFrame(result, columns=columns)
-                        row_count = len(df)
-                    else:
-                        df = pd.DataFrame()
-                        row_count = 0
-
+            if cache is not None:
+                hit = cache.get(sql_query, variant=cache_variant)
+                if hit is not None:
+                    table, cache_info = hit
                     execution_time = time.time() - start_time
-                    logger.debug(f"Query completed in {execution_time:.2f}s")
-
-                    # 로깅
-                    log_sql_execution(
-                        logger,
-                        query=sql_query,
-                        success=True,
-                        execution_time=execution_time,
-                        row_count=row_count
+                    logger.debug(
+                        f"Query cache HIT ({cache_info['tier']}, age {cache_info['age']}s, "
+                        f"saved {cache_info['execution_time']:.2f}s)"
                     )
-
                     return {
                         'success': True,
-                        'data': df,
-                        'row_count': row_count,
+                        'data': table if result_format == 'arrow' else arrow_to_pandas(table, dtype_backend),
+                        'row_count': table.num_rows,
                         'execution_time': round(execution_time, 2),
-                        'error_message': None
+                        'error_message': None,
+                        'cached': True,
+                        'coalesced': False
                     }
 
-                finally:
-                    cursor.close()
+            def run_and_store() -> pa.Table:
+                run_started = time.time()
+                result_table = self._run_query(sql_query, max_rows)
+                run_time = time.time() - run_started
+                logger.debug(f"Query completed in {run_time:.2f}s")
 
-        except Exception as e:
-            execution_time = time.time() - start_time
-            error_msg = str(e)
-            error_type = type(e).__name__
-
-            # 더 친절한 에러 메시지 (에러 타입별 분류)
-            if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                error_msg = (
-                    f"⏱️ 연결 시간 초과 ({execution_time:.1f}초)\n\n"
-                    "원인:\n"
-                    "1. SQL Warehouse가 중단됨 (가장 가능성 높음)\n"
-                    "2. 네트워크 문제\n\n"
-                    "해결 방법:\n"
-                    "• Databricks → SQL → SQL Warehouses → Start 클릭\n"
-                    "• Warehouse가 'Running' 상태가 되면 다시 실행\n\n"
-                    f"기술 상세: {e}"
-                )
-            elif "CANNOT_PARSE_TIMESTAMP" in error_msg:
-                error_msg = (
-                    f"📅 날짜 형식 오류\n\n"
-                    "데이터베이스에 잘못된 날짜 형식이 있습니다.\n"
-                    "TRY_TO_DATE()를 사용하면 해결됩니다.\n\n"
-                    f"상세: {e}"
-                )
-            elif "MISSING_GROUP_BY" in error_msg or "MISSING_AGGREGATION" in error_msg:
-                error_msg = (
-                    f"📊 SQL 집계 오류\n\n"
-                    "GROUP BY 절이 누락되었거나 집계 함수가 잘못되었습니다.\n"
-                    "쿼리를 재생성하세요.\n\n"
-                    f"상세: {e}"
-                )
-            elif "INVALID_IDENTIFIER" in error_msg:
-                error_msg = (
-                    f"🔤 컬럼명 오류\n\n"
-                    "존재하지 않는 컬럼을 참조했거나 한글 별칭에 백틱(`)이 누락되었습니다.\n\n"
-                    f"상세: {e}"
+                # 로깅 (동일 쿼리가 합쳐진 경우 실제 실행 1회만 기록)
+                log_sql_execution(
+                    logger,
+                    query=sql_query,
+                    success=True,
+                    execution_time=run_time,
+                    row_count=result_table.num_rows
                 )
+
+                # 대기 중이던 호출이 끝나기 전에 저장해 두어 뒤늦은 요청도 캐시 적중
+                if cache is not None:
+                    cache.put(
+                        sql_query,
+                        result_table,
+                        category=cache_category,
+                        execution_time=run_time,
+                        variant=cache_variant
+                    )
+                return result_table
+
+            if coalesce:
+                flight_key = make_cache_key(sql_query, cache_variant)
+                table, coalesced = self.singleflight.do(flight_key, run_and_store)
             else:
-                # 일반 에러
-                error_msg = f"❌ {error_type}: {error_msg}"
+                table, coalesced = run_and_store(), False
+
+            execution_time = time.time() - start_time
+
+            return {
+                'success': True,
+                'data': table if result_format == 'arrow' else arrow_to_pandas(table, dtype_backend),
+                'row_count': table.num_rows,
+                'execution_time': round(execution_time, 2),
+                'error_message': None,
+                'cached': False,
+                'coalesced': coalesced
+            }
+
+        except Exception as e:
+            execution_time = time.time() - start_time
+            error_msg = self._format_error_message(e, execution_time)
 
             logger.debug(f"Query failed: {error_msg}")
 
@@ -207,9 +755,291 @@ class DatabricksClient:
                 'data': None,
                 'row_count': 0,
                 'execution_time': round(execution_time, 2),
-                'error_message': error_msg
+                'error_message': error_msg,
+                'cached': False,
+                'coalesced': False
+            }
+
+    def invalidate_cache(self, sql_query: Optional[str] = None, category: Optional[str] = None) -> int:
+        """
+        결과 캐시 수동 무효화
+
+        Args:
+            sql_query: 지정 시 해당 쿼리 결과만 제거
+            category: 지정 시 해당 카테고리 전체 제거 (둘 다 None이면 전체)
+
+        Returns:
+            제거된 항목 수
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate(sql_query=sql_query, category=category)
+
+    async def execute_query_async(self, sql_query: str, **kwargs) -> Dict[str, Any]:
+        """
+        execute_query()의 asyncio 버전 (유한 크기 스레드 풀에서 실행)
+
+        Args:
+            sql_query: 실행할 SQL 쿼리
+            **kwargs: execute_query()에 전달할 인자 (max_rows, result_format 등)
+
+        Returns:
+            execute_query() 결과와 동일한 형식 + 'wall_time' (대기 포함 총 소요 시간)
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(self.execute_query, sql_query, **kwargs)
+            )
+        except Exception as e:
+            # execute_query()는 예외를 결과 dict로 변환하지만, executor 오류 등도 격리
+            wall_time = time.time() - start_time
+            result = {
+                'success': False,
+                'data': None,
+                'row_count': 0,
+                'execution_time': round(wall_time, 2),
+                'error_message': self._format_error_message(e, wall_time),
+                'cached': False,
+                'coalesced': False
             }
 
+        result['wall_time'] = round(time.time() - start_time, 2)
+        return result
+
+    async def execute_many_async(
+        self,
+        queries: List[str],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        여러 쿼리를 동시에 실행 (asyncio)
+
+        한 쿼리의 실패는 다른 쿼리에 영향을 주지 않으며 결과는 입력 순서대로 반환됨
+
+        Args:
+            queries: SQL 쿼리 리스트
+            max_concurrency: 동시 실행 최대 개수 (None이면 client.max_concurrency)
+            **kwargs: 각 execute_query() 호출에 전달할 인자
+
+        Returns:
+            입력 순서와 동일한 결과 리스트
+            (각 항목은 execute_query_async() 형식 + 'query_index', 'queue_time')
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def run(index: int, sql_query: str) -> Dict[str, Any]:
+            queued_at = time.time()
+            async with semaphore:
+                started_at = time.time()
+                result = await self.execute_query_async(sql_query, **kwargs)
+            result['query_index'] = index
+            result['queue_time'] = round(started_at - queued_at, 2)  # 동시성 한도로 대기한 시간
+            return result
+
+        return await asyncio.gather(*(run(i, q) for i, q in enumerate(queries)))
+
+    def execute_many(
+        self,
+        queries: List[str],
+        max_concurrency: Optional[int] = None,
+        **kwargs
+    ) -> List[Dict[str, Any]]:
+        """
+        execute_many_async()의 동기 래퍼 (Streamlit 스크립트 등 이벤트 루프 밖에서 사용)
+
+        사용 예:
+            results = client.execute_many([sql1, sql2, sql3], max_concurrency=4)
+        """
+        return asyncio.run(self.execute_many_async(queries, max_concurrency=max_concurrency, **kwargs))
+
+    def execute_query_stream(
+        self,
+        sql_query: str,
+        batch_size: int = 50000,
+        result_format: str = 'pandas',
+        dtype_backend: Optional[str] = None
+    ) -> Iterator[QueryBatch]:
+        """
+        SQL 쿼리를 실행하고 결과를 batch_size 단위로 스트리밍
+
+        execute_query()와 달리 max_rows로 잘리지 않으며, 한 번에 한 배치만
+        메모리에 유지함 (수십만 행 추출용). 제너레이터를 끝까지 소비하거나
+        close()하면 커서와 연결이 풀로 반납됨.
+
+        사용 예:
+            for batch in client.execute_query_stream(sql, batch_size=20000):
+                batch.data.to_csv(f, header=(batch.batch_index == 0), index=False)
+
+        Args:
+            sql_query: 실행할 SQL 쿼리
+            batch_size: 배치당 최대 행 수
+            result_format: 'pandas' (DataFrame) 또는 'arrow' (pyarrow.Table)
+            dtype_backend: pandas 변환 시 dtype 매핑 (execute_query() 참고)
+
+        Yields:
+            QueryBatch (첫 배치 소요 시간, 누적 행 수 포함)
+
+        Raises:
+            QueryExecutionError: 쿼리 실행 또는 fetch 실패 시 (사용자 친화적 메시지)
+        """
+        if result_format not in ('pandas', 'arrow'):
+            raise ValueError(f"result_format must be 'pandas' or 'arrow', got: {result_format}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        dtype_backend = dtype_backend or self.dtype_backend
+        start_time = time.time()
+        time_to_first_batch = None
+        total_rows = 0
+        batch_index = 0
+
+        try:
+            with self.get_connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(sql_query)
+
+                    while True:
+                        table = self._fetch_arrow(cursor, batch_size)
+                        if table.num_rows == 0:
+                            break
+
+                        elapsed = time.time() - start_time
+                        if time_to_first_batch is None:
+                            time_to_first_batch = elapsed
+                            logger.debug(f"First batch received in {time_to_first_batch:.2f}s")
+                        total_rows += table.num_rows
+
+                        yield QueryBatch(
+                            data=table if result_format == 'arrow' else arrow_to_pandas(table, dtype_backend),
+                            batch_index=batch_index,
+                            row_count=table.num_rows,
+                            total_rows=total_rows,
+                            time_to_first_batch=round(time_to_first_batch, 3),
+                            elapsed=round(elapsed, 3)
+                        )
+                        batch_index += 1
+                finally:
+                    cursor.close()
+
+        except Exception as e:
+            execution_time = time.time() - start_time
+            error_msg = self._format_error_message(e, execution_time)
+            log_sql_execution(logger, query=sql_query, success=False, error=error_msg)
+            raise QueryExecutionError(error_msg) from e
+
+        execution_time = time.time() - start_time
+        log_sql_execution(
+            logger,
+            query=sql_query,
+            success=True,
+            execution_time=execution_time,
+            row_count=total_rows
+        )
+
+    def export_query_to_csv(
+        self,
+        sql_query: str,
+        output: BinaryIO,
+        batch_size: int = 50000,
+        progress_callback: Optional[Callable[[QueryBatch], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        쿼리 전체 결과를 배치 단위로 CSV에 기록 (메모리 사용량 일정)
+
+        Args:
+            sql_query: 실행할 SQL 쿼리
+            output: 바이너리 쓰기 가능한 파일 객체
+            batch_size: 배치당 최대 행 수
+            progress_callback: 배치마다 호출되는 콜백 (진행 상황 표시용)
+
+        Returns:
+            {'row_count': int, 'batch_count': int, 'time_to_first_batch': float or None,
+             'execution_time': float}
+        """
+        start_time = time.time()
+        batch = None
+
+        # Excel 호환을 위해 BOM 포함 UTF-8 (기존 CSV 다운로드와 동일)
+        output.write('\ufeff'.encode('utf-8'))
+        for batch in self.execute_query_stream(sql_query, batch_size=batch_size):
+            csv_text = batch.data.to_csv(index=False, header=(batch.batch_index == 0))
+            output.write(csv_text.encode('utf-8'))
+            if progress_callback:
+                progress_callback(batch)
+
+        return {
+            'row_count': batch.total_rows if batch else 0,
+            'batch_count': batch.batch_index + 1 if batch else 0,
+            'time_to_first_batch': batch.time_to_first_batch if batch else None,
+            'execution_time': round(time.time() - start_time, 2)
+        }
+
+    @staticmethod
+    def _format_error_message(e: Exception, execution_time: float) -> str:
+        """쿼리 실패 예외를 사용자 친화적인 메시지로 변환"""
+        error_msg = str(e)
+        error_type = type(e).__name__
+
+        # 더 친절한 에러 메시지 (에러 타입별 분류)
+        if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
+            error_msg = (
+                f"⏱️ 연결 시간 초과 ({execution_time:.1f}초)\n\n"
+                "원인:\n"
+                "1. SQL Warehouse가 중단됨 (가장 가능성 높음)\n"
+                "2. 네트워크 문제\n\n"
+                "해결 방법:\n"
+                "• Databricks → SQL → SQL Warehouses → Start 클릭\n"
+                "• Warehouse가 'Running' 상태가 되면 다시 실행\n\n"
+                f"기술 상세: {e}"
+            )
+        elif "CANNOT_PARSE_TIMESTAMP" in error_msg:
+            error_msg = (
+                f"📅 날짜 형식 오류\n\n"
+                "데이터베이스에 잘못된 날짜 형식이 있습니다.\n"
+                "TRY_TO_DATE()를 사용하면 해결됩니다.\n\n"
+                f"상세: {e}"
+            )
+        elif "MISSING_GROUP_BY" in error_msg or "MISSING_AGGREGATION" in error_msg:
+            error_msg = (
+                f"📊 SQL 집계 오류\n\n"
+                "GROUP BY 절이 누락되었거나 집계 함수가 잘못되었습니다.\n"
+                "쿼리를 재생성하세요.\n\n"
+                f"상세: {e}"
+            )
+        elif "INVALID_IDENTIFIER" in error_msg:
+            error_msg = (
+                f"🔤 컬럼명 오류\n\n"
+                "존재하지 않는 컬럼을 참조했거나 한글 별칭에 백틱(`)이 누락되었습니다.\n\n"
+                f"상세: {e}"
+            )
+        else:
+            # 일반 에러
+            error_msg = f"❌ {error_type}: {error_msg}"
+
+        return error_msg
+
+    @staticmethod
+    def _fetch_arrow(cursor, max_rows: int) -> pa.Table:
+        """
+        커서에서 최대 max_rows 행을 Arrow Table로 가져옴
+
+        Arrow fetch를 지원하지 않는 커서는 행 튜플을 컬럼 단위로 변환
+        """
+        if hasattr(cursor, 'fetchmany_arrow'):
+            return cursor.fetchmany_arrow(max_rows)
+
+        rows = cursor.fetchmany(max_rows)
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        return pa.Table.from_pydict({
+            name: [row[i] for row in rows]
+            for i, name in enumerate(columns)
+        })
+
     def test_connection(self) -> bool:
         """
         연결 테스트
@@ -218,7 +1048,7 @@ class DatabricksClient:
             True if connection successful, False otherwise
         """
         try:
-            result = self.execute_query("SELECT 1 as test")
+            result = self.execute_query("SELECT 1 as test", use_cache=False)
             return result['success']
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
@@ -243,6 +1073,21 @@ class DatabricksClient:
         return self.execute_query(sql)
 
 
+def get_execution_metrics() -> Dict[str, Any]:
+    """
+    실행 계층 지표 (모니터링 탭용)
+
+    DatabricksClient가 아직 초기화되지 않았으면 빈 dict 반환 (연결 정보 없이도 호출 가능)
+    """
+    client = DatabricksClient._instance
+    if client is None or not getattr(client, '_initialized', False):
+        return {}
+    return {
+        'pool': client.get_pool_metrics(),
+        'coalescing': client.get_coalescing_metrics()
+    }
+
+
 # 사용 예시
 if __name__ == "__main__":
     # 클라이언트 초기화
@@ -1,55 +1,72 @@
 """
 Centralized Gemini API service
-Handles all LLM interactions
+Handles all LLM interactions through the shared LLM gateway
 """
 
-from typing import Optional, Any
-import google.generativeai as genai
-from google.generativeai.types import GenerateContentResponse
-from config.config_loader import get_config, ConfigurationError
+from typing import Optional, Any, Iterator
+
+from services.llm_gateway import PRIORITY_INTERACTIVE, LLMGateway, get_llm_gateway
 
 
 class GeminiService:
-    """Singleton Gemini API client"""
+    """Singleton Gemini API client (thin wrapper over the process-wide LLMGateway)"""
 
     _instance: Optional['GeminiService'] = None
     _initialized: bool = False
 
-    def __new__(cls, model_name: str = 'gemini-2.5-flash') -> 'GeminiService':
+    def __new__(cls, model_name: Optional[str] = None) -> 'GeminiService':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self, model_name: str = 'gemini-2.5-flash') -> None:
+    def __init__(self, model_name: Optional[str] = None) -> None:
         """
         Initialize Gemini API client.
 
         Args:
-            model_name: Gemini model identifier
+            model_name: Gemini model identifier (default: gateway model, config.yaml -> llm.model)
 
-        Raises:
-            ConfigurationError: If API key is not found or invalid
+        Note:
+            The API key is read when the first request is sent; a missing key raises
+            ConfigurationError from that call.
         """
         if self._initialized:
             return
 
-        # Use centralized config loader
-        config = get_config()
-        api_key: str = config.get_gemini_api_key()
-
-        genai.configure(api_key=api_key)
-        self.model: genai.GenerativeModel = genai.GenerativeModel(model_name)
+        self.gateway: LLMGateway = get_llm_gateway()
+        self.model_name: str = model_name or self.gateway.model_name
         self._initialized = True
 
-    def generate_content(self, prompt: str) -> GenerateContentResponse:
+    def generate_content(self, prompt: str, priority: str = PRIORITY_INTERACTIVE, caller: str = "gemini_service") -> Any:
         """
         Generate content using Gemini API.
 
         Args:
             prompt: Input prompt
+            priority: Gateway priority class ('interactive' | 'default' | 'batch')
+            caller: Name recorded in gateway metrics
 
         Returns:
             API response object
         """
-        return self.model.generate_content(prompt)
+        return self.gateway.generate(prompt, priority=priority, caller=caller, model=self.model_name)
+
+    def generate_content_stream(
+        self,
+        prompt: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        caller: str = "gemini_service"
+    ) -> Iterator[str]:
+        """
+        Generate content using Gemini API, streaming text chunks.
+
+        Args:
+            prompt: Input prompt
+            priority: Gateway priority class
+            caller: Name recorded in gateway metrics
+
+        Yields:
+            Response text chunks as they arrive
+        """
+        return self.gateway.stream(prompt, priority=priority, caller=caller, model=self.model_name)
@@ -0,0 +1,253 @@
+"""
+LLM 카세트 - LLMGateway용 녹화/재생 백엔드
+
+실제 Gemini 응답을 (모델, 프롬프트) 해시별로 카세트 파일에 녹화해 두고,
+이후에는 API 키 / 네트워크 없이 같은 응답을 결정적으로 재생
+→ generate_sql(), 레시피 추천, 스키마 챗봇, PDF 보고서의 LLM 외 오버헤드를 오프라인에서 반복 측정
+
+- record: 항상 실제 호출, 응답 + 지연 시간(스트림은 청크별 도착 시각)을 기록
+- replay: 녹화된 응답만 사용, 없으면 LLMAPIError
+- auto: 녹화가 있으면 재생, 없으면 실제 호출 후 기록
+- 재생 지연: latency_scale (0 = 즉시, 1.0 = 녹화 당시 지연 그대로)
+- 같은 프롬프트가 여러 번 녹화되면 재생도 같은 순서로 (마지막 응답은 이후 반복)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.exceptions import LLMAPIError
+from services.llm_gateway import response_text, token_usage
+from utils.logger import setup_logger
+
+logger = setup_logger("llm_cassette")
+
+CASSETTE_VERSION = 1
+
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+MODE_AUTO = 'auto'
+MODES = (MODE_RECORD, MODE_REPLAY, MODE_AUTO)
+
+
+def prompt_key(model_name: str, prompt: str) -> str:
+    """카세트 키 - 모델명 + 프롬프트 SHA-256"""
+    return hashlib.sha256(f"{model_name}\x00{prompt}".encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CassetteResponse:
+    """재생 응답 (Gemini 응답처럼 .text, .usage_metadata 제공)"""
+    text: str
+    usage_metadata: Optional[SimpleNamespace] = None
+
+
+@dataclass
+class CassetteMetrics:
+    """카세트 누적 지표"""
+    replayed: int = 0
+    recorded: int = 0
+    misses: int = 0             # 녹화 없음 (replay 모드에서는 오류)
+    simulated_latency: float = 0.0
+
+
+def _usage(entry: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_token_count=entry.get('prompt_tokens', 0),
+        candidates_token_count=entry.get('output_tokens', 0),
+        total_token_count=entry.get('prompt_tokens', 0) + entry.get('output_tokens', 0)
+    )
+
+
+class CassetteBackend:
+    """
+    녹화/재생 백엔드 (LLMGateway의 backend 자리에 그대로 사용)
+
+    사용 예:
+        backend = CassetteBackend('tests/cassettes/pipelines.json', mode='auto', inner=GeminiBackend())
+        gateway = LLMGateway(backend=backend)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = MODE_REPLAY,
+        inner: Optional[Any] = None,
+        latency_scale: float = 0.0,
+        sleep: Callable[[float], None] = time.sleep
+    ) -> None:
+        """
+        Args:
+            path: 카세트 JSON 파일 경로
+            mode: record | replay | auto
+            inner: 실제 호출 백엔드 (record/auto 모드에서 필요)
+            latency_scale: 재생 지연 배율 (0이면 지연 없음)
+            sleep: 지연 함수 (테스트용)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (expected one of {list(MODES)})")
+        if mode != MODE_REPLAY and inner is None:
+            raise ValueError(f"Cassette mode '{mode}' needs an inner backend to record from")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.inner = inner
+        self.latency_scale = max(0.0, latency_scale)
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = self._load()
+        self._replay_index: Dict[str, int] = {}
+        self._recorded_keys: set = set()   # 이번 세션에서 녹화한 키 (record 모드는 기존 녹화를 교체)
+        self.metrics = CassetteMetrics()
+
+        logger.info(f"LLM cassette {self.path} | mode={mode} | {len(self._entries)} prompts | latency x{self.latency_scale}")
+
+    # ---------- backend interface ----------
+
+    def generate(self, model_name: str, prompt: str) -> Any:
+        key = prompt_key(model_name, prompt)
+        entry = self._next_entry(key)
+        if entry is not None:
+            self._simulate(entry['latency'])
+            return CassetteResponse(text=entry['text'], usage_metadata=_usage(entry))
+
+        started_at = time.perf_counter()
+        response = self.inner.generate(model_name, prompt)
+        prompt_tokens, output_tokens = token_usage(response)
+        self._record(key, model_name, prompt, {
+            'text': response_text(response),
+            'chunks': None,
+            'chunk_offsets': None,
+            'latency': time.perf_counter() - started_at,
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+        })
+        return response
+
+    def stream(self, model_name: str, prompt: str) -> Iterator[Any]:
+        key = prompt_key(model_name, prompt)
+        entry = self._next_entry(key)
+        if entry is not None:
+            return self._replay_stream(entry)
+        return self._record_stream(key, model_name, prompt)
+
+    # ---------- public ----------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = asdict(self.metrics)
+            metrics.update({
+                'mode': self.mode,
+                'path': str(self.path),
+                'prompts': len(self._entries),
+                'latency_scale': self.latency_scale,
+            })
+        return metrics
+
+    # ---------- replay ----------
+
+    def _next_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """재생할 녹화 (없고 녹화 가능하면 None, replay 모드에서 없으면 LLMAPIError)"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries and self.mode != MODE_RECORD:
+                index = self._replay_index.get(key, 0)
+                self._replay_index[key] = index + 1
+                self.metrics.replayed += 1
+                return entries[min(index, len(entries) - 1)]
+            if self.mode == MODE_REPLAY:
+                self.metrics.misses += 1
+                raise LLMAPIError(
+                    f"LLM cassette miss: prompt {key[:12]} is not recorded in {self.path} "
+                    f"(record it with mode 'auto' or 'record')"
+                )
+            if self.mode == MODE_AUTO:
+                self.metrics.misses += 1
+        return None
+
+    def _replay_stream(self, entry: Dict[str, Any]) -> Iterator[CassetteResponse]:
+        chunks = entry.get('chunks') or [entry['text']]
+        offsets = entry.get('chunk_offsets') or [entry['latency']]
+        elapsed = 0.0
+        for index, (chunk, offset) in enumerate(zip(chunks, offsets)):
+            self._simulate(offset - elapsed)
+            elapsed = offset
+            # 실제 스트림처럼 사용량은 마지막 청크에
+            usage = _usage(entry) if index == len(chunks) - 1 else None
+            yield CassetteResponse(text=chunk, usage_metadata=usage)
+
+    def _simulate(self, seconds: float) -> None:
+        delay = seconds * self.latency_scale
+        if delay > 0:
+            with self._lock:
+                self.metrics.simulated_latency += delay
+            self._sleep(delay)
+
+    # ---------- record ----------
+
+    def _record_stream(self, key: str, model_name: str, prompt: str) -> Iterator[Any]:
+        started_at = time.perf_counter()
+        chunks: List[str] = []
+        offsets: List[float] = []
+        last_chunk = None
+        for chunk in self.inner.stream(model_name, prompt):
+            last_chunk = chunk
+            chunks.append(response_text(chunk))
+            offsets.append(time.perf_counter() - started_at)
+            yield chunk
+
+        # 끝까지 받은 스트림만 기록
+        prompt_tokens, output_tokens = token_usage(last_chunk)
+        self._record(key, model_name, prompt, {
+            'text': ''.join(chunks),
+            'chunks': chunks,
+            'chunk_offsets': offsets,
+            'latency': offsets[-1] if offsets else time.perf_counter() - started_at,
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+        })
+
+    def _record(self, key: str, model_name: str, prompt: str, entry: Dict[str, Any]) -> None:
+        entry.update({
+            'model': model_name,
+            'prompt_chars': len(prompt),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        with self._lock:
+            if self.mode == MODE_RECORD and key not in self._recorded_keys:
+                self._entries[key] = []
+            self._recorded_keys.add(key)
+            self._entries.setdefault(key, []).append(entry)
+            self.metrics.recorded += 1
+            self._save()
+
+    # ---------- file ----------
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if not self.path.exists():
+            if self.mode == MODE_REPLAY:
+                raise LLMAPIError(f"LLM cassette not found: {self.path}")
+            return {}
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise LLMAPIError(f"Unsupported LLM cassette version {data.get('version')} in {self.path}")
+        return data.get('entries', {})
+
+    def _save(self) -> None:
+        """카세트 전체를 다시 씀 (호출자가 잠금 보유)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f'.tmp{os.getpid()}')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CASSETTE_VERSION, 'entries': self._entries}, f, ensure_ascii=False, indent=1)
+            tmp_path.replace(self.path)  # 원자적 교체 (동시 읽기 보호)
+        except Exception as e:
+            logger.warning(f"Failed to write LLM cassette {self.path}: {e}")
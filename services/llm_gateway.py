@@ -0,0 +1,445 @@
+"""
+LLM Gateway - 모든 Gemini 호출이 지나가는 공용 관문
+
+- 모델 생성 / genai.configure를 한 곳에서 (모델명 통일: config.yaml -> llm.model)
+- 동시 호출 수 제한 (max_concurrency) + 분당 요청 수 토큰 버킷 (requests_per_minute, burst)
+- 우선순위: 대기열에서 interactive(NL2SQL, 챗봇, 레시피 추천)가 batch(PDF 인사이트)보다 먼저 슬롯을 받음
+- 429 / 5xx는 지터를 준 지수 백오프로 재시도, 429를 받으면 버킷을 잠시 멈춰 다른 호출도 함께 속도를 낮춤
+- 호출별 대기 시간 / 지연 시간 / 토큰 수 지표 (호출자별 집계 포함)
+"""
+
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from core.exceptions import LLMAPIError
+from utils.logger import setup_logger
+
+logger = setup_logger("llm_gateway")
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+
+PRIORITY_INTERACTIVE = 'interactive'   # 사용자가 화면에서 기다리는 호출
+PRIORITY_DEFAULT = 'default'
+PRIORITY_BATCH = 'batch'               # PDF 보고서 등 일괄 작업
+PRIORITIES: Dict[str, int] = {PRIORITY_INTERACTIVE: 0, PRIORITY_DEFAULT: 1, PRIORITY_BATCH: 2}
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """예외의 HTTP 상태 코드 (google.api_core 예외는 .code, 없으면 None)"""
+    for attr in ('code', 'status_code'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def response_text(chunk: Any) -> str:
+    """응답(또는 스트림 청크)의 텍스트, 텍스트 파트가 없으면 ''"""
+    try:
+        return chunk.text or ''
+    except ValueError:
+        # 종료 사유 / 안전 메타데이터만 있는 청크
+        return ''
+
+
+def token_usage(response: Any) -> Tuple[int, int]:
+    """(프롬프트 토큰, 출력 토큰) - usage_metadata가 없으면 (0, 0)"""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return 0, 0
+    return int(getattr(usage, 'prompt_token_count', 0) or 0), int(getattr(usage, 'candidates_token_count', 0) or 0)
+
+
+class TokenBucket:
+    """
+    요청 수 토큰 버킷 (잠금 없음 - LLMGateway의 Condition 안에서만 사용)
+
+    - rate: 초당 보충 토큰 수 (None이면 제한 없음)
+    - capacity: 최대 버스트
+    """
+
+    def __init__(self, rate: Optional[float], capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def reserve_delay(self) -> float:
+        """토큰이 있으면 1개 소비하고 0, 없으면 기다려야 할 시간 (소비하지 않음)"""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if not self.rate:
+            return 0.0
+
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """429 수신 시 - seconds 동안 모든 호출 보류, 버스트도 비움"""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        self.tokens = 0.0
+        self._updated = self._clock()
+
+
+@dataclass
+class LLMCallMetrics:
+    """LLM 호출 누적 지표"""
+    calls: int = 0              # 성공한 호출 수
+    failures: int = 0           # 재시도 후에도 실패한 호출 수
+    retries: int = 0
+    rate_limited: int = 0       # 429 응답 수
+    queue_wait: float = 0.0     # 슬롯/토큰 대기 누적 (초)
+    latency: float = 0.0        # API 응답 누적 (초)
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+
+class GeminiBackend:
+    """google.generativeai 백엔드 (genai.configure는 처음 모델을 만들 때 한 번)"""
+
+    def __init__(self, api_key: Optional[str] = None) -> None:
+        self._api_key = api_key
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _model(self, model_name: str):
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                import google.generativeai as genai
+                if not self._models:
+                    from config.config_loader import get_config
+                    genai.configure(api_key=self._api_key or get_config().get_gemini_api_key())
+                model = genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+            return model
+
+    def generate(self, model_name: str, prompt: str) -> Any:
+        return self._model(model_name).generate_content(prompt)
+
+    def stream(self, model_name: str, prompt: str) -> Iterator[Any]:
+        return iter(self._model(model_name).generate_content(prompt, stream=True))
+
+
+class LLMGateway:
+    """
+    우선순위 + 동시성 + 요청률 제한 LLM 호출기
+
+    사용 예:
+        gateway = get_llm_gateway()
+        response = gateway.generate(prompt, priority=PRIORITY_INTERACTIVE, caller="nl2sql")
+        for text in gateway.stream(prompt, caller="nl2sql"):
+            ...
+    """
+
+    def __init__(
+        self,
+        backend: Optional[Any] = None,
+        model_name: str = DEFAULT_MODEL,
+        max_concurrency: int = 4,
+        requests_per_minute: Optional[float] = 60,
+        burst: Optional[int] = None,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 30.0,
+        acquire_timeout: float = 300.0
+    ) -> None:
+        """
+        Args:
+            backend: generate(model, prompt) / stream(model, prompt)를 제공하는 객체 (기본 GeminiBackend)
+            model_name: 기본 모델
+            max_concurrency: 동시에 진행할 수 있는 최대 호출 수
+            requests_per_minute: 분당 요청 수 (None/0이면 제한 없음)
+            burst: 토큰 버킷 용량 (기본 max_concurrency)
+            max_retries: 429/5xx 재시도 횟수
+            retry_base_delay / retry_max_delay: 지수 백오프 기준 / 상한 (초)
+            acquire_timeout: 슬롯 대기 최대 시간 (초과 시 LLMAPIError)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.backend = backend or GeminiBackend()
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.acquire_timeout = acquire_timeout
+
+        self._bucket = TokenBucket(
+            rate=requests_per_minute / 60.0 if requests_per_minute else None,
+            capacity=burst or max_concurrency
+        )
+        self._cond = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []   # (우선순위, 도착 순서) 힙
+        self._arrivals = itertools.count()
+        self._in_flight = 0
+
+        self.metrics = LLMCallMetrics()
+        self._by_caller: Dict[str, LLMCallMetrics] = {}
+        self._latencies: Deque[float] = deque(maxlen=1000)
+
+    # ---------- public ----------
+
+    def generate(
+        self,
+        prompt: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        caller: str = "",
+        model: Optional[str] = None
+    ) -> Any:
+        """
+        한 번에 응답 받기 (429/5xx 재시도)
+
+        Returns:
+            백엔드 응답 (.text, .usage_metadata)
+        """
+        model_name = model or self.model_name
+        for attempt in range(self.max_retries + 1):
+            queue_wait = self._acquire(priority)
+            started_at = time.perf_counter()
+            try:
+                response = self.backend.generate(model_name, prompt)
+            except Exception as e:
+                self._release()
+                self._handle_error(e, attempt, caller, queue_wait)
+                continue
+            self._release()
+            self._record(caller, priority, queue_wait, time.perf_counter() - started_at, response)
+            return response
+
+    def stream(
+        self,
+        prompt: str,
+        priority: str = PRIORITY_INTERACTIVE,
+        caller: str = "",
+        model: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        텍스트 청크 스트리밍 (첫 청크 전 오류만 재시도, 스트림이 끝날 때까지 슬롯 점유)
+
+        Yields:
+            비어 있지 않은 텍스트 청크
+        """
+        model_name = model or self.model_name
+        for attempt in range(self.max_retries + 1):
+            queue_wait = self._acquire(priority)
+            started_at = time.perf_counter()
+            last_chunk = None
+            yielded = False
+            released = False
+            try:
+                for chunk in self.backend.stream(model_name, prompt):
+                    last_chunk = chunk
+                    text = response_text(chunk)
+                    if text:
+                        yielded = True
+                        yield text
+            except Exception as e:
+                self._release()
+                released = True
+                if yielded:
+                    self._record_failure(caller, queue_wait)
+                    raise
+                self._handle_error(e, attempt, caller, queue_wait)
+                continue
+            finally:
+                if not released:
+                    self._release()
+            self._record(caller, priority, queue_wait, time.perf_counter() - started_at, last_chunk)
+            return
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """지표 스냅샷 (모니터링 탭용)"""
+        with self._cond:
+            metrics = asdict(self.metrics)
+            latencies = sorted(self._latencies)
+            metrics.update({
+                'in_flight': self._in_flight,
+                'queued': len(self._waiting),
+                'max_concurrency': self.max_concurrency,
+                'model': self.model_name,
+                'by_caller': {name: asdict(m) for name, m in self._by_caller.items()},
+            })
+        calls = metrics['calls']
+        metrics['avg_latency'] = metrics['latency'] / calls if calls else 0.0
+        metrics['avg_queue_wait'] = metrics['queue_wait'] / calls if calls else 0.0
+        metrics['latency_p50'] = latencies[len(latencies) // 2] if latencies else 0.0
+        metrics['latency_p95'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return metrics
+
+    def reset_metrics(self) -> None:
+        with self._cond:
+            self.metrics = LLMCallMetrics()
+            self._by_caller.clear()
+            self._latencies.clear()
+
+    # ---------- scheduling ----------
+
+    def _acquire(self, priority: str) -> float:
+        """우선순위 순서대로 동시성 슬롯 + 요청 토큰 확보, 대기 시간(초) 반환"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {list(PRIORITIES)})")
+
+        started_at = time.monotonic()
+        deadline = started_at + self.acquire_timeout
+        ticket = (PRIORITIES[priority], next(self._arrivals))
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    delay = None
+                    if self._waiting[0] == ticket and self._in_flight < self.max_concurrency:
+                        delay = self._bucket.reserve_delay()
+                        if delay == 0:
+                            break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise LLMAPIError(
+                            f"LLM 호출 대기 시간 초과 ({self.acquire_timeout:.0f}s, "
+                            f"진행 중 {self._in_flight}/{self.max_concurrency}, 대기 {len(self._waiting)})"
+                        )
+                    self._cond.wait(remaining if delay is None else min(delay, remaining))
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+            self._cond.notify_all()   # 다음 대기자가 맨 앞이 됨
+        return time.monotonic() - started_at
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _handle_error(self, error: Exception, attempt: int, caller: str, queue_wait: float) -> None:
+        """재시도 가능하면 백오프 후 반환, 아니면 지표 기록 후 예외 다시 발생"""
+        status = status_code(error)
+        if status not in RETRYABLE_STATUS or attempt >= self.max_retries:
+            self._record_failure(caller, queue_wait, rate_limited=status == 429)
+            raise error
+
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        with self._cond:
+            self.metrics.retries += 1
+            self._caller_metrics(caller).retries += 1
+            if status == 429:
+                self.metrics.rate_limited += 1
+                self._caller_metrics(caller).rate_limited += 1
+                self._bucket.pause(delay)
+                self._cond.notify_all()
+        logger.warning(f"LLM call retry {attempt + 1}/{self.max_retries} | {caller} | status {status} | {delay:.1f}s 후 재시도")
+        time.sleep(delay)
+
+    # ---------- metrics ----------
+
+    def _caller_metrics(self, caller: str) -> LLMCallMetrics:
+        return self._by_caller.setdefault(caller or 'unknown', LLMCallMetrics())
+
+    def _record(self, caller: str, priority: str, queue_wait: float, latency: float, response: Any) -> None:
+        prompt_tokens, output_tokens = token_usage(response)
+        with self._cond:
+            for metrics in (self.metrics, self._caller_metrics(caller)):
+                metrics.calls += 1
+                metrics.queue_wait += queue_wait
+                metrics.latency += latency
+                metrics.prompt_tokens += prompt_tokens
+                metrics.output_tokens += output_tokens
+            self._latencies.append(latency)
+        logger.info(
+            f"LLM call | {caller or 'unknown'} | {priority} | wait {queue_wait:.2f}s | "
+            f"latency {latency:.2f}s | tokens {prompt_tokens}/{output_tokens}"
+        )
+
+    def _record_failure(self, caller: str, queue_wait: float, rate_limited: bool = False) -> None:
+        with self._cond:
+            for metrics in (self.metrics, self._caller_metrics(caller)):
+                metrics.failures += 1
+                metrics.queue_wait += queue_wait
+                metrics.rate_limited += int(rate_limited)
+
+
+def _cassette_backend(settings: Dict[str, Any]) -> Optional[Any]:
+    """카세트 설정(환경 변수 우선)이 있으면 CassetteBackend, 없으면 None (GeminiBackend 사용)"""
+    path = os.getenv('LLM_CASSETTE') or settings.get('path')
+    if not path:
+        return None
+
+    from services.llm_cassette import CassetteBackend, MODE_REPLAY
+    return CassetteBackend(
+        path,
+        mode=os.getenv('LLM_CASSETTE_MODE') or settings.get('mode', MODE_REPLAY),
+        inner=GeminiBackend(),
+        latency_scale=float(os.getenv('LLM_CASSETTE_LATENCY_SCALE') or settings.get('latency_scale', 0.0))
+    )
+
+
+_shared_gateway: Optional[LLMGateway] = None
+_shared_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    프로세스 공용 LLMGateway (config.yaml -> llm.* 설정 사용)
+
+    설정 예:
+        llm:
+          model: gemini-2.5-flash
+          max_concurrency: 4
+          requests_per_minute: 60
+          burst: 4
+          max_retries: 4
+          retry_base_delay: 1.0
+          retry_max_delay: 30.0
+          acquire_timeout: 300
+          cassette:                 # 선택 - 녹화/재생 (services/llm_cassette.py)
+            path: tests/cassettes/pipelines.json
+            mode: replay            # record | replay | auto
+            latency_scale: 1.0
+
+    LLM_CASSETTE / LLM_CASSETTE_MODE / LLM_CASSETTE_LATENCY_SCALE 환경 변수가 cassette 설정보다 우선
+    """
+    global _shared_gateway
+    with _shared_gateway_lock:
+        if _shared_gateway is None:
+            from config.config_loader import get_config, ConfigurationError
+            try:
+                settings = get_config().get('llm', {}) or {}
+            except ConfigurationError:
+                settings = {}
+
+            burst = settings.get('burst')
+            _shared_gateway = LLMGateway(
+                backend=_cassette_backend(settings.get('cassette') or {}),
+                model_name=settings.get('model', DEFAULT_MODEL),
+                max_concurrency=int(settings.get('max_concurrency', 4)),
+                requests_per_minute=settings.get('requests_per_minute', 60),
+                burst=int(burst) if burst else None,
+                max_retries=int(settings.get('max_retries', 4)),
+                retry_base_delay=float(settings.get('retry_base_delay', 1.0)),
+                retry_max_delay=float(settings.get('retry_max_delay', 30.0)),
+                acquire_timeout=float(settings.get('acquire_timeout', 300.0))
+            )
+        return _shared_gateway
@@ -0,0 +1,334 @@
+"""
+로컬 DuckDB 실행기
+Databricks SQL Warehouse 없이 레시피 SQL(Spark SQL 방언)을 로컬 Parquet 데이터에 실행
+
+DatabricksClient의 커넥션 풀은 "인자 없는 connect() → DB-API 커넥션" 형태의 팩토리만 요구하므로,
+이 모듈의 LocalDuckDBConnection을 같은 자리에 끼워 넣으면 풀/스트리밍/캐시/비동기 실행이 그대로 동작함.
+
+config.yaml:
+    databricks:
+      executor: "local"              # databricks (기본) | local
+      local:
+        data_dir: "data/local_warehouse"
+        threads: 4                   # DuckDB 스레드 수 (생략 시 DuckDB 기본값)
+
+데이터 디렉토리 구조 (테이블명 = 파일/디렉토리명):
+    data/local_warehouse/
+      basic_treatment/year=2023/part-0.parquet   # 디렉토리 → hive 파티션 Parquet
+      insured_person.parquet                     # 단일 Parquet 파일
+      hospital.csv                               # CSV도 허용
+"""
+
+import functools
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+
+from utils.logger import setup_logger
+
+logger = setup_logger("local_executor")
+
+EXECUTORS = ('databricks', 'local')
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
+# sqlglot이 Anonymous 함수로만 파싱하는 Spark TRY_* 함수 → 대응 함수 + safe(실패 시 NULL)
+_SAFE_FUNCTIONS = {
+    'TRY_TO_DATE': 'TO_DATE',
+    'TRY_TO_TIMESTAMP': 'TO_TIMESTAMP',
+}
+
+
+def _rewrite_safe_functions(node):
+    """TRY_TO_DATE(x, 'yyyyMMdd') → TRY_STRPTIME 기반 DuckDB 식으로 바뀌도록 노드 교체"""
+    from sqlglot import exp
+
+    if isinstance(node, exp.Anonymous) and node.name.upper() in _SAFE_FUNCTIONS:
+        replacement = exp.func(_SAFE_FUNCTIONS[node.name.upper()], *node.expressions, dialect='databricks')
+        if 'safe' in replacement.arg_types:
+            replacement.set('safe', True)
+        return replacement
+    return node
+
+
+# Spark는 'yyyyMMdd' 문자열을 DATE 문맥에서 암묵 변환하지만 DuckDB는 오류 → 명시적 파싱 (ISO 형식도 허용)
+_STRING_DATE_FORMATS = ('%Y%m%d', '%Y-%m-%d')
+_COMPARISONS = ('EQ', 'NEQ', 'GT', 'GTE', 'LT', 'LTE')
+
+
+def _is_date_type(data_type) -> bool:
+    from sqlglot import exp
+    return data_type.is_type(exp.DataType.Type.DATE, *exp.DataType.TEMPORAL_TYPES)
+
+
+def _is_date_expr(node) -> bool:
+    """DATE/TIMESTAMP 값을 내는 식인지 (DATE 리터럴, 캐스트, 날짜 함수, 날짜 ± INTERVAL)"""
+    from sqlglot import exp
+
+    if isinstance(node, (exp.Cast, exp.TryCast)):
+        return _is_date_type(node.to)
+    if isinstance(node, (exp.CurrentDate, exp.CurrentTimestamp, exp.StrToTime, exp.StrToDate,
+                         exp.DateAdd, exp.DateSub, exp.DateTrunc, exp.TsOrDsToDate)):
+        return True
+    if isinstance(node, (exp.Add, exp.Sub)):
+        return any(_is_date_expr(side) for side in (node.left, node.right)) and \
+            any(isinstance(side, exp.Interval) for side in (node.left, node.right))
+    if isinstance(node, exp.Paren):
+        return _is_date_expr(node.this)
+    return False
+
+
+def _coerce_string_dates(string_columns: FrozenSet[str]):
+    """DATE 문맥(날짜와 비교 / DATE·TIMESTAMP 캐스트)에 쓰인 문자열 컬럼을 TRY_STRPTIME으로 감싸는 transform"""
+    from sqlglot import exp
+
+    def is_string_column(node) -> bool:
+        return isinstance(node, exp.Column) and node.name.lower() in string_columns
+
+    def parsed(column, data_type='DATE'):
+        formats = exp.Array(expressions=[exp.Literal.string(f) for f in _STRING_DATE_FORMATS])
+        return exp.cast(exp.Anonymous(this='TRY_STRPTIME', expressions=[column.copy(), formats]), data_type)
+
+    def transform(node):
+        if isinstance(node, (exp.Cast, exp.TryCast)) and is_string_column(node.this) and _is_date_type(node.to):
+            return parsed(node.this, node.to)
+        if node.key.upper() in _COMPARISONS:
+            for side, other in (('this', node.expression), ('expression', node.this)):
+                if is_string_column(node.args[side]) and _is_date_expr(other):
+                    node.set(side, parsed(node.args[side]))
+        if isinstance(node, exp.Between) and is_string_column(node.this) and \
+                (_is_date_expr(node.args['low']) or _is_date_expr(node.args['high'])):
+            node.set('this', parsed(node.this))
+        return node
+
+    return transform
+
+
+def _rewrite_format_number(node):
+    """FORMAT_NUMBER(x, d) → format('{:,.df}', CAST(x AS DOUBLE)) (DuckDB에 FORMAT_NUMBER 없음)"""
+    from sqlglot import exp
+
+    if isinstance(node, exp.Anonymous) and node.name.upper() == 'FORMAT_NUMBER' and len(node.expressions) == 2:
+        value, decimals = node.expressions
+        if isinstance(decimals, exp.Literal) and not decimals.is_string:
+            pattern = exp.Literal.string(f"{{:,.{int(decimals.this)}f}}")
+            return exp.Anonymous(this='format', expressions=[pattern, exp.cast(value.copy(), 'DOUBLE')])
+    return node
+
+
+@functools.lru_cache(maxsize=512)
+def translate_spark_sql(sql_query: str, string_columns: FrozenSet[str] = frozenset()) -> str:
+    """
+    Spark SQL(Databricks) → DuckDB SQL 변환
+
+    TRY_TO_DATE / RLIKE / DATE_SUB / DATEDIFF / TRY_DIVIDE / COLLECT_SET / FORMAT_NUMBER / 백틱 별칭 등을 sqlglot으로 변환.
+    string_columns(소문자 컬럼명)가 DATE 문맥에 쓰이면 Spark처럼 'yyyyMMdd' 문자열을 날짜로 파싱.
+    같은 SQL은 반복 변환하지 않도록 캐시.
+
+    Raises:
+        ValueError: 변환할 수 없는 SQL
+    """
+    import sqlglot
+    from sqlglot.errors import SqlglotError
+
+    try:
+        # ';' 뒤에 주석만 남은 경우 None 또는 빈 문장이 섞여 나옴
+        expressions = [e for e in sqlglot.parse(sql_query, read='databricks') if e is not None]
+        statements = [
+            e.transform(_rewrite_safe_functions).transform(_rewrite_format_number).sql(dialect='duckdb')
+            for e in expressions
+        ]
+        if string_columns:
+            # 날짜 캐스트는 DuckDB로 생성할 때 드러나므로 (YEAR(x) → YEAR(CAST(x AS DATE))) DuckDB AST에서 처리
+            coerce = _coerce_string_dates(string_columns)
+            statements = [
+                sqlglot.parse_one(s, read='duckdb').transform(coerce).sql(dialect='duckdb')
+                if _COMMENT_RE.sub('', s).strip() else s
+                for s in statements
+            ]
+    except SqlglotError as e:
+        raise ValueError(f"Spark SQL을 DuckDB SQL로 변환하지 못했습니다: {e}") from e
+
+    statements = [s for s in statements if _COMMENT_RE.sub('', s).strip()]
+    if len(statements) != 1:
+        raise ValueError(f"한 번에 하나의 SQL 문만 실행할 수 있습니다 (입력: {len(statements)}개)")
+    return statements[0]
+
+
+def discover_tables(data_dir: Path) -> Dict[str, str]:
+    """
+    데이터 디렉토리에서 테이블 목록과 DuckDB 스캔 표현식을 찾음
+
+    Returns:
+        {테이블명: "read_parquet(...)" 등의 FROM 절 표현식}
+    """
+    tables: Dict[str, str] = {}
+    if not data_dir.exists():
+        return tables
+
+    for path in sorted(data_dir.iterdir()):
+        name = path.stem
+        location = path.as_posix().replace("'", "''")
+        if path.is_dir():
+            if any(path.rglob('*.parquet')):
+                tables[name] = f"read_parquet('{location}/**/*.parquet', hive_partitioning = true)"
+        elif path.suffix == '.parquet':
+            tables[name] = f"read_parquet('{location}')"
+        elif path.suffix == '.csv':
+            tables[name] = f"read_csv_auto('{location}', header = true)"
+    return tables
+
+
+class LocalWarehouse:
+    """
+    로컬 DuckDB 데이터베이스 (프로세스당 data_dir별 1개)
+
+    테이블은 Parquet/CSV 위의 VIEW로만 등록하므로 데이터를 메모리에 올리지 않음.
+    풀의 각 커넥션은 이 DB의 cursor()를 하나씩 받아 독립적으로 실행.
+    """
+
+    _instances: Dict[str, "LocalWarehouse"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, data_dir: str, threads: Optional[int] = None):
+        import duckdb
+
+        self.data_dir = Path(data_dir)
+        self.db = duckdb.connect(database=':memory:')
+        if threads:
+            self.db.execute(f"SET threads = {int(threads)}")
+
+        self.tables = discover_tables(self.data_dir)
+        for name, scan in self.tables.items():
+            self.db.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {scan}')
+        self.string_columns = self._string_columns()
+
+        if self.tables:
+            logger.info(f"Local warehouse ready: {self.data_dir} ({', '.join(self.tables)})")
+        else:
+            logger.warning(f"Local warehouse has no tables: {self.data_dir}")
+
+    def _string_columns(self) -> FrozenSet[str]:
+        """모든 테이블에서 VARCHAR인 컬럼명 (한 테이블이라도 다른 타입이면 제외 - 날짜 파싱 대상 판정용)"""
+        rows = self.db.execute(
+            "SELECT lower(column_name), bool_and(data_type = 'VARCHAR') "
+            "FROM information_schema.columns GROUP BY 1"
+        ).fetchall()
+        return frozenset(name for name, all_varchar in rows if all_varchar)
+
+    @classmethod
+    def get(cls, data_dir: str, threads: Optional[int] = None) -> "LocalWarehouse":
+        """data_dir별 공유 인스턴스 반환"""
+        key = str(Path(data_dir).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(data_dir, threads=threads)
+            return cls._instances[key]
+
+    def connect(self) -> "LocalDuckDBConnection":
+        """풀에 넣을 DB-API 호환 커넥션 생성"""
+        return LocalDuckDBConnection(self.db.cursor(), self.string_columns)
+
+
+class LocalDuckDBCursor:
+    """
+    databricks-sql-connector 커서와 같은 인터페이스의 DuckDB 커서
+
+    execute()에서 Spark SQL을 DuckDB SQL로 변환하고,
+    fetchmany_arrow()로 Arrow 배치를 반환 (DatabricksClient._fetch_arrow와 호환).
+    """
+
+    def __init__(self, connection: Any, string_columns: FrozenSet[str] = frozenset()):
+        self._connection = connection
+        self._string_columns = string_columns
+        self._reader: Optional[pa.RecordBatchReader] = None
+        self._pending: List[pa.RecordBatch] = []
+        self.description: Optional[List[Tuple]] = None
+
+    def execute(self, operation: str, parameters: Optional[Sequence[Any]] = None) -> "LocalDuckDBCursor":
+        translated = translate_spark_sql(operation, self._string_columns)
+        if parameters:
+            self._connection.execute(translated, parameters)
+        else:
+            self._connection.execute(translated)
+
+        # duckdb >= 1.4: to_arrow_reader(), 이전 버전: fetch_record_batch()
+        if hasattr(self._connection, 'to_arrow_reader'):
+            self._reader = self._connection.to_arrow_reader()
+        else:
+            self._reader = self._connection.fetch_record_batch()
+        self._pending = []
+        self.description = [
+            (field.name, str(field.type), None, None, None, None, None)
+            for field in self._reader.schema
+        ]
+        return self
+
+    def fetchmany_arrow(self, size: int) -> pa.Table:
+        """최대 size행을 Arrow Table로 반환 (결과가 끝나면 0행)"""
+        if self._reader is None:
+            raise RuntimeError("execute()가 먼저 호출되어야 합니다")
+
+        batches: List[pa.RecordBatch] = []
+        remaining = size
+        while remaining > 0:
+            if self._pending:
+                batch = self._pending.pop(0)
+            else:
+                try:
+                    batch = self._reader.read_next_batch()
+                except StopIteration:
+                    break
+            if batch.num_rows > remaining:
+                self._pending.insert(0, batch.slice(remaining))
+                batch = batch.slice(0, remaining)
+            batches.append(batch)
+            remaining -= batch.num_rows
+
+        return pa.Table.from_batches(batches, schema=self._reader.schema)
+
+    def fetchall_arrow(self) -> pa.Table:
+        tables = []
+        while True:
+            table = self.fetchmany_arrow(100000)
+            if table.num_rows == 0:
+                break
+            tables.append(table)
+        if not tables:
+            return self._reader.schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def fetchmany(self, size: int) -> List[Tuple]:
+        table = self.fetchmany_arrow(size)
+        columns = [column.to_pylist() for column in table.columns]
+        return list(zip(*columns))
+
+    def fetchall(self) -> List[Tuple]:
+        table = self.fetchall_arrow()
+        columns = [column.to_pylist() for column in table.columns]
+        return list(zip(*columns))
+
+    def close(self) -> None:
+        self._reader = None
+        self._pending = []
+
+
+class LocalDuckDBConnection:
+    """DB-API 커넥션 래퍼 (DuckDB cursor 1개 = 독립 실행 컨텍스트)"""
+
+    def __init__(self, duckdb_connection: Any, string_columns: FrozenSet[str] = frozenset()):
+        self._connection = duckdb_connection
+        self._string_columns = string_columns
+        self.closed = False
+
+    def cursor(self) -> LocalDuckDBCursor:
+        return LocalDuckDBCursor(self._connection, self._string_columns)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._connection.close()
+            self.closed = True
+
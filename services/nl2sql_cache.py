@@ -0,0 +1,399 @@
+"""
+NL2SQL 생성 캐시
+같은 질문(표현만 조금 다른 질문 포함)에 대해 Gemini 호출 없이 이전 SQL 생성 결과를 재사용
+
+- 1단: 정규화된 질의 텍스트 완전 일치 (대소문자/공백/문장부호 차이 무시)
+- 2단: 의미 정규형 일치 (질병/약품 언급 → 코드 패턴/성분, 조사·요청 표현·공백 제거, 숫자 정규화)
+- 키에 프롬프트 템플릿 + 스키마 CSV + 모델 해시(generation context)를 포함 → 프롬프트/스키마 수정 시 자동 무효화
+- 저장: 메모리 LRU + 디스크 JSON (세션/프로세스 간 공유)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.drug_resolver import brand_base
+from utils.logger import setup_logger
+
+logger = setup_logger("nl2sql_cache")
+
+# 2단 정규형에서 떼어낼 격조사/보조사 (긴 것부터), 떼고 남는 길이가 2 이상일 때만
+# 방향/범위/비교/한정 조사 (부터, 까지, 에서, 으로, 보다, 처럼, 만 ...)는 의미가 있으므로 남김
+# ("작년부터" ≠ "작년까지"), 그 뒤에 붙은 보조사만 뗌 ("작년부터는" → "작년부터")
+_PARTICLES = (
+    '이랑', '하고',
+    '의', '은', '는', '이', '가', '을', '를', '에', '과', '와', '도', '랑',
+)
+
+# 정규형 규칙이 바뀌면 올림 (이전 규칙으로 저장된 디스크 항목과 2단 키가 섞이지 않도록)
+_SEMANTIC_FORM_VERSION = 2
+
+# 결과에 영향 없는 요청 표현
+_FILLER_WORDS = {
+    '알려주세요', '알려줘', '알려줄래', '보여주세요', '보여줘', '주세요', '해주세요', '해줘', '구해주세요', '구해줘',
+    '조회해주세요', '조회해줘', '분석해주세요', '분석해줘', '뽑아주세요', '뽑아줘', '찾아주세요', '찾아줘',
+    '좀', '부탁해', '부탁합니다', '부탁드립니다', 'please', 'show', 'me',
+}
+
+_WORD_RE = re.compile(r'[0-9][0-9,]*(?:\.[0-9]+)?|[가-힣]+|[a-z_]+|⟨[^⟩]*⟩')
+_TRAILING_PUNCT_RE = re.compile(r'[\s?!.。~]+$')
+
+
+def normalize_query(query: str) -> str:
+    """1단 키용 정규화 - 유니코드 NFKC, 소문자, 공백 하나로, 끝 문장부호 제거"""
+    text = unicodedata.normalize('NFKC', query).lower()
+    text = ' '.join(text.split())
+    return _TRAILING_PUNCT_RE.sub('', text)
+
+
+def _strip_particle(word: str) -> str:
+    for particle in _PARTICLES:
+        if word.endswith(particle) and len(word) - len(particle) >= 2:
+            return word[:-len(particle)]
+    return word
+
+
+def _canonical_number(text: str) -> str:
+    number = text.replace(',', '')
+    if '.' in number:
+        return repr(float(number))
+    return str(int(number))
+
+
+def semantic_form(query: str, disease_matcher=None, drug_resolver=None) -> str:
+    """
+    2단 키용 의미 정규형
+
+    "고혈압 환자의 성별 분포를 알려주세요" / "고혈압환자 성별분포" → 같은 문자열
+
+    Args:
+        query: 사용자 질의
+        disease_matcher: core.disease_matcher.DiseaseMatcher (질병 언급 → 대표 질병 코드)
+        drug_resolver: core.drug_resolver.DrugResolver (약품 언급 → 표준 성분)
+    """
+    text = normalize_query(query)
+
+    # 엔티티 언급을 표준 토큰으로 치환 (겹치면 먼저 찾은 질병 우선)
+    spans: List[Tuple[int, int, str]] = []
+    if disease_matcher is not None:
+        for mention in disease_matcher.find_mentions(text, per_mention=1):
+            token = mention.diseases[0]['disease_code'] if mention.diseases else mention.keyword
+            spans.append((mention.start, mention.end, f"⟨d:{token}⟩"))
+    if drug_resolver is not None:
+        for match in drug_resolver.resolve(text, limit=20):
+            if any(s < match.end and match.start < e for s, e, _ in spans):
+                continue
+            entry = match.entry
+            # 상품명은 제형 표기를 뗀 기본형 (소론도정 = 소론도), 성분명은 표준 성분 - 상품/성분 질문은 구분
+            token = f"b:{brand_base(entry.keyword)}" if entry.kind == 'brand' else f"m:{entry.ingredient}"
+            spans.append((match.start, match.end, f"⟨{token}⟩"))
+    for start, end, token in sorted(spans, reverse=True):
+        text = text[:start] + f" {token} " + text[end:]
+
+    parts = []
+    for word in _WORD_RE.findall(text):
+        if word in _FILLER_WORDS:
+            continue
+        if word[0].isdigit():
+            parts.append(_canonical_number(word))
+        elif '가' <= word[0] <= '힣':
+            word = _strip_particle(word)
+            if word not in _FILLER_WORDS and word not in _PARTICLES:
+                parts.append(word)
+        else:
+            parts.append(word)
+    return ''.join(parts)
+
+
+_file_digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(path: Path) -> str:
+    """파일 내용 SHA-256 (크기/mtime이 같으면 이전 값 재사용)"""
+    stat = path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+    key = str(path.resolve())
+    with _file_digests_lock:
+        cached = _file_digests.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    with _file_digests_lock:
+        _file_digests[key] = (signature, digest)
+    return digest
+
+
+def generation_context_hash(input_paths: Iterable[Path], model: str = "") -> str:
+    """
+    생성 결과에 영향을 주는 입력 파일 내용 + 모델 이름의 해시 (캐시 키 접두사)
+
+    Args:
+        input_paths: 프롬프트 템플릿 / 스키마 CSV / 참조 데이터 등 (디렉토리는 하위 파일 전체, 없는 경로는 무시)
+        model: LLM 모델 이름
+    """
+    files: List[Path] = []
+    for path in input_paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(p for p in sorted(path.rglob('*')) if p.is_file() and '__pycache__' not in p.parts)
+        elif path.exists():
+            files.append(path)
+
+    hasher = hashlib.sha256(model.encode('utf-8'))
+    for path in files:
+        hasher.update(b'\x00' + path.as_posix().encode('utf-8') + b'\x00' + _file_digest(path).encode())
+    return hasher.hexdigest()
+
+
+@dataclass
+class NL2SQLCacheMetrics:
+    """NL2SQL 캐시 누적 지표"""
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    expirations: int = 0
+    time_saved: float = 0.0  # 캐시 적중으로 생략된 LLM 생성 시간 합계 (초)
+
+
+class NL2SQLCache:
+    """
+    NL2SQL 생성 결과 캐시 (메모리 LRU + 디스크 JSON)
+
+    사용 예:
+        cache = NL2SQLCache(disk_dir="data/nl2sql_cache")
+        hit = cache.get(query, context)  # (payload, {'tier', 'storage', 'age', 'query'}) or None
+        cache.put(query, context, payload, generation_time=3.2)
+    """
+
+    def __init__(
+        self,
+        disk_dir: Optional[str] = "data/nl2sql_cache",
+        memory_max_entries: int = 512,
+        disk_max_entries: int = 20000,
+        ttl: float = 7 * 24 * 3600,
+        semantic: bool = True,
+        disease_matcher=None,
+        drug_resolver=None
+    ) -> None:
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.memory_max_entries = memory_max_entries
+        self.disk_max_entries = disk_max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.disease_matcher = disease_matcher
+        self.drug_resolver = drug_resolver
+
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.metrics = NL2SQLCacheMetrics()
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def iter_keys(self, query: str, context: str) -> Iterator[Tuple[str, str]]:
+        """('exact', 1단 키), ('semantic', 2단 키) 순 - 2단 정규형은 필요할 때만 계산"""
+        yield 'exact', self._hash(context, 'exact', normalize_query(query))
+        if self.semantic:
+            form = semantic_form(query, self.disease_matcher, self.drug_resolver)
+            if form:
+                yield 'semantic', self._hash(context, f'semantic-v{_SEMANTIC_FORM_VERSION}', form)
+
+    def get(self, query: str, context: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        캐시 조회 (1단 → 2단)
+
+        Returns:
+            (저장된 payload, {'tier': 'exact'|'semantic', 'storage': 'memory'|'disk', 'age', 'query'}) 또는 None
+        """
+        now = time.time()
+        for tier, key in self.iter_keys(query, context):
+            storage = 'memory'
+            with self._lock:
+                record = self._memory.get(key)
+                if record is not None:
+                    self._memory.move_to_end(key)
+            if record is None:
+                record = self._load_disk(key)
+                storage = 'disk'
+            if record is None:
+                continue
+
+            if now - record['created_at'] >= self.ttl:
+                with self._lock:
+                    self._memory.pop(key, None)
+                    self.metrics.expirations += 1
+                self._drop_disk(key)
+                continue
+
+            with self._lock:
+                if storage == 'disk':
+                    self._store_memory(key, record)
+                if tier == 'exact':
+                    self.metrics.exact_hits += 1
+                else:
+                    self.metrics.semantic_hits += 1
+                self.metrics.time_saved += record.get('generation_time', 0.0)
+            return record['payload'], {
+                'tier': tier,
+                'storage': storage,
+                'age': round(now - record['created_at'], 1),
+                'query': record.get('query', '')
+            }
+
+        with self._lock:
+            self.metrics.misses += 1
+        return None
+
+    def put(self, query: str, context: str, payload: Dict[str, Any], generation_time: float = 0.0) -> None:
+        """생성 결과 저장 (1단/2단 키 모두)"""
+        if self.ttl <= 0:
+            return
+        record = {
+            'created_at': time.time(),
+            'generation_time': generation_time,
+            'query': query,
+            'payload': payload,
+        }
+        keys = [key for _, key in self.iter_keys(query, context)]
+        with self._lock:
+            for key in keys:
+                self._store_memory(key, record)
+            self.metrics.stores += 1
+        for key in keys:
+            self._write_disk(key, record)
+        self._enforce_disk_limit()
+
+    def clear(self) -> int:
+        """전체 캐시 제거 - 제거된 디스크 항목 수"""
+        removed = 0
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir:
+                for path in self.disk_dir.glob("*.json"):
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        logger.info(f"NL2SQL cache cleared: {removed} entries")
+        return removed
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """캐시 지표 스냅샷 (모니터링 탭용)"""
+        with self._lock:
+            metrics = asdict(self.metrics)
+            hits = self.metrics.exact_hits + self.metrics.semantic_hits
+            lookups = hits + self.metrics.misses
+            metrics.update({
+                'hits': hits,
+                'hit_rate': round(hits / lookups * 100, 1) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': len(list(self.disk_dir.glob("*.json"))) if self.disk_dir else 0,
+            })
+        metrics['time_saved'] = round(metrics['time_saved'], 2)
+        return metrics
+
+    # ---------- internal ----------
+
+    @staticmethod
+    def _hash(context: str, tier: str, text: str) -> str:
+        return hashlib.sha256(f"{context}\x00{tier}\x00{text}".encode('utf-8')).hexdigest()
+
+    def _store_memory(self, key: str, record: Dict[str, Any]) -> None:
+        self._memory[key] = record
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.disk_dir / f"{key}.json" if self.disk_dir else None
+
+    def _write_disk(self, key: str, record: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            tmp_path.replace(path)  # 원자적 교체 (동시 읽기 보호)
+        except Exception as e:
+            logger.warning(f"Failed to write NL2SQL cache entry {key[:12]}: {e}")
+
+    def _load_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read NL2SQL cache entry {key[:12]}: {e}")
+            return None
+
+    def _drop_disk(self, key: str) -> None:
+        path = self._disk_path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def _enforce_disk_limit(self) -> None:
+        """디스크 항목 수 초과 시 가장 오래된 항목부터 제거"""
+        if not self.disk_dir:
+            return
+        files = list(self.disk_dir.glob("*.json"))
+        if len(files) <= self.disk_max_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:len(files) - self.disk_max_entries]:
+            path.unlink(missing_ok=True)
+
+
+_shared_cache: Optional[NL2SQLCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_nl2sql_cache() -> Optional[NL2SQLCache]:
+    """
+    프로세스 공용 NL2SQLCache (config.yaml -> nl2sql_cache.* 설정 사용)
+
+    설정 예:
+        nl2sql_cache:
+          enabled: true
+          disk_dir: data/nl2sql_cache
+          memory_max_entries: 512
+          ttl: 604800
+          semantic: true
+
+    Returns:
+        NL2SQLCache, enabled: false면 None
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            from config.config_loader import get_config, ConfigurationError
+            try:
+                settings = get_config().get('nl2sql_cache', {}) or {}
+            except ConfigurationError:
+                settings = {}
+            if not settings.get('enabled', True):
+                return None
+
+            from core.disease_matcher import get_disease_matcher
+            from core.drug_resolver import get_drug_resolver
+            _shared_cache = NL2SQLCache(
+                disk_dir=settings.get('disk_dir', "data/nl2sql_cache"),
+                memory_max_entries=int(settings.get('memory_max_entries', 512)),
+                disk_max_entries=int(settings.get('disk_max_entries', 20000)),
+                ttl=float(settings.get('ttl', 7 * 24 * 3600)),
+                semantic=bool(settings.get('semantic', True)),
+                disease_matcher=get_disease_matcher(),
+                drug_resolver=get_drug_resolver()
+            )
+        return _shared_cache
@@ -0,0 +1,449 @@
+"""
+SQL 결과 캐시
+정규화된 SQL 해시를 키로 하는 2단 캐시 (메모리 LRU + 디스크 Arrow IPC)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.logger import setup_logger
+
+logger = setup_logger("query_cache")
+
+# 문자열 리터럴 / 백틱 식별자 / 주석을 구분하는 토큰 패턴
+_SQL_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<string>'(?:[^'\\]|\\.|'')*')      # '...' 문자열 리터럴
+    | (?P<ident>`[^`]*`)                   # `한글 별칭`
+    | (?P<line_comment>--[^\n]*)           # -- 한 줄 주석
+    | (?P<block_comment>/\*.*?\*/)         # /* 블록 주석 */
+    | (?P<space>\s+)
+    """,
+    re.VERBOSE | re.DOTALL
+)
+
+
+def normalize_sql(sql_query: str) -> str:
+    """
+    캐시 키용 SQL 정규화
+
+    주석을 제거하고 공백을 하나로 합침. 문자열 리터럴과 백틱 식별자 내부는 그대로 유지.
+    """
+    parts = []
+    pos = 0
+    for match in _SQL_TOKEN_PATTERN.finditer(sql_query):
+        if match.start() > pos:
+            parts.append(sql_query[pos:match.start()])
+        if match.lastgroup in ('string', 'ident'):
+            parts.append(match.group())
+        elif parts and parts[-1] != ' ':
+            # 공백/주석 구간은 공백 하나로 (연속 구간은 합침)
+            parts.append(' ')
+        pos = match.end()
+    parts.append(sql_query[pos:])
+
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+def make_cache_key(sql_query: str, variant: str = "") -> str:
+    """
+    정규화된 SQL (+ max_rows 등 결과에 영향을 주는 옵션)의 SHA-256 해시
+
+    Args:
+        sql_query: SQL 쿼리
+        variant: 실행 대상 + 결과 형태를 바꾸는 옵션 문자열 (예: "databricks:<host><http_path>:max_rows=10000")
+    """
+    payload = normalize_sql(sql_query) + "\x00" + variant
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CacheMetrics:
+    """캐시 누적 지표"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0  # 메모리 LRU에서 밀려난 항목 수
+    expirations: int = 0  # TTL 만료로 제거된 항목 수
+    bytes_saved: int = 0  # 캐시 적중으로 웨어하우스에서 다시 가져오지 않은 바이트
+    time_saved: float = 0.0  # 캐시 적중으로 절약된 원래 실행 시간 합계 (초)
+
+
+@dataclass
+class _CacheEntry:
+    table: pa.Table
+    created_at: float
+    ttl: float
+    category: str
+    execution_time: float
+    sql_hash: str  # variant와 무관한 SQL 해시 (쿼리 단위 무효화용)
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def expired(self, now: float) -> bool:
+        return now - self.created_at >= self.ttl
+
+
+class QueryResultCache:
+    """
+    SQL 결과 캐시 (메모리 LRU + 디스크 Arrow IPC)
+
+    - 메모리 티어: 바이트 크기 기준 LRU (memory_max_bytes 초과 시 오래된 항목부터 제거)
+    - 디스크 티어: {key}.arrow + {key}.json 메타데이터, 프로세스 재시작 후에도 유지
+    - TTL: 카테고리별 (예: pool / profile / nl2sql), 미지정 시 default_ttl
+
+    사용 예:
+        cache = QueryResultCache(disk_dir="data/query_cache")
+        cache.put(sql, table, category="profile", execution_time=12.3)
+        hit = cache.get(sql)  # (table, metadata) or None
+    """
+
+    def __init__(
+        self,
+        disk_dir: Optional[str] = "data/query_cache",
+        memory_max_bytes: int = 256 * 1024 * 1024,
+        disk_max_bytes: int = 2 * 1024 * 1024 * 1024,
+        default_ttl: float = 3600,
+        ttl_by_category: Optional[Dict[str, float]] = None
+    ) -> None:
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.default_ttl = default_ttl
+        self.ttl_by_category: Dict[str, float] = dict(ttl_by_category or {})
+
+        self._memory: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self.metrics = CacheMetrics()
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def ttl_for(self, category: Optional[str]) -> float:
+        """카테고리별 TTL (초)"""
+        return self.ttl_by_category.get(category or '', self.default_ttl)
+
+    def get(self, sql_query: str, variant: str = "") -> Optional[Tuple[pa.Table, Dict[str, Any]]]:
+        """
+        캐시 조회
+
+        Returns:
+            (pyarrow.Table, {'tier', 'category', 'age', 'execution_time'}) 또는 None
+        """
+        key = make_cache_key(sql_query, variant)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.expired(now):
+                    self._drop_memory(key)
+                    self._drop_disk(key)
+                    self.metrics.expirations += 1
+                else:
+                    self._memory.move_to_end(key)
+                    return entry.table, self._record_hit(entry, 'memory', now)
+
+        entry = self._load_disk(key)
+        with self._lock:
+            if entry is not None:
+                if entry.expired(now):
+                    self._drop_disk(key)
+                    self.metrics.expirations += 1
+                else:
+                    self._store_memory(key, entry)
+                    return entry.table, self._record_hit(entry, 'disk', now)
+
+            self.metrics.misses += 1
+            return None
+
+    def put(
+        self,
+        sql_query: str,
+        table: pa.Table,
+        category: Optional[str] = None,
+        execution_time: float = 0.0,
+        variant: str = ""
+    ) -> None:
+        """결과 저장 (메모리 + 디스크)"""
+        key = make_cache_key(sql_query, variant)
+        entry = _CacheEntry(
+            table=table,
+            created_at=time.time(),
+            ttl=self.ttl_for(category),
+            category=category or '',
+            execution_time=execution_time,
+            sql_hash=make_cache_key(sql_query)
+        )
+        if entry.ttl <= 0:
+            return
+
+        with self._lock:
+            self._store_memory(key, entry)
+            self.metrics.stores += 1
+
+        self._write_disk(key, entry, sql_query)
+
+    def invalidate(self, sql_query: Optional[str] = None, category: Optional[str] = None) -> int:
+        """
+        수동 무효화
+
+        Args:
+            sql_query: 지정 시 해당 쿼리의 모든 변형(max_rows 등) 제거
+            category: 지정 시 해당 카테고리 전체 제거
+            (둘 다 None이면 전체 제거)
+
+        Returns:
+            제거된 항목 수
+        """
+        sql_hash = make_cache_key(sql_query) if sql_query is not None else None
+
+        def matches(entry_category: str, entry_sql_hash: str) -> bool:
+            if sql_hash is not None and entry_sql_hash != sql_hash:
+                return False
+            if category is not None and entry_category != category:
+                return False
+            return True
+
+        with self._lock:
+            keys = set(
+                key for key, entry in self._memory.items()
+                if matches(entry.category, entry.sql_hash)
+            )
+            for key, meta in self._iter_disk_metadata():
+                if matches(meta.get('category', ''), meta.get('sql_hash', '')):
+                    keys.add(key)
+
+            for key in keys:
+                self._drop_memory(key)
+                self._drop_disk(key)
+
+        logger.info(
+            f"Query cache invalidated: {len(keys)} entries "
+            f"(category={category or 'ALL'}, query={'yes' if sql_query else 'ALL'})"
+        )
+        return len(keys)
+
+    def clear(self) -> int:
+        """전체 캐시 제거"""
+        return self.invalidate()
+
+    def purge_expired(self) -> int:
+        """만료된 디스크/메모리 항목 정리"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for key in [k for k, e in self._memory.items() if e.expired(now)]:
+                self._drop_memory(key)
+                removed += 1
+            for key, meta in self._iter_disk_metadata():
+                if now - meta.get('created_at', 0) >= meta.get('ttl', 0):
+                    self._drop_disk(key)
+                    removed += 1
+            self.metrics.expirations += removed
+        return removed
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """캐시 지표 스냅샷 (모니터링 탭용)"""
+        with self._lock:
+            metrics = asdict(self.metrics)
+            hits = self.metrics.memory_hits + self.metrics.disk_hits
+            lookups = hits + self.metrics.misses
+            metrics.update({
+                'hits': hits,
+                'hit_rate': round(hits / lookups * 100, 1) if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_max_bytes': self.memory_max_bytes,
+                'disk_entries': 0,
+                'disk_bytes': 0,
+            })
+            if self.disk_dir:
+                arrow_files = list(self.disk_dir.glob("*.arrow"))
+                metrics['disk_entries'] = len(arrow_files)
+                metrics['disk_bytes'] = sum(f.stat().st_size for f in arrow_files if f.exists())
+        metrics['time_saved'] = round(metrics['time_saved'], 2)
+        return metrics
+
+    # ---------- internal ----------
+
+    def _record_hit(self, entry: _CacheEntry, tier: str, now: float) -> Dict[str, Any]:
+        if tier == 'memory':
+            self.metrics.memory_hits += 1
+        else:
+            self.metrics.disk_hits += 1
+        self.metrics.bytes_saved += entry.nbytes
+        self.metrics.time_saved += entry.execution_time
+        return {
+            'tier': tier,
+            'category': entry.category,
+            'age': round(now - entry.created_at, 1),
+            'execution_time': entry.execution_time
+        }
+
+    def _store_memory(self, key: str, entry: _CacheEntry) -> None:
+        if entry.nbytes > self.memory_max_bytes:
+            return  # 메모리 한도보다 큰 결과는 디스크에만 보관
+        self._drop_memory(key)
+        self._memory[key] = entry
+        self._memory_bytes += entry.nbytes
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            old_key, old_entry = self._memory.popitem(last=False)
+            self._memory_bytes -= old_entry.nbytes
+            self.metrics.evictions += 1
+
+    def _drop_memory(self, key: str) -> None:
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.nbytes
+
+    def _disk_path(self, key: str, suffix: str) -> Optional[Path]:
+        if not self.disk_dir:
+            return None
+        return self.disk_dir / f"{key}.{suffix}"
+
+    def _write_disk(self, key: str, entry: _CacheEntry, sql_query: str) -> None:
+        if not self.disk_dir:
+            return
+        data_path = self._disk_path(key, 'arrow')
+        meta_path = self._disk_path(key, 'json')
+        # 프로세스/스레드별 임시 파일 (같은 키를 동시에 쓰는 쪽과 섞이지 않도록)
+        tmp_path = data_path.with_name(f"{data_path.name}.tmp{os.getpid()}.{threading.get_ident()}")
+        try:
+            feather.write_feather(entry.table, tmp_path, compression='lz4')
+            tmp_path.replace(data_path)  # 원자적 교체 (동시 읽기 보호)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'created_at': entry.created_at,
+                    'ttl': entry.ttl,
+                    'category': entry.category,
+                    'execution_time': entry.execution_time,
+                    'sql_hash': entry.sql_hash,
+                    'row_count': entry.table.num_rows,
+                    'nbytes': entry.nbytes,
+                    'sql_preview': normalize_sql(sql_query)[:200]
+                }, f, ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"Failed to write query cache entry {key[:12]}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._enforce_disk_limit()
+
+    def _load_disk(self, key: str) -> Optional[_CacheEntry]:
+        if not self.disk_dir:
+            return None
+        data_path = self._disk_path(key, 'arrow')
+        meta_path = self._disk_path(key, 'json')
+        if not (data_path.exists() and meta_path.exists()):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            table = feather.read_table(data_path, memory_map=True)
+        except Exception as e:
+            logger.warning(f"Failed to read query cache entry {key[:12]}: {e}")
+            return None
+        return _CacheEntry(
+            table=table,
+            created_at=meta['created_at'],
+            ttl=meta['ttl'],
+            category=meta.get('category', ''),
+            execution_time=meta.get('execution_time', 0.0),
+            sql_hash=meta.get('sql_hash', '')
+        )
+
+    def _drop_disk(self, key: str) -> None:
+        if not self.disk_dir:
+            return
+        for suffix in ('arrow', 'json'):
+            path = self._disk_path(key, suffix)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _iter_disk_metadata(self):
+        if not self.disk_dir:
+            return
+        for meta_path in self.disk_dir.glob("*.json"):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    yield meta_path.stem, json.load(f)
+            except Exception:
+                continue
+
+    def _enforce_disk_limit(self) -> None:
+        """디스크 용량 초과 시 가장 오래된 항목부터 제거 (호출자가 잠금 보유)"""
+        files = []
+        for path in self.disk_dir.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # 다른 스레드/프로세스가 glob 이후 지운 파일
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.disk_max_bytes:
+                break
+            total -= size
+            self._drop_disk(path.stem)
+
+
+_shared_cache: Optional[QueryResultCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryResultCache:
+    """
+    프로세스 공용 QueryResultCache (config.yaml -> query_cache.* 설정 사용)
+
+    설정 예:
+        query_cache:
+          enabled: true
+          disk_dir: data/query_cache
+          memory_max_mb: 256
+          disk_max_mb: 2048
+          ttl:
+            default: 3600
+            pool: 21600
+            profile: 86400
+            nl2sql: 600
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            from config.config_loader import get_config, ConfigurationError
+            try:
+                config = get_config()
+                settings = config.get('query_cache', {}) or {}
+            except ConfigurationError:
+                settings = {}
+
+            ttl = dict(settings.get('ttl', {}) or {})
+            default_ttl = ttl.pop('default', 3600)
+            _shared_cache = QueryResultCache(
+                disk_dir=settings.get('disk_dir', "data/query_cache"),
+                memory_max_bytes=int(settings.get('memory_max_mb', 256)) * 1024 * 1024,
+                disk_max_bytes=int(settings.get('disk_max_mb', 2048)) * 1024 * 1024,
+                default_ttl=default_ttl,
+                ttl_by_category=ttl
+            )
+        return _shared_cache
@@ -69,7 +69,7 @@ class SchemaChatbot:
             )
 
             # Step 4: Get LLM response
-            response = self.gemini_service.generate_content(prompt)
+            response = self.gemini_service.generate_content(prompt, caller="schema_chatbot")
             answer = response.text
 
             # Step 5: Extract relevant tables and columns from schema
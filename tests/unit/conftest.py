@@ -0,0 +1,22 @@
+"""
+Shared fixtures for unit tests
+"""
+
+import pytest
+
+from services.databricks_client import ConnectionPool, DatabricksClient
+
+
+@pytest.fixture
+def make_client():
+    """Builds DatabricksClient instances over a given connect() factory; closed at teardown"""
+    clients = []
+
+    def make(connect, max_size=2, **kwargs):
+        client = DatabricksClient.from_pool(ConnectionPool(connect=connect, max_size=max_size), **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
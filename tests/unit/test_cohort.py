@@ -0,0 +1,190 @@
+"""
+Unit tests for shared cohort materialization
+Recipes rendered against a materialized cohort must return the same rows as the full scan
+"""
+
+import gc
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from core.sql_template_engine import SQLTemplateEngine
+from pipelines.cohort import CohortMaterializer, CohortSpec, MaterializedCohort
+
+
+SPEC = CohortSpec('당뇨', '2023-03-01', '2025-06-30')
+
+
+def make_cohort(spec=SPEC, table_name='cohort_test'):
+    return MaterializedCohort(spec=spec, table_name=table_name, visit_count=0, patient_count=0, build_time=0.0)
+
+
+class TestCohortSpec:
+    """Test suite for CohortSpec"""
+
+    def test_table_name_is_stable_per_spec(self):
+        """Same (keyword, window) maps to the same table; schema is prefixed"""
+        assert SPEC.table_name() == CohortSpec('당뇨', '2023-03-01', '2025-06-30').table_name()
+        assert SPEC.table_name() != CohortSpec('당뇨', '2023-03-01', '2025-07-01').table_name()
+        assert SPEC.table_name('scratch').startswith('scratch.cohort_')
+
+    def test_covers_same_keyword_within_years(self):
+        """Only the same keyword with a window inside the cohort years is covered"""
+        assert SPEC.covers('당뇨', '2023-01-01', '2025-12-31')
+        assert not SPEC.covers('고혈압', '2023-03-01', '2025-06-30')
+        assert not SPEC.covers('당뇨', '2022-12-31', '2025-06-30')
+        assert not SPEC.covers('당뇨', '2023-03-01', None)
+
+    def test_quote_in_keyword_rejected(self):
+        """Keywords are inlined into the CTAS, so quotes are refused"""
+        with pytest.raises(ValueError):
+            CohortSpec("당뇨' OR 1=1 --", '2023-01-01', '2025-01-01')
+
+
+class TestCohortTemplateFunction:
+    """Test suite for cohort_visits() in SQLTemplateEngine"""
+
+    TEMPLATE = "SELECT * FROM {{ cohort_visits(disease_name_keyword, start_date, end_date) }} bt"
+    PARAMS = {'disease_name_keyword': '당뇨', 'start_date': '2023-03-01', 'end_date': '2025-06-30'}
+
+    def test_without_cohort_scans_base_table(self):
+        """No cohort renders the original basic_treatment scan"""
+        assert SQLTemplateEngine().render(self.TEMPLATE, self.PARAMS) == "SELECT * FROM basic_treatment bt"
+
+    def test_matching_cohort_is_referenced(self):
+        """A covering cohort replaces the base table"""
+        sql = SQLTemplateEngine().render(self.TEMPLATE, self.PARAMS, cohort=make_cohort())
+        assert sql == "SELECT * FROM cohort_test bt"
+
+    def test_other_disease_falls_back(self):
+        """A cohort for another disease is ignored"""
+        params = dict(self.PARAMS, disease_name_keyword='고혈압')
+        sql = SQLTemplateEngine().render(self.TEMPLATE, params, cohort=make_cohort())
+        assert sql == "SELECT * FROM basic_treatment bt"
+
+
+@pytest.fixture
+def local_client(make_client, tmp_path):
+    """DatabricksClient backed by a local DuckDB warehouse with treatments and prescriptions"""
+    pytest.importorskip("duckdb")
+    pytest.importorskip("sqlglot")
+    from services.local_executor import LocalWarehouse
+
+    pq.write_table(pa.table({
+        'user_id': [1, 1, 2, 3, 4, 5],
+        'res_disease_name': ['제2형 당뇨병', '제2형 당뇨병', '고혈압', '당뇨병성 신증', '제2형 당뇨병', '제2형 당뇨병'],
+        'res_treat_start_date': ['20230105', '20240210', '20230301', '20250101', '20210101', '20240505'],
+        'deleted': [False, False, False, False, False, True],
+    }), tmp_path / 'basic_treatment.parquet')
+    pq.write_table(pa.table({
+        'user_id': [1, 1, 2, 3, 4],
+        'res_treat_start_date': ['20230105', '20240210', '20230301', '20250101', '20210101'],
+        'res_ingredients': ['metformin', 'metformin', 'amlodipine', 'glimepiride', 'metformin'],
+        'deleted': [False, False, False, False, False],
+    }), tmp_path / 'prescribed_drug.parquet')
+
+    return make_client(LocalWarehouse(str(tmp_path)).connect, executor='local')
+
+
+@pytest.fixture
+def new_materializer(local_client):
+    """CohortMaterializer factory whose tables are dropped before the client closes"""
+    created = []
+
+    def make(**kwargs):
+        materializer = CohortMaterializer(local_client, **kwargs)
+        created.append(materializer)
+        return materializer
+
+    yield make
+    for materializer in created:
+        materializer.drop_all()
+
+
+class TestCohortMaterializer:
+    """Test suite for CohortMaterializer against the local executor"""
+
+    def test_materialize_counts_and_reuse(self, local_client, new_materializer):
+        """The cohort is built once; a second request reuses it"""
+        materializer = new_materializer()
+        calls = []
+        execute = local_client.execute_query
+        local_client.execute_query = lambda sql, **kw: calls.append(sql) or execute(sql, **kw)
+
+        cohort = materializer.materialize(SPEC)
+        again = materializer.materialize(CohortSpec('당뇨', '2023-03-01', '2025-06-30'))
+
+        assert again is cohort
+        assert (cohort.patient_count, cohort.visit_count) == (2, 3)
+        assert sum(sql.startswith('CREATE') for sql in calls) == 1
+
+    def test_requires_scratch_schema_on_warehouse(self, make_client):
+        """Without a schema, only the local executor may create cohort tables"""
+        warehouse_client = make_client(connect=None, executor='databricks')
+
+        with pytest.raises(ValueError):
+            CohortMaterializer(warehouse_client)
+        assert CohortMaterializer(warehouse_client, schema='scratch').schema == 'scratch'
+
+    def test_expired_cohorts_dropped(self, local_client, new_materializer):
+        """Tables are dropped once TTL + grace has passed, and all of them on drop_all()"""
+        materializer = new_materializer(ttl_seconds=60, drop_grace_seconds=30)
+        old = materializer.materialize(SPEC)
+        fresh = materializer.materialize(CohortSpec('고혈압', '2023-03-01', '2025-06-30'))
+
+        old.created_at -= 60
+        assert materializer.drop_expired() == 0
+        old.created_at -= 30
+        assert materializer.drop_expired() == 1
+
+        count = f"SELECT COUNT(*) FROM {{}}"
+        assert not local_client.execute_query(count.format(old.table_name), use_cache=False)['success']
+        assert local_client.execute_query(count.format(fresh.table_name), use_cache=False)['success']
+        assert materializer.drop_all() == 1
+        assert not local_client.execute_query(count.format(fresh.table_name), use_cache=False)['success']
+
+    def test_rebuild_keeps_old_table_during_grace(self, local_client, new_materializer):
+        """A rebuild after TTL gets a new table; the old one survives until TTL + grace"""
+        materializer = new_materializer(ttl_seconds=60, drop_grace_seconds=30)
+        first = materializer.materialize(SPEC)
+        first.created_at -= 61
+        second = materializer.materialize(SPEC)
+
+        count = "SELECT COUNT(*) FROM {}"
+        assert second.table_name != first.table_name
+        assert local_client.execute_query(count.format(first.table_name), use_cache=False)['success']
+        first.created_at -= 30
+        assert materializer.drop_expired() == 1
+        assert materializer.get(SPEC) is second
+
+    def test_materializers_own_their_tables(self, local_client):
+        """Two sessions get separate tables; one dropping or being collected leaves the other intact"""
+        session_a = CohortMaterializer(local_client)
+        session_b = CohortMaterializer(local_client)
+        table_a = session_a.materialize(SPEC).table_name
+        table_b = session_b.materialize(SPEC).table_name
+
+        count = "SELECT COUNT(*) FROM {}"
+        assert table_a != table_b
+        assert session_a.drop_all() == 1
+        assert local_client.execute_query(count.format(table_b), use_cache=False)['success']
+
+        del session_b
+        gc.collect()
+        assert not local_client.execute_query(count.format(table_b), use_cache=False)['success']
+
+    def test_recipe_results_unchanged(self, local_client, new_materializer):
+        """A core recipe returns the same rows with and without the cohort"""
+        engine = SQLTemplateEngine('recipes')
+        params = {'disease_name_keyword': '당뇨', 'start_date': '2023-03-01', 'end_date': '2025-06-30', 'top_n': 5}
+        cohort = new_materializer().materialize(SPEC)
+
+        full_sql = engine.render_template('get_top_prescribed_ingredients_by_disease', params)
+        cohort_sql = engine.render_template('get_top_prescribed_ingredients_by_disease', params, cohort=cohort)
+        assert cohort.table_name in cohort_sql and 'FROM basic_treatment' in full_sql
+
+        full = local_client.execute_query(full_sql, use_cache=False)
+        shared = local_client.execute_query(cohort_sql, use_cache=False)
+        assert full['success'] and shared['success'], (full['error_message'], shared['error_message'])
+        assert full['data'].to_dict('records') == shared['data'].to_dict('records')
@@ -0,0 +1,414 @@
+"""
+Unit tests for DatabricksClient building blocks
+Tests connection pooling and result fetching without a live SQL Warehouse
+"""
+
+import asyncio
+import io
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from core.exceptions import QueryExecutionError
+from services.databricks_client import (
+    ConnectionPool,
+    DatabricksClient,
+    PoolTimeoutError,
+    SingleFlight,
+    arrow_to_pandas,
+)
+
+
+RESULTS = {
+    "SELECT gender, cnt FROM t": (
+        ['gender', 'cnt'],
+        [('MAN', 3), ('WOMAN', None), ('WOMAN', 5)]
+    ),
+    "SELECT id FROM visits": (
+        ['id'],
+        [(i,) for i in range(25)]
+    ),
+}
+
+
+class FakeCursor:
+    """Minimal DB-API cursor stand-in (row tuples only, no Arrow fetch)"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = None
+        self._rows = []
+
+    def execute(self, query):
+        if not self.connection.healthy:
+            raise ConnectionError("session expired")
+        if query not in RESULTS and query != "SELECT 1":
+            raise RuntimeError(f"[TABLE_OR_VIEW_NOT_FOUND] {query}")
+        self.connection.executed.append(query)
+        columns, rows = RESULTS.get(query, (['1'], [(1,)]))
+        self.description = [(name, None) for name in columns]
+        self._rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def close(self):
+        pass
+
+
+class FakeArrowCursor(FakeCursor):
+    """Cursor exposing the databricks-sql-connector Arrow fetch API"""
+
+    def fetchmany_arrow(self, size):
+        rows = self.fetchmany(size)
+        return pa.Table.from_pydict({
+            desc[0]: [row[i] for row in rows]
+            for i, desc in enumerate(self.description)
+        })
+
+
+class FakeConnection:
+    """Minimal DB-API connection stand-in"""
+
+    cursor_class = FakeCursor
+
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+        self.executed = []
+
+    def cursor(self):
+        return self.cursor_class(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeArrowConnection(FakeConnection):
+    cursor_class = FakeArrowCursor
+
+
+@pytest.fixture
+def client(make_client):
+    """DatabricksClient wired to fake connections (bypasses config.yaml)"""
+    return make_client(FakeArrowConnection, max_size=4)
+
+
+class TestConnectionPool:
+    """Test suite for ConnectionPool"""
+
+    def test_reuses_warm_connection(self):
+        """Sequential checkouts should reuse a single connection"""
+        pool = ConnectionPool(connect=FakeConnection, max_size=4)
+
+        with pool.connection() as conn1:
+            pass
+        with pool.connection() as conn2:
+            pass
+
+        assert conn1 is conn2
+        metrics = pool.get_metrics()
+        assert metrics['creations'] == 1
+        assert metrics['checkouts'] == 2
+
+    def test_max_size_blocks_and_counts_waits(self):
+        """Checkout beyond max_size should wait for a release"""
+        pool = ConnectionPool(connect=FakeConnection, max_size=1, checkout_timeout=5)
+        entry = pool.acquire()
+
+        def release_later():
+            time.sleep(0.05)
+            pool.release(entry)
+
+        threading.Thread(target=release_later).start()
+        with pool.connection() as conn:
+            assert conn is entry.connection
+
+        metrics = pool.get_metrics()
+        assert metrics['waits'] == 1
+        assert metrics['creations'] == 1
+
+    def test_checkout_timeout(self):
+        """Checkout should fail with PoolTimeoutError when pool stays full"""
+        pool = ConnectionPool(connect=FakeConnection, max_size=1, checkout_timeout=0.05)
+        pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+    def test_idle_eviction_keeps_min_size(self):
+        """Idle connections past idle_timeout are closed down to min_size"""
+        pool = ConnectionPool(connect=FakeConnection, min_size=1, max_size=3, idle_timeout=0.01)
+        entries = [pool.acquire() for _ in range(3)]
+        for entry in entries:
+            pool.release(entry)
+
+        time.sleep(0.02)
+        with pool.connection():
+            pass
+
+        metrics = pool.get_metrics()
+        assert metrics['size'] == 1
+        assert metrics['evictions'] == 2
+        assert sum(e.connection.closed for e in entries) == 2
+
+    def test_health_check_replaces_dead_connection(self):
+        """A connection failing SELECT 1 after idle should be replaced"""
+        pool = ConnectionPool(connect=FakeConnection, max_size=2, health_check_interval=0)
+
+        with pool.connection() as conn1:
+            pass
+        conn1.healthy = False
+
+        with pool.connection() as conn2:
+            pass
+
+        assert conn2 is not conn1
+        assert conn1.closed
+        metrics = pool.get_metrics()
+        assert metrics['health_check_failures'] == 1
+        assert metrics['size'] == 1
+
+    def test_error_in_block_flags_health_check(self):
+        """An exception inside the block should trigger a health check on next checkout"""
+        pool = ConnectionPool(connect=FakeConnection, max_size=1, health_check_interval=3600)
+
+        with pytest.raises(ValueError):
+            with pool.connection():
+                raise ValueError("bad SQL")
+
+        with pool.connection() as conn:
+            assert conn.executed == ["SELECT 1"]
+
+        assert pool.get_metrics()['health_checks'] == 1
+
+    def test_failed_connect_frees_slot(self):
+        """A failing connect() must not leak pool capacity"""
+        attempts = []
+
+        def flaky_connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("warehouse starting")
+            return FakeConnection()
+
+        pool = ConnectionPool(connect=flaky_connect, max_size=1, checkout_timeout=0.05)
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+
+        with pool.connection() as conn:
+            assert isinstance(conn, FakeConnection)
+
+
+class TestArrowFetch:
+    """Test suite for Arrow-native result fetching"""
+
+    def test_execute_query_pandas_default(self, client):
+        """Default result_format returns a pandas DataFrame"""
+        result = client.execute_query("SELECT gender, cnt FROM t")
+
+        assert result['success']
+        assert isinstance(result['data'], pd.DataFrame)
+        assert result['row_count'] == 3
+        assert list(result['data'].columns) == ['gender', 'cnt']
+
+    def test_execute_query_arrow_format(self, client):
+        """result_format='arrow' hands back the pyarrow.Table"""
+        result = client.execute_query("SELECT gender, cnt FROM t", result_format='arrow')
+
+        assert isinstance(result['data'], pa.Table)
+        assert result['data'].num_rows == 3
+
+    def test_max_rows_truncates(self, client):
+        """max_rows still limits the fetched rows"""
+        result = client.execute_query("SELECT gender, cnt FROM t", max_rows=2)
+        assert result['row_count'] == 2
+
+    def test_row_cursor_fallback(self, client):
+        """Cursors without fetchmany_arrow are converted column-wise"""
+        client.pool = ConnectionPool(connect=FakeConnection)
+        result = client.execute_query("SELECT gender, cnt FROM t")
+
+        assert result['success']
+        assert result['data']['gender'].tolist() == ['MAN', 'WOMAN', 'WOMAN']
+
+    def test_failed_query_keeps_contract(self, client):
+        """Failures still return the standard dict with an error message"""
+        result = client.execute_query("SELECT * FROM missing")
+
+        assert result['success'] is False
+        assert result['data'] is None
+        assert result['cached'] is False and result['coalesced'] is False
+        assert 'TABLE_OR_VIEW_NOT_FOUND' in result['error_message']
+
+    def test_dtype_backends(self):
+        """dtype_backend controls how nullable integers are mapped"""
+        table = pa.table({'cnt': pa.array([1, None, 3], type=pa.int64())})
+
+        assert arrow_to_pandas(table, 'numpy')['cnt'].dtype == 'float64'
+        assert arrow_to_pandas(table, 'nullable')['cnt'].dtype == pd.Int64Dtype()
+        assert isinstance(arrow_to_pandas(table, 'pyarrow')['cnt'].dtype, pd.ArrowDtype)
+
+        with pytest.raises(ValueError):
+            arrow_to_pandas(table, 'unknown')
+
+
+class TestQueryStream:
+    """Test suite for execute_query_stream() / export_query_to_csv()"""
+
+    def test_stream_yields_batches(self, client):
+        """Results are yielded in batch_size chunks without truncation"""
+        batches = list(client.execute_query_stream("SELECT id FROM visits", batch_size=10))
+
+        assert [b.row_count for b in batches] == [10, 10, 5]
+        assert [b.total_rows for b in batches] == [10, 20, 25]
+        assert batches[-1].data['id'].tolist() == list(range(20, 25))
+        assert all(b.time_to_first_batch == batches[0].time_to_first_batch for b in batches)
+
+    def test_stream_arrow_format(self, client):
+        """result_format='arrow' yields pyarrow tables"""
+        batch = next(client.execute_query_stream("SELECT id FROM visits", result_format='arrow'))
+        assert isinstance(batch.data, pa.Table)
+
+    def test_early_close_returns_connection(self, client):
+        """Closing the generator mid-stream releases the pooled connection"""
+        stream = client.execute_query_stream("SELECT id FROM visits", batch_size=5)
+        next(stream)
+        assert client.pool.get_metrics()['in_use'] == 1
+
+        stream.close()
+        assert client.pool.get_metrics()['in_use'] == 0
+
+    def test_stream_error_raises(self, client):
+        """Failures surface as QueryExecutionError with the friendly message"""
+        with pytest.raises(QueryExecutionError, match='TABLE_OR_VIEW_NOT_FOUND'):
+            list(client.execute_query_stream("SELECT * FROM missing"))
+
+    def test_export_query_to_csv(self, client):
+        """CSV export writes one header and every row across batches"""
+        buffer = io.BytesIO()
+        stats = client.export_query_to_csv("SELECT id FROM visits", buffer, batch_size=10)
+
+        lines = buffer.getvalue().decode('utf-8-sig').splitlines()
+        assert lines[0] == 'id'
+        assert len(lines) == 26
+        assert stats['row_count'] == 25
+        assert stats['batch_count'] == 3
+
+
+class TestAsyncExecution:
+    """Test suite for execute_query_async() / execute_many()"""
+
+    def test_execute_query_async(self, client):
+        """The async API returns the execute_query() dict plus wall_time"""
+        result = asyncio.run(client.execute_query_async("SELECT gender, cnt FROM t"))
+
+        assert result['success']
+        assert result['row_count'] == 3
+        assert 'wall_time' in result
+
+    def test_execute_many_preserves_order_and_isolates_failures(self, client):
+        """Results come back in input order; one failure does not cancel the rest"""
+        queries = ["SELECT id FROM visits", "SELECT * FROM missing", "SELECT gender, cnt FROM t"]
+        results = client.execute_many(queries, max_concurrency=2)
+
+        assert [r['query_index'] for r in results] == [0, 1, 2]
+        assert [r['success'] for r in results] == [True, False, True]
+        assert results[0]['row_count'] == 25
+        assert results[2]['row_count'] == 3
+        assert all('queue_time' in r for r in results)
+
+    def test_execute_many_respects_max_concurrency(self, client):
+        """No more than max_concurrency queries run at once"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        original = client.execute_query
+
+        def slow_execute(sql_query, **kwargs):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            return original(sql_query, **kwargs)
+
+        client.execute_query = slow_execute
+        results = client.execute_many(["SELECT gender, cnt FROM t"] * 6, max_concurrency=2)
+
+        assert all(r['success'] for r in results)
+        assert max(peak) <= 2
+
+
+class TestSingleFlight:
+    """Test suite for in-flight query coalescing"""
+
+    def test_concurrent_identical_queries_execute_once(self, client):
+        """Concurrent identical queries share one warehouse execution and result object"""
+        calls = []
+        gate = threading.Event()
+        table = pa.table({'id': [1, 2, 3]})
+
+        def slow_run(sql_query, max_rows):
+            calls.append(sql_query)
+            gate.wait(5)
+            return table
+
+        client._run_query = slow_run
+        results = []
+
+        def worker():
+            results.append(client.execute_query("SELECT id FROM visits", result_format='arrow'))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        while client.get_coalescing_metrics()['calls'] < 4:
+            time.sleep(0.005)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert all(r['data'] is table for r in results)
+        assert sum(r['coalesced'] for r in results) == 3
+        metrics = client.get_coalescing_metrics()
+        assert metrics['executions'] == 1
+        assert metrics['coalescing_ratio'] == 0.75
+
+    def test_error_shared_with_waiters(self):
+        """Waiters receive the leader's exception and the key is released"""
+        flight = SingleFlight()
+        gate = threading.Event()
+        errors = []
+
+        def failing():
+            gate.wait(5)
+            raise RuntimeError("warehouse down")
+
+        def worker():
+            try:
+                flight.do('k', failing)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for t in threads:
+            t.start()
+        while flight.get_metrics()['calls'] < 3:
+            time.sleep(0.005)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        assert len(errors) == 3
+        assert flight.get_metrics()['in_flight'] == 0
+        assert flight.do('k', lambda: 42) == (42, False)
@@ -0,0 +1,74 @@
+"""
+Unit tests for the disease-code prefix tree and cohort estimates
+Uses a small hand-written code table
+"""
+
+import pandas as pd
+import pytest
+
+from core.disease_code_tree import DiseaseCodeTree, get_disease_code_tree
+
+
+@pytest.fixture
+def tree():
+    """Hypertension, diabetes and influenza codes plus the '$' placeholder"""
+    codes = pd.DataFrame([
+        ('AI109', 120000, 2000000),
+        ('AI119', 5000, 40000),
+        ('AI10', 300, 900),
+        ('AE119', 50000, 800000),
+        ('AE118', 13000, 100000),
+        ('AJ101', 70000, 90000),
+        ('$', 999999, 9999999),
+    ], columns=['code', 'patient_count', 'occurrence_count'])
+    return DiseaseCodeTree(codes)
+
+
+class TestDiseaseCodeTree:
+    """Test suite for DiseaseCodeTree"""
+
+    def test_prefix_aggregates(self, tree):
+        """Each node sums its codes; '$' is excluded"""
+        node = tree.node('AI1')
+
+        assert node.patient_count == 125300
+        assert node.occurrence_count == 2040900
+        assert node.code_count == 3
+        assert tree.root.code_count == 6
+        assert sorted(n.prefix for n in node.iter_codes()) == ['AI10', 'AI109', 'AI119']
+
+    def test_estimate_bounds(self, tree):
+        """Patient estimates give max-code lower and summed upper bounds"""
+        estimate = tree.estimate('AI1%')
+
+        assert (estimate.patient_count_min, estimate.patient_count) == (120000, 125300)
+        assert estimate.is_large
+        assert '120,000~125,300명' in estimate.describe()
+        assert tree.estimate('ZZ%').code_count == 0
+
+    def test_tightest_prefix(self, tree):
+        """The deepest common prefix covering all codes"""
+        assert tree.tightest_prefix(['AE119', 'AE118']).prefix == 'AE11'
+        assert tree.tightest_prefix(['AI109', 'AE119']).prefix == 'A'
+        assert tree.tightest_prefix(['AI109', 'XX1']) is None
+
+    def test_cover_merges_cheapest_pairs(self, tree):
+        """Covering with fewer patterns merges codes that add the fewest patients"""
+        cover = tree.cover(['AI109', 'AI119', 'AE119', 'AE118'], max_patterns=2)
+        assert [n.prefix for n in cover] == ['AI1', 'AE11']
+
+        assert [n.prefix for n in tree.cover(['AI10', 'AI109'])] == ['AI10']
+
+    def test_precision(self, tree):
+        """Share of the prefixes' patients that belong to the given codes"""
+        assert tree.precision([tree.node('AI10')], ['AI10', 'AI109']) == 1.0
+        assert tree.precision([tree.node('AI1')], ['AI109', 'AI10']) == pytest.approx(120300 / 125300)
+        assert tree.precision([tree.node('AE11'), tree.node('AJ101')], ['AE119']) == pytest.approx(50000 / 133000)
+
+    def test_shared_tree(self, tmp_path):
+        """Repeated lookups reuse one tree"""
+        path = tmp_path / 'codes.csv'
+        pd.DataFrame([('AJ459', 10, 20)], columns=['code', 'patient_count', 'occurrence_count']).to_csv(path, index=False)
+
+        assert get_disease_code_tree(str(path)) is get_disease_code_tree(str(path))
+        assert get_disease_code_tree(str(path)).estimate('AJ4').patient_count == 10
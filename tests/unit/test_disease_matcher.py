@@ -0,0 +1,117 @@
+"""
+Unit tests for the Aho–Corasick disease-name matcher
+Uses a small hand-written disease table
+"""
+
+import pandas as pd
+import pytest
+
+from core.disease_code_tree import DiseaseCodeTree
+from core.disease_matcher import AhoCorasick, DiseaseMatcher, extract_terms, get_disease_matcher
+
+
+@pytest.fixture
+def matcher():
+    """Disease table in arbitrary order with one '$' code"""
+    diseases = pd.DataFrame([
+        ('(양방)상세불명의 류마티스관절염', 'AM069', 500),
+        ('(양방)기타 및 상세불명의 원발성 고혈압', 'AI109', 9000),
+        ('(양방)합병증을 동반하지 않은 2형 당뇨병', 'AE119', 7000),
+        ('(양방)상세불명의 관절염', 'AM139', 3000),
+        ('(양방)고혈압성 심장병', 'AI119', 800),
+        ('(양방)계절성 인플루엔자바이러스가 확인된 인플루엔자', 'AJ101', 4000),
+        ('(양방)고혈압 관련 미분류', '$', 99999),
+    ], columns=['name', 'code', 'patient_count'])
+    return DiseaseMatcher(diseases)
+
+
+class TestAhoCorasick:
+    """Test suite for the automaton"""
+
+    def test_all_overlapping_matches(self):
+        """Every occurrence is reported, including words inside other words"""
+        automaton = AhoCorasick(['관절염', '류마티스관절염', '염'])
+        matches = sorted(automaton.iter_matches('류마티스관절염'))
+
+        assert matches == [(0, 7, '류마티스관절염'), (4, 7, '관절염'), (6, 7, '염')]
+
+
+class TestDiseaseMatcher:
+    """Test suite for DiseaseMatcher"""
+
+    def test_terms_skip_modifiers(self):
+        """Generic modifiers and particle-ending words are not mention terms"""
+        assert extract_terms('(양방)기타 및 상세불명의 원발성 고혈압') == ['고혈압']
+
+    def test_codes_ranked_by_patient_count(self, matcher):
+        """Hints keep the old dict shape, ordered by patient count, without '$' codes"""
+        codes = matcher.find_disease_codes('고혈압 환자의 성별 분포')
+
+        assert [c['disease_code'] for c in codes] == ['AI109', 'AI119']
+        assert codes[0]['pattern'] == 'AI1%'
+        assert codes[0]['keyword'] == '고혈압'
+
+    def test_patterns_from_code_tree(self):
+        """With a code tree, each hint uses the prefix covering the mention's candidates, not the first 3 chars"""
+        diseases = pd.DataFrame([
+            ('(양방)상세불명의 천식', 'AJ459', 28000),
+            ('(양방)주로 알레르기성 천식', 'AJ4509', 6000),
+            ('(양방)기침형천식', 'AJ4500', 4000),
+            ('(양방)천식지속상태', 'AJ46', 1100),
+            ('(양방)상세불명의 만성 폐쇄성 폐질환', 'AJ449', 60000),
+        ], columns=['name', 'code', 'patient_count'])
+        tree = DiseaseCodeTree(diseases.assign(occurrence_count=diseases['patient_count']))
+        matcher = DiseaseMatcher(diseases)
+
+        codes = matcher.find_disease_codes('천식 환자 수', code_tree=tree)
+        assert [(c['disease_code'], c['pattern']) for c in codes] == [
+            ('AJ459', 'AJ45%'), ('AJ4509', 'AJ45%'), ('AJ4500', 'AJ45%')
+        ]
+        assert matcher.find_disease_codes('천식 환자 수')[0]['pattern'] == 'AJ4%'
+
+    def test_every_mention_found_in_query_order(self, matcher):
+        """Diseases outside the old hard-coded groups are found, all in one pass"""
+        mentions = matcher.find_mentions('류마티스관절염과 당뇨병을 가진 환자')
+
+        assert [m.keyword for m in mentions] == ['류마티스관절염', '당뇨병']
+        assert mentions[0].diseases[0]['disease_code'] == 'AM069'
+
+    def test_aliases(self, matcher):
+        """Colloquial aliases map to the names used in the reference data"""
+        codes = matcher.find_disease_codes('독감 환자 지역별 분포')
+        assert codes[0]['disease_code'] == 'AJ101'
+
+    def test_organ_cancer_aliases(self):
+        """위암/폐암 map to that site's primary cancers; bare 암 only fires at the start of a word"""
+        diseases = pd.DataFrame([
+            ('(양방)갑상선의 악성 신생물', 'AC73', 900),
+            ('(양방)상세불명의 위의 악성 신생물', 'AC169', 800),
+            ('(양방)상세불명의 기관지 또는 폐의 악성 신생물', 'AC349', 500),
+            ('(양방)위의 체부의 악성 신생물', 'AC162', 300),
+            ('(양방)간의 이차성 악성 신생물', 'AC787', 200),
+            ('(양방)상세불명의 간의 악성 신생물', 'AC229', 100),
+            ('(양방)뇌간의 악성 신생물', 'AC717', 50),
+            ('(양방)상세불명의 위염', 'AK297', 5000),
+        ], columns=['name', 'code', 'patient_count'])
+        matcher = DiseaseMatcher(diseases)
+
+        def codes(query):
+            return [c['disease_code'] for c in matcher.find_disease_codes(query, per_mention=10)]
+
+        assert codes('위암 환자 수') == ['AC169', 'AC162']
+        assert codes('폐암 환자의 성별 분포') == ['AC349']
+        assert codes('간암 환자 수') == ['AC229']
+        assert matcher.find_mentions('후두암 환자 수') == []
+        assert 'AC73' in codes('암 환자 수')
+
+    def test_no_mentions(self, matcher):
+        """Queries without disease names return no hints"""
+        assert matcher.find_disease_codes('서울 지역 병원 수') == []
+
+    def test_shared_matcher(self, tmp_path):
+        """Repeated lookups reuse one matcher; a missing file yields None"""
+        path = tmp_path / 'diseases.csv'
+        pd.DataFrame([('(양방)천식', 'AJ459', 10)], columns=['name', 'code', 'patient_count']).to_csv(path, index=False)
+
+        assert get_disease_matcher(str(path)) is get_disease_matcher(str(path))
+        assert get_disease_matcher(str(tmp_path / 'missing.csv')) is None
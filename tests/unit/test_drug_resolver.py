@@ -0,0 +1,82 @@
+"""
+Unit tests for the drug/ingredient resolver
+Uses a small hand-written drug table
+"""
+
+import pandas as pd
+import pytest
+
+from core.drug_resolver import DrugResolver, brand_stems, canonical_ingredient, get_drug_resolver
+
+
+@pytest.fixture
+def resolver():
+    """Drugs with brand/Korean ingredient names plus one drug only in medication_ingredients"""
+    drugs = pd.DataFrame([
+        ('소론도정(프레드니솔론)_(5mg/1정)', 'prednisolone', 277195),
+        ('타이레놀8시간이알서방정(아세트아미노펜)_(0.65g/1정)', 'acetaminophen(encapsulated)', 158892),
+        ('다이아벡스정500밀리그램(메트포르민염산염)_(0.5g/1정)', 'metformin hydrochloride', 5811),
+        ('소론도주(프레드니솔론)_(1mL)', 'prednisolone', 10),
+    ], columns=['name', 'ingredients', 'patient_count'])
+    medication = pd.DataFrame([
+        ('소론도정(프레드니솔론)_(5mg/1정)', 'prednisolone', 1341477),
+        ('부루펜시럽(이부프로펜)_(100mL)', 'ibuprofen', 5000),
+    ], columns=['drug_name', 'ingredients', 'usage_count'])
+    return DrugResolver(drugs, medication)
+
+
+class TestNormalization:
+    """Test suite for name normalization helpers"""
+
+    def test_brand_stems(self):
+        """Leading Hangul brand plus the form-less base"""
+        assert brand_stems('소론도정(프레드니솔론)_(5mg/1정)') == ['소론도정', '소론도']
+        assert brand_stems('타이레놀8시간이알서방정(아세트아미노펜)_(0.65g/1정)') == ['타이레놀']
+
+    def test_canonical_ingredient(self):
+        """Salt and parenthetical qualifiers are dropped"""
+        assert canonical_ingredient('metformin hydrochloride') == 'metformin'
+        assert canonical_ingredient('acetaminophen(encapsulated)') == 'acetaminophen'
+
+
+class TestDrugResolver:
+    """Test suite for DrugResolver.resolve()"""
+
+    def test_brand_maps_to_ingredient(self, resolver):
+        """A brand name resolves to its canonical ingredient and both filters"""
+        match, = resolver.resolve('소론도정 처방 환자 수')
+
+        assert match.entry.ingredient == 'prednisolone'
+        assert match.entry.drug_name_filter == "pd.res_drug_name LIKE '소론도정%'"
+        assert match.entry.ingredient_filter == "LOWER(pd.res_ingredients) LIKE '%prednisolone%'"
+        assert match.entry.drug_names[0] == '소론도정(프레드니솔론)_(5mg/1정)'
+
+    def test_korean_and_english_ingredients(self, resolver):
+        """Korean ingredient names without salt suffix and English names both resolve"""
+        matches = resolver.resolve('메트포르민과 ibuprofen 동시 처방')
+
+        assert [(m.mention, m.entry.ingredient) for m in matches] == [('메트포르민', 'metformin'), ('ibuprofen', 'ibuprofen')]
+        assert matches[0].entry.drug_name_filter is None
+
+    def test_english_needs_word_boundary(self, resolver):
+        """English ingredients do not match inside longer words"""
+        assert resolver.resolve('xibuprofens') == []
+
+    def test_fuzzy_brand(self, resolver):
+        """Unmatched Hangul words fall back to the brand bigram index"""
+        match, = resolver.resolve('다이아벡 처방 환자')
+
+        assert match.entry.keyword == '다이아벡스'
+        assert match.similarity < 1.0
+
+    def test_no_drugs(self, resolver):
+        """Queries without drug mentions return nothing"""
+        assert resolver.resolve('고혈압 환자의 성별 분포') == []
+
+    def test_shared_resolver(self, tmp_path):
+        """Repeated lookups reuse one resolver; a missing directory yields None"""
+        pd.DataFrame([('부루펜정(이부프로펜)_(200mg/1정)', 'ibuprofen', 3)],
+                     columns=['name', 'ingredients', 'patient_count']).to_csv(tmp_path / 'unique_drugs.csv', index=False)
+
+        assert get_drug_resolver(str(tmp_path)) is get_drug_resolver(str(tmp_path))
+        assert get_drug_resolver(str(tmp_path / 'missing')) is None
@@ -0,0 +1,141 @@
+"""
+Unit tests for the rule-based intent parser and fast-path template SQL
+Uses small hand-written disease/drug/code tables
+"""
+
+import pandas as pd
+import pytest
+import sqlglot
+
+from core.disease_code_tree import DiseaseCodeTree
+from core.disease_matcher import DiseaseMatcher
+from core.drug_resolver import DrugResolver
+from core.intent_parser import INTENT_PATIENT_COUNT, INTENT_TOP_DRUGS, IntentParser
+from pipelines.fast_path_sql import FastPathSQL
+
+
+@pytest.fixture(scope='module')
+def parser():
+    """Hypertension/diabetes/obesity plus a cancer term spread over unrelated code blocks"""
+    diseases = pd.DataFrame([
+        ('(양방)기타 및 상세불명의 원발성 고혈압', 'AI109', 9000),
+        ('(양방)고혈압성 심장병', 'AI119', 800),
+        ('(양방)합병증을 동반하지 않은 2형 당뇨병', 'AE119', 7000),
+        ('(양방)상세불명의 비만', 'AE669', 1600),
+        ('(양방)기타 비만', 'AE668', 1500),
+        ('(양방)갑상선의 악성 신생물', 'AC73', 900),
+        ('(양방)위의 악성 신생물', 'AC169', 800),
+        ('(양방)유방의 악성 신생물', 'AC509', 700),
+    ], columns=['name', 'code', 'patient_count'])
+    drugs = pd.DataFrame([
+        ('다이아벡스정500밀리그램(메트포르민염산염)_(0.5g/1정)', 'metformin hydrochloride', 5811),
+    ], columns=['name', 'ingredients', 'patient_count'])
+    codes = diseases.rename(columns={'name': 'disease_names'}).assign(occurrence_count=lambda df: df['patient_count'])
+    return IntentParser(DiseaseMatcher(diseases), DrugResolver(drugs), DiseaseCodeTree(codes))
+
+
+class TestIntentParser:
+    """Test suite for IntentParser.parse()"""
+
+    def test_gender_distribution(self, parser):
+        """Disease + gender grouping, with and without spacing/particles"""
+        for query in ['고혈압 환자의 남녀 성별 분포를 알려주세요', '고혈압환자 성별분포 보여줘']:
+            intent = parser.parse(query)
+            assert (intent.intent, intent.group_by, intent.disease_patterns) == (INTENT_PATIENT_COUNT, ['gender'], ['AI1%'])
+            assert intent.confidence > 0.85
+
+    def test_top_drugs_slots(self, parser):
+        """Age band, gender, disease (tightest code prefix) and TOP N"""
+        intent = parser.parse('20대 여성 비만 환자에게 가장 많이 처방된 약물 TOP 10')
+
+        assert intent.intent == INTENT_TOP_DRUGS
+        assert (intent.gender, intent.age_min, intent.age_max, intent.top_n) == ('WOMAN', 20, 29, 10)
+        assert intent.disease_patterns == ['AE66%']
+
+    def test_sibling_codes_covered_by_or(self):
+        """Candidates under sibling blocks become an OR of prefixes; unmatched siblings lower confidence"""
+        diseases = pd.DataFrame([
+            ('(양방)상세불명의 천식', 'AJ459', 28000),
+            ('(양방)기침형천식', 'AJ4500', 4000),
+            ('(양방)기타 알레르기천식 중등도 지속성', 'AJ4502', 2500),
+            ('(양방)기타 알레르기천식 간헐성', 'AJ4501', 1300),
+            ('(양방)상세불명의 비알레르기천식', 'AJ4519', 300),
+            ('(양방)기타 혼합형 천식', 'AJ4588', 1100),
+            ('(양방)천식지속상태', 'AJ46', 1100),
+            ('(양방)상세불명의 만성 폐쇄성 폐질환', 'AJ449', 60000),
+            ('(양방)상세불명의 폐렴', 'AJ189', 90000),
+        ], columns=['name', 'code', 'patient_count'])
+        codes = diseases.rename(columns={'name': 'disease_names'}).assign(occurrence_count=lambda df: df['patient_count'])
+        asthma = IntentParser(DiseaseMatcher(diseases), code_tree=DiseaseCodeTree(codes))
+
+        intent = asthma.parse('2023년 천식 환자 수')
+        assert intent.disease_patterns == ['AJ45%', 'AJ46%']
+        assert intent.confidence == 1.0
+        sql = FastPathSQL(asthma).synthesize('2023년 천식 환자 수').sql_query
+        assert "(bt.res_disease_code LIKE 'AJ45%' OR bt.res_disease_code LIKE 'AJ46%')" in sql
+
+        codes.loc[len(codes)] = ['(양방)기타 하기도 질환', 'AJ457', 38300, 38300]
+        intent = IntentParser(DiseaseMatcher(diseases), code_tree=DiseaseCodeTree(codes)).parse('2023년 천식 환자 수')
+        assert intent.disease_patterns == ['AJ45%', 'AJ46%']
+        assert intent.confidence == pytest.approx(0.5)
+
+    def test_dates_ages_and_regions(self, parser):
+        """Date ranges, open age bounds and regions"""
+        intent = parser.parse('2023년 1월부터 6월까지 서울 지역 65세 이상 환자 수는?')
+        assert (intent.date_from, intent.date_to) == ('20230101', '20230630')
+        assert (intent.age_min, intent.age_max, intent.region) == (65, None, '서울')
+
+        intent = parser.parse('최근 3개월 동안 고혈압으로 진료받은 40세 미만 남성 환자 몇 명')
+        assert (intent.recent, intent.age_max, intent.gender) == ((3, '개월'), 39, 'MAN')
+        assert intent.confidence > 0.85
+
+    def test_drug_filter(self, parser):
+        """Ingredient mentions become a prescription filter on a count"""
+        intent = parser.parse('메트포르민 처방받은 고혈압 환자 수')
+
+        assert intent.intent == INTENT_PATIENT_COUNT
+        assert intent.drug.entry.ingredient == 'metformin'
+
+    def test_unexplained_words_rejected(self, parser):
+        """Any word outside the slots and allowed phrasing drops confidence to zero"""
+        for query in ['고혈압 입원 환자 수', '연령대별 환자 수와 누적 합계', '서울 지역 65세 이상 환자의 평균 처방 약품 수']:
+            assert parser.parse(query).confidence == 0.0
+
+    def test_ambiguous_disease_low_confidence(self, parser):
+        """A term spread over several code blocks is not trusted"""
+        intent = parser.parse('암 환자 수')
+
+        assert intent.intent == INTENT_PATIENT_COUNT
+        assert 0 < intent.confidence < 0.85
+
+
+class TestFastPathSQL:
+    """Test suite for FastPathSQL.synthesize()"""
+
+    def test_renders_example_shape(self, parser):
+        """Template SQL matches the few-shot example shape and parses as Spark SQL"""
+        result = FastPathSQL(parser).synthesize('당뇨병 환자에게 가장 많이 처방된 약물 TOP 5')
+
+        assert result.template == 'top_drugs'
+        assert result.referenced_tables == ['basic_treatment', 'prescribed_drug']
+        assert "bt.res_disease_code LIKE 'AE119%'" in result.sql_query
+        assert result.sql_query.endswith('LIMIT 5')
+        sqlglot.parse_one(result.sql_query, read='spark')
+
+    def test_cross_tab_parses(self, parser):
+        """Gender x age band grouping produces valid SQL"""
+        result = FastPathSQL(parser).synthesize('성별, 연령대별 환자 수를 교차 집계해줘')
+
+        assert result.template == 'patient_count_by_gender_age_group'
+        sqlglot.parse_one(result.sql_query, read='spark')
+
+    def test_metrics(self, parser):
+        """Hits, low-confidence fallbacks and unsupported shapes are counted separately"""
+        fast_path = FastPathSQL(parser)
+        fast_path.synthesize('고혈압 환자 수')
+        fast_path.synthesize('암 환자 수')
+        fast_path.synthesize('각 질병별로 환자 수 순위를 매겨줘')
+
+        metrics = fast_path.get_metrics()
+        assert (metrics['hits'], metrics['fallbacks'], metrics['unmatched']) == (1, 1, 1)
+        assert metrics['hit_rate'] == pytest.approx(100 / 3)
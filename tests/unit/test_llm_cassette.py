@@ -0,0 +1,118 @@
+"""
+Unit tests for the LLM record/replay cassette
+Records from a scripted backend into a temp file, then replays offline
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.exceptions import LLMAPIError
+from services.llm_cassette import CassetteBackend
+from services.llm_gateway import LLMGateway
+
+
+class ScriptedBackend:
+    """Numbered answers per prompt, with usage on the final stream chunk"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _usage(self):
+        return SimpleNamespace(prompt_token_count=12, candidates_token_count=3)
+
+    def generate(self, model_name, prompt):
+        self.calls += 1
+        return SimpleNamespace(text=f'{prompt}#{self.calls}', usage_metadata=self._usage())
+
+    def stream(self, model_name, prompt):
+        self.calls += 1
+        yield SimpleNamespace(text='SELECT ', usage_metadata=None)
+        yield SimpleNamespace(text=str(self.calls), usage_metadata=self._usage())
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    return tmp_path / 'cassettes' / 'run.json'
+
+
+def replay_gateway(path, **kwargs):
+    return LLMGateway(backend=CassetteBackend(str(path), mode='replay', **kwargs), requests_per_minute=None)
+
+
+class TestCassetteBackend:
+    """Test suite for CassetteBackend"""
+
+    def test_record_then_replay(self, cassette_path):
+        """Replay returns the recorded text and token usage without the inner backend"""
+        inner = ScriptedBackend()
+        recorder = LLMGateway(backend=CassetteBackend(str(cassette_path), mode='record', inner=inner), requests_per_minute=None)
+        recorder.generate('q', caller='nl2sql')
+
+        player = replay_gateway(cassette_path)
+        response = player.generate('q', caller='nl2sql')
+        assert response.text == 'q#1'
+        assert player.get_metrics()['prompt_tokens'] == 12
+        assert inner.calls == 1
+
+    def test_repeated_prompt_replays_in_order(self, cassette_path):
+        """Repeats replay in recorded order, then the last answer sticks"""
+        recorder = CassetteBackend(str(cassette_path), mode='record', inner=ScriptedBackend())
+        recorder.generate('m', 'q')
+        recorder.generate('m', 'q')
+
+        player = CassetteBackend(str(cassette_path), mode='replay')
+        assert [player.generate('m', 'q').text for _ in range(3)] == ['q#1', 'q#2', 'q#2']
+
+    def test_stream_chunks_and_latency(self, cassette_path):
+        """Streams replay chunk by chunk; simulated delays follow recorded offsets"""
+        recorder = LLMGateway(backend=CassetteBackend(str(cassette_path), mode='record', inner=ScriptedBackend()), requests_per_minute=None)
+        assert list(recorder.stream('q')) == ['SELECT ', '1']
+
+        entries = json.loads(cassette_path.read_text(encoding='utf-8'))['entries']
+        entry = next(iter(entries.values()))[0]
+        entry['chunk_offsets'] = [0.2, 0.5]
+        cassette_path.write_text(json.dumps({'version': 1, 'entries': {k: [entry] for k in entries}}), encoding='utf-8')
+
+        sleeps = []
+        player = replay_gateway(cassette_path, latency_scale=2.0, sleep=sleeps.append)
+        assert list(player.stream('q')) == ['SELECT ', '1']
+        assert sleeps == pytest.approx([0.4, 0.6])
+        assert player.get_metrics()['output_tokens'] == 3
+
+    def test_replay_miss_and_model_key(self, cassette_path):
+        """Unknown prompts (or the same prompt on another model) fail in replay mode"""
+        CassetteBackend(str(cassette_path), mode='record', inner=ScriptedBackend()).generate('m', 'q')
+        player = CassetteBackend(str(cassette_path), mode='replay')
+
+        with pytest.raises(LLMAPIError):
+            player.generate('m', 'other')
+        with pytest.raises(LLMAPIError):
+            player.generate('other-model', 'q')
+        assert player.get_metrics()['misses'] == 2
+
+    def test_auto_records_only_misses(self, cassette_path):
+        """Auto mode calls through once, then replays"""
+        inner = ScriptedBackend()
+        backend = CassetteBackend(str(cassette_path), mode='auto', inner=inner)
+
+        assert backend.generate('m', 'q').text == backend.generate('m', 'q').text == 'q#1'
+        assert inner.calls == 1
+
+    def test_record_replaces_previous_recording(self, cassette_path):
+        """A new record session overwrites earlier answers for the prompts it sees"""
+        CassetteBackend(str(cassette_path), mode='record', inner=ScriptedBackend()).generate('m', 'q')
+        inner = ScriptedBackend()
+        inner.calls = 10
+        CassetteBackend(str(cassette_path), mode='record', inner=inner).generate('m', 'q')
+
+        player = CassetteBackend(str(cassette_path), mode='replay')
+        assert [player.generate('m', 'q').text for _ in range(2)] == ['q#11', 'q#11']
+
+    def test_invalid_setup(self, cassette_path):
+        """Missing cassette in replay mode and recording without a backend are rejected"""
+        with pytest.raises(LLMAPIError):
+            CassetteBackend(str(cassette_path), mode='replay')
+        with pytest.raises(ValueError):
+            CassetteBackend(str(cassette_path), mode='record')
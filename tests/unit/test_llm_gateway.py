@@ -0,0 +1,180 @@
+"""
+Unit tests for the shared LLM gateway
+Uses scripted in-process backends; no Gemini calls
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.exceptions import LLMAPIError
+from services.llm_gateway import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LLMGateway, TokenBucket
+
+
+class APIError(Exception):
+    """Stand-in for google.api_core errors (HTTP status on .code)"""
+
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+def response(text='ok', prompt_tokens=10, output_tokens=5):
+    usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=output_tokens)
+    return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+class ScriptedBackend:
+    """Raises the scripted errors in order, then answers"""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def generate(self, model_name, prompt):
+        with self.lock:
+            self.calls.append(prompt)
+            error = self.errors.pop(0) if self.errors else None
+        time.sleep(self.delay)
+        if error:
+            raise error
+        return response(text=prompt)
+
+    def stream(self, model_name, prompt):
+        self.generate(model_name, prompt)
+        return iter([SimpleNamespace(text='SELECT '), SimpleNamespace(text=''), response(text='1')])
+
+
+def gateway(backend, **kwargs):
+    kwargs.setdefault('requests_per_minute', None)
+    return LLMGateway(backend=backend, retry_base_delay=0.01, retry_max_delay=0.02, **kwargs)
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket"""
+
+    def test_burst_then_refill(self):
+        """Capacity is available at once; further tokens arrive at rate"""
+        now = [0.0]
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0])
+
+        assert [bucket.reserve_delay() for _ in range(2)] == [0.0, 0.0]
+        assert bucket.reserve_delay() == pytest.approx(0.5)
+        now[0] = 0.5
+        assert bucket.reserve_delay() == 0.0
+
+    def test_pause(self):
+        """A 429 pause blocks even when tokens are left"""
+        now = [0.0]
+        bucket = TokenBucket(rate=None, capacity=4, clock=lambda: now[0])
+        bucket.pause(3.0)
+
+        assert bucket.reserve_delay() == pytest.approx(3.0)
+        now[0] = 3.0
+        assert bucket.reserve_delay() == 0.0
+
+
+class TestLLMGateway:
+    """Test suite for LLMGateway"""
+
+    def test_metrics_recorded(self):
+        """Latency and token usage are collected overall and per caller"""
+        llm = gateway(ScriptedBackend())
+        llm.generate('a', caller='nl2sql')
+        llm.generate('b', caller='pdf_chart_insight', priority=PRIORITY_BATCH)
+
+        metrics = llm.get_metrics()
+        assert (metrics['calls'], metrics['prompt_tokens'], metrics['output_tokens']) == (2, 20, 10)
+        assert metrics['by_caller']['nl2sql']['calls'] == 1
+
+    def test_retries_429_and_5xx(self):
+        """Retryable statuses are retried; 429 is counted as rate limited"""
+        backend = ScriptedBackend(errors=[APIError(429), APIError(503)])
+        llm = gateway(backend)
+
+        assert llm.generate('q').text == 'q'
+        metrics = llm.get_metrics()
+        assert (len(backend.calls), metrics['retries'], metrics['rate_limited']) == (3, 2, 1)
+
+    def test_non_retryable_raises(self):
+        """4xx other than 429 fails immediately"""
+        backend = ScriptedBackend(errors=[APIError(400)])
+        llm = gateway(backend)
+
+        with pytest.raises(APIError):
+            llm.generate('q')
+        assert len(backend.calls) == 1 and llm.get_metrics()['failures'] == 1
+
+    def test_retries_exhausted(self):
+        """The last error is raised after max_retries"""
+        llm = gateway(ScriptedBackend(errors=[APIError(500)] * 3), max_retries=2)
+
+        with pytest.raises(APIError):
+            llm.generate('q')
+
+    def test_concurrency_limit(self):
+        """No more than max_concurrency calls are in flight"""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        class CountingBackend(ScriptedBackend):
+            def generate(self, model_name, prompt):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.02)
+                with lock:
+                    active[0] -= 1
+                return response(prompt)
+
+        llm = gateway(CountingBackend(), max_concurrency=2)
+        threads = [threading.Thread(target=llm.generate, args=(str(i),)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 2 and llm.get_metrics()['calls'] == 6
+
+    def test_interactive_before_batch(self):
+        """Queued interactive calls get the next slot ahead of earlier batch calls"""
+        backend = ScriptedBackend(delay=0.05)
+        llm = gateway(backend, max_concurrency=1)
+
+        blocker = threading.Thread(target=llm.generate, args=('blocker',))
+        blocker.start()
+        time.sleep(0.01)
+        batch = [threading.Thread(target=llm.generate, args=(f'batch{i}',), kwargs={'priority': PRIORITY_BATCH}) for i in range(2)]
+        for thread in batch:
+            thread.start()
+        time.sleep(0.01)
+        interactive = threading.Thread(target=llm.generate, args=('interactive',), kwargs={'priority': PRIORITY_INTERACTIVE})
+        interactive.start()
+        for thread in [blocker, interactive, *batch]:
+            thread.join()
+
+        assert backend.calls[:2] == ['blocker', 'interactive']
+
+    def test_acquire_timeout(self):
+        """Waiting longer than acquire_timeout raises LLMAPIError and leaves the queue clean"""
+        llm = gateway(ScriptedBackend(delay=0.2), max_concurrency=1, acquire_timeout=0.05)
+        blocker = threading.Thread(target=llm.generate, args=('blocker',))
+        blocker.start()
+        time.sleep(0.01)
+
+        with pytest.raises(LLMAPIError):
+            llm.generate('late')
+        blocker.join()
+        assert llm.get_metrics()['queued'] == 0
+
+    def test_stream(self):
+        """Streams skip empty chunks, retry before the first chunk and record usage"""
+        llm = gateway(ScriptedBackend(errors=[APIError(503)]))
+
+        assert list(llm.stream('q', caller='nl2sql')) == ['SELECT ', '1']
+        metrics = llm.get_metrics()
+        assert (metrics['calls'], metrics['retries'], metrics['in_flight'], metrics['prompt_tokens']) == (1, 1, 0, 10)
@@ -0,0 +1,165 @@
+"""
+Unit tests for the local DuckDB executor
+Runs Spark SQL recipe constructs against tiny Parquet tables
+"""
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("sqlglot")
+
+from core.recipe_loader import RecipeLoader
+from core.sql_template_engine import SQLTemplateEngine
+from services.local_executor import LocalWarehouse, discover_tables, translate_spark_sql
+from tools.generate_all_sql import generate_dummy_parameters
+from tools.generate_synthetic_data import SyntheticDataGenerator
+
+RECIPE_NAMES = [recipe['name'] for recipe in RecipeLoader('recipes').get_all_recipes()]
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    """Local warehouse with basic_treatment (partitioned) and insured_person tables"""
+    for year, rows in {
+        '2023': {'user_id': [1, 1, 2], 'res_treat_start_date': ['20230105', '20230301', '20231110'],
+                 'res_disease_code': ['E11', 'E11.9', 'N18.3'], 'deleted': [False, False, True]},
+        '2024': {'user_id': [2, 3], 'res_treat_start_date': ['20240110', 'bad-date'],
+                 'res_disease_code': ['E14', 'I10'], 'deleted': [False, False]},
+    }.items():
+        partition = tmp_path / 'basic_treatment' / f'year={year}'
+        partition.mkdir(parents=True)
+        pq.write_table(pa.table(rows), partition / 'part-0.parquet')
+
+    pq.write_table(
+        pa.table({'user_id': [1, 2, 3], 'gender': ['MAN', 'WOMAN', 'WOMAN']}),
+        tmp_path / 'insured_person.parquet'
+    )
+    return LocalWarehouse(str(tmp_path))
+
+
+@pytest.fixture(scope='module')
+def synthetic_warehouse(tmp_path_factory):
+    """Synthetic dataset from tools/generate_synthetic_data.py"""
+    output = tmp_path_factory.mktemp('synthetic')
+    SyntheticDataGenerator(rows=20_000, seed=11).generate(str(output), progress=False)
+    return LocalWarehouse(str(output))
+
+
+def render_recipe(name):
+    recipe = RecipeLoader('recipes').get_recipe_by_name(name)
+    return SQLTemplateEngine('recipes').render_template(name, generate_dummy_parameters(recipe['parameters']))
+
+
+@pytest.fixture
+def client(make_client, warehouse):
+    """DatabricksClient whose pool hands out local DuckDB connections"""
+    return make_client(warehouse.connect, executor='local')
+
+
+class TestTranslateSparkSQL:
+    """Test suite for translate_spark_sql()"""
+
+    def test_spark_functions_translated(self):
+        """RLIKE / DATE_SUB / backtick aliases are rewritten for DuckDB"""
+        duck = translate_spark_sql(
+            "SELECT user_id AS `환자 ID`, DATE_SUB(CURRENT_DATE(), 30) AS d "
+            "FROM basic_treatment WHERE res_disease_code RLIKE '^E1[0-4]'"
+        )
+
+        assert '"환자 ID"' in duck
+        assert 'REGEXP_MATCHES' in duck
+        assert '`' not in duck
+
+    def test_try_to_date_becomes_safe_parse(self):
+        """TRY_TO_DATE maps to a NULL-on-failure strptime"""
+        duck = translate_spark_sql("SELECT TRY_TO_DATE(d, 'yyyyMMdd') FROM t")
+        assert "TRY_STRPTIME(d, '%Y%m%d')" in duck
+
+    def test_string_dates_coerced_in_date_context(self):
+        """yyyyMMdd string columns compared with DATE values or cast to DATE are parsed like Spark does"""
+        duck = translate_spark_sql(
+            "SELECT YEAR(d) FROM t WHERE d >= DATE '2023-01-01' AND d < DATE_ADD(DATE '2024-01-01', 1) "
+            "AND name = '2023-01-01' AND d >= '2023-01-01'",
+            frozenset({'d', 'name'})
+        )
+
+        assert duck.count("TRY_STRPTIME(d, ['%Y%m%d', '%Y-%m-%d'])") == 3
+        assert "name = '2023-01-01'" in duck and "d >= '2023-01-01'" in duck
+
+    def test_format_number(self):
+        """FORMAT_NUMBER maps to a thousands-separated format() call"""
+        duck = translate_spark_sql("SELECT FORMAT_NUMBER(amount, 0) FROM t")
+        assert "FORMAT('{:,.0f}', CAST(amount AS DOUBLE))" in duck
+
+    def test_trailing_comment_ignored(self):
+        """A comment after the final semicolon is not a second statement"""
+        duck = translate_spark_sql("SELECT 1;\n-- 끝")
+        assert duck == 'SELECT 1'
+
+    def test_multiple_statements_rejected(self):
+        """Only a single statement can be executed"""
+        with pytest.raises(ValueError):
+            translate_spark_sql("SELECT 1; SELECT 2")
+
+
+class TestLocalWarehouse:
+    """Test suite for LocalWarehouse / LocalDuckDBCursor"""
+
+    def test_discover_tables(self, warehouse):
+        """Directories become hive-partitioned scans, files become single scans"""
+        tables = discover_tables(warehouse.data_dir)
+
+        assert set(tables) == {'basic_treatment', 'insured_person'}
+        assert 'hive_partitioning' in tables['basic_treatment']
+
+    def test_fetchmany_arrow_batches(self, warehouse):
+        """fetchmany_arrow honours size and returns an empty table at the end"""
+        cursor = warehouse.connect().cursor()
+        cursor.execute("SELECT user_id FROM basic_treatment ORDER BY user_id")
+
+        assert cursor.fetchmany_arrow(2).num_rows == 2
+        assert cursor.fetchmany_arrow(10).num_rows == 3
+        assert cursor.fetchmany_arrow(10).num_rows == 0
+        assert cursor.description[0][0] == 'user_id'
+
+    def test_recipe_style_query(self, client):
+        """A recipe-style Spark query runs end to end through execute_query()"""
+        result = client.execute_query("""
+            SELECT ip.gender AS `성별`, COUNT(DISTINCT bt.user_id) AS patient_count
+            FROM basic_treatment bt
+            JOIN insured_person ip ON ip.user_id = bt.user_id
+            WHERE bt.deleted = FALSE
+              AND bt.res_disease_code RLIKE '^E1[0-4]'
+              AND TRY_TO_DATE(bt.res_treat_start_date, 'yyyyMMdd') >= DATE_SUB(TO_DATE('2024-12-31'), 730)
+            GROUP BY ip.gender
+            ORDER BY `성별`
+        """)
+
+        assert result['success'], result['error_message']
+        assert result['data'].to_dict('records') == [
+            {'성별': 'MAN', 'patient_count': 1},
+            {'성별': 'WOMAN', 'patient_count': 1},
+        ]
+
+    def test_stream_through_pool(self, client):
+        """Streaming uses the same Arrow batch interface as the warehouse connector"""
+        batches = list(client.execute_query_stream("SELECT * FROM basic_treatment", batch_size=2))
+        assert [b.row_count for b in batches] == [2, 2, 1]
+
+
+class TestRecipesOnLocalWarehouse:
+    """Renders the real recipe templates and runs them on synthetic data"""
+
+    def test_string_columns_detected(self, synthetic_warehouse):
+        """Columns stored as yyyyMMdd strings are known to the translator"""
+        assert 'res_treat_start_date' in synthetic_warehouse.string_columns
+        assert 'user_id' not in synthetic_warehouse.string_columns
+
+    @pytest.mark.parametrize('name', RECIPE_NAMES)
+    def test_recipe_runs(self, synthetic_warehouse, name):
+        """Every recipe executes without DuckDB catalog/binder/conversion errors"""
+        cursor = synthetic_warehouse.connect().cursor()
+        cursor.execute(render_recipe(name))
+        cursor.fetchall_arrow()
@@ -0,0 +1,125 @@
+"""
+Unit tests for the two-tier NL2SQL generation cache
+Uses small hand-written disease/drug tables and a temporary cache directory
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from core.disease_matcher import DiseaseMatcher
+from core.drug_resolver import DrugResolver
+from services.nl2sql_cache import NL2SQLCache, generation_context_hash, normalize_query, semantic_form
+
+
+PAYLOAD = {'sql_query': 'SELECT 1', 'analysis': {}, 'referenced_tables': [], 'relevant_examples': []}
+
+
+@pytest.fixture(scope='module')
+def entities():
+    """Disease matcher and drug resolver over tiny reference tables"""
+    diseases = pd.DataFrame([
+        ('(양방)기타 및 상세불명의 원발성 고혈압', 'AI109', 9000),
+        ('(양방)고혈압성 심장병', 'AI119', 800),
+        ('(양방)합병증을 동반하지 않은 2형 당뇨병', 'AE119', 7000),
+    ], columns=['name', 'code', 'patient_count'])
+    drugs = pd.DataFrame([
+        ('소론도정(프레드니솔론)_(5mg/1정)', 'prednisolone', 100),
+    ], columns=['name', 'ingredients', 'patient_count'])
+    return DiseaseMatcher(diseases), DrugResolver(drugs)
+
+
+@pytest.fixture
+def cache(tmp_path, entities):
+    disease_matcher, drug_resolver = entities
+    return NL2SQLCache(disk_dir=str(tmp_path / 'cache'), disease_matcher=disease_matcher, drug_resolver=drug_resolver)
+
+
+class TestNormalization:
+    """Test suite for query normalization"""
+
+    def test_exact_normalization(self):
+        """Case, repeated whitespace and trailing punctuation are ignored"""
+        assert normalize_query('  고혈압  환자 TOP 10?! ') == '고혈압 환자 top 10'
+
+    def test_semantic_form_rephrasings(self, entities):
+        """Particles, spacing, fillers and disease synonyms collapse to one form"""
+        forms = {semantic_form(q, *entities) for q in [
+            '당뇨병 환자의 성별 분포를 알려주세요',
+            '당뇨 환자 성별분포',
+            '당뇨병환자 성별 분포 보여줘',
+        ]}
+        assert len(forms) == 1
+
+    def test_semantic_form_keeps_meaning(self, entities):
+        """Different diseases, numbers and brand-vs-ingredient questions stay distinct"""
+        assert semantic_form('고혈압 환자 수', *entities) != semantic_form('고혈압성 심장병 환자 수', *entities)
+        assert semantic_form('상위 10개 약물', *entities) != semantic_form('상위 5개 약물', *entities)
+        assert semantic_form('상위 1,000명', *entities) == semantic_form('상위 1000명', *entities)
+        assert semantic_form('소론도정 처방 환자', *entities) == semantic_form('소론도 처방 환자', *entities)
+        assert semantic_form('소론도정 처방 환자', *entities) != semantic_form('프레드니솔론 처방 환자', *entities)
+
+    def test_semantic_form_keeps_range_and_comparison_particles(self, entities):
+        """Directional, comparative and limiting particles are part of the key; topic markers are not"""
+        since, until = semantic_form('작년부터 고혈압 환자', *entities), semantic_form('작년까지 고혈압 환자', *entities)
+        assert since != until
+        assert semantic_form('작년부터는 고혈압 환자', *entities) == since
+        assert semantic_form('남성보다 여성 환자', *entities) != semantic_form('남성 여성 환자', *entities)
+        assert semantic_form('고혈압 환자만', *entities) != semantic_form('고혈압 환자', *entities)
+
+
+class TestNL2SQLCache:
+    """Test suite for NL2SQLCache"""
+
+    def test_exact_then_semantic_hits(self, cache):
+        """Same text hits tier one; a rephrasing hits tier two; metrics count both"""
+        assert cache.get('고혈압 환자의 성별 분포', 'ctx') is None
+        cache.put('고혈압 환자의 성별 분포', 'ctx', PAYLOAD, generation_time=2.5)
+
+        payload, meta = cache.get('고혈압 환자의 성별 분포', 'ctx')
+        assert payload == PAYLOAD and meta['tier'] == 'exact'
+        _, meta = cache.get('고혈압환자 성별분포를 알려주세요', 'ctx')
+        assert meta['tier'] == 'semantic'
+
+        metrics = cache.get_metrics()
+        assert (metrics['exact_hits'], metrics['semantic_hits'], metrics['misses']) == (1, 1, 1)
+        assert metrics['time_saved'] == 5.0
+
+    def test_context_change_misses(self, cache):
+        """A different generation context (prompt/schema edit) never reuses entries"""
+        cache.put('고혈압 환자 수', 'ctx-a', PAYLOAD)
+        assert cache.get('고혈압 환자 수', 'ctx-b') is None
+
+    def test_shared_through_disk(self, cache, entities):
+        """A second cache on the same directory (another session/process) sees stored entries"""
+        cache.put('고혈압 환자 수', 'ctx', PAYLOAD)
+        other = NL2SQLCache(disk_dir=str(cache.disk_dir), disease_matcher=entities[0], drug_resolver=entities[1])
+
+        _, meta = other.get('고혈압 환자 수', 'ctx')
+        assert meta['storage'] == 'disk'
+
+    def test_expired_entries_dropped(self, cache):
+        """Entries older than ttl are removed instead of returned"""
+        cache.put('고혈압 환자 수', 'ctx', PAYLOAD)
+        cache.ttl = -1
+        assert cache.get('고혈압 환자 수', 'ctx') is None
+        assert cache.get_metrics()['expirations'] >= 1
+
+
+class TestGenerationContext:
+    """Test suite for generation_context_hash()"""
+
+    def test_prompt_edit_changes_hash(self, tmp_path):
+        """Editing any file under a prompt directory changes the context"""
+        (tmp_path / 'prompts').mkdir()
+        template = tmp_path / 'prompts' / 'system.txt'
+        template.write_text('v1', encoding='utf-8')
+        before = generation_context_hash([tmp_path / 'prompts', tmp_path / 'missing.csv'], model='m')
+
+        template.write_text('v2', encoding='utf-8')
+        stat = template.stat()
+        os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        assert generation_context_hash([tmp_path / 'prompts'], model='m') != before
+        assert generation_context_hash([tmp_path / 'prompts'], model='other') != generation_context_hash([tmp_path / 'prompts'], model='m')
@@ -0,0 +1,204 @@
+"""
+Unit tests for concurrent recipe execution in DiseaseAnalysisPipeline
+Uses a fake query client; no Gemini or Databricks access
+"""
+
+import threading
+import time
+
+import pytest
+
+from pipelines.disease_pipeline import DiseaseAnalysisPipeline
+from pipelines.stage_graph import StageGraph
+
+
+class FakeQueryClient:
+    """execute_query() stand-in: sleeps per SQL and fails on 'FAIL'"""
+
+    max_concurrency = 4
+
+    def __init__(self, delays):
+        self.delays = delays
+        self.executed = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def execute_query(self, sql_query, **kwargs):
+        with self.lock:
+            self.executed.append(sql_query)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delays.get(sql_query, 0.01))
+        with self.lock:
+            self.active -= 1
+
+        if sql_query.startswith('FAIL'):
+            return {'success': False, 'data': None, 'row_count': 0,
+                    'execution_time': 0.01, 'error_message': 'boom', 'cached': False}
+        return {'success': True, 'data': [sql_query], 'row_count': 1,
+                'execution_time': self.delays.get(sql_query, 0.01), 'error_message': None, 'cached': False}
+
+
+def make_pipeline(client, max_workers=None):
+    """Pipeline without __init__ (skips Gemini / recipe loading)"""
+    pipeline = DiseaseAnalysisPipeline.__new__(DiseaseAnalysisPipeline)
+    pipeline.max_workers = max_workers
+    pipeline._query_client = client
+    pipeline.cohort_enabled = False
+    return pipeline
+
+
+def rendered(name, sql, success=True):
+    return {'recipe_name': name, 'success': success, 'sql_query': sql, 'parameters': {}, 'metadata': {}}
+
+
+class TestExecuteRecipeQueries:
+    """Test suite for execute_recipe_queries()"""
+
+    def test_wall_time_close_to_slowest(self):
+        """Queries run concurrently: wall time ~ slowest recipe, not the sum"""
+        client = FakeQueryClient({'Q1': 0.2, 'Q2': 0.2, 'Q3': 0.2, 'Q4': 0.2})
+        pipeline = make_pipeline(client)
+
+        started = time.time()
+        results = list(pipeline.execute_recipe_queries([rendered(f'r{i}', f'Q{i}') for i in range(1, 5)]))
+        elapsed = time.time() - started
+
+        assert len(results) == 4
+        assert all(r['status'] == 'succeeded' for r in results)
+        assert elapsed < 0.6
+
+    def test_results_stream_in_completion_order(self):
+        """Fast recipes are yielded before slow ones; index maps back to input order"""
+        client = FakeQueryClient({'SLOW': 0.3, 'FAST': 0.01})
+        pipeline = make_pipeline(client)
+
+        results = list(pipeline.execute_recipe_queries([rendered('slow', 'SLOW'), rendered('fast', 'FAST')]))
+
+        assert [r['recipe_name'] for r in results] == ['fast', 'slow']
+        assert [r['index'] for r in results] == [1, 0]
+        assert results[1]['execution_time'] == 0.3
+        assert 'queue_time' in results[0]
+
+    def test_bounded_worker_pool(self):
+        """No more than max_workers queries are in flight"""
+        client = FakeQueryClient({f'Q{i}': 0.05 for i in range(6)})
+        pipeline = make_pipeline(client, max_workers=2)
+
+        list(pipeline.execute_recipe_queries([rendered(f'r{i}', f'Q{i}') for i in range(6)]))
+        assert client.peak <= 2
+
+    def test_isolate_policy(self):
+        """A failing recipe does not stop the others; render failures are not executed"""
+        client = FakeQueryClient({})
+        pipeline = make_pipeline(client)
+        inputs = [rendered('ok', 'Q1'), rendered('bad', 'FAIL'), rendered('norender', None, success=False)]
+
+        results = {r['recipe_name']: r for r in pipeline.execute_recipe_queries(inputs)}
+
+        assert results['ok']['status'] == 'succeeded'
+        assert results['bad']['status'] == 'failed'
+        assert results['bad']['error'] == 'boom'
+        assert results['norender']['status'] == 'render_failed'
+        assert sorted(client.executed) == ['FAIL', 'Q1']
+
+    def test_fail_fast_cancels_pending(self):
+        """fail_fast cancels recipes that have not started yet"""
+        client = FakeQueryClient({'FAIL': 0.01, 'Q1': 0.1, 'Q2': 0.1, 'Q3': 0.1})
+        pipeline = make_pipeline(client, max_workers=1)
+        inputs = [rendered('bad', 'FAIL')] + [rendered(f'r{i}', f'Q{i}') for i in range(1, 4)]
+
+        results = list(pipeline.execute_recipe_queries(inputs, failure_policy='fail_fast'))
+
+        statuses = sorted(r['status'] for r in results)
+        assert statuses.count('cancelled') >= 2
+        assert len(results) == 4
+        assert len(client.executed) <= 2
+
+    def test_unknown_policy_rejected(self):
+        """Unknown failure policies raise ValueError"""
+        pipeline = make_pipeline(FakeQueryClient({}))
+        with pytest.raises(ValueError):
+            list(pipeline.execute_recipe_queries([], failure_policy='retry'))
+
+
+class TestStageGraph:
+    """Test suite for StageGraph"""
+
+    def test_independent_stages_overlap(self):
+        """Stages without dependencies run concurrently"""
+        graph = StageGraph()
+        graph.add('a', lambda _: time.sleep(0.2) or 'A')
+        graph.add('b', lambda _: time.sleep(0.2) or 'B')
+        graph.add('c', lambda r: r['a'] + r['b'], depends_on=['a', 'b'])
+
+        started = time.time()
+        results = graph.run()
+
+        assert results == {'a': 'A', 'b': 'B', 'c': 'AB'}
+        assert time.time() - started < 0.35
+        timings = {t.name: t for t in graph.timeline}
+        assert timings['c'].started_at >= max(timings['a'].finished_at, timings['b'].finished_at)
+
+    def test_failure_skips_dependents(self):
+        """A failed stage marks dependents skipped and re-raises"""
+        graph = StageGraph()
+        graph.add('bad', lambda _: 1 / 0)
+        graph.add('after', lambda r: 'never', depends_on=['bad'])
+        graph.add('other', lambda _: 'ok')
+
+        with pytest.raises(ZeroDivisionError):
+            graph.run()
+
+        statuses = {t.name: t.status for t in graph.timeline}
+        assert statuses == {'bad': 'failed', 'after': 'skipped', 'other': 'succeeded'}
+
+    def test_unknown_dependency_rejected(self):
+        """Dependencies must be declared before use"""
+        with pytest.raises(ValueError):
+            StageGraph().add('x', lambda _: None, depends_on=['missing'])
+
+
+class TestRunCompletePipeline:
+    """Test suite for the staged run_complete_pipeline()"""
+
+    def test_recommendation_overlaps_core_execution(self):
+        """The LLM recommendation runs while core recipes render and execute"""
+        client = FakeQueryClient({'CORE': 0.2, 'EXTRA': 0.05})
+        pipeline = make_pipeline(client)
+        pipeline.execute_core_recipes = lambda disease, cohort=None: [rendered('core', 'CORE')]
+        pipeline.recommend_additional_recipes = lambda disease, target_count: time.sleep(0.2) or ['extra']
+        pipeline.execute_approved_recipes = lambda disease, names, cohort=None: [rendered(n, 'EXTRA') for n in names]
+
+        started = time.time()
+        result = pipeline.run_complete_pipeline('당뇨병', execute_queries=True)
+        elapsed = time.time() - started
+
+        assert [r['recipe_name'] for r in result.executed_results] == ['core', 'extra']
+        assert result.success_rate == 1.0
+        assert elapsed < 0.4
+        timings = {t.name: t for t in result.stage_timeline}
+        assert timings['core_execute'].started_at < timings['recommend'].finished_at
+        assert result.execution_wall_time is not None
+
+    def test_cohort_stage_shared_by_renders(self):
+        """The cohort is materialized once, before both render stages, and handed to them"""
+        client = FakeQueryClient({})
+        pipeline = make_pipeline(client)
+        pipeline.cohort_enabled = True
+        built, seen = [], []
+        pipeline.materialize_cohort = lambda disease: built.append(disease) or 'COHORT'
+        pipeline.execute_core_recipes = lambda disease, cohort=None: seen.append(cohort) or [rendered('core', 'CORE')]
+        pipeline.recommend_additional_recipes = lambda disease, target_count: ['extra']
+        pipeline.execute_approved_recipes = (
+            lambda disease, names, cohort=None: seen.append(cohort) or [rendered(n, 'EXTRA') for n in names]
+        )
+
+        result = pipeline.run_complete_pipeline('당뇨병', execute_queries=True)
+
+        assert built == ['당뇨병']
+        assert seen == ['COHORT', 'COHORT']
+        assert result.cohort == 'COHORT'
+        timings = {t.name: t for t in result.stage_timeline}
+        assert timings['core_render'].started_at >= timings['cohort'].finished_at
@@ -0,0 +1,160 @@
+"""
+Unit tests for the SQL result cache
+Tests key normalization, memory LRU accounting, disk persistence and TTL
+"""
+
+import time
+
+import pyarrow as pa
+
+from services.query_cache import QueryResultCache, make_cache_key, normalize_sql
+
+
+def make_table(rows: int = 10) -> pa.Table:
+    return pa.table({'user_id': list(range(rows)), 'gender': ['MAN'] * rows})
+
+
+class TestNormalizeSQL:
+    """Test suite for normalize_sql()"""
+
+    def test_whitespace_and_comments_ignored(self):
+        """Formatting and comments should not change the cache key"""
+        sql1 = """-- 고혈압 환자 수
+        SELECT COUNT(*)   FROM basic_treatment
+        WHERE deleted = FALSE /* soft delete */ ;"""
+        sql2 = "SELECT COUNT(*) FROM basic_treatment WHERE deleted = FALSE"
+
+        assert normalize_sql(sql1) == sql2
+        assert make_cache_key(sql1) == make_cache_key(sql2)
+
+    def test_literals_preserved(self):
+        """String literals and backtick aliases keep their exact contents"""
+        sql = "SELECT a AS `환자  수` FROM t WHERE name LIKE '%고혈압  --%'"
+        assert normalize_sql(sql) == sql
+
+    def test_variant_changes_key(self):
+        """Options like max_rows produce distinct keys"""
+        sql = "SELECT 1"
+        assert make_cache_key(sql, "max_rows=10") != make_cache_key(sql, "max_rows=100")
+
+
+class TestQueryResultCache:
+    """Test suite for QueryResultCache"""
+
+    def test_memory_hit(self, tmp_path):
+        """A stored result is returned from memory with hit metrics"""
+        cache = QueryResultCache(disk_dir=str(tmp_path))
+        cache.put("SELECT 1", make_table(), execution_time=4.0)
+
+        table, info = cache.get("select 1".upper())
+        assert table.num_rows == 10
+        assert info['tier'] == 'memory'
+
+        metrics = cache.get_metrics()
+        assert metrics['memory_hits'] == 1
+        assert metrics['time_saved'] == 4.0
+        assert metrics['bytes_saved'] == table.nbytes
+
+    def test_miss_counts(self, tmp_path):
+        """Unknown queries are counted as misses"""
+        cache = QueryResultCache(disk_dir=str(tmp_path))
+        assert cache.get("SELECT 2") is None
+        assert cache.get_metrics()['misses'] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """A new cache instance reads entries written by a previous one"""
+        QueryResultCache(disk_dir=str(tmp_path)).put("SELECT 1", make_table(5))
+
+        table, info = QueryResultCache(disk_dir=str(tmp_path)).get("SELECT 1")
+        assert info['tier'] == 'disk'
+        assert table.column('user_id').to_pylist() == list(range(5))
+
+    def test_disk_limit_skips_vanished_files(self, tmp_path):
+        """Files removed by another process between glob and stat do not fail put()"""
+        cache = QueryResultCache(disk_dir=str(tmp_path), disk_max_bytes=0)
+        (tmp_path / 'gone.arrow').symlink_to(tmp_path / 'missing.arrow')
+
+        cache.put("SELECT 1", make_table())
+        assert cache.get("SELECT 1")[1]['tier'] == 'memory'
+        assert not list(tmp_path.glob('*.tmp*'))
+
+    def test_lru_byte_limit(self):
+        """Memory tier evicts least-recently-used entries beyond memory_max_bytes"""
+        entry_size = make_table(100).nbytes
+        cache = QueryResultCache(disk_dir=None, memory_max_bytes=entry_size * 2)
+
+        cache.put("SELECT 'a'", make_table(100))
+        cache.put("SELECT 'b'", make_table(100))
+        cache.get("SELECT 'a'")  # a를 최근 사용으로 갱신
+        cache.put("SELECT 'c'", make_table(100))
+
+        assert cache.get("SELECT 'b'") is None
+        assert cache.get("SELECT 'a'") is not None
+        metrics = cache.get_metrics()
+        assert metrics['evictions'] == 1
+        assert metrics['memory_bytes'] <= entry_size * 2
+
+    def test_ttl_by_category(self, tmp_path):
+        """Entries expire according to their category TTL"""
+        cache = QueryResultCache(
+            disk_dir=str(tmp_path),
+            default_ttl=3600,
+            ttl_by_category={'nl2sql': 0.01}
+        )
+        cache.put("SELECT 1", make_table(), category='nl2sql')
+        cache.put("SELECT 2", make_table(), category='profile')
+
+        time.sleep(0.02)
+        assert cache.get("SELECT 1") is None
+        assert cache.get("SELECT 2") is not None
+        assert cache.get_metrics()['expirations'] == 1
+
+    def test_invalidate_by_category_and_query(self, tmp_path):
+        """Manual invalidation removes memory and disk entries"""
+        cache = QueryResultCache(disk_dir=str(tmp_path))
+        cache.put("SELECT 1", make_table(), category='pool', variant="max_rows=10")
+        cache.put("SELECT 1", make_table(), category='pool', variant="max_rows=20")
+        cache.put("SELECT 2", make_table(), category='profile')
+
+        assert cache.invalidate(sql_query="SELECT 1") == 2
+        assert cache.invalidate(category='profile') == 1
+        assert cache.get_metrics()['disk_entries'] == 0
+
+
+class TestDatabricksClientCache:
+    """DatabricksClient.execute_query() should serve repeated SQL from the cache"""
+
+    def test_execute_query_uses_cache(self, tmp_path, make_client):
+        client = make_client(connect=None, cache=QueryResultCache(disk_dir=str(tmp_path)))
+
+        calls = []
+
+        def fake_run_query(sql_query, max_rows):
+            calls.append(sql_query)
+            return make_table(3)
+
+        client._run_query = fake_run_query
+
+        first = client.execute_query("SELECT * FROM t", cache_category='profile')
+        second = client.execute_query("SELECT *\n  FROM t  -- same query")
+        uncached = client.execute_query("SELECT * FROM t", use_cache=False)
+
+        assert len(calls) == 2
+        assert first['cached'] is False
+        assert second['cached'] is True and second['coalesced'] is False
+        assert second['row_count'] == 3
+        assert uncached['cached'] is False
+
+    def test_executors_do_not_share_results(self, tmp_path, make_client):
+        """Results cached for one executor/data_dir are not served to another"""
+        cache = QueryResultCache(disk_dir=str(tmp_path))
+        local = make_client(connect=None, cache=cache, cache_namespace='local:/data/synthetic')
+        warehouse = make_client(connect=None, cache=cache, cache_namespace='databricks:adb-1/sql/1.0/warehouses/x')
+        local._run_query = lambda sql_query, max_rows: make_table(3)
+        warehouse._run_query = lambda sql_query, max_rows: make_table(5)
+
+        local.execute_query("SELECT * FROM t")
+        result = warehouse.execute_query("SELECT * FROM t")
+
+        assert result['cached'] is False and result['row_count'] == 5
+        assert local.execute_query("SELECT * FROM t")['row_count'] == 3
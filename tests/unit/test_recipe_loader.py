@@ -0,0 +1,87 @@
+"""
+Unit tests for RecipeLoader's manifest and process-wide registry
+Uses a throwaway recipes directory
+"""
+
+import json
+import os
+
+import pytest
+import yaml
+
+from core import recipe_loader
+from core.recipe_loader import MANIFEST_FILENAME, RecipeLoader
+
+
+@pytest.fixture
+def recipes_dir(tmp_path, monkeypatch):
+    """Two recipes plus one broken YAML; empty registry"""
+    monkeypatch.setattr(recipe_loader, '_registry', {})
+    (tmp_path / 'pool').mkdir()
+    (tmp_path / 'profile').mkdir()
+    (tmp_path / 'pool' / 'a.yaml').write_text("name: a\ndescription: 환자 수\ntags: [count]\n", encoding='utf-8')
+    (tmp_path / 'profile' / 'b.yaml').write_text("name: b\nparameters:\n  - name: start_date\n", encoding='utf-8')
+    (tmp_path / 'profile' / 'broken.yaml').write_text("name: [unclosed\n", encoding='utf-8')
+    return tmp_path
+
+
+@pytest.fixture
+def parse_counter(monkeypatch):
+    """Counts YAML documents actually parsed"""
+    calls = []
+    original = yaml.load
+    monkeypatch.setattr(yaml, 'load', lambda stream, Loader: calls.append(1) or original(stream, Loader=Loader))
+    return calls
+
+
+def bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+class TestRecipeLoader:
+    """Test suite for manifest-backed RecipeLoader"""
+
+    def test_metadata_and_manifest(self, recipes_dir):
+        """Valid recipes load, broken YAML is skipped, manifest is written"""
+        loader = RecipeLoader(str(recipes_dir))
+
+        assert sorted(loader.recipe_metadata) == ['a', 'b']
+        assert loader.get_recipe_by_name('a')['category'] == 'pool'
+        assert loader.get_recipe_by_name('b')['parameters'] == [{'name': 'start_date'}]
+
+        manifest = json.loads((recipes_dir / MANIFEST_FILENAME).read_text(encoding='utf-8'))
+        assert set(manifest['files']) == {'pool/a.yaml', 'profile/b.yaml', 'profile/broken.yaml'}
+
+    def test_registry_shared_within_process(self, recipes_dir, parse_counter):
+        """A second loader reuses the parsed metadata without touching YAML"""
+        first = RecipeLoader(str(recipes_dir))
+        parsed = len(parse_counter)
+        second = RecipeLoader(str(recipes_dir))
+
+        assert second.recipe_metadata is first.recipe_metadata
+        assert len(parse_counter) == parsed
+
+    def test_manifest_skips_parsing_on_restart(self, recipes_dir, parse_counter, monkeypatch):
+        """A fresh process (empty registry) reads the manifest instead of parsing YAML"""
+        RecipeLoader(str(recipes_dir))
+        monkeypatch.setattr(recipe_loader, '_registry', {})
+        parse_counter.clear()
+
+        loader = RecipeLoader(str(recipes_dir))
+        assert sorted(loader.recipe_metadata) == ['a', 'b']
+        assert parse_counter == []
+
+    def test_changed_yaml_reparsed(self, recipes_dir, parse_counter):
+        """Only the edited YAML is parsed again; touched-but-identical files are not"""
+        RecipeLoader(str(recipes_dir))
+        parse_counter.clear()
+
+        edited = recipes_dir / 'pool' / 'a.yaml'
+        edited.write_text("name: a\ndescription: 환자 수 (수정)\n", encoding='utf-8')
+        bump_mtime(edited)
+        bump_mtime(recipes_dir / 'profile' / 'b.yaml')
+
+        loader = RecipeLoader(str(recipes_dir))
+        assert loader.get_recipe_by_name('a')['description'] == '환자 수 (수정)'
+        assert len(parse_counter) == 1
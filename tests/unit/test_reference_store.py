@@ -0,0 +1,69 @@
+"""
+Unit tests for the memory-mapped reference data store
+Uses a throwaway reference directory
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from core import reference_store
+from core.reference_store import build_reference_store, load_reference_frame, load_reference_table, store_path_for
+
+
+@pytest.fixture
+def reference_dir(tmp_path, monkeypatch):
+    """Ingredient table with a JSON list column and a numeric-looking code table; empty registry"""
+    monkeypatch.setattr(reference_store, '_tables', {})
+    pd.DataFrame({
+        'name': ['acetaminophen', 'ibuprofen'],
+        'patient_count': [10, 5],
+        'example_drugs': ['["타이레놀정", "", "펜잘정"]', '["부루펜정"]'],
+    }).to_csv(tmp_path / 'unique_ingredients.csv', index=False)
+    pd.DataFrame({'code': ['0123', 'AI109'], 'patient_count': [1, 2]}).to_csv(tmp_path / 'codes.csv', index=False)
+    return tmp_path
+
+
+class TestReferenceStore:
+    """Test suite for core.reference_store"""
+
+    def test_csv_fallback_matches_read_csv(self, reference_dir):
+        """Without a store the CSV is read directly; codes stay strings"""
+        frame = load_reference_frame(reference_dir / 'codes.csv')
+
+        assert frame['code'].tolist() == ['0123', 'AI109']
+        assert frame['patient_count'].tolist() == [1, 2]
+
+    def test_list_column_parsed_once(self, reference_dir):
+        """JSON list strings become list<string> values without empty items"""
+        build_reference_store(reference_dir)
+        table = load_reference_table(reference_dir / 'unique_ingredients.csv')
+
+        assert str(table.schema.field('example_drugs').type) == 'list<item: string>'
+        assert table.column('example_drugs').to_pylist() == [['타이레놀정', '펜잘정'], ['부루펜정']]
+
+    def test_store_memory_mapped_and_shared(self, reference_dir, monkeypatch):
+        """A fresh store is read via memory map and cached for the process"""
+        build_reference_store(reference_dir)
+        monkeypatch.setattr(reference_store, 'read_reference_csv', lambda path: pytest.fail('CSV parsed'))
+
+        first = load_reference_table(reference_dir / 'codes.csv')
+        assert first is load_reference_table(reference_dir / 'codes.csv')
+        assert first.column('code').to_pylist() == ['0123', 'AI109']
+
+    def test_stale_store_ignored(self, reference_dir):
+        """Editing the CSV after conversion falls back to the CSV until rebuilt"""
+        build_reference_store(reference_dir)
+        csv_path = reference_dir / 'codes.csv'
+        pd.DataFrame({'code': ['B01'], 'patient_count': [7]}).to_csv(csv_path, index=False)
+        stat = csv_path.stat()
+        os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+        assert load_reference_frame(csv_path)['code'].tolist() == ['B01']
+        assert store_path_for(csv_path).exists()
+
+    def test_missing_reference_raises(self, reference_dir):
+        """Neither CSV nor store present"""
+        with pytest.raises(FileNotFoundError):
+            load_reference_table(reference_dir / 'missing.csv')
@@ -0,0 +1,199 @@
+"""
+Unit tests for inverted-index schema retrieval in SchemaLoader
+Uses a small hand-written schema CSV
+"""
+
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from core import schema_loader
+from core.schema_index import SchemaSearchIndex, tokenize
+from core.schema_loader import SchemaLoader, get_schema_snapshot
+
+
+COLUMNS = ['테이블명', '컬럼명', '한글명', '설명', '데이터타입', '컬럼타입', 'NULL허용', '키워드', '카테고리', '중요도', 'search_text']
+
+
+def row(table, column, korean, keywords, search_text):
+    return [table, column, korean, '', 'string', 'string', '예', keywords, '', '보통', search_text]
+
+
+@pytest.fixture
+def loader(tmp_path):
+    """Schema with core tables, hospital/region columns and one column without search_text"""
+    rows = [
+        row('basic_treatment', 'user_id', '사용자 ID', 'user', 'basic_treatment user_id 환자'),
+        row('basic_treatment', 'res_disease_name', '상병명', '질환', 'basic_treatment res_disease_name 상병명 질환'),
+        row('prescribed_drug', 'res_drug_name', '약품명', '약물', 'prescribed_drug res_drug_name 약품명 처방'),
+        row('hospital', 'sido_name', '시도명', '지역', 'hospital sido_name 시도명 지역 병원 주소'),
+        row('hospital', 'hospital_code', '병원 코드', 'hospital', 'hospital hospital_code 병원 코드'),
+        row('health_checkup', 'blood_pressure', '혈압', '검진', 'health_checkup blood_pressure 혈압 건강검진'),
+        row('family', 'memo', '메모', '', None),
+    ]
+    path = tmp_path / 'schema.csv'
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False, encoding='utf-8-sig')
+    return SchemaLoader(str(path))
+
+
+def rewrite_schema(path, rows):
+    """Replace the CSV and push its mtime forward so the change is always visible"""
+    stat = path.stat()
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False, encoding='utf-8-sig')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+
+class TestTokenize:
+    """Test suite for schema tokenization"""
+
+    def test_hangul_bigrams_and_identifiers(self):
+        """Hangul words become syllable bigrams; snake_case identifiers are split too"""
+        assert tokenize('당뇨병 환자의') == ['당뇨', '뇨병', '환자', '자의']
+        assert tokenize('user_id') == ['user_id', 'user', 'id']
+
+    def test_min_word_length(self):
+        """Short query words are dropped like the previous scorer did"""
+        assert tokenize('a 및 혈압', min_word_length=2) == ['혈압']
+
+
+class TestSchemaSearchIndex:
+    """Test suite for the BM25 index"""
+
+    def test_rarer_terms_score_higher(self):
+        """A term in fewer documents contributes more (idf)"""
+        index = SchemaSearchIndex([['a', 'b'], ['a'], ['a', 'c']])
+        scores = index.score(['a', 'c'])
+
+        assert scores.argmax() == 2
+        assert scores[0] > 0 and scores[1] > 0
+        assert index.score(['zzz']).sum() == 0
+
+
+class TestGetRelevantSchema:
+    """Test suite for SchemaLoader.get_relevant_schema()"""
+
+    def test_core_tables_always_included(self, loader):
+        """Core tables come first with 0.8 even when the query does not mention them"""
+        result = loader.get_relevant_schema('건강검진 혈압', top_k=10)
+
+        core = result[result['relevance_score'] == 0.8]
+        assert set(core['테이블명']) == {'basic_treatment', 'prescribed_drug'}
+        assert 'blood_pressure' in result['컬럼명'].tolist()
+
+    def test_ranking_and_bonus(self, loader):
+        """Important keywords in both query and search_text add 0.3 each"""
+        result = loader.get_relevant_schema('병원 지역 분포', top_k=10, include_core_tables=False)
+
+        assert result['컬럼명'].tolist()[:2] == ['sido_name', 'hospital_code']
+        scores = dict(zip(result['컬럼명'], result['relevance_score']))
+        assert scores['sido_name'] - scores['hospital_code'] > 0.3 - 1e-6
+
+    def test_top_k_counts_core_rows(self, loader):
+        """Core rows use up part of top_k, as before"""
+        result = loader.get_relevant_schema('병원 지역', top_k=4)
+
+        assert len(result) == 4
+        assert (result['relevance_score'] == 0.8).sum() == 3
+        assert result['relevance_score'].is_monotonic_decreasing
+
+    def test_missing_search_text_not_scored(self, loader):
+        """Columns without search_text are never returned by relevance"""
+        result = loader.get_relevant_schema('메모', top_k=10, include_core_tables=False)
+        assert result.empty
+
+    def test_schema_df_not_mutated(self, loader):
+        """Scoring no longer writes a relevance_score column into the shared schema"""
+        loader.get_relevant_schema('병원', top_k=5)
+        assert 'relevance_score' not in loader.schema_df.columns
+
+
+class TestSchemaSnapshot:
+    """Test suite for the process-wide schema snapshot"""
+
+    def test_loaders_share_one_snapshot(self, loader):
+        """A second loader on the same CSV reuses the parsed snapshot"""
+        other = SchemaLoader(str(loader.schema_path))
+
+        assert other.snapshot is loader.snapshot
+        assert other.schema_df is loader.schema_df
+
+    def test_snapshot_arrays_read_only(self, loader):
+        """Index and mask arrays cannot be modified in place"""
+        with pytest.raises(ValueError):
+            loader.snapshot.core_mask[0] = False
+
+    def test_hot_reload_swaps_snapshot(self, loader, monkeypatch):
+        """A changed CSV yields a new snapshot; the old one is left intact"""
+        monkeypatch.setattr(schema_loader, 'RELOAD_CHECK_INTERVAL', 0.0)
+        old = loader.snapshot
+
+        rewrite_schema(loader.schema_path, [row('basic_treatment', 'user_id', '사용자 ID', 'user', 'user_id 환자')])
+
+        assert len(loader.schema_df) == 1
+        assert loader.snapshot is not old
+        assert len(old.schema_df) == 7
+
+    def test_failed_reload_keeps_previous(self, loader, monkeypatch):
+        """A missing file after start-up keeps serving the last good snapshot"""
+        monkeypatch.setattr(schema_loader, 'RELOAD_CHECK_INTERVAL', 0.0)
+        old = loader.snapshot
+        os.remove(loader.schema_path)
+
+        assert get_schema_snapshot(str(loader.schema_path)) is old
+
+    def test_concurrent_queries_during_reload(self, loader, monkeypatch):
+        """Queries running while the CSV is swapped always see a complete snapshot"""
+        monkeypatch.setattr(schema_loader, 'RELOAD_CHECK_INTERVAL', 0.0)
+        errors = []
+
+        def query():
+            try:
+                for _ in range(50):
+                    result = loader.get_relevant_schema('병원 지역', top_k=10)
+                    assert 'relevance_score' in result.columns
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for i in range(5):
+            rewrite_schema(loader.schema_path, [row('hospital', f'c{i}', '지역', '지역', '병원 지역')] * (i + 1))
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+
+class TestFormatSchemaForLLM:
+    """Test suite for precomputed schema text"""
+
+    def test_cached_lines_match_row_formatting(self, loader):
+        """Snapshot-derived frames use cached lines with identical output"""
+        result = loader.get_relevant_schema('병원 지역 혈압', top_k=10)
+        detached = result.copy()
+        detached.attrs = {}
+
+        text = loader.format_schema_for_llm(result)
+        assert text == loader.format_schema_for_llm(detached)
+        assert text.index('**Table: basic_treatment**') < text.index('**Table: hospital**')
+        assert '키워드: 지역' in text
+
+    def test_repeated_row_sets_memoized(self, loader):
+        """The core-table context is built once and then served from the memo"""
+        core = loader.get_core_tables_schema()
+        loader.format_schema_for_llm(core)
+        loader.format_schema_for_llm(loader.get_core_tables_schema())
+
+        assert loader.snapshot._format_cache.cache_info().hits >= 1
+
+    def test_frame_from_previous_snapshot_formatted_directly(self, loader, monkeypatch):
+        """Rows selected before a reload are still formatted from their own values"""
+        monkeypatch.setattr(schema_loader, 'RELOAD_CHECK_INTERVAL', 0.0)
+        selected = loader.get_table_schema('hospital')
+        rewrite_schema(loader.schema_path, [row('user', 'id', 'ID', '', 'user id')])
+
+        text = loader.format_schema_for_llm(selected)
+        assert 'sido_name' in text and 'hospital_code' in text
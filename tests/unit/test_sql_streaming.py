@@ -0,0 +1,89 @@
+"""
+Unit tests for streaming NL2SQL generation
+Incremental JSON field extraction and progress callbacks over a fake streaming model
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pipelines.nl2sql_generator import NL2SQLGenerator
+from services.llm_gateway import LLMGateway
+from utils.parsers import StreamingJSONField
+
+
+RESPONSE = '```json\n' + json.dumps({
+    'sql': "SELECT\n    ip.gender AS `성별`\nFROM insured_person ip\nWHERE ip.gender = \"WOMAN\"",
+    'analysis': {'required_tables': ['insured_person'], 'key_conditions': ['{"sql": "not this"}']},
+}, ensure_ascii=False) + '\n```'
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStreamingBackend:
+    """Gateway backend that returns the canned response, or streams it in small chunks"""
+
+    def __init__(self, text, size=5):
+        self.text, self.size = text, size
+
+    def generate(self, model_name, prompt):
+        return SimpleNamespace(text=self.text)
+
+    def stream(self, model_name, prompt):
+        return iter([SimpleNamespace(text=chunk) for chunk in chunked(self.text, self.size)])
+
+
+@pytest.fixture
+def generator():
+    generator = NL2SQLGenerator.__new__(NL2SQLGenerator)
+    generator.llm = LLMGateway(backend=FakeStreamingBackend(RESPONSE), requests_per_minute=None)
+    generator.logger = None
+    return generator
+
+
+class TestStreamingJSONField:
+    """Test suite for StreamingJSONField"""
+
+    @pytest.mark.parametrize('size', [1, 3, 7, 64])
+    def test_value_grows_then_completes(self, size):
+        """Partial values are prefixes of the final value; escapes across chunk borders decode"""
+        field = StreamingJSONField('sql')
+        values = [field.feed(chunk) for chunk in chunked(RESPONSE, size)]
+        expected = json.loads(RESPONSE[len('```json\n'):-len('\n```')])['sql']
+
+        assert field.complete and field.value == expected
+        assert all(value is None or expected.startswith(value) for value in values)
+
+    def test_ignores_nested_and_missing_fields(self):
+        """Same-named keys inside nested objects are skipped; absent field stays None"""
+        field = StreamingJSONField('sql')
+        field.feed('{"analysis": {"sql": "nested"}, "sql": "SELECT 1"}')
+        assert field.value == 'SELECT 1'
+
+        field = StreamingJSONField('sql')
+        assert field.feed('{"analysis": {"sql": "nested"}}') is None
+        assert not field.complete
+
+
+class TestStreamingGeneration:
+    """Test suite for NL2SQLGenerator._call_llm()"""
+
+    def test_progress_and_metrics(self, generator):
+        """Callback sees growing SQL, exactly one completion, and timings are recorded"""
+        progress = []
+        text, metrics = generator._call_llm('prompt', lambda sql, complete: progress.append((sql, complete)))
+
+        assert text == RESPONSE
+        assert [complete for _, complete in progress].count(True) == 1
+        assert progress[-1] == (json.loads(text.split('```json')[1].split('```')[0])['sql'], True)
+        assert 0 <= metrics.time_to_first_token <= metrics.time_to_sql <= metrics.total_time
+        assert metrics.chunks == len(chunked(RESPONSE, 5))
+
+    def test_blocking_without_callback(self, generator):
+        """No callback keeps the single blocking call"""
+        text, metrics = generator._call_llm('prompt')
+
+        assert text == RESPONSE and metrics is None
@@ -0,0 +1,111 @@
+"""
+Unit tests for the synthetic clinical data generator
+Generates a tiny dataset and checks shape, partitioning and determinism
+"""
+
+import json
+
+import pyarrow.dataset as ds
+import pytest
+
+from tools.generate_synthetic_data import SyntheticDataGenerator
+
+
+@pytest.fixture(scope="module")
+def dataset_dir(tmp_path_factory):
+    """20k-row dataset written once for the module"""
+    output = tmp_path_factory.mktemp("warehouse")
+    SyntheticDataGenerator(rows=20_000, chunk_rows=8_000, seed=7).generate(str(output), progress=False)
+    return output
+
+
+def _recipe_tables():
+    """Tables referenced by every rendered recipe under recipes/ (CTE names excluded)"""
+    sqlglot = pytest.importorskip("sqlglot")
+    from sqlglot import exp
+    from core.recipe_loader import RecipeLoader
+    from core.sql_template_engine import SQLTemplateEngine
+    from tools.generate_all_sql import generate_dummy_parameters
+
+    engine = SQLTemplateEngine('recipes')
+    tables = set()
+    for recipe in RecipeLoader('recipes').get_all_recipes():
+        sql = engine.render_template(recipe['name'], generate_dummy_parameters(recipe['parameters']))
+        tree = sqlglot.parse_one(sql, read='databricks')
+        ctes = {cte.alias_or_name for cte in tree.find_all(exp.CTE)}
+        tables |= {table.name for table in tree.find_all(exp.Table)} - ctes
+    return tables
+
+
+def _read(path):
+    return ds.dataset(path, format="parquet", partitioning="hive").to_table()
+
+
+class TestSyntheticDataGenerator:
+    """Test suite for SyntheticDataGenerator"""
+
+    def test_tables_and_row_counts(self, dataset_dir):
+        """All tables are written and basic_treatment has exactly the requested rows"""
+        stats = json.loads((dataset_dir / "_generation.json").read_text(encoding="utf-8"))
+
+        treatments = _read(dataset_dir / "basic_treatment")
+        assert treatments.num_rows == 20_000 == stats["basic_treatment_rows"]
+        assert stats["chunks"] == 3
+        assert _read(dataset_dir / "prescribed_drug").num_rows == stats["prescribed_drug_rows"]
+        assert _read(dataset_dir / "insured_person").num_rows == stats["patients"] == 800
+        assert _read(dataset_dir / "hospital").num_rows == stats["hospitals"]
+        assert _read(dataset_dir / "nhis_health_checkup_preview").num_rows == stats["checkup_rows"] > 0
+        assert _read(dataset_dir / "medical_expenses_detail_history").num_rows == stats["medical_expenses_detail_rows"] > 0
+
+    def test_year_partitions_match_dates(self, dataset_dir):
+        """Rows land in the year=YYYY partition of their res_treat_start_date"""
+        table = _read(dataset_dir / "basic_treatment").to_pandas()
+
+        assert table["res_treat_start_date"].str.len().eq(8).all()
+        assert (table["res_treat_start_date"].str[:4].astype(int) == table["year"].astype(int)).all()
+
+    def test_reference_distribution_and_keys(self, dataset_dir):
+        """Most common disease follows reference patient_count; foreign keys resolve"""
+        treatments = _read(dataset_dir / "basic_treatment").to_pandas()
+        hospitals = _read(dataset_dir / "hospital").to_pandas()
+
+        assert treatments["res_disease_code"].value_counts().index[0] == "$"
+        assert treatments["user_id"].between(1, 800).all()
+        assert set(treatments["res_hospital_code"]) <= set(hospitals["hospital_code"])
+        assert 0 < treatments["deleted"].mean() < 0.05
+
+    def test_seed_is_deterministic(self, tmp_path):
+        """Same seed produces identical data"""
+        for name in ("a", "b"):
+            SyntheticDataGenerator(rows=2_000, seed=3).generate(str(tmp_path / name), progress=False)
+
+        a = _read(tmp_path / "a" / "prescribed_drug").sort_by("prescribed_drug_id")
+        b = _read(tmp_path / "b" / "prescribed_drug").sort_by("prescribed_drug_id")
+        assert a.equals(b)
+
+    def test_refuses_to_overwrite(self, dataset_dir):
+        """Existing output is kept unless overwrite=True"""
+        with pytest.raises(FileExistsError):
+            SyntheticDataGenerator(rows=100).generate(str(dataset_dir), progress=False)
+
+    def test_every_recipe_table_generated(self, dataset_dir):
+        """Each table referenced under recipes/ exists in the generated warehouse"""
+        from services.local_executor import discover_tables
+
+        tables = _recipe_tables()
+        assert {'basic_treatment', 'medical_expenses_detail_history', 'nhis_health_checkup_preview'} <= tables
+        assert tables <= set(discover_tables(dataset_dir))
+
+    def test_queryable_by_local_executor(self, dataset_dir):
+        """The output directory plugs straight into the local DuckDB warehouse"""
+        pytest.importorskip("duckdb")
+        pytest.importorskip("sqlglot")
+        from services.local_executor import LocalWarehouse
+
+        cursor = LocalWarehouse(str(dataset_dir)).connect().cursor()
+        cursor.execute(
+            "SELECT COUNT(DISTINCT bt.user_id) AS n FROM basic_treatment bt "
+            "JOIN insured_person ip ON ip.user_id = bt.user_id "
+            "WHERE bt.deleted = FALSE AND TRY_TO_DATE(bt.res_treat_start_date, 'yyyyMMdd') IS NOT NULL"
+        )
+        assert cursor.fetchall()[0][0] > 0
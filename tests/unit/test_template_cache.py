@@ -0,0 +1,79 @@
+"""
+Unit tests for the compiled template cache in SQLTemplateEngine
+Uses a throwaway recipes directory so mtime-based reloads can be exercised
+"""
+
+import os
+
+import pytest
+
+from core.exceptions import RecipeNotFoundError
+from core.sql_template_engine import SQLTemplateEngine
+
+
+@pytest.fixture
+def recipes_dir(tmp_path):
+    """recipes/pool + recipes/profile with one name present in both"""
+    (tmp_path / 'pool').mkdir()
+    (tmp_path / 'profile').mkdir()
+    (tmp_path / 'pool' / 'count.sql').write_text("SELECT COUNT(*) FROM {{ table }}", encoding='utf-8')
+    (tmp_path / 'pool' / 'shared.sql').write_text("-- pool", encoding='utf-8')
+    (tmp_path / 'profile' / 'shared.sql').write_text("-- profile", encoding='utf-8')
+    return tmp_path
+
+
+class TestTemplateCache:
+    """Test suite for the shared Jinja environment and recipe index"""
+
+    def test_index_prefers_pool(self, recipes_dir):
+        """pool/ wins over profile/ for the same recipe name, as before"""
+        engine = SQLTemplateEngine(str(recipes_dir))
+
+        assert engine.get_sql_template_path('shared') == recipes_dir / 'pool' / 'shared.sql'
+        assert engine.render_template('shared', {}) == '-- pool'
+
+    def test_compiled_once_and_shared(self, recipes_dir):
+        """Engines on the same directory reuse one compiled template"""
+        first = SQLTemplateEngine(str(recipes_dir))
+        second = SQLTemplateEngine(str(recipes_dir))
+
+        assert first.render_template('count', {'table': 't'}) == 'SELECT COUNT(*) FROM t'
+        assert first.env is second.env
+        assert first.env.get_template('count.sql') is second.env.get_template('count.sql')
+
+    def test_modified_file_reloaded(self, recipes_dir):
+        """Editing a .sql file is picked up on the next render"""
+        engine = SQLTemplateEngine(str(recipes_dir))
+        engine.render_template('count', {'table': 't'})
+
+        path = recipes_dir / 'pool' / 'count.sql'
+        path.write_text("SELECT 1 FROM {{ table }}", encoding='utf-8')
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+        assert engine.render_template('count', {'table': 't'}) == 'SELECT 1 FROM t'
+
+    def test_new_recipe_and_missing_recipe(self, recipes_dir):
+        """Files added after start-up are found; unknown recipes still raise"""
+        engine = SQLTemplateEngine(str(recipes_dir))
+        (recipes_dir / 'profile' / 'late.sql').write_text("SELECT 2", encoding='utf-8')
+
+        assert engine.render_template('late', {}) == 'SELECT 2'
+        with pytest.raises(RecipeNotFoundError):
+            engine.render_template('missing', {})
+
+    def test_bytecode_cache_written(self, recipes_dir, tmp_path_factory):
+        """With a bytecode cache directory, compiled templates are persisted"""
+        cache_dir = tmp_path_factory.mktemp('bytecode')
+        engine = SQLTemplateEngine(str(recipes_dir), bytecode_cache_dir=str(cache_dir))
+
+        engine.render_template('count', {'table': 't'})
+        assert any(cache_dir.iterdir())
+
+    def test_string_templates_cached(self, recipes_dir):
+        """render() compiles a given SQL string once"""
+        engine = SQLTemplateEngine(str(recipes_dir))
+        engine.render("SELECT {{ x }}", {'x': 1})
+        engine.render("SELECT {{ x }}", {'x': 2})
+
+        assert engine._store.from_string.cache_info().hits >= 1
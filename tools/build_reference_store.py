@@ -0,0 +1,43 @@
+"""
+Reference Store Builder
+reference_data/*.csv → reference_data/.arrow/*.arrow (압축 없는 Arrow IPC) 일괄 변환
+
+런타임(core.reference_store)은 최신 사본이 있으면 CSV 대신 메모리 매핑으로 읽음.
+CSV를 갱신한 뒤에는 다시 실행 (오래된 사본은 자동으로 무시되고 CSV에서 읽음).
+
+Usage:
+    python tools/build_reference_store.py
+    python tools/build_reference_store.py --reference-dir reference_data
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.reference_store import REFERENCE_DIR, STORE_DIRNAME, build_reference_store  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description='reference_data CSV → 메모리 매핑용 Arrow 사본 변환')
+    parser.add_argument('--reference-dir', type=Path, default=REFERENCE_DIR, help='참조 데이터 디렉토리')
+    args = parser.parse_args()
+
+    if not args.reference_dir.is_dir():
+        print(f"❌ 디렉토리가 없습니다: {args.reference_dir}")
+        sys.exit(1)
+
+    start = time.time()
+    written = build_reference_store(args.reference_dir)
+    elapsed = time.time() - start
+
+    for csv_name, store_path in written.items():
+        csv_size = (args.reference_dir / csv_name).stat().st_size
+        print(f"  - {csv_name:32s} {csv_size / 1e6:6.1f} MB → {store_path} ({store_path.stat().st_size / 1e6:.1f} MB)")
+    print(f"✅ {len(written)}개 변환 완료 ({elapsed:.2f}s) - {args.reference_dir / STORE_DIRNAME}")
+
+
+if __name__ == "__main__":
+    main()
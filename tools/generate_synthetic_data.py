@@ -0,0 +1,647 @@
+"""
+Synthetic Clinical Data Generator
+부하/규모 테스트용 합성 진료 데이터 생성 도구
+
+reference_data/의 실제 분포를 따라 basic_treatment / prescribed_drug / detail_treatment /
+insured_person / user / hospital 테이블과, 레시피가 참조하는 의료비(medical_expenses_history /
+medical_expenses_detail_history) · 건강검진(nhis_health_checkup_preview) 테이블을 Parquet으로 생성. 출력 디렉토리는 로컬 DuckDB 실행기(databricks.executor: local)의
+data_dir 구조와 같으므로 바로 레시피 벤치마크에 사용할 수 있음.
+
+분포:
+    - 질환: unique_diseases.csv의 patient_count로 (환자, 질환) 에피소드를 뽑고,
+            occurrence_count / patient_count를 에피소드당 평균 방문 수로 사용.
+            에피소드 시작일은 질환별 first_occurrence ~ last_occurrence 범위.
+    - 약품: unique_drugs.csv의 prescription_count 가중치 (성분 누락분은 medication_ingredients.csv로 보충)
+
+모든 샘플링은 NumPy 벡터 연산 + Arrow dictionary 배열로 처리 (행 단위 Python 루프 없음).
+행 수가 많으면 chunk 단위로 생성/기록하므로 메모리 사용량은 chunk 크기에 비례.
+
+Usage:
+    python tools/generate_synthetic_data.py --rows 1000000
+    python tools/generate_synthetic_data.py --rows 100000000 --chunk-rows 5000000 --output data/local_warehouse
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+REFERENCE_DIR = Path("reference_data")
+DEFAULT_OUTPUT = Path("data/local_warehouse")
+
+DATE_MIN = np.datetime64('2020-01-01')
+DATE_MAX = np.datetime64('2025-08-31')
+
+# ICD 대분류(코드 두 번째 글자) → 진료과
+DEPARTMENT_BY_CHAPTER = {
+    'A': '내과', 'B': '내과', 'C': '혈액종양내과', 'D': '혈액종양내과', 'E': '내분비내과',
+    'F': '정신건강의학과', 'G': '신경과', 'H': '안과', 'I': '순환기내과', 'J': '이비인후과',
+    'K': '소화기내과', 'L': '피부과', 'M': '정형외과', 'N': '신장내과', 'O': '산부인과',
+    'P': '소아청소년과', 'Q': '소아청소년과', 'R': '가정의학과', 'S': '정형외과', 'T': '응급의학과',
+    'Z': '가정의학과',
+}
+
+# (시도, 시군구 목록, 가중치)
+REGIONS = [
+    ('서울특별시', ['강남구', '송파구', '서초구', '강서구', '노원구', '마포구'], 0.19),
+    ('경기도', ['수원시', '성남시', '고양시', '용인시', '부천시', '화성시'], 0.26),
+    ('부산광역시', ['해운대구', '부산진구', '동래구', '사하구'], 0.07),
+    ('인천광역시', ['남동구', '부평구', '연수구', '서구'], 0.06),
+    ('대구광역시', ['수성구', '달서구', '북구', '중구'], 0.05),
+    ('대전광역시', ['서구', '유성구', '중구'], 0.03),
+    ('광주광역시', ['북구', '서구', '광산구'], 0.03),
+    ('경상남도', ['창원시', '김해시', '양산시', '진주시'], 0.06),
+    ('경상북도', ['포항시', '구미시', '경산시'], 0.05),
+    ('충청남도', ['천안시', '아산시', '서산시'], 0.04),
+    ('전라북도', ['전주시', '익산시', '군산시'], 0.04),
+    ('전라남도', ['순천시', '여수시', '목포시'], 0.04),
+    ('강원도', ['춘천시', '원주시', '강릉시'], 0.03),
+    ('충청북도', ['청주시', '충주시'], 0.03),
+    ('제주특별자치도', ['제주시', '서귀포시'], 0.02),
+]
+
+# (요양기관종별코드, 기관명 접미사, 가중치)  01: 상급종합, 11: 종합병원, 21/28/29: 병원급, 31: 의원
+FACILITY_TYPES = [
+    ('01', '대학교병원', 0.01),
+    ('11', '종합병원', 0.04),
+    ('21', '병원', 0.10),
+    ('28', '요양병원', 0.05),
+    ('29', '정신병원', 0.01),
+    ('31', '의원', 0.72),
+    ('92', '보건소', 0.07),
+]
+
+TREAT_TYPES = np.array(['외래', '입원', '약국'])
+TREAT_TYPE_WEIGHTS = np.array([0.90, 0.04, 0.06])
+
+# detail_treatment 행위명 (방문당 Poisson 개수, 가중치)
+TREATMENT_ACTS = [
+    ('초진 진찰료', 0.18), ('재진 진찰료', 0.30), ('일반혈액검사(CBC)', 0.08), ('간기능검사', 0.05),
+    ('당화혈색소(HbA1c)', 0.04), ('소변검사', 0.04), ('흉부 단순촬영', 0.04), ('복부 초음파', 0.03),
+    ('심전도검사', 0.03), ('근육주사', 0.05), ('정맥주사', 0.03), ('신경차단술', 0.02),
+    ('물리치료(온열)', 0.04), ('상부소화관 내시경', 0.02), ('전산화단층촬영(CT)', 0.02),
+    ('자기공명영상(MRI)', 0.01), ('관절강내 주사', 0.01), ('침술', 0.01),
+]
+
+SURNAMES = list('김이박최정강조윤장임한오서신권황안송류홍')
+# 건강검진 수검률 / 수검자당 검진 횟수 상한, 의료비 내역의 기관 수 / 기관당 결제 건수 평균
+CHECKUP_RATIO = 0.6
+MAX_CHECKUPS = 3
+EXPENSE_COMPANIES_PER_PATIENT = 3.0
+PAYMENTS_PER_COMPANY = 4.0
+
+GIVEN_NAMES = ['민준', '서연', '도윤', '지우', '하준', '서윤', '시우', '하은', '주원', '지민',
+               '영수', '영희', '정숙', '순자', '철수', '미경', '성호', '은주', '현우', '수빈']
+
+
+@dataclass
+class GenerationStats:
+    """생성 결과 요약 (출력 디렉토리의 _generation.json에도 기록)"""
+    rows: int
+    patients: int
+    hospitals: int
+    basic_treatment_rows: int = 0
+    prescribed_drug_rows: int = 0
+    detail_treatment_rows: int = 0
+    checkup_rows: int = 0
+    medical_expenses_rows: int = 0
+    medical_expenses_detail_rows: int = 0
+    chunks: int = 0
+    elapsed: float = 0.0
+    seed: int = 0
+
+
+def _dictionary(indices: np.ndarray, values) -> pa.DictionaryArray:
+    """정수 인덱스 + 값 목록 → Arrow dictionary 배열 (문자열을 행마다 만들지 않음)"""
+    return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), pa.array(values))
+
+
+def _to_str(values: np.ndarray) -> pa.Array:
+    """정수 배열 → 문자열 배열 (varchar 컬럼 흉내)"""
+    return pc.cast(pa.array(values), pa.string())
+
+
+def load_reference_distributions(reference_dir: Path = REFERENCE_DIR) -> Dict[str, pd.DataFrame]:
+    """
+    reference_data/ CSV에서 샘플링 분포 로드
+
+    Returns:
+        {'diseases': DataFrame, 'drugs': DataFrame}
+    """
+    diseases = pd.read_csv(reference_dir / "unique_diseases.csv", dtype={'code': str})
+    diseases = diseases[diseases['patient_count'] > 0].reset_index(drop=True)
+    diseases['visits_per_patient'] = (
+        diseases['occurrence_count'] / diseases['patient_count']
+    ).clip(lower=1.0, upper=60.0)
+    diseases['first_day'] = pd.to_datetime(
+        diseases['first_occurrence'].astype(str), format='%Y%m%d', errors='coerce'
+    ).fillna(pd.Timestamp(str(DATE_MIN)))
+    diseases['last_day'] = pd.to_datetime(
+        diseases['last_occurrence'].astype(str), format='%Y%m%d', errors='coerce'
+    ).fillna(pd.Timestamp(str(DATE_MAX)))
+    diseases['department'] = diseases['code'].str[1:2].map(DEPARTMENT_BY_CHAPTER).fillna('내과')
+
+    drugs = pd.read_csv(reference_dir / "unique_drugs.csv")
+    drugs = drugs[drugs['prescription_count'] > 0].reset_index(drop=True)
+    ingredients_path = reference_dir / "medication_ingredients.csv"
+    if ingredients_path.exists():
+        mapping = pd.read_csv(ingredients_path).drop_duplicates('drug_name').set_index('drug_name')['ingredients']
+        drugs['ingredients'] = drugs['ingredients'].fillna(drugs['name'].map(mapping))
+    drugs['ingredients'] = drugs['ingredients'].fillna('')
+
+    return {'diseases': diseases, 'drugs': drugs}
+
+
+class SyntheticDataGenerator:
+    """
+    합성 진료 데이터 생성기
+
+    사용 예:
+        generator = SyntheticDataGenerator(rows=1_000_000)
+        stats = generator.generate("data/local_warehouse")
+    """
+
+    def __init__(
+        self,
+        rows: int,
+        patients: Optional[int] = None,
+        drugs_per_visit: float = 1.3,
+        chunk_rows: int = 2_000_000,
+        deleted_ratio: float = 0.01,
+        seed: int = 42,
+        reference_dir: Path = REFERENCE_DIR
+    ):
+        """
+        Args:
+            rows: basic_treatment 행 수
+            patients: 환자 수 (기본: rows / 25)
+            drugs_per_visit: 방문당 평균 처방 약품 수 (prescribed_drug ≈ rows × drugs_per_visit)
+            chunk_rows: 한 번에 생성/기록하는 basic_treatment 행 수
+            deleted_ratio: deleted=TRUE 비율 (레시피의 deleted=FALSE 필터 검증용)
+            seed: 난수 시드 (같은 시드 → 같은 데이터)
+        """
+        self.rows = int(rows)
+        self.patients = int(patients or max(1, self.rows // 25))
+        self.hospitals = int(min(100_000, max(50, self.patients // 200)))
+        self.drugs_per_visit = drugs_per_visit
+        self.chunk_rows = int(chunk_rows)
+        self.deleted_ratio = deleted_ratio
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        reference = load_reference_distributions(reference_dir)
+        diseases = reference['diseases']
+        drugs = reference['drugs']
+
+        # 질환 분포
+        self.disease_codes = diseases['code'].to_numpy()
+        self.disease_names = diseases['name'].to_numpy()
+        self.disease_weights = (diseases['patient_count'] / diseases['patient_count'].sum()).to_numpy()
+        self.disease_visits = diseases['visits_per_patient'].to_numpy()
+        self.disease_first = (diseases['first_day'].to_numpy().astype('datetime64[D]') - DATE_MIN).astype(np.int64)
+        self.disease_last = (diseases['last_day'].to_numpy().astype('datetime64[D]') - DATE_MIN).astype(np.int64)
+        departments = diseases['department'].to_numpy()
+        self.department_values, self.disease_department = np.unique(departments, return_inverse=True)
+
+        # 기대 방문 수 / 에피소드 (에피소드 수 산정용)
+        self.visits_per_episode = float(np.dot(self.disease_weights, self.disease_visits))
+
+        # 약품 분포
+        self.drug_names = drugs['name'].to_numpy()
+        self.drug_ingredients = drugs['ingredients'].to_numpy()
+        self.drug_weights = (drugs['prescription_count'] / drugs['prescription_count'].sum()).to_numpy()
+
+        # 행위 분포
+        self.act_names = [name for name, _ in TREATMENT_ACTS]
+        act_weights = np.array([w for _, w in TREATMENT_ACTS])
+        self.act_weights = act_weights / act_weights.sum()
+
+        # 날짜 사전 (YYYYMMDD 문자열을 날짜 수만큼만 생성)
+        self.n_days = int((DATE_MAX - DATE_MIN).astype(int)) + 1
+        days = DATE_MIN + np.arange(self.n_days)
+        self.day_strings = np.char.replace(np.datetime_as_string(days, unit='D'), '-', '')
+        self.day_years = days.astype('datetime64[Y]').astype(int) + 1970
+
+        self._hospital_table: Optional[pa.Table] = None
+        self._hospital_weights: Optional[np.ndarray] = None
+
+    # ------------------------------------------------------------------
+    # 차원 테이블
+    # ------------------------------------------------------------------
+
+    def build_hospitals(self) -> pa.Table:
+        """hospital 테이블 (레시피에서 쓰는 컬럼: hospital_code, medical_facility_type_code, full_address 등)"""
+        n = self.hospitals
+        rng = self.rng
+
+        region_weights = np.array([w for _, _, w in REGIONS])
+        region_idx = rng.choice(len(REGIONS), size=n, p=region_weights / region_weights.sum())
+        sigungu = np.empty(n, dtype=object)
+        for r, (_, districts, _) in enumerate(REGIONS):
+            mask = region_idx == r
+            sigungu[mask] = rng.choice(districts, size=int(mask.sum()))
+        sido = np.array([REGIONS[r][0] for r in region_idx], dtype=object)
+
+        type_weights = np.array([w for _, _, w in FACILITY_TYPES])
+        type_idx = rng.choice(len(FACILITY_TYPES), size=n, p=type_weights / type_weights.sum())
+        type_codes = np.array([FACILITY_TYPES[t][0] for t in type_idx], dtype=object)
+        suffixes = np.array([FACILITY_TYPES[t][1] for t in type_idx], dtype=object)
+
+        codes = np.char.mod('%08d', 10_000_000 + np.arange(n))
+        names = np.array([f"{s.split()[0][:2]}{i % 997}{suffix}" for i, (s, suffix) in enumerate(zip(sido, suffixes))])
+        addresses = np.array([f"{a} {b} 중앙로 {i % 300 + 1}" for i, (a, b) in enumerate(zip(sido, sigungu))])
+
+        # 큰 기관일수록 방문이 많도록 가중치 (Zipf 형태 + 종별 보정)
+        type_boost = np.array([{'01': 40, '11': 15, '21': 5, '28': 2, '29': 1, '31': 1, '92': 0.5}[c] for c in type_codes])
+        weights = type_boost / np.arange(1, n + 1) ** 0.3
+        self._hospital_weights = weights / weights.sum()
+
+        return pa.table({
+            'hospital_code': pa.array(codes),
+            'medical_facility_code': pa.array(codes),
+            'name': pa.array(names),
+            'medical_facility_name': pa.array(names),
+            'medical_facility_type_code': pa.array(type_codes.astype(str)),
+            'hospital_level': pa.array(suffixes.astype(str)),
+            'sido_name': pa.array(sido.astype(str)),
+            'sigungu_name': pa.array(sigungu.astype(str)),
+            'full_address': pa.array(addresses),
+            'location_address': pa.array(addresses),
+            'deleted': pa.array(np.zeros(n, dtype=bool)),
+        })
+
+    def build_people(self, start: int, stop: int) -> Dict[str, pa.Table]:
+        """user / insured_person 테이블 (user_id = start..stop-1 구간)"""
+        rng = self.rng
+        n = stop - start
+        user_ids = np.arange(start, stop, dtype=np.int64) + 1
+
+        # 나이: 20~90세, 중년층 비중이 높은 분포
+        birth_years = np.clip(rng.normal(1972, 16, n).round(), 1935, 2005).astype(np.int64)
+        birth_months = rng.integers(1, 13, n)
+        birth_days = rng.integers(1, 29, n)
+        birthday = _to_str(birth_years * 10000 + birth_months * 100 + birth_days)
+        gender_idx = (rng.random(n) < 0.52).astype(np.int32)  # 1 = WOMAN
+
+        name_idx = rng.integers(0, len(SURNAMES) * len(GIVEN_NAMES), n)
+        name_values = [s + g for s in SURNAMES for g in GIVEN_NAMES]
+        phone = pc.binary_join_element_wise('010', _to_str(rng.integers(10_000_000, 100_000_000, n)), '')
+        created_at = pa.array(
+            (np.datetime64('2019-06-01') + rng.integers(0, 365 * 5, n).astype('timedelta64[D]')).astype('datetime64[us]')
+        )
+
+        user = pa.table({
+            'id': pa.array(user_ids),
+            'name': _dictionary(name_idx, name_values),
+            'birthday': birthday,
+            'phone_number': phone,
+            'age': pa.array(2025 - birth_years),
+            'created_at': created_at,
+        })
+        insured_person = pa.table({
+            'insured_person_id': pa.array(user_ids),
+            'user_id': pa.array(user_ids),
+            'name': _dictionary(name_idx, name_values),
+            'birthday': birthday,
+            'gender': _dictionary(gender_idx, ['MAN', 'WOMAN']),
+            'created_at': created_at,
+        })
+        return {'user': user, 'insured_person': insured_person}
+
+    def build_checkups(self, user_ids: np.ndarray, id_offset: int) -> pa.Table:
+        """nhis_health_checkup_preview 테이블 (수검자별 1~MAX_CHECKUPS회, BMI 등 수치는 varchar)"""
+        rng = self.rng
+        examined = user_ids[rng.random(len(user_ids)) < CHECKUP_RATIO]
+        per_user = rng.integers(1, MAX_CHECKUPS + 1, len(examined))
+        users = np.repeat(examined, per_user)
+        n = len(users)
+
+        day = rng.integers(0, self.n_days, n)
+        height = rng.normal(165, 9, n).clip(140, 195)
+        bmi = rng.lognormal(np.log(23.5), 0.14, n).clip(15, 45)
+        weight = bmi * (height / 100) ** 2
+        systolic = rng.normal(122, 14, n).clip(90, 190).round().astype(np.int64)
+        diastolic = (systolic * rng.uniform(0.6, 0.7, n)).round().astype(np.int64)
+
+        return pa.table({
+            'nhis_health_checkup_preview_id': pa.array(np.arange(id_offset, id_offset + n, dtype=np.int64) + 1),
+            'user_id': pa.array(users),
+            'res_checkup_year': _to_str(self.day_years[day]),
+            'res_checkup_date': _dictionary(day, self.day_strings),
+            'res_height': pa.array(np.char.mod('%.1f', height)),
+            'res_weight': pa.array(np.char.mod('%.1f', weight)),
+            'res_waist': pa.array(np.char.mod('%.0f', 60 + (bmi - 15) * 2.2 + rng.normal(0, 4, n))),
+            'res_bmi': pa.array(np.char.mod('%.1f', bmi)),
+            'res_blood_pressure': pc.binary_join_element_wise(_to_str(systolic), _to_str(diastolic), '/'),
+            'res_fasting_blood_suger': _to_str(rng.lognormal(np.log(98), 0.18, n).round().astype(np.int64)),
+            'created_at': pa.array((DATE_MIN + day.astype('timedelta64[D]')).astype('datetime64[us]')),
+            'deleted': pa.array(rng.random(n) < self.deleted_ratio),
+        })
+
+    def build_medical_expenses(self, user_ids: np.ndarray, hospitals: pa.Table,
+                               history_offset: int, detail_offset: int) -> Dict[str, pa.Table]:
+        """
+        medical_expenses_history (환자 × 의료기관) / medical_expenses_detail_history (결제 건) 테이블
+
+        금액은 "12,340" 같은 varchar, 결제일은 yyyyMMdd (레시피가 숫자/날짜로 정규화함).
+        """
+        rng = self.rng
+        per_user = rng.poisson(EXPENSE_COMPANIES_PER_PATIENT, len(user_ids))
+        users = np.repeat(user_ids, per_user)
+        n = len(users)
+        company = rng.choice(self.hospitals, size=n, p=self._hospital_weights)
+        history_ids = np.arange(history_offset, history_offset + n, dtype=np.int64) + 1
+
+        history = pa.table({
+            'medical_expenses_history_id': pa.array(history_ids),
+            'user_id': pa.array(users),
+            'res_company_name': pc.take(hospitals['name'], pa.array(company)),
+            'res_company_identity_no': pa.array(np.char.mod('%010d', 1_000_000_000 + company)),
+            'deleted': pa.array(rng.random(n) < self.deleted_ratio),
+        })
+
+        payments = 1 + rng.poisson(PAYMENTS_PER_COMPANY - 1.0, n)
+        parent = np.repeat(np.arange(n), payments)
+        m = len(parent)
+        amount = np.round(rng.lognormal(9.8, 1.0, m), -1).astype(np.int64)
+        amount_text = pa.array([f"{a:,}" for a in amount.tolist()])
+
+        details = pa.table({
+            'medical_expenses_detail_history_id': pa.array(np.arange(detail_offset, detail_offset + m, dtype=np.int64) + 1),
+            'medical_expenses_history_id': pa.array(history_ids[parent]),
+            'res_date_payment': _dictionary(rng.integers(0, self.n_days, m), self.day_strings),
+            'res_amount': amount_text,
+            'res_total_amount': amount_text,
+            'res_amount1': _to_str(amount),
+        })
+        return {'medical_expenses_history': history, 'medical_expenses_detail_history': details}
+
+    # ------------------------------------------------------------------
+    # 사실 테이블
+    # ------------------------------------------------------------------
+
+    def build_treatments(self, n_rows: int, id_offset: int) -> Dict[str, np.ndarray]:
+        """
+        basic_treatment 한 chunk를 구성하는 인덱스 배열 생성
+
+        (환자, 질환) 에피소드를 먼저 뽑고 에피소드별 방문 수만큼 반복한 뒤 n_rows로 자름.
+        """
+        rng = self.rng
+        n_episodes = int(np.ceil(n_rows / self.visits_per_episode * 1.05)) + 1
+
+        episode_disease = rng.choice(len(self.disease_codes), size=n_episodes, p=self.disease_weights)
+        episode_user = rng.integers(1, self.patients + 1, n_episodes)
+        episode_hospital = rng.choice(self.hospitals, size=n_episodes, p=self._hospital_weights)
+        episode_visits = 1 + rng.poisson(self.disease_visits[episode_disease] - 1.0)
+
+        first = self.disease_first[episode_disease]
+        last = np.maximum(self.disease_last[episode_disease], first + 1)
+        episode_start = first + (rng.random(n_episodes) * (last - first)).astype(np.int64)
+
+        # 에피소드 → 방문 행 전개
+        row_episode = np.repeat(np.arange(n_episodes), episode_visits)[:n_rows]
+        n_rows = len(row_episode)
+
+        # 에피소드 내 방문 간격: 지수분포(평균 21일) 누적합, 첫 방문은 시작일
+        gaps = rng.exponential(21.0, n_rows).astype(np.int64)
+        is_first = np.ones(n_rows, dtype=bool)
+        is_first[1:] = row_episode[1:] != row_episode[:-1]
+        gaps[is_first] = 0
+        cumulative = np.cumsum(gaps)
+        episode_base = np.maximum.accumulate(np.where(is_first, cumulative, 0))
+        day = np.clip(episode_start[row_episode] + cumulative - episode_base, 0, self.n_days - 1)
+
+        return {
+            'basic_treatment_id': np.arange(id_offset, id_offset + n_rows, dtype=np.int64) + 1,
+            'user_id': episode_user[row_episode],
+            'disease': episode_disease[row_episode],
+            'hospital': episode_hospital[row_episode],
+            'day': day,
+        }
+
+    def treatment_table(self, rows: Dict[str, np.ndarray], hospitals: pa.Table) -> pa.Table:
+        """인덱스 배열 → basic_treatment Arrow 테이블"""
+        rng = self.rng
+        n = len(rows['user_id'])
+        amount = np.round(rng.lognormal(9.6, 0.9, n), -1).astype(np.int64)
+        public_ratio = rng.uniform(0.6, 0.8, n)
+        public_charge = (amount * public_ratio).astype(np.int64)
+        created = (DATE_MIN + rows['day'].astype('timedelta64[D]') + rng.integers(1, 45, n).astype('timedelta64[D]'))
+
+        return pa.table({
+            'basic_treatment_id': pa.array(rows['basic_treatment_id']),
+            'user_id': pa.array(rows['user_id']),
+            'res_treat_start_date': _dictionary(rows['day'], self.day_strings),
+            'res_hospital_name': pc.take(hospitals['name'], pa.array(rows['hospital'])),
+            'res_hospital_code': pc.take(hospitals['hospital_code'], pa.array(rows['hospital'])),
+            'res_department': _dictionary(self.disease_department[rows['disease']], self.department_values),
+            'res_treat_type': _dictionary(
+                rng.choice(len(TREAT_TYPES), size=n, p=TREAT_TYPE_WEIGHTS), TREAT_TYPES
+            ),
+            'res_disease_code': _dictionary(rows['disease'], self.disease_codes),
+            'res_disease_name': _dictionary(rows['disease'], self.disease_names),
+            'res_visit_days': _dictionary(np.zeros(n, dtype=np.int32), ['1']),
+            'res_total_amount': _to_str(amount),
+            'res_public_charge': _to_str(public_charge),
+            'res_deductible_amt': _to_str(amount - public_charge),
+            'created_at': pa.array(created.astype('datetime64[us]')),
+            'deleted': pa.array(rng.random(n) < self.deleted_ratio),
+        })
+
+    def prescription_table(self, rows: Dict[str, np.ndarray], hospitals: pa.Table, id_offset: int) -> pa.Table:
+        """방문별 Poisson(drugs_per_visit)개 약품 처방 → prescribed_drug Arrow 테이블"""
+        rng = self.rng
+        per_visit = rng.poisson(self.drugs_per_visit, len(rows['user_id']))
+        visit_idx = np.repeat(np.arange(len(per_visit)), per_visit)
+        n = len(visit_idx)
+
+        drug = rng.choice(len(self.drug_names), size=n, p=self.drug_weights)
+        day = rows['day'][visit_idx]
+        dosing_days = rng.choice([3, 5, 7, 14, 28, 30, 60, 90], size=n, p=[.25, .2, .2, .1, .1, .08, .04, .03])
+        created = DATE_MIN + day.astype('timedelta64[D]') + rng.integers(1, 45, n).astype('timedelta64[D]')
+
+        return pa.table({
+            'prescribed_drug_id': pa.array(np.arange(id_offset, id_offset + n, dtype=np.int64) + 1),
+            'user_id': pa.array(rows['user_id'][visit_idx]),
+            'res_treat_start_date': _dictionary(day, self.day_strings),
+            'res_hospital_name': pc.take(hospitals['name'], pa.array(rows['hospital'][visit_idx])),
+            'res_treat_type': _dictionary(np.zeros(n, dtype=np.int32), ['약국']),
+            'res_drug_name': _dictionary(drug, self.drug_names),
+            'res_ingredients': _dictionary(drug, self.drug_ingredients),
+            'res_one_dose': _dictionary(rng.integers(0, 3, n), ['1', '2', '0.5']),
+            'res_daily_doses_number': _dictionary(rng.integers(0, 3, n), ['1', '2', '3']),
+            'res_total_dosing_days': _to_str(dosing_days),
+            'created_at': pa.array(created.astype('datetime64[us]')),
+            'deleted': pa.array(rng.random(n) < self.deleted_ratio),
+        })
+
+    def detail_table(self, rows: Dict[str, np.ndarray], treatments: pa.Table, id_offset: int,
+                     acts_per_visit: float = 1.5) -> pa.Table:
+        """방문별 Poisson(acts_per_visit)개 진료 행위 → detail_treatment Arrow 테이블"""
+        rng = self.rng
+        per_visit = rng.poisson(acts_per_visit, len(rows['user_id']))
+        visit_idx = np.repeat(np.arange(len(per_visit)), per_visit)
+        n = len(visit_idx)
+        take = pa.array(visit_idx)
+
+        return pa.table({
+            'detail_treatment_id': pa.array(np.arange(id_offset, id_offset + n, dtype=np.int64) + 1),
+            'user_id': pa.array(rows['user_id'][visit_idx]),
+            'res_treat_start_date': _dictionary(rows['day'][visit_idx], self.day_strings),
+            'res_hospital_name': pc.take(treatments['res_hospital_name'], take),
+            'res_treat_type': pc.take(treatments['res_treat_type'], take),
+            'res_code_name': _dictionary(rng.choice(len(self.act_names), size=n, p=self.act_weights), self.act_names),
+            'res_one_dose': _dictionary(np.zeros(n, dtype=np.int32), ['1']),
+            'res_daily_doses_number': _dictionary(np.zeros(n, dtype=np.int32), ['1']),
+            'res_total_dosing_days': _dictionary(np.zeros(n, dtype=np.int32), ['1']),
+            'created_at': pc.take(treatments['created_at'], take),
+            'deleted': pa.array(rng.random(n) < self.deleted_ratio),
+        })
+
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+
+    def _write_partitioned(self, table: pa.Table, days: np.ndarray, directory: Path, chunk: int) -> None:
+        """진료일 연도별 hive 파티션(year=YYYY)으로 기록"""
+        years = self.day_years[days]
+        order = np.argsort(years, kind='stable')
+        sorted_years = years[order]
+        boundaries = np.flatnonzero(np.diff(sorted_years)) + 1
+        for part in np.split(np.arange(len(order)), boundaries):
+            if len(part) == 0:
+                continue
+            year = int(sorted_years[part[0]])
+            partition = directory / f"year={year}"
+            partition.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table.take(pa.array(order[part])), partition / f"part-{chunk:05d}.parquet")
+
+    def generate(self, output_dir: str = str(DEFAULT_OUTPUT), overwrite: bool = False,
+                 progress: bool = True) -> GenerationStats:
+        """
+        전체 테이블을 output_dir에 생성
+
+        Args:
+            output_dir: 출력 디렉토리 (테이블별 하위 디렉토리)
+            overwrite: True면 기존 테이블 디렉토리 삭제 후 생성
+            progress: chunk별 진행 상황 출력
+        """
+        started = time.time()
+        output = Path(output_dir)
+        tables = ['basic_treatment', 'prescribed_drug', 'detail_treatment', 'insured_person', 'user', 'hospital',
+                  'nhis_health_checkup_preview', 'medical_expenses_history', 'medical_expenses_detail_history']
+        for name in tables:
+            target = output / name
+            if target.exists():
+                if not overwrite:
+                    raise FileExistsError(f"{target} already exists (use --overwrite)")
+                shutil.rmtree(target)
+            target.mkdir(parents=True)
+
+        stats = GenerationStats(rows=self.rows, patients=self.patients, hospitals=self.hospitals, seed=self.seed)
+
+        hospitals = self.build_hospitals()
+        pq.write_table(hospitals, output / 'hospital' / 'part-00000.parquet')
+
+        people_chunk = max(1, self.chunk_rows // 4)
+        for chunk, start in enumerate(range(0, self.patients, people_chunk)):
+            stop = min(self.patients, start + people_chunk)
+            people = self.build_people(start, stop)
+            user_ids = people['user']['id'].to_numpy()
+            people['nhis_health_checkup_preview'] = self.build_checkups(user_ids, stats.checkup_rows)
+            people.update(self.build_medical_expenses(
+                user_ids, hospitals, stats.medical_expenses_rows, stats.medical_expenses_detail_rows
+            ))
+            for name, table in people.items():
+                pq.write_table(table, output / name / f"part-{chunk:05d}.parquet")
+
+            stats.checkup_rows += people['nhis_health_checkup_preview'].num_rows
+            stats.medical_expenses_rows += people['medical_expenses_history'].num_rows
+            stats.medical_expenses_detail_rows += people['medical_expenses_detail_history'].num_rows
+
+        treatment_offset = 0
+        prescription_offset = 0
+        detail_offset = 0
+        for chunk, start in enumerate(range(0, self.rows, self.chunk_rows)):
+            n_rows = min(self.chunk_rows, self.rows - start)
+            rows = self.build_treatments(n_rows, treatment_offset)
+            treatments = self.treatment_table(rows, hospitals)
+            prescriptions = self.prescription_table(rows, hospitals, prescription_offset)
+            details = self.detail_table(rows, treatments, detail_offset)
+
+            self._write_partitioned(treatments, rows['day'], output / 'basic_treatment', chunk)
+            visit_days = pc.cast(prescriptions['res_treat_start_date'].combine_chunks().indices, pa.int64())
+            self._write_partitioned(prescriptions, visit_days.to_numpy(), output / 'prescribed_drug', chunk)
+            detail_days = pc.cast(details['res_treat_start_date'].combine_chunks().indices, pa.int64())
+            self._write_partitioned(details, detail_days.to_numpy(), output / 'detail_treatment', chunk)
+
+            treatment_offset += treatments.num_rows
+            prescription_offset += prescriptions.num_rows
+            detail_offset += details.num_rows
+            stats.chunks += 1
+
+            if progress:
+                elapsed = time.time() - started
+                print(f"  - chunk {chunk + 1}: {treatment_offset:,}/{self.rows:,} treatments, "
+                      f"{prescription_offset:,} prescriptions ({elapsed:.1f}s)")
+
+        stats.basic_treatment_rows = treatment_offset
+        stats.prescribed_drug_rows = prescription_offset
+        stats.detail_treatment_rows = detail_offset
+        stats.elapsed = round(time.time() - started, 2)
+
+        with open(output / '_generation.json', 'w', encoding='utf-8') as f:
+            json.dump(asdict(stats), f, ensure_ascii=False, indent=2)
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='합성 진료 데이터 생성 (로컬 DuckDB 실행기용 Parquet)')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='basic_treatment 행 수 (권장 1M~500M)')
+    parser.add_argument('--patients', type=int, default=None, help='환자 수 (기본: rows / 25)')
+    parser.add_argument('--drugs-per-visit', type=float, default=1.3, help='방문당 평균 처방 약품 수')
+    parser.add_argument('--chunk-rows', type=int, default=2_000_000, help='chunk당 basic_treatment 행 수')
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT), help='출력 디렉토리')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--overwrite', action='store_true', help='기존 데이터 덮어쓰기')
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows:,} basic_treatment rows into {args.output} ...")
+    generator = SyntheticDataGenerator(
+        rows=args.rows,
+        patients=args.patients,
+        drugs_per_visit=args.drugs_per_visit,
+        chunk_rows=args.chunk_rows,
+        seed=args.seed
+    )
+    try:
+        stats = generator.generate(args.output, overwrite=args.overwrite)
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("-" * 50)
+    print("✅ Generation complete.")
+    print(f"   basic_treatment: {stats.basic_treatment_rows:,} rows")
+    print(f"   prescribed_drug: {stats.prescribed_drug_rows:,} rows")
+    print(f"   detail_treatment: {stats.detail_treatment_rows:,} rows")
+    print(f"   nhis_health_checkup_preview: {stats.checkup_rows:,} rows")
+    print(f"   medical_expenses_history / detail: {stats.medical_expenses_rows:,} / "
+          f"{stats.medical_expenses_detail_rows:,} rows")
+    print(f"   patients: {stats.patients:,} / hospitals: {stats.hospitals:,}")
+    print(f"   elapsed: {stats.elapsed}s")
+    print("   Use with config.yaml -> databricks.executor: local, databricks.local.data_dir")
+
+
+if __name__ == "__main__":
+    main()
@@ -303,7 +303,7 @@ class DatabricksTokenValidator:
             client = DatabricksClient()
 
             # 간단한 쿼리로 테스트
-            result = client.execute_query("SELECT 1 as test", max_rows=1)
+            result = client.execute_query("SELECT 1 as test", max_rows=1, use_cache=False)
 
             if result['success']:
                 return {
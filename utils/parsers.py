@@ -4,8 +4,9 @@ Pure functions with no external dependencies
 """
 
 import io
+import json
 import pandas as pd
-from typing import Union
+from typing import List, Optional, Union
 
 
 def robust_csv_parser(data_input: Union[str, io.BytesIO]) -> pd.DataFrame:
@@ -30,3 +31,102 @@ def robust_csv_parser(data_input: Union[str, io.BytesIO]) -> pd.DataFrame:
     # Use sep=None and engine='python' to auto-detect separators
     df = pd.read_csv(csv_file, sep=None, engine='python')
     return df
+
+
+class StreamingJSONField:
+    """
+    Incrementally extracts one top-level string field from a JSON object that arrives in chunks.
+
+    Text before the opening brace (e.g. a ```json fence) and after the closing brace is ignored.
+    `feed()` returns the decoded value seen so far, so callers can render it while the rest of
+    the object is still being generated; `complete` turns True once the closing quote arrives.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.value: Optional[str] = None
+        self.complete = False
+
+        self._depth = 0
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._capture_next = False
+        self._string_role: Optional[str] = None   # 'key' | 'value' | None (skipped)
+        self._raw: List[str] = []
+        self._key: Optional[str] = None
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Consume the next chunk.
+
+        Returns:
+            Decoded field value so far, or None if the field has not started yet
+        """
+        for char in chunk:
+            if self._done:
+                break
+            if self._in_string:
+                self._consume_string_char(char)
+            elif self._depth == 0:
+                if char == '{':
+                    self._depth, self._expect_key = 1, True
+            else:
+                self._consume_structural_char(char)
+
+        if self._string_role == 'value' and self._in_string:
+            self.value = self._decode_partial(''.join(self._raw))
+        return self.value
+
+    def _consume_string_char(self, char: str) -> None:
+        if self._escape:
+            self._escape = False
+        elif char == '\\':
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            raw = ''.join(self._raw)
+            if self._string_role == 'key':
+                self._key = json.loads(f'"{raw}"', strict=False)
+            elif self._string_role == 'value':
+                self.value = json.loads(f'"{raw}"', strict=False)
+                self.complete = True
+                self._done = True
+            self._string_role = None
+            return
+        if self._string_role is not None:
+            self._raw.append(char)
+
+    def _consume_structural_char(self, char: str) -> None:
+        if char == '"':
+            self._in_string = True
+            self._raw = []
+            if self._depth == 1 and self._expect_key:
+                self._string_role = 'key'
+            elif self._depth == 1 and self._capture_next:
+                self._string_role = 'value'
+            self._capture_next = False
+        elif char in '{[':
+            self._depth += 1
+            self._capture_next = False
+        elif char in '}]':
+            self._depth -= 1
+            self._done = self._depth == 0
+        elif self._depth == 1 and char == ',':
+            self._expect_key = True
+        elif self._depth == 1 and char == ':':
+            self._expect_key = False
+            self._capture_next = self._key == self.field
+        elif not char.isspace():
+            self._capture_next = False
+
+    @staticmethod
+    def _decode_partial(raw: str) -> str:
+        # Drop a trailing, not yet complete escape sequence (\, \u00, ...) before decoding
+        for cut in range(0, min(len(raw), 6) + 1):
+            try:
+                return json.loads(f'"{raw[:len(raw) - cut]}"', strict=False)
+            except json.JSONDecodeError:
+                continue
+        return ''